@@ -0,0 +1 @@
+"""Benchmarks en belastingtests voor PlantWijs (zie benchmarks/README.md)."""
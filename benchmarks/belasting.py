@@ -0,0 +1,405 @@
+# belasting.py
+# Doel: uitzoeken hoeveel gelijktijdige gebruikers één instance draagt (Render:
+# 512 MB), met realistische verkeersmixen tegen de app en de nep-PDOK.
+#
+# Gebruik (vanuit de projectroot):
+#   python benchmarks/belasting.py                              # mix "gemengd", 1..128 gebruikers
+#   python benchmarks/belasting.py --mix agent --stappen 4,8,16,32 --stap-s 30
+#   python benchmarks/belasting.py --mix browser --json belasting.json
+#   python benchmarks/belasting.py --env PLANTWIJS_PDF_WORKERS=2
+#
+# Elke virtuele gebruiker doet sessies na elkaar, met een (exponentieel
+# verdeelde) denktijd ertussen. De sessies volgen de website en de agents:
+#   kaartklik   — /advies/geo zoals static/js/api.js hem stuurt, daarna
+#                 /api/plants met vocht/bodem van de kaart, soms nog een
+#                 tweede /api/plants met een extra filter;
+#   agent_md    — /advies/geo?format=md, op coördinaten of op adres;
+#   export_csv, export_xlsx, pdf — de downloads onder het soortenlijstje.
+# De mix bepaalt de verhouding (zie MIXEN). Het aantal gebruikers loopt per
+# stap op; na elke stap volgt een regel met doorvoer, latentie per soort
+# request, threadpool en geheugen.
+#
+# Gemeten bij de app (een gewone uvicorn-worker):
+#   - geheugen: VmHWM en VmRSS uit /proc/<pid>/status van de worker plus de
+#     RSS van zijn kindprocessen (de PDF-procespool), elke 0,25 s bemonsterd;
+#   - threadpool: plantwijs_threadpool_busy/_waiting uit /api/metrics (async,
+#     dus zelf niet in de rij), elke 0,5 s.
+#
+# Verzadigd is de eerste stap waarin de doorvoer minder dan 5 % stijgt ten
+# opzichte van de beste stap tot dan toe, of waarin een grens overschreden
+# wordt: p95 boven --slo-ms, meer dan 1 % fouten, of meer geheugen dan
+# --geheugen-mb. De ramp stopt daarna (tenzij --alle-stappen). Alleen Linux
+# (/proc); CPU-beperking van een kleine instance is te benaderen met
+# `taskset -c 0 python benchmarks/belasting.py`.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import omgeving  # noqa: E402
+from benchmarks.bench import PLEKKEN, PLANTS_FILTERS  # noqa: E402
+
+# standaardkeuze van de website: inheems en ingeburgerd aan, exoot uit
+STATUS = {"toon_inheems": "true", "toon_ingeburgerd": "true", "toon_exoot": "false",
+          "exclude_invasief": "true"}
+
+# sessie → (gewicht, denktijd-factor); agents wachten korter dan mensen
+MIXEN: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "browser": {"kaartklik": (85, 1.0), "export_csv": (6, 1.0), "export_xlsx": (3, 1.0), "pdf": (6, 1.0)},
+    "agent": {"agent_md": (100, 0.25)},
+    "gemengd": {"kaartklik": (55, 1.0), "agent_md": (25, 0.25), "export_csv": (8, 1.0),
+                "export_xlsx": (4, 1.0), "pdf": (8, 1.0)},
+}
+
+FOUTGRENS = 0.01
+GROEI_MIN = 1.05
+
+
+# ───────────────────── sessies
+class Gebruiker:
+    """Eén virtuele gebruiker: een eigen stroom willekeurige keuzes en de laatste plek."""
+
+    def __init__(self, nr: int, client: httpx.AsyncClient, meting: "Meting"):
+        self.rng = random.Random(nr)
+        self.client = client
+        self.meting = meting
+        self.context: Dict[str, Any] = {}
+
+    def punt(self) -> Dict[str, float]:
+        lat, lon = self.rng.choice(PLEKKEN)
+        return {"lat": round(lat + self.rng.uniform(-0.03, 0.03), 6),
+                "lon": round(lon + self.rng.uniform(-0.03, 0.03), 6)}
+
+    def soorten_query(self) -> Dict[str, Any]:
+        q: Dict[str, Any] = dict(STATUS)
+        for veld in ("vocht", "bodem"):
+            if self.context.get(veld):
+                q[veld] = self.context[veld]
+        return q
+
+    async def get(self, soort: str, pad: str, params: Dict[str, Any]) -> Optional[httpx.Response]:
+        t = time.perf_counter()
+        try:
+            r = await self.client.get(pad, params=params)
+            ok = r.status_code == 200
+        except httpx.HTTPError:
+            r, ok = None, False
+        self.meting.noteer(soort, time.perf_counter() - t, ok)
+        return r
+
+    async def kaartklik(self) -> None:
+        r = await self.get("geo", "/advies/geo", {**self.punt(), **STATUS})
+        if r is not None and r.status_code == 200:
+            d = r.json()
+            self.context = {"vocht": d.get("vocht"), "bodem": d.get("bodem")}
+        await self.get("plants", "/api/plants", self.soorten_query())
+        if self.rng.random() < 0.4:   # nog een filter erbij
+            extra = {k: v for k, v in self.rng.choice(PLANTS_FILTERS).items() if k in ("licht", "q")}
+            await self.get("plants", "/api/plants", {**self.soorten_query(), **extra})
+
+    async def agent_md(self) -> None:
+        if self.rng.random() < 0.5:
+            params: Dict[str, Any] = {"adres": f"Loenenseweg {self.rng.randint(1, 200)} Beekbergen"}
+        else:
+            params = self.punt()
+        await self.get("geo_md", "/advies/geo", {**params, "format": "md"})
+
+    async def export_csv(self) -> None:
+        await self.get("export_csv", "/export/csv", self.soorten_query())
+
+    async def export_xlsx(self) -> None:
+        await self.get("export_xlsx", "/export/xlsx", self.soorten_query())
+
+    async def pdf(self) -> None:
+        await self.get("pdf", "/advies/pdf", {**self.punt(), **self.soorten_query()})
+
+
+async def _gebruiker(g: Gebruiker, mix: Dict[str, Tuple[float, float]], denktijd_s: float,
+                     eind: float) -> None:
+    namen = list(mix)
+    gewichten = [mix[n][0] for n in namen]
+    # niet iedereen tegelijk: de eerste sessie start ergens in de eerste denktijd
+    await asyncio.sleep(g.rng.uniform(0, denktijd_s))
+    while time.monotonic() < eind:
+        naam = g.rng.choices(namen, gewichten)[0]
+        await getattr(g, naam)()
+        factor = mix[naam][1]
+        if denktijd_s > 0:
+            await asyncio.sleep(g.rng.expovariate(1 / (denktijd_s * factor)))
+
+
+# ───────────────────── metingen
+class Meting:
+    """Duur en uitslag per soort request binnen één stap."""
+
+    def __init__(self) -> None:
+        self.duren: Dict[str, List[float]] = {}
+        self.fouten: Dict[str, int] = {}
+
+    def noteer(self, soort: str, duur_s: float, ok: bool) -> None:
+        self.duren.setdefault(soort, []).append(duur_s)
+        self.fouten[soort] = self.fouten.get(soort, 0) + (not ok)
+
+    def alle(self) -> List[float]:
+        return [d for duren in self.duren.values() for d in duren]
+
+
+def _proc_status(pid: int) -> Dict[str, int]:
+    """VmRSS/VmHWM (kB) van één proces; {} als het er niet meer is."""
+    uit: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for regel in f:
+                if regel.startswith(("VmRSS:", "VmHWM:")):
+                    naam, waarde = regel.split(":", 1)
+                    uit[naam] = int(waarde.split()[0])
+    except OSError:
+        pass
+    return uit
+
+
+def _kinderen(pid: int) -> List[int]:
+    """Alle nakomelingen van `pid` (via PPid in /proc/*/stat)."""
+    ouders: Dict[int, List[int]] = {}
+    for naam in os.listdir("/proc"):
+        if not naam.isdigit():
+            continue
+        try:
+            with open(f"/proc/{naam}/stat", "r", encoding="utf-8") as f:
+                velden = f.read().rsplit(")", 1)[1].split()
+            ouders.setdefault(int(velden[1]), []).append(int(naam))
+        except (OSError, IndexError, ValueError):
+            continue
+    uit, open_ = [], [pid]
+    while open_:
+        for kind in ouders.get(open_.pop(), []):
+            uit.append(kind)
+            open_.append(kind)
+    return uit
+
+
+class Geheugen(threading.Thread):
+    """Bemonstert het geheugen van de worker en zijn kindprocessen."""
+
+    def __init__(self, pid: int, interval_s: float = 0.25):
+        super().__init__(name="geheugen", daemon=True)
+        self.pid = pid
+        self.interval_s = interval_s
+        self.piek_totaal_kb = 0
+        self._klaar = threading.Event()
+
+    def run(self) -> None:
+        while not self._klaar.is_set():
+            totaal = _proc_status(self.pid).get("VmRSS", 0)
+            totaal += sum(_proc_status(k).get("VmRSS", 0) for k in _kinderen(self.pid))
+            self.piek_totaal_kb = max(self.piek_totaal_kb, totaal)
+            self._klaar.wait(self.interval_s)
+
+    def nieuwe_stap(self) -> None:
+        self.piek_totaal_kb = 0
+
+    def stop(self) -> None:
+        self._klaar.set()
+
+    def stand(self) -> Dict[str, Optional[float]]:
+        s = _proc_status(self.pid)
+        return {
+            "rss_mb": round(s.get("VmRSS", 0) / 1024, 1),
+            "hwm_mb": round(s.get("VmHWM", 0) / 1024, 1),
+            "piek_totaal_mb": round(self.piek_totaal_kb / 1024, 1),
+        }
+
+
+async def _volg_threadpool(basis: str, monsters: List[Tuple[float, float]], stop: asyncio.Event) -> None:
+    """(bezet, wachtend) uit /api/metrics, met een eigen client (niet in de rij van de gebruikers)."""
+    async with httpx.AsyncClient(base_url=basis, timeout=10) as client:
+        while not stop.is_set():
+            try:
+                waarden = {}
+                for regel in (await client.get("/api/metrics")).text.splitlines():
+                    if regel.startswith("plantwijs_threadpool_"):
+                        naam, waarde = regel.rsplit(" ", 1)
+                        waarden[naam] = float(waarde)
+                if waarden:
+                    monsters.append((waarden.get("plantwijs_threadpool_busy", 0.0),
+                                     waarden.get("plantwijs_threadpool_waiting", 0.0)))
+            except httpx.HTTPError:
+                pass
+            try:
+                await asyncio.wait_for(stop.wait(), 0.5)
+            except asyncio.TimeoutError:
+                pass
+
+
+# ───────────────────── ramp
+async def _stap(basis: str, gebruikers: int, mix: Dict[str, Tuple[float, float]], denktijd_s: float,
+                duur_s: float, geheugen: Geheugen) -> Dict[str, Any]:
+    meting = Meting()
+    monsters: List[Tuple[float, float]] = []
+    stop = asyncio.Event()
+    geheugen.nieuwe_stap()
+    limieten = httpx.Limits(max_connections=gebruikers + 8, max_keepalive_connections=gebruikers + 8)
+    async with httpx.AsyncClient(base_url=basis, timeout=120, limits=limieten) as client:
+        volger = asyncio.create_task(_volg_threadpool(basis, monsters, stop))
+        t0 = time.monotonic()
+        eind = t0 + duur_s
+        await asyncio.gather(*(_gebruiker(Gebruiker(nr, client, meting), mix, denktijd_s, eind)
+                               for nr in range(gebruikers)))
+        wandklok = time.monotonic() - t0
+        stop.set()
+        await volger
+
+    alle = meting.alle()
+    fouten = sum(meting.fouten.values())
+    bezet = [b for b, _ in monsters]
+    wachtend = [w for _, w in monsters]
+    return {
+        "gebruikers": gebruikers,
+        "duur_s": round(wandklok, 1),
+        "totaal": omgeving.samenvatting(alle, wandklok, fouten),
+        "per_soort": {soort: omgeving.samenvatting(duren, wandklok, meting.fouten.get(soort, 0))
+                      for soort, duren in sorted(meting.duren.items())},
+        "threadpool": {
+            "bezet_max": max(bezet, default=None),
+            "bezet_gem": round(sum(bezet) / len(bezet), 1) if bezet else None,
+            "wachtend_max": max(wachtend, default=None),
+            "wachtend_gem": round(sum(wachtend) / len(wachtend), 1) if wachtend else None,
+        },
+        "geheugen": geheugen.stand(),
+    }
+
+
+def _grens(stap: Dict[str, Any], slo_ms: float, geheugen_mb: float) -> Optional[str]:
+    """Waarom deze stap over een grens gaat, of None."""
+    t = stap["totaal"]
+    if t["aantal"] and t["fouten"] / t["aantal"] > FOUTGRENS:
+        return f"{t['fouten']}/{t['aantal']} fouten"
+    if t["p95_ms"] is not None and t["p95_ms"] > slo_ms:
+        return f"p95 {t['p95_ms']:.0f} ms > {slo_ms:.0f} ms"
+    if stap["geheugen"]["piek_totaal_mb"] > geheugen_mb:
+        return f"geheugen {stap['geheugen']['piek_totaal_mb']:.0f} MB > {geheugen_mb:.0f} MB"
+    return None
+
+
+def _regel(stap: Dict[str, Any]) -> str:
+    t, tp, g = stap["totaal"], stap["threadpool"], stap["geheugen"]
+
+    def _v(x: Any, fmt: str = ".0f") -> str:
+        return "-" if x is None else format(x, fmt)
+    per_soort = " ".join(f"{soort}={_v(r['p95_ms'])}" for soort, r in stap["per_soort"].items())
+    return (f"{stap['gebruikers']:>5} {_v(t['rps'], '.1f'):>7} {t['aantal']:>6} {t['fouten']:>5} "
+            f"{_v(t['p50_ms']):>7} {_v(t['p95_ms']):>7} {_v(t['p99_ms']):>7} "
+            f"{_v(tp['bezet_max']):>5} {_v(tp['wachtend_max']):>5} "
+            f"{_v(g['piek_totaal_mb']):>6} {_v(g['hwm_mb']):>6}   p95: {per_soort}")
+
+
+KOP = (f"{'gebr':>5} {'req/s':>7} {'n':>6} {'fout':>5} {'p50':>7} {'p95':>7} {'p99':>7} "
+       f"{'pool':>5} {'wacht':>5} {'MB':>6} {'HWM':>6}")
+
+
+def analyse(stappen: List[Dict[str, Any]], slo_ms: float, geheugen_mb: float) -> Dict[str, Any]:
+    """De beste gezonde stap en de stap waarin de app verzadigd raakt."""
+    beste: Optional[Dict[str, Any]] = None
+    verzadigd: Optional[Dict[str, Any]] = None
+    reden = None
+    for stap in stappen:
+        reden = _grens(stap, slo_ms, geheugen_mb)
+        rps = stap["totaal"]["rps"] or 0.0
+        if reden is None and beste is not None and rps < beste["totaal"]["rps"] * GROEI_MIN:
+            reden = "doorvoer stijgt niet meer"
+        if reden is not None:
+            verzadigd = stap
+            break
+        if beste is None or rps > beste["totaal"]["rps"]:
+            beste = stap
+    return {
+        "max_gebruikers_binnen_grenzen": beste["gebruikers"] if beste else None,
+        "doorvoer_rps": beste["totaal"]["rps"] if beste else None,
+        "verzadigd_bij_gebruikers": verzadigd["gebruikers"] if verzadigd else None,
+        "reden": reden if verzadigd else None,
+        "hwm_mb": max((s["geheugen"]["hwm_mb"] for s in stappen), default=None),
+        "piek_totaal_mb": max((s["geheugen"]["piek_totaal_mb"] for s in stappen), default=None),
+    }
+
+
+async def _ramp(args: argparse.Namespace, app: omgeving.App) -> List[Dict[str, Any]]:
+    mix = MIXEN[args.mix]
+    geheugen = Geheugen(app.pid)
+    geheugen.start()
+    stappen: List[Dict[str, Any]] = []
+    print(KOP, flush=True)
+    try:
+        for n in args.stappen:
+            stap = await _stap(app.basis, n, mix, args.denktijd_s, args.stap_s, geheugen)
+            stappen.append(stap)
+            print(_regel(stap), flush=True)
+            if not args.alle_stappen and analyse(stappen, args.slo_ms, args.geheugen_mb)["verzadigd_bij_gebruikers"]:
+                break
+    finally:
+        geheugen.stop()
+    return stappen
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Belastingtest van PlantWijs tegen een lokale nep-PDOK.")
+    ap.add_argument("--mix", choices=sorted(MIXEN), default="gemengd")
+    ap.add_argument("--stappen", default="1,2,4,8,16,32,64,128",
+                    help="aantallen gelijktijdige gebruikers, komma-gescheiden")
+    ap.add_argument("--stap-s", type=float, default=20.0, help="duur per stap")
+    ap.add_argument("--denktijd-s", type=float, default=2.0,
+                    help="gemiddelde denktijd tussen sessies (agents: een kwart)")
+    ap.add_argument("--slo-ms", type=float, default=3000.0, help="grens voor p95 over alle requests")
+    ap.add_argument("--geheugen-mb", type=float, default=512.0,
+                    help="grens voor het geheugen van worker + kindprocessen")
+    ap.add_argument("--alle-stappen", action="store_true", help="ook na verzadiging doorgaan")
+    ap.add_argument("--latentie-ms", type=float, default=60.0, help="latentie per PDOK-aanvraag")
+    ap.add_argument("--spreiding-ms", type=float, default=40.0, help="plus 0..N ms willekeurig")
+    ap.add_argument("--foutkans", type=float, default=0.0, help="aandeel PDOK-aanvragen dat 503 krijgt")
+    ap.add_argument("--env", action="append", default=[], metavar="NAAM=WAARDE",
+                    help="extra omgevingsvariabele voor de app (herhaalbaar)")
+    ap.add_argument("--json", help="alle stappen en de analyse als JSON naar dit bestand")
+    ap.add_argument("--applog", help="uitvoer van de app naar dit bestand (standaard weg)")
+    args = ap.parse_args(argv)
+    args.stappen = [int(n) for n in args.stappen.split(",") if n.strip()]
+    extra_env = dict(paar.split("=", 1) for paar in args.env)
+
+    with omgeving.nep_upstream(args.latentie_ms, args.spreiding_ms, args.foutkans) as upstream, \
+            omgeving.app(upstream, extra_env=extra_env, log=args.applog) as app:
+        print(f"[LAST] mix {args.mix}: {', '.join(f'{k} {v[0]:g}' for k, v in MIXEN[args.mix].items())}; "
+              f"{args.stap_s:g} s per stap, denktijd {args.denktijd_s:g} s", flush=True)
+        stappen = asyncio.run(_ramp(args, app))
+
+    uitslag = analyse(stappen, args.slo_ms, args.geheugen_mb)
+    print()
+    if uitslag["max_gebruikers_binnen_grenzen"] is not None:
+        print(f"[LAST] binnen de grenzen: {uitslag['max_gebruikers_binnen_grenzen']} gebruikers, "
+              f"{uitslag['doorvoer_rps']} req/s")
+    if uitslag["verzadigd_bij_gebruikers"] is not None:
+        print(f"[LAST] verzadigd bij {uitslag['verzadigd_bij_gebruikers']} gebruikers: {uitslag['reden']}")
+    else:
+        print("[LAST] niet verzadigd binnen de stappen; probeer meer gebruikers")
+    print(f"[LAST] geheugen: VmHWM worker {uitslag['hwm_mb']} MB, "
+          f"piek worker + kindprocessen {uitslag['piek_totaal_mb']} MB (grens {args.geheugen_mb:g} MB)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"mix": args.mix, "instellingen": {k: v for k, v in vars(args).items() if k != "json"},
+                       "stappen": stappen, "analyse": uitslag}, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
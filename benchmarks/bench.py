@@ -0,0 +1,313 @@
+# bench.py
+# Doel: vaste prestatiemetingen van PlantWijs, los van het echte PDOK, met een
+# drempel tegen regressies die vóór een deploy gedraaid kan worden.
+#
+# Gebruik (vanuit de projectroot):
+#   python benchmarks/bench.py                                  # alles, tabel op stdout
+#   python benchmarks/bench.py --snel                           # kleinere aantallen
+#   python benchmarks/bench.py --scenario geo_json --scenario plants
+#   python benchmarks/bench.py --baseline benchmarks/baseline.json   # exit 1 bij regressie
+#   python benchmarks/bench.py --bewaar-baseline benchmarks/baseline.json
+#
+# HTTP-scenario's draaien tegen een echte uvicorn-worker met de nep-PDOK van
+# nep_upstream.py (vaste latentie + spreiding, standaard 60 + 0..40 ms per
+# PDOK-aanvraag). De klikpunten schuiven per request een beetje op, zodat de
+# caches per punt het werk niet verbergen. Index- en NSN-metingen draaien in
+# dit proces: de NSN-metingen op een synthetisch raster in een tijdelijke map
+# (de echte NSN-zip is groot en staat niet altijd in data/).
+#
+# Per scenario: p50/p95/p99/gemiddelde in ms en doorvoer in requests/s. Met
+# `--baseline` is een scenario een regressie als p95 meer dan `--drempel`
+# (standaard 25 %, plus `--marge-ms`) hoger ligt of de doorvoer meer dan die
+# drempel lager; elke fout (onverwachte status, exception) telt ook. De
+# baseline is machine-afhankelijk: maak hem op dezelfde machine (of CI-runner)
+# als de controle.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import omgeving  # noqa: E402
+
+# klikpunten verspreid over NL (lat, lon)
+PLEKKEN: List[Tuple[float, float]] = [
+    (52.0907, 5.1214),   # Utrecht
+    (52.2112, 5.9699),   # Apeldoorn
+    (53.2194, 6.5665),   # Groningen
+    (51.4416, 5.4697),   # Eindhoven
+    (51.9244, 4.4777),   # Rotterdam
+    (52.3676, 4.9041),   # Amsterdam
+    (51.8426, 5.8546),   # Nijmegen
+    (52.5168, 6.0830),   # Zwolle
+]
+
+PLANTS_FILTERS: List[Dict[str, Any]] = [
+    {"limit": 50},
+    {"q": "eik"},
+    {"licht": "zon", "vocht": "droog"},
+    {"bodem": "zand", "inheems_only": "true"},
+    {"toon_exoot": "true", "exclude_invasief": "false", "sort": "hoogte", "desc": "true"},
+    {"q": "acer", "fields": "naam,hoogte,standplaats_licht"},
+    {"licht": ["halfschaduw", "schaduw"], "vocht": "nat", "limit": 20},
+]
+
+EXPORT_FILTERS: Dict[str, Any] = {"licht": "zon", "vocht": "vochtig"}
+
+Verzoek = Tuple[str, Dict[str, Any]]
+
+
+def _punt(rng: random.Random) -> Dict[str, float]:
+    lat, lon = rng.choice(PLEKKEN)
+    return {"lat": round(lat + rng.uniform(-0.02, 0.02), 6),
+            "lon": round(lon + rng.uniform(-0.02, 0.02), 6)}
+
+
+class HttpScenario:
+    """`aantal` requests, `gelijktijdig` tegelijk; `verzoek(i, rng)` geeft pad + parameters."""
+
+    def __init__(self, naam: str, verzoek: Callable[[int, random.Random], Verzoek],
+                 aantal: int, gelijktijdig: int, opwarmen: int = 2):
+        self.naam = naam
+        self.verzoek = verzoek
+        self.aantal = aantal
+        self.gelijktijdig = gelijktijdig
+        self.opwarmen = opwarmen
+
+
+def http_scenarios() -> List[HttpScenario]:
+    return [
+        HttpScenario("geo_json", lambda i, rng: ("/advies/geo", {**_punt(rng), "limit": 50}), 120, 8),
+        HttpScenario("geo_md", lambda i, rng: ("/advies/geo", {**_punt(rng), "format": "md"}), 60, 4),
+        HttpScenario("geo_adres", lambda i, rng: ("/advies/geo", {"adres": f"Loenenseweg {i % 40 + 1} Beekbergen",
+                                                                  "limit": 20}), 40, 4),
+        HttpScenario("plants", lambda i, rng: ("/api/plants", PLANTS_FILTERS[i % len(PLANTS_FILTERS)]), 210, 8),
+        HttpScenario("export_csv", lambda i, rng: ("/export/csv", EXPORT_FILTERS), 30, 2),
+        HttpScenario("export_xlsx", lambda i, rng: ("/export/xlsx", EXPORT_FILTERS), 10, 2, opwarmen=1),
+        HttpScenario("pdf", lambda i, rng: ("/advies/pdf", _punt(rng)), 8, 2, opwarmen=1),
+    ]
+
+
+async def _draai_http(client: httpx.AsyncClient, sc: HttpScenario, schaal: float,
+                      seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    aantal = max(1, int(sc.aantal * schaal))
+    for i in range(sc.opwarmen):
+        pad, params = sc.verzoek(i, rng)
+        await client.get(pad, params=params)
+
+    duren: List[float] = []
+    fouten = 0
+    volgende = iter(range(aantal))
+
+    async def _werker() -> None:
+        nonlocal fouten
+        for i in volgende:
+            pad, params = sc.verzoek(i, rng)
+            t = time.perf_counter()
+            try:
+                r = await client.get(pad, params=params)
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            duren.append(time.perf_counter() - t)
+            fouten += not ok
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_werker() for _ in range(sc.gelijktijdig)))
+    return omgeving.samenvatting(duren, time.perf_counter() - t0, fouten)
+
+
+# ───────────────────── metingen in dit proces
+def _meet(fn: Callable[[int], None], aantal: int) -> Dict[str, Any]:
+    duren: List[float] = []
+    fouten = 0
+    t0 = time.perf_counter()
+    for i in range(aantal):
+        t = time.perf_counter()
+        try:
+            fn(i)
+        except Exception as e:
+            print("[BENCH] fout:", e)
+            fouten += 1
+        duren.append(time.perf_counter() - t)
+    return omgeving.samenvatting(duren, time.perf_counter() - t0, fouten)
+
+
+def _zoekindex_bouw(schaal: float) -> Dict[str, Any]:
+    from plantwijs.services.dataset import get_df
+    from plantwijs.services.zoekindex import Zoekindex
+
+    df = get_df(kopie=False)
+    return _meet(lambda _i: Zoekindex(df), max(1, int(10 * schaal)))
+
+
+def _nsn_raster(pad: str, stap_m: int = 5000, punten_per_zijde: int = 6) -> None:
+    """Synthetische NSN-bron in RD: een raster van vierkanten met extra hoekpunten."""
+    labels = ["Dekzandrug", "Dekzandvlakte", "Beekdal", "Rivierkom", "Oeverwal", "Veenvlakte",
+              "Stuwwal", "Duinvallei"]
+    features = []
+    for ix, x in enumerate(range(10_000, 290_000, stap_m)):
+        for iy, y in enumerate(range(305_000, 615_000, stap_m)):
+            ring = []
+            for (ax, ay), (bx, by) in (((x, y), (x + stap_m, y)), ((x + stap_m, y), (x + stap_m, y + stap_m)),
+                                       ((x + stap_m, y + stap_m), (x, y + stap_m)), ((x, y + stap_m), (x, y))):
+                for k in range(punten_per_zijde):
+                    f = k / punten_per_zijde
+                    ring.append([ax + (bx - ax) * f, ay + (by - ay) * f])
+            ring.append(ring[0])
+            features.append({"type": "Feature",
+                             "properties": {"subtype_na": labels[(ix * 7 + iy) % len(labels)]},
+                             "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    with open(pad, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def _nsn(schaal: float) -> Dict[str, Dict[str, Any]]:
+    """Indexbouw en lookups op een synthetisch raster (module-globals tijdelijk omgezet)."""
+    from plantwijs.services import nsn
+
+    oud = {k: getattr(nsn, k) for k in ("NSN_GEOJSON_PATH", "NSN_INDEX_DIR", "NSN_INDEX_DB", "_NSN_SOURCE")}
+    with tempfile.TemporaryDirectory(prefix="plantwijs-nsn-") as map_:
+        bron = os.path.join(map_, "nsn.geojson")
+        _nsn_raster(bron)
+        nsn.NSN_GEOJSON_PATH = bron
+        nsn.NSN_INDEX_DIR = map_
+        nsn.NSN_INDEX_DB = os.path.join(map_, "nsn_index.sqlite")
+        nsn._NSN_SOURCE = None
+        try:
+            def _bouw(_i: int) -> None:
+                if os.path.exists(nsn.NSN_INDEX_DB):
+                    os.remove(nsn.NSN_INDEX_DB)
+                if not nsn._ensure_nsn_index():
+                    raise RuntimeError("NSN-index niet gebouwd")
+
+            uit = {"nsn_index_bouw": _meet(_bouw, max(1, int(3 * schaal)))}
+            rng = random.Random(1)
+
+            def _zoek(_i: int) -> None:
+                p = _punt(rng)
+                if nsn.nsn_from_point(p["lat"], p["lon"]) is None:
+                    raise RuntimeError(f"geen NSN-label op {p}")
+
+            uit["nsn_lookup"] = _meet(_zoek, max(1, int(500 * schaal)))
+            return uit
+        finally:
+            for k, v in oud.items():
+                setattr(nsn, k, v)
+
+
+# ───────────────────── rapportage en regressie
+def _tabel(resultaten: Dict[str, Dict[str, Any]]) -> str:
+    kop = f"{'scenario':<16}{'n':>6}{'fout':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'gem ms':>10}{'req/s':>9}"
+    regels = [kop, "-" * len(kop)]
+
+    def _v(x: Any) -> str:
+        return "-" if x is None else f"{x:.1f}"
+    for naam, r in resultaten.items():
+        regels.append(f"{naam:<16}{r['aantal']:>6}{r['fouten']:>6}{_v(r['p50_ms']):>10}{_v(r['p95_ms']):>10}"
+                      f"{_v(r['p99_ms']):>10}{_v(r['gem_ms']):>10}{_v(r['rps']):>9}")
+    return "\n".join(regels)
+
+
+def vergelijk(resultaten: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+              drempel: float, marge_ms: float = 0.0) -> List[str]:
+    """Regressies t.o.v. de baseline, als leesbare regels ([] = alles binnen de drempel).
+
+    `marge_ms` komt bovenop de p95-grens, zodat ruis bij metingen van een paar
+    milliseconden (NSN-lookup) geen regressie oplevert.
+    """
+    uit = []
+    for naam, r in resultaten.items():
+        if r["fouten"]:
+            uit.append(f"{naam}: {r['fouten']} fouten")
+        b = baseline.get(naam)
+        if not b:
+            continue
+        if b.get("p95_ms") and r["p95_ms"] is not None and r["p95_ms"] > b["p95_ms"] * (1 + drempel) + marge_ms:
+            uit.append(f"{naam}: p95 {r['p95_ms']:.1f} ms > {b['p95_ms']:.1f} ms × {1 + drempel:.2f}"
+                       f" + {marge_ms:g} ms")
+        if b.get("rps") and r["rps"] is not None and r["rps"] < b["rps"] * (1 - drempel):
+            uit.append(f"{naam}: doorvoer {r['rps']:.1f}/s < {b['rps']:.1f}/s × {1 - drempel:.2f}")
+    return uit
+
+
+async def _http(scenarios: List[HttpScenario], args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    uit: Dict[str, Dict[str, Any]] = {}
+    with omgeving.nep_upstream(args.latentie_ms, args.spreiding_ms) as upstream, \
+            omgeving.app(upstream, log=args.applog) as app:
+        limieten = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+        async with httpx.AsyncClient(base_url=app.basis, timeout=120, limits=limieten) as client:
+            for i, sc in enumerate(scenarios):
+                print(f"[BENCH] {sc.naam} …", flush=True)
+                uit[sc.naam] = await _draai_http(client, sc, args.schaal, seed=i)
+    return uit
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="PlantWijs-benchmarks tegen een lokale nep-PDOK.")
+    ap.add_argument("--scenario", action="append", default=[],
+                    help="alleen deze scenario's (herhaalbaar); zie de tabel voor de namen")
+    ap.add_argument("--snel", action="store_true", help="een kwart van de aantallen")
+    ap.add_argument("--latentie-ms", type=float, default=60.0, help="latentie per PDOK-aanvraag")
+    ap.add_argument("--spreiding-ms", type=float, default=40.0, help="plus 0..N ms willekeurig")
+    ap.add_argument("--json", help="resultaten ook als JSON naar dit bestand")
+    ap.add_argument("--baseline", help="vergelijk met deze baseline; exit 1 bij regressie")
+    ap.add_argument("--drempel", type=float, default=0.25, help="toegestane verslechtering (0.25 = 25%%)")
+    ap.add_argument("--marge-ms", type=float, default=5.0, help="extra ruimte op de p95-grens (ms)")
+    ap.add_argument("--bewaar-baseline", help="resultaten als nieuwe baseline opslaan")
+    ap.add_argument("--applog", help="uitvoer van de app naar dit bestand (standaard weg)")
+    args = ap.parse_args(argv)
+    args.schaal = 0.25 if args.snel else 1.0
+
+    def _gekozen(naam: str) -> bool:
+        return not args.scenario or naam in args.scenario
+
+    resultaten: Dict[str, Dict[str, Any]] = {}
+    scenarios = [sc for sc in http_scenarios() if _gekozen(sc.naam)]
+    if scenarios:
+        resultaten.update(asyncio.run(_http(scenarios, args)))
+    if _gekozen("zoekindex_bouw"):
+        print("[BENCH] zoekindex_bouw …", flush=True)
+        resultaten["zoekindex_bouw"] = _zoekindex_bouw(args.schaal)
+    if _gekozen("nsn_index_bouw") or _gekozen("nsn_lookup"):
+        print("[BENCH] nsn …", flush=True)
+        resultaten.update({k: v for k, v in _nsn(args.schaal).items() if _gekozen(k)})
+
+    print()
+    print(_tabel(resultaten))
+    meta = {"python": platform.python_version(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "latentie_ms": args.latentie_ms, "spreiding_ms": args.spreiding_ms,
+            "snel": args.snel, "tijd": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    for pad in filter(None, (args.json, args.bewaar_baseline)):
+        with open(pad, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "scenarios": resultaten}, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("scenarios", {})
+        regressies = vergelijk(resultaten, baseline, args.drempel, args.marge_ms)
+        if regressies:
+            print("\n[BENCH] REGRESSIE:")
+            for regel in regressies:
+                print("  -", regel)
+            return 1
+        print(f"\n[BENCH] binnen de drempel ({args.drempel:.0%}) van {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# nep_upstream.py
+# Doel: een lokale vervanger voor PDOK (WMS/WFS), de Locatieserver en de
+# OSM-tiles, zodat benchmarks en belastingtests niet van het internet afhangen
+# en elke run dezelfde antwoorden krijgt.
+#
+# Gebruik (vanuit de projectroot):
+#   python benchmarks/nep_upstream.py --poort 8765 --latentie-ms 80 --spreiding-ms 40
+#   PLANTWIJS_UPSTREAM_OVERRIDE=http://127.0.0.1:8765 uvicorn api:app
+#
+# De app stuurt met PLANTWIJS_UPSTREAM_OVERRIDE elke externe aanvraag naar
+# `<basis>/<oorspronkelijke host>/<pad>?<query>` (config.upstream_url). Deze
+# server zoekt daarbij de eerste opname in opnamen.json met dezelfde host, een
+# passend pad (fnmatch, dus `*` mag) en dezelfde waarden voor de parameters in
+# `query` (sleutels en waarden hoofdletterongevoelig). Geen opname → 404.
+#
+# Een opname:
+#   {"host": "service.pdok.nl", "pad": "/bzk/bro-bodemkaart/wms/v1_0",
+#    "query": {"request": "GetFeatureInfo", "info_format": "application/json"},
+#    "status": 200, "content_type": "application/json",
+#    "json": {...} | "tekst": "..." | "base64": "..."}
+#
+# Met `--opnemen` gaat een aanvraag zonder opname naar de echte dienst; het
+# antwoord wordt aan het bestand toegevoegd (met request, service, layers,
+# typenames en info_format/outputformat als sleutel). Zo is opnamen.json te
+# verversen met echte PDOK-antwoorden.
+
+import argparse
+import base64
+import fnmatch
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+OPNAMEN_PAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opnamen.json")
+# parameters die bij `--opnemen` de opname bepalen
+OPNAME_SLEUTELS = ("service", "request", "layers", "typenames", "info_format", "outputformat")
+
+
+def lees_opnamen(pad: str = OPNAMEN_PAD) -> List[Dict[str, Any]]:
+    with open(pad, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _query(qs: str) -> Dict[str, str]:
+    return {k.lower(): v for k, v in parse_qsl(qs, keep_blank_values=True)}
+
+
+def zoek_opname(opnamen: List[Dict[str, Any]], host: str, pad: str,
+                query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """De eerste opname die past bij host, pad en de gevraagde parameters."""
+    for op in opnamen:
+        if op.get("host") != host or not fnmatch.fnmatchcase(pad, op.get("pad", "")):
+            continue
+        if all(query.get(k.lower(), "").lower() == str(v).lower()
+               for k, v in (op.get("query") or {}).items()):
+            return op
+    return None
+
+
+def _lichaam(op: Dict[str, Any]) -> bytes:
+    if "json" in op:
+        return json.dumps(op["json"]).encode("utf-8")
+    if "base64" in op:
+        return base64.b64decode(op["base64"])
+    return str(op.get("tekst", "")).encode("utf-8")
+
+
+class NepUpstream(ThreadingHTTPServer):
+    """HTTP-server die opnamen teruggeeft, met kunstmatige latentie en fouten."""
+
+    daemon_threads = True
+
+    def __init__(self, adres: Tuple[str, int], opnamen: List[Dict[str, Any]],
+                 latentie_ms: float = 0.0, spreiding_ms: float = 0.0, foutkans: float = 0.0,
+                 opnemen: Optional[str] = None):
+        super().__init__(adres, _Handler)
+        self.opnamen = opnamen
+        self.latentie_ms = latentie_ms
+        self.spreiding_ms = spreiding_ms
+        self.foutkans = foutkans
+        self.opnemen = opnemen
+        self.aantal = 0
+        self.missers = 0
+        self._lock = threading.Lock()
+
+    @property
+    def basis(self) -> str:
+        host, poort = self.server_address[:2]
+        return f"http://{host}:{poort}"
+
+    def vertraging_s(self) -> float:
+        return max(0.0, self.latentie_ms + random.uniform(0, self.spreiding_ms)) / 1000
+
+    def neem_op(self, host: str, pad: str, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """De echte dienst vragen en het antwoord als opname bewaren."""
+        import requests
+
+        url = f"https://{host}{pad}"
+        r = requests.get(url, params=query, timeout=30,
+                         headers={"User-Agent": "PlantWijs-benchmark/opname"})
+        ctype = r.headers.get("Content-Type", "application/octet-stream")
+        op: Dict[str, Any] = {
+            "host": host, "pad": pad, "status": r.status_code, "content_type": ctype,
+            "query": {k: query[k] for k in OPNAME_SLEUTELS if k in query},
+        }
+        if "json" in ctype:
+            op["json"] = r.json()
+        elif ctype.startswith("text/") or "xml" in ctype:
+            op["tekst"] = r.text
+        else:
+            op["base64"] = base64.b64encode(r.content).decode("ascii")
+        with self._lock:
+            self.opnamen.append(op)
+            tmp = f"{self.opnemen}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.opnamen, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.opnemen)
+        print(f"[NEP] opgenomen: {host}{pad} {op['query']}")
+        return op
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: NepUpstream
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        delen = urlsplit(self.path)
+        host, _, rest = delen.path.lstrip("/").partition("/")
+        pad, query = "/" + rest, _query(delen.query)
+        with self.server._lock:
+            self.server.aantal += 1
+        time.sleep(self.server.vertraging_s())
+
+        if self.server.foutkans and random.random() < self.server.foutkans:
+            self._stuur(503, "text/plain", b"nep-storing")
+            return
+        op = zoek_opname(self.server.opnamen, host, pad, query)
+        if op is None and self.server.opnemen:
+            try:
+                op = self.server.neem_op(host, pad, query)
+            except Exception as e:
+                print("[NEP] opnemen mislukt:", e)
+        if op is None:
+            with self.server._lock:
+                self.server.missers += 1
+            self._stuur(404, "text/plain", b"geen opname")
+            return
+        self._stuur(int(op.get("status", 200)), op.get("content_type", "application/json"), _lichaam(op))
+
+    def _stuur(self, status: int, ctype: str, lichaam: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(lichaam)))
+        self.end_headers()
+        self.wfile.write(lichaam)
+
+    def log_message(self, *_a: Any) -> None:
+        pass
+
+
+def start(poort: int = 0, latentie_ms: float = 0.0, spreiding_ms: float = 0.0,
+          foutkans: float = 0.0, opnamen: Optional[List[Dict[str, Any]]] = None) -> NepUpstream:
+    """Server in een achtergrondthread starten (tests); `poort=0` kiest een vrije poort."""
+    server = NepUpstream(("127.0.0.1", poort), opnamen if opnamen is not None else lees_opnamen(),
+                         latentie_ms, spreiding_ms, foutkans)
+    threading.Thread(target=server.serve_forever, name="nep-upstream", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Lokale vervanger voor PDOK, Locatieserver en OSM-tiles.")
+    ap.add_argument("--poort", type=int, default=8765)
+    ap.add_argument("--latentie-ms", type=float, default=0.0, help="vaste vertraging per aanvraag")
+    ap.add_argument("--spreiding-ms", type=float, default=0.0, help="plus 0..N ms willekeurig")
+    ap.add_argument("--foutkans", type=float, default=0.0, help="aandeel aanvragen dat 503 krijgt")
+    ap.add_argument("--opnamen", default=OPNAMEN_PAD)
+    ap.add_argument("--opnemen", action="store_true",
+                    help="aanvragen zonder opname doorsturen naar de echte dienst en bewaren")
+    args = ap.parse_args(argv)
+
+    server = NepUpstream(("127.0.0.1", args.poort), lees_opnamen(args.opnamen),
+                         args.latentie_ms, args.spreiding_ms, args.foutkans,
+                         opnemen=args.opnamen if args.opnemen else None)
+    print(f"[NEP] luistert op {server.basis} ({len(server.opnamen)} opnamen)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# omgeving.py
+# Hulpfuncties voor bench.py en de belastingtest belasting.py: de nep-PDOK
+# en de app als losse processen starten, en latenties samenvatten.
+#
+# De app draait als gewone uvicorn-worker (zoals in productie), met
+# PLANTWIJS_UPSTREAM_OVERRIDE naar de nep-PDOK, de upstream-dosering uit
+# (de nep-server mag je niet overbelasten) en alle caches/opslagpaden in een
+# tijdelijke map, zodat elke run koud begint en de echte data/lokaal niet
+# geraakt wordt.
+
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def vrije_poort() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wacht_tot_bereikbaar(url: str, proces: subprocess.Popen, timeout_s: float) -> None:
+    eind = time.monotonic() + timeout_s
+    while time.monotonic() < eind:
+        if proces.poll() is not None:
+            raise RuntimeError(f"proces stopte met code {proces.returncode} ({url})")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} niet bereikbaar na {timeout_s:.0f} s")
+
+
+def _stop(proces: subprocess.Popen) -> None:
+    if proces.poll() is None:
+        proces.terminate()
+        try:
+            proces.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proces.kill()
+            proces.wait()
+
+
+@contextmanager
+def nep_upstream(latentie_ms: float = 0.0, spreiding_ms: float = 0.0,
+                 foutkans: float = 0.0) -> Iterator[str]:
+    """Start benchmarks/nep_upstream.py; geeft de basis-URL."""
+    poort = vrije_poort()
+    proces = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "nep_upstream.py"), "--poort", str(poort),
+         "--latentie-ms", str(latentie_ms), "--spreiding-ms", str(spreiding_ms),
+         "--foutkans", str(foutkans)],
+        cwd=ROOT, stdout=subprocess.DEVNULL)
+    basis = f"http://127.0.0.1:{poort}"
+    try:
+        _wacht_tot_bereikbaar(f"{basis}/", proces, 15)
+        yield basis
+    finally:
+        _stop(proces)
+
+
+class App:
+    """Een draaiende app (uvicorn-subproces) achter `basis`."""
+
+    def __init__(self, basis: str, proces: subprocess.Popen, werkmap: str):
+        self.basis = basis
+        self.proces = proces
+        self.werkmap = werkmap
+
+    @property
+    def pid(self) -> int:
+        return self.proces.pid
+
+
+@contextmanager
+def app(upstream: str, extra_env: Optional[Dict[str, str]] = None,
+        log: Optional[str] = None) -> Iterator[App]:
+    """Start `uvicorn api:app` tegen de nep-PDOK en wacht tot /api/health antwoordt."""
+    poort = vrije_poort()
+    with tempfile.TemporaryDirectory(prefix="plantwijs-bench-") as werkmap:
+        env = dict(os.environ)
+        env.update({
+            "PLANTWIJS_UPSTREAM_OVERRIDE": upstream,
+            "PLANTWIJS_UPSTREAM_RPS": "0",
+            "PLANTWIJS_LOKAAL_DIR": os.path.join(werkmap, "lokaal"),
+            "PLANTWIJS_FGR_PAD": os.path.join(werkmap, "lokaal", "fgr.sqlite"),
+            "PLANTWIJS_WMSMETA_PAD": os.path.join(werkmap, "wms_meta.json"),
+            "PLANTWIJS_TILE_CACHE_DIR": os.path.join(werkmap, "tiles"),
+            "PYTHONUNBUFFERED": "1",
+        })
+        env.update(extra_env or {})
+        uitvoer = open(log, "w", encoding="utf-8") if log else subprocess.DEVNULL
+        proces = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1",
+             "--port", str(poort), "--log-level", "warning", "--no-access-log"],
+            cwd=ROOT, env=env, stdout=uitvoer, stderr=subprocess.STDOUT)
+        basis = f"http://127.0.0.1:{poort}"
+        try:
+            _wacht_tot_bereikbaar(f"{basis}/api/health", proces, 120)
+            _wacht_op_fgr(basis)
+            yield App(basis, proces, werkmap)
+        finally:
+            _stop(proces)
+            if log:
+                uitvoer.close()
+
+
+def _wacht_op_fgr(basis: str, timeout_s: float = 30) -> None:
+    """De FGR-index wordt bij de start op de achtergrond gebouwd; wacht daarop."""
+    eind = time.monotonic() + timeout_s
+    while time.monotonic() < eind:
+        health = httpx.get(f"{basis}/api/health", timeout=10).json()
+        if (health.get("lokale_data") or {}).get("fgr") == "lokaal":
+            return
+        time.sleep(0.2)
+    print("[BENCH] FGR-index niet op tijd klaar; FGR gaat via de WFS")
+
+
+# ───────────────────── samenvatten
+def percentiel(waarden: Sequence[float], p: float) -> Optional[float]:
+    """Percentiel `p` (0..100) met lineaire interpolatie; None zonder waarden."""
+    if not waarden:
+        return None
+    s = sorted(waarden)
+    k = (len(s) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def samenvatting(duren_s: List[float], wandklok_s: float, fouten: int = 0) -> Dict[str, Optional[float]]:
+    """Aantal, fouten, p50/p95/p99/gemiddelde in ms en doorvoer (requests per seconde)."""
+    def _ms(v: Optional[float]) -> Optional[float]:
+        return None if v is None else round(v * 1000, 2)
+
+    return {
+        "aantal": len(duren_s),
+        "fouten": fouten,
+        "p50_ms": _ms(percentiel(duren_s, 50)),
+        "p95_ms": _ms(percentiel(duren_s, 95)),
+        "p99_ms": _ms(percentiel(duren_s, 99)),
+        "gem_ms": _ms(sum(duren_s) / len(duren_s)) if duren_s else None,
+        "rps": round(len(duren_s) / wandklok_s, 2) if wandklok_s > 0 else None,
+    }
@@ -9,6 +9,7 @@ from __future__ import annotations
 import os
 import tempfile
 from typing import List
+from urllib.parse import urlsplit
 
 from pyproj import Transformer
 
@@ -32,6 +33,24 @@ LEGACY_HTML = os.path.join(STATIC_DIR, "legacy.html")  # oude embedded UI
 HEADERS = {"User-Agent": f"plantwijs/{VERSION}"}
 FMT_JSON = "application/json;subtype=geojson"
 
+# Asynchrone client voor PDOK en de Locatieserver (services/httpklient.py):
+# maximaal aantal gelijktijdige verbindingen per proces; de rest wacht op een
+# vrije verbinding uit de pool.
+HTTP_MAX_VERBINDINGEN = int(os.environ.get("PLANTWIJS_HTTP_MAX_VERBINDINGEN", "64") or 64)
+
+# Dosering per externe host (services/upstream.py): aanvragen per seconde,
+# toegestane piek, en hoe lang een aanvraag hooguit in de wachtrij staat
+# voordat hij als bronfout wordt opgegeven. UPSTREAM_RPS=0 zet de dosering uit.
+UPSTREAM_RPS = float(os.environ.get("PLANTWIJS_UPSTREAM_RPS", "10") or 0)
+UPSTREAM_BURST = int(os.environ.get("PLANTWIJS_UPSTREAM_BURST", "20") or 20)
+UPSTREAM_WACHT_S = float(os.environ.get("PLANTWIJS_UPSTREAM_WACHT_S", "5") or 0)
+
+# Stroomonderbreker per bron: na BRON_DREMPEL storingen op rij (time-out, geen
+# verbinding) wordt de bron BRON_RUST_S seconden overgeslagen, daarna volgt één
+# proef-lookup. BRON_DREMPEL=0 zet de onderbrekers uit.
+BRON_DREMPEL = int(os.environ.get("PLANTWIJS_BRON_DREMPEL", "5") or 0)
+BRON_RUST_S = float(os.environ.get("PLANTWIJS_BRON_RUST_S", "30") or 0)
+
 # ───────────────────── NSN (Natuurlijk Systeem Nederland)
 NSN_DATA_DIR = DATA_DIR
 # Groot bestand: liever niet in Git als losse .geojson. Daarom ondersteunen we ook een ZIP in /data.
@@ -43,25 +62,84 @@ NSN_GEOJSON_IS_RD: bool = True  # GeoJSON in RD New (EPSG:28992); op False zette
 NSN_INDEX_DIR = os.path.join(tempfile.gettempdir(), "plantwijs_nsn")
 NSN_INDEX_DB = os.path.join(NSN_INDEX_DIR, "nsn_index.sqlite")
 
+# ───────────────────── content/ (kennislaag)
+# Hoe vaak (seconden) services/content.py hooguit controleert of een YAML-bestand
+# in content/ is gewijzigd. 0 = bij elke aanroep (handig tijdens het schrijven).
+CONTENT_CONTROLE_S = float(os.environ.get("PLANTWIJS_CONTENT_CONTROLE_S", "5") or 0)
+
+# Voorberekende kennislaag (scripts/bouw_kennislaag.py). Ontbreekt het bestand, of
+# hoort het bij een andere contentversie, dan rekent de API alles live uit.
+KENNISLAAG_PAD = os.environ.get("PLANTWIJS_KENNISLAAG_PAD", "").strip() or \
+    os.path.join(OUT_DIR, "kennislaag.json")
+
+# ───────────────────── OSM-tiles (kaartuitsnede in het PDF-rapport)
+# Schijfcache voor de tiles; net als de NSN-index in de tijdelijke map, zodat
+# een herstart op dezelfde machine de tiles niet opnieuw hoeft op te halen.
+TILE_CACHE_DIR = os.environ.get("PLANTWIJS_TILE_CACHE_DIR", "").strip() or \
+    os.path.join(tempfile.gettempdir(), "plantwijs_tiles")
+
+# ───────────────────── PDF-rapport (procespool)
+# Het opmaken van de PDF is CPU-werk en draait daarom in aparte processen,
+# zodat het de GIL van de API niet vasthoudt. 0 workers = in het eigen proces.
+PDF_WORKERS = int(os.environ.get("PLANTWIJS_PDF_WORKERS", "1") or 1)
+# Maximaal aantal rapporten tegelijk in behandeling (lopend + wachtend);
+# daarboven antwoordt /advies/pdf met 429.
+PDF_WACHTRIJ = int(os.environ.get("PLANTWIJS_PDF_WACHTRIJ", "4") or 4)
+PDF_TIMEOUT_S = float(os.environ.get("PLANTWIJS_PDF_TIMEOUT_S", "60") or 60)
+
+# ───────────────────── externe diensten vervangen (benchmarks/)
+# Alle externe diensten (PDOK, Locatieserver, OSM-tiles) naar één andere basis-
+# URL sturen, bijv. de nep-PDOK van benchmarks/nep_upstream.py. De oorspronkelijke
+# host komt vóór het pad (`<basis>/service.pdok.nl/bzk/...`), zodat de vervanger
+# ziet welke dienst bedoeld is. Leeg = de echte diensten.
+UPSTREAM_OVERRIDE = os.environ.get("PLANTWIJS_UPSTREAM_OVERRIDE", "").strip().rstrip("/")
+
+
+def upstream_url(url: str) -> str:
+    """`url` van een externe dienst, zo nodig omgeleid naar `UPSTREAM_OVERRIDE`."""
+    if not UPSTREAM_OVERRIDE:
+        return url
+    delen = urlsplit(url)
+    return f"{UPSTREAM_OVERRIDE}/{delen.netloc}{delen.path}" + (f"?{delen.query}" if delen.query else "")
+
+
 # ───────────────────── PDOK endpoints
 # WFS FGR
-PDOK_FGR_WFS = (
+PDOK_FGR_WFS = upstream_url(
     "https://service.pdok.nl/ez/fysischgeografischeregios/wfs/v1_0"
     "?service=WFS&version=2.0.0"
 )
-FGR_WMS = "https://service.pdok.nl/ez/fysischgeografischeregios/wms/v1_0"
+FGR_WMS = upstream_url("https://service.pdok.nl/ez/fysischgeografischeregios/wms/v1_0")
 
 # WMS Bodemkaart (BRO)
-BODEM_WMS = "https://service.pdok.nl/bzk/bro-bodemkaart/wms/v1_0"
+BODEM_WMS = upstream_url("https://service.pdok.nl/bzk/bro-bodemkaart/wms/v1_0")
 
 # WMS Grondwaterspiegeldiepte (BRO)
-GWD_WMS = "https://service.pdok.nl/bzk/bro-grondwaterspiegeldiepte/wms/v2_0"
+GWD_WMS = upstream_url("https://service.pdok.nl/bzk/bro-grondwaterspiegeldiepte/wms/v2_0")
 
 # AHN WMS (Actueel Hoogtebestand Nederland, DTM 0.5m)
-AHN_WMS = "https://service.pdok.nl/rws/ahn/wms/v1_0"
+AHN_WMS = upstream_url("https://service.pdok.nl/rws/ahn/wms/v1_0")
 
 # BRO Geomorfologische kaart (GMM) WMS
-GMM_WMS = "https://service.pdok.nl/bzk/bro-geomorfologischekaart/wms/v2_0"
+GMM_WMS = upstream_url("https://service.pdok.nl/bzk/bro-geomorfologischekaart/wms/v2_0")
+
+# Opgeloste WMS-laagnamen (GetCapabilities) op schijf, zodat een herstart ze
+# meteen heeft. Ouder dan WMSMETA_TTL_S: eerst de oude gebruiken en op de
+# achtergrond verversen.
+WMSMETA_PAD = os.environ.get("PLANTWIJS_WMSMETA_PAD", "").strip() or \
+    os.path.join(tempfile.gettempdir(), "plantwijs_wmsmeta.json")
+WMSMETA_TTL_S = float(os.environ.get("PLANTWIJS_WMSMETA_TTL_S", "604800") or 0)
+
+# Lokale kaartdata (services/lokaal.py, gebouwd met scripts/bouw_lokale_data.py):
+# rasters voor Gt/GHG/GLG en AHN, polygonen voor bodem en GMM. Ontbreekt een
+# bestand, dan gaat die bron gewoon via de WMS.
+LOKAAL_DIR = os.environ.get("PLANTWIJS_LOKAAL_DIR", "").strip() or \
+    os.path.join(DATA_DIR, "lokaal")
+# FGR-vlakken als SQLite-index, zoals bodem en GMM (services/fgr.py). Ontbreekt
+# het bestand, dan haalt de server ze bij de start één keer via de WFS op en
+# schrijft ze hierheen.
+FGR_PAD = os.environ.get("PLANTWIJS_FGR_PAD", "").strip() or \
+    os.path.join(LOKAAL_DIR, "fgr.sqlite")
 
 # ───────────────────── Proj (lokaal, geen netwerk)
 TX_WGS84_RD = Transformer.from_crs(4326, 28992, always_xy=True)
@@ -85,6 +163,11 @@ DATA_PATHS = [p for p in DATA_PATHS if p]
 # bestand), behalve als het pad expliciet via PLANTWIJS_CSV is opgegeven.
 MIN_DATASET_ROWS = 500
 
+# Hoe vaak (seconden) get_df() hooguit controleert of de CSV is gewijzigd
+# (os.stat per pad). Daartussen komt de dataset zonder bestandstoegang uit de
+# cache. 0 = bij elke aanroep.
+DATASET_CONTROLE_S = float(os.environ.get("PLANTWIJS_DATASET_CONTROLE_S", "5") or 0)
+
 # Online CSV fallback (GitHub raw) — alleen als er lokaal echt niets gevonden wordt
 # NB: de repo gebruikt branch `master` (niet `main`); met /main/ gaven deze
 # URL's altijd 404 en heeft de online fallback in de praktijk nooit gewerkt.
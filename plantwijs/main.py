@@ -15,7 +15,11 @@ from .routers import export as export_router
 from .routers import pages as pages_router
 from .routers import plants as plants_router
 from .routers import seo as seo_router
+from .services import httpklient, pdfjobs, pdfpool
+from .services.fgr import warm_fgr
 from .services.nsn import warm_nsn
+from .services.pdok import warm_wms_meta
+from .services.timing import TimingMiddleware, volg_threadpool
 
 API_DESCRIPTION = (
     "Beplantingswijzer geeft voor elke plek in Nederland een beplantingsadvies op maat: het "
@@ -34,8 +38,17 @@ async def lifespan(app: FastAPI):
     # Startup: NSN-bron controleren en (indien nodig) de on-disk index bouwen.
     # Bij een koude start kan dat even duren; daarna is het meteen klaar.
     warm_nsn()
+    # WMS-laagnamen van schijf; ontbreken ze of zijn ze oud, dan op de achtergrond.
+    warm_wms_meta()
+    # FGR-vlakken lokaal (bestand, anders één keer via de WFS).
+    warm_fgr()
+    # Bezetting van de threadpool in /api/metrics.
+    volg_threadpool()
     yield
-    # Shutdown: niets op te ruimen.
+    # Shutdown: gedeelde HTTP-client, PDF-jobs en de procespool afsluiten.
+    await httpklient.sluit()
+    pdfjobs.shutdown()
+    pdfpool.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -51,6 +64,8 @@ def create_app() -> FastAPI:
         allow_methods=["GET", "POST"],
         allow_headers=["*"],
     )
+    # buitenste laag: meet de hele request, inclusief CORS (Server-Timing-header)
+    app.add_middleware(TimingMiddleware)
 
     os.makedirs(STATIC_DIR, exist_ok=True)
     app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
 import urllib.parse
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Query, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
+from ..services import timing, upstream
 from ..services.advies import verrijk_advies
 from ..services.context import beschrijf, categorieen
 from ..services.dataset import (
@@ -20,30 +23,33 @@ from ..services.dataset import (
     rapport_status_defaults,
     status_filter_labels,
 )
-from ..services.geocode import zoek_adres
+from ..services.geocode import zoek_adres_async
+from ..services.jsonuitvoer import json_antwoord, records_json
 from ..services.nsn import nsn_from_point, nsn_status
+from ..services.paginering import OngeldigVerzoek, pagina, query_hash, velden
 from ..services.pdok import (
     RUWE_BODEM_KEY,
-    ahn_from_wms,
-    bodem_from_bodemkaart,
-    fgr_from_point,
-    gmm_from_wms,
-    vocht_from_gwt,
+    ahn_from_wms_async,
+    bodem_from_bodemkaart_async,
+    fgr_from_point_async,
+    gmm_from_wms_async,
+    vocht_from_gwt_async,
 )
 from ..services.rapport_md import rapport_markdown
 
 router = APIRouter(tags=["advies"])
 
 
-def _veilig(bron: str, status: Dict[str, str], fn: Callable[[], Any], leeg: Any) -> Any:
-    """Voer een bronlookup uit en noteer de status; nooit een exception naar buiten.
+async def _veilig(bron: str, status: Dict[str, Optional[str]], lookup: Awaitable[Any],
+                  leeg: Any) -> Any:
+    """Wacht op een bronlookup en noteer de status; nooit een exception naar buiten.
 
     Eén kapotte PDOK/NSN-bron mag volgens docs/API.md nooit een 500 opleveren.
     `fout` betekent: de lookup gooide een exception. `leeg`: de bron antwoordde,
     maar zonder bruikbare waarde.
     """
     try:
-        waarde = fn()
+        waarde = await timing.gemeten(bron, lookup)
     except Exception as e:
         print(f"[ADVIES] bron '{bron}' faalde:", e)
         status[bron] = "fout"
@@ -92,7 +98,7 @@ def _links(request: Request, vocht: Any, bodem: Any, exclude_invasief: bool) ->
         "Geef de locatie op als `lat` + `lon` (WGS84, decimale graden) óf als `adres` "
         "(server-side geocoding via de PDOK Locatieserver). Worden beide meegegeven, "
         "dan winnen `lat`/`lon`. Zonder locatie volgt een 422, bij een adres zonder "
-        "treffer een 404.\n\n"
+        "treffer een 404 en als de geocoder onbereikbaar is een 503.\n\n"
         "Met `format=md` komt hetzelfde advies terug als leesbaar Markdown-rapport "
         "(`text/markdown`) — handig voor AI-agents en voor direct gebruik in een "
         "document. `format=json` (standaard) geeft de JSON hierboven. Zie /llms.txt.\n\n"
@@ -104,9 +110,10 @@ def _links(request: Request, vocht: Any, bodem: Any, exclude_invasief: bool) ->
         200: {"content": {"application/json": {}, "text/markdown": {}}},
         404: {"description": "adres_niet_gevonden — geen enkele treffer voor `adres`"},
         422: {"description": "locatie_ontbreekt — geef lat+lon of adres op"},
+        503: {"description": "bron_onbereikbaar — de geocoder (PDOK Locatieserver) is niet bereikbaar"},
     },
 )
-def advies_geo(
+async def advies_geo(
     request: Request,
     lat: Optional[float] = Query(None, description="Breedtegraad (WGS84, decimale graden), bijv. 52.078"),
     lon: Optional[float] = Query(None, description="Lengtegraad (WGS84, decimale graden), bijv. 5.89"),
@@ -117,10 +124,14 @@ def advies_geo(
     toon_ingeburgerd: Optional[bool] = Query(None),
     toon_exoot: Optional[bool] = Query(None),
     exclude_invasief: bool = Query(True),
-    limit: Optional[int] = Query(None),  # genegeerd
+    limit: Optional[int] = Query(None, ge=0, description="Maximaal aantal soorten in `advies` (standaard: alle)."),
+    offset: int = Query(0, ge=0, description="Aantal soorten in `advies` overslaan."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` van de vorige pagina; wint van `offset`."),
+    fields: List[str] = Query(default=[], description="Alleen deze velden per soort (komma-gescheiden of herhaald)."),
 ):
     t0 = time.time()
-    bronnen_status: Dict[str, str] = {}
+    # vaste volgorde in de response, ook al komen de bronnen in willekeurige volgorde binnen
+    bronnen_status: Dict[str, Optional[str]] = dict.fromkeys(("fgr", "nsn", "bodem", "gwt", "ahn", "gmm"))
 
     fmt = str(format or "json").strip().lower()
 
@@ -128,7 +139,10 @@ def advies_geo(
     adres_gevonden: Optional[str] = None
     if lat is None or lon is None:
         if str(adres or "").strip():
-            treffer = zoek_adres(adres or "")
+            try:
+                treffer = await timing.gemeten("geocode", zoek_adres_async(adres or ""))
+            except upstream.BronFout as e:
+                return JSONResponse({"error": "bron_onbereikbaar", "detail": str(e)}, status_code=503)
             if not treffer:
                 return JSONResponse({"error": "adres_niet_gevonden"}, status_code=404)
             lat = float(treffer["lat"])
@@ -147,8 +161,18 @@ def advies_geo(
                 status_code=422,
             )
 
-    fgr = _veilig("fgr", bronnen_status, lambda: fgr_from_point(lat, lon), None) or "Onbekend"
-    nsn_val = _veilig("nsn", bronnen_status, lambda: nsn_from_point(lat, lon), None)
+    # Alle bronnen tegelijk: de PDOK-lookups als coroutines op de event loop,
+    # de NSN-index (lokaal bestand, CPU) kort in de threadpool.
+    (fgr, nsn_val, (bodem_raw, _props_bodem), (vocht_raw, _props_gwt, gt_code),
+     (ahn_val, _props_ahn), (gmm_val, _props_gmm)) = await asyncio.gather(
+        _veilig("fgr", bronnen_status, fgr_from_point_async(lat, lon), None),
+        _veilig("nsn", bronnen_status, run_in_threadpool(nsn_from_point, lat, lon), None),
+        _veilig("bodem", bronnen_status, bodem_from_bodemkaart_async(lat, lon), (None, {})),
+        _veilig("gwt", bronnen_status, vocht_from_gwt_async(lat, lon), (None, {}, None)),
+        _veilig("ahn", bronnen_status, ahn_from_wms_async(lat, lon), (None, {})),
+        _veilig("gmm", bronnen_status, gmm_from_wms_async(lat, lon), (None, {})),
+    )
+    fgr = fgr or "Onbekend"
     if bronnen_status.get("nsn") == "leeg":
         try:
             if nsn_status() == "ontbreekt":
@@ -156,14 +180,31 @@ def advies_geo(
         except Exception:
             bronnen_status["nsn"] = "ontbreekt"
 
-    bodem_raw, _props_bodem = _veilig(
-        "bodem", bronnen_status, lambda: bodem_from_bodemkaart(lat, lon), (None, {}))
-    vocht_raw, _props_gwt, gt_code = _veilig(
-        "gwt", bronnen_status, lambda: vocht_from_gwt(lat, lon), (None, {}, None))
-    ahn_val, _props_ahn = _veilig(
-        "ahn", bronnen_status, lambda: ahn_from_wms(lat, lon), (None, {}))
-    gmm_val, _props_gmm = _veilig(
-        "gmm", bronnen_status, lambda: gmm_from_wms(lat, lon), (None, {}))
+    # Filteren, kennislaag en serialiseren zijn CPU-werk: in de threadpool, zodat
+    # de event loop vrij blijft voor de lookups van andere requests.
+    return await run_in_threadpool(
+        _advies_antwoord, request, t0, fmt, bronnen_status,
+        plek={"lat": lat, "lon": lon, "adres_gevonden": adres_gevonden, "fgr": fgr,
+              "nsn": nsn_val, "bodem": bodem_raw, "props_bodem": _props_bodem,
+              "vocht": vocht_raw, "gt_code": gt_code, "ahn": ahn_val, "gmm": gmm_val},
+        filters={"inheems_only": inheems_only, "toon_inheems": toon_inheems,
+                 "toon_ingeburgerd": toon_ingeburgerd, "toon_exoot": toon_exoot,
+                 "exclude_invasief": exclude_invasief},
+        pagina_params={"limit": limit, "offset": offset, "cursor": cursor, "fields": fields},
+    )
+
+
+def _advies_antwoord(request: Request, t0: float, fmt: str,
+                     bronnen_status: Dict[str, Optional[str]], *, plek: Dict[str, Any],
+                     filters: Dict[str, Any], pagina_params: Dict[str, Any]) -> Response:
+    """Het synchrone deel van /advies/geo: soorten filteren, kennislaag, response."""
+    lat, lon, adres_gevonden = plek["lat"], plek["lon"], plek["adres_gevonden"]
+    fgr, nsn_val, gt_code = plek["fgr"], plek["nsn"], plek["gt_code"]
+    bodem_raw, _props_bodem, vocht_raw = plek["bodem"], plek["props_bodem"], plek["vocht"]
+    ahn_val, gmm_val = plek["ahn"], plek["gmm"]
+    inheems_only, exclude_invasief = filters["inheems_only"], filters["exclude_invasief"]
+    toon_inheems, toon_ingeburgerd, toon_exoot = (
+        filters["toon_inheems"], filters["toon_ingeburgerd"], filters["toon_exoot"])
 
     bodem_val = bodem_raw
     vocht_val = vocht_raw
@@ -185,20 +226,21 @@ def advies_geo(
     statusfilters = status_filter_labels(
         inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot)
 
-    df = get_df()
-    df = _apply_status_nl_filter(df, inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot)
-    if exclude_invasief and "invasief" in df.columns:
-        df = df[(df["invasief"].astype(str).str.lower() != "ja") | (df["invasief"].isna())]
-
-    df = filter_standplaats(
-        df,
-        vocht=[vocht_val] if vocht_val else [],
-        bodem=[bodem_val] if bodem_val else [],
-    )
-
-    # beplantingstype + status_nl horen bij de itemvorm van /api/plants en zijn
-    # de kolommen "Type" en "Status" in het md-rapport.
-    df = ensure_beplantingstype(df)
+    with timing.stap("filter"):
+        df = get_df()
+        df = _apply_status_nl_filter(df, inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot)
+        if exclude_invasief and "invasief" in df.columns:
+            df = df[(df["invasief"].astype(str).str.lower() != "ja") | (df["invasief"].isna())]
+
+        df = filter_standplaats(
+            df,
+            vocht=[vocht_val] if vocht_val else [],
+            bodem=[bodem_val] if bodem_val else [],
+        )
+
+        # beplantingstype + status_nl horen bij de itemvorm van /api/plants en zijn
+        # de kolommen "Type" en "Status" in het md-rapport.
+        df = ensure_beplantingstype(df)
     cols = [c for c in (
         "naam", "wetenschappelijke_naam", "nederlandse_naam", "beplantingstype",
         "status_nl", "inheems", "invasief",
@@ -206,7 +248,6 @@ def advies_geo(
         "ellenberg_l", "ellenberg_f", "ellenberg_t", "ellenberg_n", "ellenberg_r", "ellenberg_s",
         "hoogte", "breedte", "winterhardheidszone", "grondsoorten", "ecowaarde"
     ) if c in df.columns]
-    items = df[cols].to_dict(orient="records")
 
     out = {
         "fgr": fgr,
@@ -222,7 +263,7 @@ def advies_geo(
         "gmm": gmm_val,
         "gmm_bron": "BRO Geomorfologische kaart (GMM) WMS" if gmm_val else "onbekend",
         "nsn": nsn_val,
-        "advies": items,
+        "advies": None,   # soortenlijst; per rij geserialiseerd (zie hieronder)
         # ── additief (WP6): waar dit advies over gaat
         "locatie": {"adres_gevonden": adres_gevonden, "lat": lat, "lon": lon},
         "elapsed_ms": int((time.time()-t0)*1000),
@@ -230,14 +271,15 @@ def advies_geo(
 
     # ── additief (WP2b): kennislaag + bronstatus
     try:
-        out.update(verrijk_advies(
-            fgr=None if fgr == "Onbekend" else fgr,
-            nsn=nsn_val,
-            gmm=gmm_val,
-            bodem=bodem_val,
-            vocht=vocht_val,
-            gt_code=gt_code,
-        ))
+        with timing.stap("kennislaag"):
+            out.update(verrijk_advies(
+                fgr=None if fgr == "Onbekend" else fgr,
+                nsn=nsn_val,
+                gmm=gmm_val,
+                bodem=bodem_val,
+                vocht=vocht_val,
+                gt_code=gt_code,
+            ))
     except Exception as e:  # kennislaag mag de rest nooit slopen
         print("[ADVIES] kennislaag faalde:", e)
         out.setdefault("landschap", {})
@@ -246,21 +288,35 @@ def advies_geo(
     out["bronnen_status"] = bronnen_status
     out["elapsed_ms"] = int((time.time()-t0)*1000)
 
-    data = _clean(out)
-
     # ── additief (WP6): hetzelfde advies als leesbaar Markdown-rapport
     if fmt in ("md", "markdown"):
+        data = _clean(dict(out, advies=df[cols].to_dict(orient="records")))
         basis, csv_url, json_url = _links(request, vocht_val, bodem_val, exclude_invasief)
         try:
-            markdown = rapport_markdown(
-                data, basis_url=basis, csv_url=csv_url, json_url=json_url,
-                statusfilters=statusfilters)
+            with timing.stap("markdown"):
+                markdown = rapport_markdown(
+                    data, basis_url=basis, csv_url=csv_url, json_url=json_url,
+                    statusfilters=statusfilters)
         except Exception as e:  # rapportopmaak mag het advies nooit slopen
             print("[ADVIES] markdown-rapport faalde:", e)
             return JSONResponse(data)
         return PlainTextResponse(markdown, media_type="text/markdown; charset=utf-8")
 
-    return JSONResponse(data)
+    # Veldselectie en paginering gelden voor de soortenlijst in `advies`.
+    try:
+        cols = velden(pagina_params["fields"], cols)
+        deel, volgende = pagina(df, pagina_params["limit"], pagina_params["offset"],
+                                pagina_params["cursor"],
+                                query_hash(request.query_params.multi_items()))
+    except OngeldigVerzoek as e:
+        return JSONResponse(e.als_json(), status_code=400)
+    out["advies_count"] = int(len(df))
+    out["next_cursor"] = volgende
+    # ── additief: duur per stap tot hier (ms); de header Server-Timing heeft ook
+    # het serialiseren en het totaal
+    out["timings"] = timing.timings()
+    with timing.stap("serialisatie"):
+        return json_antwoord(out, advies=records_json(deel, cols))
 
 
 @router.get("/api/context")
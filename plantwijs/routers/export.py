@@ -1,4 +1,5 @@
-"""Export-routes: /export/csv, /export/xlsx en /advies/pdf."""
+"""Export-routes: /export/csv, /export/xlsx, /export/parquet, /export/arrow, /advies/pdf
+en de asynchrone variant /advies/pdf/jobs."""
 
 from __future__ import annotations
 
@@ -7,13 +8,18 @@ from typing import List, Optional
 
 import pandas as pd
 from fastapi import APIRouter, Query
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-from ..services.dataset import _filter_plants_df, rapport_status_defaults
-from ..services.report import BESTANDSNAAM, maak_rapport
+from ..config import NO_STORE_HEADERS
+from ..services import pdfjobs, pdfpool
+from ..services.dataset import _filter_plants_df, getypeerd, rapport_status_defaults
+from ..services.report import BESTANDSNAAM, maak_rapport_async
 
 router = APIRouter(tags=["export"])
 
+# Na een 429 op /advies/pdf: zo lang duurt een rapport ongeveer.
+PDF_RETRY_AFTER_S = 5
+
 
 @router.get("/export/csv")
 def export_csv(
@@ -66,8 +72,92 @@ def export_xlsx(
                              headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 
+# ───────────────────── kolomformaten (Parquet / Arrow IPC)
+def _pyarrow():
+    """pyarrow pas bij gebruik importeren: het kost flink wat geheugen en
+    alleen de kolomformaten hebben het nodig. None als het niet is geïnstalleerd."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return pa
+    except Exception as e:
+        print("[EXPORT] pyarrow niet beschikbaar:", e)
+        return None
+
+
+def _niet_beschikbaar(formaat: str) -> JSONResponse:
+    return JSONResponse({"error": f"{formaat}_niet_beschikbaar",
+                         "detail": "pyarrow ontbreekt op deze server"}, status_code=501)
+
+
+@router.get("/export/parquet")
+def export_parquet(
+    q: str = Query(""),
+    inheems_only: bool = Query(False),
+    toon_inheems: Optional[bool] = Query(None),
+    toon_ingeburgerd: Optional[bool] = Query(None),
+    toon_exoot: Optional[bool] = Query(None),
+    exclude_invasief: bool = Query(True),
+    licht: List[str] = Query(default=[]),
+    vocht: List[str] = Query(default=[]),
+    bodem: List[str] = Query(default=[]),
+    beplantingstype: List[str] = Query(default=[]),
+    sort: str = Query("naam"),
+    desc: bool = Query(False),
+):
+    """Zelfde selectie als /export/csv, als Parquet met echte kolomtypes
+    (zie `services.dataset.getypeerd`)."""
+    pa = _pyarrow()
+    if pa is None:
+        return _niet_beschikbaar("parquet")
+    df = _filter_plants_df(q, inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot, exclude_invasief, licht, vocht, bodem, beplantingstype, sort, desc)
+    tabel = pa.Table.from_pandas(getypeerd(df), preserve_index=False)
+    buf = io.BytesIO()
+    pa.parquet.write_table(tabel, buf, compression="zstd")
+    buf.seek(0)
+    filename = "beplantingswijzer_export.parquet"
+    return StreamingResponse(buf,
+                             media_type="application/vnd.apache.parquet",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/export/arrow")
+def export_arrow(
+    q: str = Query(""),
+    inheems_only: bool = Query(False),
+    toon_inheems: Optional[bool] = Query(None),
+    toon_ingeburgerd: Optional[bool] = Query(None),
+    toon_exoot: Optional[bool] = Query(None),
+    exclude_invasief: bool = Query(True),
+    licht: List[str] = Query(default=[]),
+    vocht: List[str] = Query(default=[]),
+    bodem: List[str] = Query(default=[]),
+    beplantingstype: List[str] = Query(default=[]),
+    sort: str = Query("naam"),
+    desc: bool = Query(False),
+):
+    """Zelfde selectie als /export/csv, als Arrow IPC-stream (`.arrows`).
+
+    Lezen met `pyarrow.ipc.open_stream(...)`; dezelfde kolomtypes als Parquet.
+    """
+    pa = _pyarrow()
+    if pa is None:
+        return _niet_beschikbaar("arrow")
+    df = _filter_plants_df(q, inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot, exclude_invasief, licht, vocht, bodem, beplantingstype, sort, desc)
+    tabel = pa.Table.from_pandas(getypeerd(df), preserve_index=False)
+    buf = io.BytesIO()
+    with pa.ipc.new_stream(buf, tabel.schema) as schrijver:
+        schrijver.write_table(tabel, max_chunksize=512)
+    buf.seek(0)
+    filename = "beplantingswijzer_export.arrows"
+    return StreamingResponse(buf,
+                             media_type="application/vnd.apache.arrow.stream",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
 @router.get("/advies/pdf")
-def advies_pdf(
+async def advies_pdf(
     lat: float = Query(...),
     lon: float = Query(...),
     inheems_only: bool = Query(False),
@@ -90,21 +180,128 @@ def advies_pdf(
     Worden er géén `toon_*`-parameters meegegeven, dan gebruikt het rapport de
     standaardkeuze van de website: inheems en ingeburgerd aan, exoot uit.
     Expliciete parameters winnen altijd.
+
+    De bronnen worden op de event loop van de app opgehaald, met de gedeelde
+    HTTP-client; het opmaken gebeurt in de procespool van services/pdfpool.py. Is die vol,
+    dan volgt meteen — vóór het ophalen van de bronnen — 429 met Retry-After;
+    duurt het te lang, dan 504.
     """
     toon_inheems, toon_ingeburgerd, toon_exoot = rapport_status_defaults(
         toon_inheems, toon_ingeburgerd, toon_exoot)
-    pdf = maak_rapport(
-        lat, lon,
-        inheems_only=inheems_only,
-        toon_inheems=toon_inheems,
-        toon_ingeburgerd=toon_ingeburgerd,
-        toon_exoot=toon_exoot,
-        exclude_invasief=exclude_invasief,
-        licht=licht,
-        vocht=vocht,
-        bodem=bodem,
-        beplantingstype=beplantingstype,
+    try:
+        pdf = await maak_rapport_async(
+            lat, lon,
+            inheems_only=inheems_only,
+            toon_inheems=toon_inheems,
+            toon_ingeburgerd=toon_ingeburgerd,
+            toon_exoot=toon_exoot,
+            exclude_invasief=exclude_invasief,
+            licht=licht,
+            vocht=vocht,
+            bodem=bodem,
+            beplantingstype=beplantingstype,
+            wachtrij=pdfpool.gereserveerd,
+        )
+    except pdfpool.WachtrijVol:
+        return JSONResponse(
+            {"error": "pdf_wachtrij_vol",
+             "detail": "Er worden nu te veel rapporten tegelijk gemaakt. Probeer het zo opnieuw."},
+            status_code=429, headers={"Retry-After": str(PDF_RETRY_AFTER_S)})
+    except pdfpool.RenderTimeout:
+        return JSONResponse(
+            {"error": "pdf_timeout",
+             "detail": "Het rapport was niet op tijd klaar. Probeer het zo opnieuw."},
+            status_code=504)
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{BESTANDSNAAM}"',
+            "Content-Length": str(len(pdf)),
+            "Cache-Control": "no-store",
+        },
     )
+
+
+# ───────────────────── asynchrone PDF-jobs
+def _job_antwoord(job: dict) -> dict:
+    """Job-status aangevuld met de URL's om te pollen en te downloaden."""
+    uit = dict(job)
+    uit["status_url"] = f"/advies/pdf/jobs/{job['id']}"
+    if job["status"] == pdfjobs.KLAAR:
+        uit["download_url"] = f"/advies/pdf/jobs/{job['id']}/download"
+    return uit
+
+
+def _job_onbekend() -> JSONResponse:
+    return JSONResponse({"error": "job_niet_gevonden",
+                         "detail": "Onbekende of verlopen job; vraag het rapport opnieuw aan."},
+                        status_code=404)
+
+
+@router.post("/advies/pdf/jobs", status_code=202)
+def advies_pdf_job(
+    lat: float = Query(..., description="Breedtegraad (WGS84)"),
+    lon: float = Query(..., description="Lengtegraad (WGS84)"),
+    inheems_only: bool = Query(False),
+    toon_inheems: Optional[bool] = Query(None),
+    toon_ingeburgerd: Optional[bool] = Query(None),
+    toon_exoot: Optional[bool] = Query(None),
+    exclude_invasief: bool = Query(True),
+    licht: List[str] = Query(default=[]),
+    vocht: List[str] = Query(default=[]),
+    bodem: List[str] = Query(default=[]),
+    beplantingstype: List[str] = Query(default=[]),
+):
+    """PDF-rapport als job aanvragen (docs/API.md § POST /advies/pdf/jobs).
+
+    Zelfde parameters als GET /advies/pdf. Antwoordt meteen met 202 en een
+    job-id; een identieke aanvraag krijgt de bestaande job terug.
+    """
+    toon_inheems, toon_ingeburgerd, toon_exoot = rapport_status_defaults(
+        toon_inheems, toon_ingeburgerd, toon_exoot)
+    try:
+        job = pdfjobs.nieuw(
+            lat, lon,
+            inheems_only=inheems_only,
+            toon_inheems=toon_inheems,
+            toon_ingeburgerd=toon_ingeburgerd,
+            toon_exoot=toon_exoot,
+            exclude_invasief=exclude_invasief,
+            licht=licht,
+            vocht=vocht,
+            bodem=bodem,
+            beplantingstype=beplantingstype,
+        )
+    except pdfjobs.JobWachtrijVol:
+        return JSONResponse(
+            {"error": "pdf_wachtrij_vol",
+             "detail": "Er staan nu te veel rapporten in de wachtrij. Probeer het zo opnieuw."},
+            status_code=429, headers={"Retry-After": str(PDF_RETRY_AFTER_S)})
+    antwoord = _job_antwoord(job)
+    return JSONResponse(antwoord, status_code=202,
+                        headers={"Location": antwoord["status_url"], **NO_STORE_HEADERS})
+
+
+@router.get("/advies/pdf/jobs/{job_id}")
+def advies_pdf_job_status(job_id: str):
+    """Status van een PDF-job: wachtend, bezig, klaar (met download_url) of fout."""
+    job = pdfjobs.status(job_id)
+    if job is None:
+        return _job_onbekend()
+    return JSONResponse(_job_antwoord(job), headers=NO_STORE_HEADERS)
+
+
+@router.get("/advies/pdf/jobs/{job_id}/download")
+def advies_pdf_job_download(job_id: str):
+    """De PDF van een afgeronde job; 409 zolang hij nog niet klaar is."""
+    pdf = pdfjobs.pdf(job_id)
+    if pdf is None:
+        job = pdfjobs.status(job_id)
+        if job is None:
+            return _job_onbekend()
+        return JSONResponse({"error": "job_niet_klaar", **_job_antwoord(job)},
+                            status_code=409, headers=NO_STORE_HEADERS)
     return Response(
         content=pdf,
         media_type="application/pdf",
@@ -6,20 +6,27 @@ import importlib
 import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from ..config import ADMIN_KEY_ENV, BODEM_WMS, FMT_JSON, GWD_WMS, VERSION
+from ..services import fgr, lokaal, metrics, timing, upstream
 from ..services.dataset import (
+    VERSIE_ATTR,
     _CACHE,
     _clean,
     _filter_plants_df,
-    clear_cache,
+    dataset_info,
     ensure_beplantingstype,
     get_df,
+    herlaad,
+    herlaad_status,
 )
+from ..services.jsonuitvoer import json_antwoord, records_json
 from ..services.nsn import _open_nsn_bytes, _resolve_nsn_source, nsn_status
+from ..services.paginering import OngeldigVerzoek, pagina, query_hash, velden
 from ..services.pdok import _wms_getfeatureinfo, fgr_from_point, get_wms_meta
+from ..services.zoekindex import index_voor
 
 router = APIRouter(tags=["plants"])
 
@@ -44,11 +51,14 @@ def api_diag_data():
 
 @router.get("/api/diag/featureinfo")
 def api_diag(service: str = Query(..., pattern="^(bodem|gt|ghg|glg|fgr)$"), lat: float = Query(...), lon: float = Query(...)):
-    if service == "fgr":
-        return JSONResponse({"fgr": fgr_from_point(lat, lon)})
-    base = {"bodem": BODEM_WMS, "gt": GWD_WMS, "ghg": GWD_WMS, "glg": GWD_WMS}[service]
-    layer = get_wms_meta().get(service, {}).get("layer")
-    props = _wms_getfeatureinfo(base, layer, lat, lon)
+    try:
+        if service == "fgr":
+            return JSONResponse({"fgr": fgr_from_point(lat, lon)})
+        base = {"bodem": BODEM_WMS, "gt": GWD_WMS, "ghg": GWD_WMS, "glg": GWD_WMS}[service]
+        layer = get_wms_meta().get(service, {}).get("layer")
+        props = _wms_getfeatureinfo(base, layer, lat, lon)
+    except upstream.BronFout as e:
+        return JSONResponse({"error": "bron_onbereikbaar", "detail": str(e)}, status_code=503)
     return JSONResponse(_clean({"base": base, "layer": layer, "props": props}))
 
 
@@ -69,23 +79,44 @@ def _pdf_beschikbaar() -> bool:
 
 @router.get("/api/health")
 def api_health():
-    """Snelle statuscheck; doet geen netwerk-calls en bouwt geen NSN-index."""
+    """Snelle statuscheck; doet geen netwerk-calls en bouwt geen NSN-index.
+    De dataset-gegevens komen uit de cache: geen bestandstoegang, geen kopie."""
     ok = True
     try:
-        df = get_df()
-        dataset = {"rows": int(len(df)), "source": str(_CACHE.get("path") or "")}
+        if _CACHE["df"] is None:
+            get_df(kopie=False)  # koude start; daarna alleen de metadata uit de cache
+        info = dataset_info()
+        dataset = {"rows": int(info["rows"] or 0), "source": str(info["path"] or "")}
     except Exception as e:
         ok = False
         dataset = {"rows": 0, "source": f"fout: {e}"}
+    dataset["versie"] = _CACHE.get("hash")
+    dataset["herladen"] = herlaad_status()
     return JSONResponse(_clean({
         "ok": ok,
         "dataset": dataset,
         "nsn": {"status": nsn_status()},
         "pdf_beschikbaar": _pdf_beschikbaar(),
+        "upstream": upstream.status(),
+        "bronnen": upstream.onderbrekers(),
+        "lokale_data": {**lokaal.status(), "fgr": fgr.status()},
+        "timings": timing.samenvatting(),
         "versie": VERSION,
     }))
 
 
+@router.get("/api/metrics")
+async def api_metrics():
+    """Metrics in het Prometheus-tekstformaat (services/metrics.py) voor een scraper.
+
+    Latentie per route en stap, PDOK-aanvragen per bron en infoformaat, NSN-
+    lookups, datasetherladingen, cache-hits, PDF-opmaak en de threadpool; geen
+    netwerk-calls. Async, zodat een scrape niet zelf in de rij voor een volle
+    threadpool staat.
+    """
+    return PlainTextResponse(metrics.tekst(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @router.get("/api/nsn")
 def api_nsn():
     """
@@ -119,6 +150,7 @@ def api_nsn():
 # ───────────────────── data
 @router.get("/api/plants")
 def api_plants(
+    request: Request,
     q: str = Query(""),
     inheems_only: bool = Query(False),
     toon_inheems: Optional[bool] = Query(None),
@@ -129,7 +161,10 @@ def api_plants(
     vocht: List[str] = Query(default=[]),
     bodem: List[str] = Query(default=[]),
     beplantingstype: List[str] = Query(default=[]),
-    limit: Optional[int] = Query(None),  # genegeerd → geen limiet
+    limit: Optional[int] = Query(None, ge=0, description="Maximaal aantal rijen (standaard: alle)."),
+    offset: int = Query(0, ge=0, description="Aantal rijen overslaan."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` van de vorige pagina; wint van `offset`."),
+    fields: List[str] = Query(default=[], description="Alleen deze velden per rij (komma-gescheiden of herhaald)."),
     sort: str = Query("naam"),
     desc: bool = Query(False),
 ):
@@ -145,22 +180,41 @@ def api_plants(
         "ellenberg_r_min", "ellenberg_r_max", "ellenberg_s_min", "ellenberg_s_max",
         "hoogte", "breedte", "winterhardheidszone", "grondsoorten", "ecowaarde"
     ) if c in df.columns]
-    items = df[cols].to_dict(orient="records")
-    return JSONResponse(_clean({"count": int(len(df)), "items": items}))
+    try:
+        cols = velden(fields, cols)
+        deel, volgende = pagina(df, limit, offset, cursor,
+                                query_hash(request.query_params.multi_items()))
+    except OngeldigVerzoek as e:
+        return JSONResponse(e.als_json(), status_code=400)
+    return json_antwoord({"count": int(len(df)), "items": None, "next_cursor": volgende},
+                         items=records_json(deel, cols))
+
+
+@router.get("/api/plants/suggest")
+def api_plants_suggest(
+    q: str = Query(""),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Autocomplete op Nederlandse, wetenschappelijke en cultivarnamen (zoekindex)."""
+    df = get_df(kopie=False)
+    items = index_voor(df, df.attrs.get(VERSIE_ATTR)).suggesties(q, limit)
+    return JSONResponse({"q": q, "items": items})
 
 
 # ───────────────────── admin
 @router.get("/api/admin/reload")
-def api_admin_reload(key: str = Query(...)):
-    """Wist de dataset-cache en laadt de CSV opnieuw.
+def api_admin_reload(key: str = Query(...), wacht: bool = Query(False)):
+    """Leest de CSV op de achtergrond opnieuw in en wisselt daarna in één keer om.
+    Lopende en nieuwe requests gebruiken tot dan de vorige dataset; met
+    `wacht=true` komt het antwoord pas als het herladen klaar is.
     Beveiligd met een simpele key in env: PLANTWIJS_ADMIN_KEY
     """
     admin_key = os.getenv(ADMIN_KEY_ENV, "")
     if not admin_key or key != admin_key:
         return JSONResponse({"ok": False, "error": "unauthorized"}, status_code=401)
-    try:
-        clear_cache()
-        get_df()  # meteen opnieuw inlezen zodat de eerste request niet wacht
-        return JSONResponse({"ok": True, "msg": "dataset cache cleared/refreshed"})
-    except Exception as e:
-        return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
+    status = herlaad(wacht=wacht)
+    if status["status"] == "fout":
+        return JSONResponse({"ok": False, "error": status["fout"], "herladen": status}, status_code=500)
+    msg = "dataset refreshed" if status["status"] == "klaar" else "dataset reload started"
+    return JSONResponse({"ok": True, "msg": msg, "herladen": status},
+                        status_code=200 if wacht else 202)
@@ -91,6 +91,10 @@ Download the full or filtered species list:
   {b}/export/csv?vocht=nat&bodem=veen
   {b}/export/xlsx
 
+Typed columnar exports for data analysis (numeric Ellenberg values):
+  {b}/export/parquet
+  {b}/export/arrow
+
 Machine-readable description of every endpoint (OpenAPI 3):
   {b}/openapi.json
   {b}/docs
@@ -42,6 +42,14 @@ de rest. Daarom geldt bovenop de score:
    zónder vochtvoorkeur: hun claim is hier immers niet te controleren. In de
    huidige catalogus noemt elke vorm een vochtvoorkeur, dus die tie-break
    verandert daar (nog) niets; hij is er voor vormen die dat later niet doen.
+
+Voorberekening
+--------------
+De invoerruimte is klein: een tuple (fgr, nsn, vocht, bodem) van entry-id's.
+Per contentversie wordt de catalogus één keer voorbereid (`_Catalogus`): per
+vorm de past_bij-sets en de vochteis, plus de generieke volgorde. De uitkomst
+(met de teksten uit `_vorm_naar_advies`) wordt per id-tuple gememoiseerd; de
+aanroeper krijgt altijd een eigen kopie.
 """
 
 from __future__ import annotations
@@ -51,10 +59,11 @@ import re
 import threading
 from typing import Any, Dict, List, Optional, Tuple
 
-import yaml
-
 from ..config import CONTENT_DIR
+from . import content
 from . import context as ctx
+from . import kennislaag
+from . import metrics
 from . import wortel
 
 MAATREGELEN_YAML_PATH = os.path.join(CONTENT_DIR, "maatregelen.yaml")
@@ -69,42 +78,34 @@ _LABEL_VORM = {"vocht": "de vochtklasse {}"}
 MAX_VORMEN = 5
 MIN_VORMEN = 3
 
-_CACHE: Dict[str, Any] = {"data": None, "mtime": None, "path": None}
+_CACHE: Dict[str, Any] = {"data": None, "raw": None}
 _LOCK = threading.Lock()
+_CATALOGUS: Dict[str, Any] = {"vormen": None, "versie": None, "catalogus": None}
 
 
 # ───────────────────── maatregelen laden + cachen
 def _vormen() -> List[dict]:
-    path = MAATREGELEN_YAML_PATH
-    try:
-        mtime = os.path.getmtime(path)
-    except OSError:
-        mtime = None
-
-    if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+    """De vormen uit maatregelen.yaml (uit de contentbundel, zie services/content.py)."""
+    raw = content.yaml_inhoud(MAATREGELEN_YAML_PATH)
+    if _CACHE["data"] is not None and _CACHE["raw"] is raw:
         return _CACHE["data"]
 
     with _LOCK:
-        if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+        if _CACHE["data"] is not None and _CACHE["raw"] is raw:
             return _CACHE["data"]
-        vormen: List[dict] = []
-        if mtime is None:
-            print(f"[MAATREGELEN] ontbreekt: {path}")
-        else:
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    raw = yaml.safe_load(f) or {}
-                vormen = [v for v in (raw.get("vormen") or []) if isinstance(v, dict)]
-            except Exception as e:
-                print("[MAATREGELEN] fout bij laden:", e)
-                vormen = []
-        _CACHE.update({"data": vormen, "mtime": mtime, "path": path})
+        try:
+            vormen = [v for v in ((raw or {}).get("vormen") or []) if isinstance(v, dict)]
+        except Exception as e:
+            print("[MAATREGELEN] fout bij laden:", e)
+            vormen = []
+        _CACHE.update({"data": vormen, "raw": raw})
     return _CACHE["data"]
 
 
 def reload_cache() -> None:
     with _LOCK:
-        _CACHE.update({"data": None, "mtime": None, "path": None})
+        _CACHE.update({"data": None, "raw": None})
+    content.herlaad()
 
 
 # ───────────────────── helpers
@@ -156,25 +157,6 @@ def _vocht_bekend(ids: Dict[str, Optional[str]]) -> bool:
     return bool(eid) and eid != "onbekend"
 
 
-def _vocht_conflict(vorm: dict, ids: Dict[str, Optional[str]]) -> bool:
-    """Sluit deze vorm de vochtklasse van de locatie uit?
-
-    Alleen waar als de vorm een vochtvoorkeur heeft, de vochtklasse van de
-    locatie bekend is en die klasse er niet bij staat.
-    """
-    eis = _vocht_eis(vorm)
-    if not eis or not _vocht_bekend(ids):
-        return False
-    return ids.get("vocht") not in eis
-
-
-def _vocht_rangorde(vorm: dict, ids: Dict[str, Optional[str]]) -> int:
-    """Tie-break bij onbekend vocht: 1 voor vormen mét een vochtvoorkeur."""
-    if _vocht_bekend(ids):
-        return 0
-    return 1 if _vocht_eis(vorm) else 0
-
-
 # Treffers wegen naar zeggingskracht: NSN is de meest specifieke kaartlaag
 # (48 klassen) en vocht de meest onderscheidende standplaatsfactor; fgr en
 # bodem zijn grofmazig. Zonder weging verdringen brede allemansvriend-vormen
@@ -182,21 +164,6 @@ def _vocht_rangorde(vorm: dict, ids: Dict[str, Optional[str]]) -> int:
 _WEGING = {"nsn": 3, "vocht": 2, "fgr": 1, "bodem": 1}
 
 
-def _score(vorm: dict, ids: Dict[str, Optional[str]]) -> Tuple[int, List[str]]:
-    """Gewogen score + de categorieën die de treffer opleverden."""
-    past = vorm.get("past_bij") or {}
-    treffers: List[str] = []
-    score = 0
-    for cat in SCORE_CATEGORIEEN:
-        eid = ids.get(cat)
-        if not eid or eid == "onbekend":
-            continue
-        if eid in [str(x).strip() for x in _lijst(past.get(cat))]:
-            treffers.append(cat)
-            score += _WEGING[cat]
-    return score, treffers
-
-
 def _label(cat: str, eid: Optional[str]) -> str:
     e = ctx.entry_by_id(cat, eid) if eid else None
     titel = ((e or {}).get("titel") or "").strip()
@@ -243,45 +210,95 @@ def aanbevolen_beplanting(
     return aanbevolen_beplanting_voor_ids(ids)
 
 
-def aanbevolen_beplanting_voor_ids(ids: Dict[str, Optional[str]]) -> List[dict]:
+class _Catalogus:
+    """De vormen uit maatregelen.yaml, voorbereid voor snelle aanbevelingen."""
+
+    MEMO_MAX = 4096   # (fgr, nsn, vocht, bodem) uit ± 92 entries; in de praktijk veel minder
+
+    def __init__(self, vormen: List[dict]):
+        self.vormen = vormen
+        self.past: List[Dict[str, frozenset]] = []
+        self.vocht_eis: List[frozenset] = []
+        for v in vormen:
+            past = v.get("past_bij") or {}
+            self.past.append({cat: frozenset(_lijst(past.get(cat))) for cat in SCORE_CATEGORIEEN})
+            self.vocht_eis.append(frozenset(_vocht_eis(v)))
+        generiek = [(_genericiteit(v), i) for i, v in enumerate(vormen)]
+        self.generiek: List[int] = [i for (vrij, totaal), i in
+                                    sorted(generiek, key=lambda t: (-t[0][0], -t[0][1], t[1]))]
+        self.memo: Dict[Tuple[Optional[str], ...], List[dict]] = {}
+
+    def aanbevolen(self, ids: Dict[str, Optional[str]]) -> List[dict]:
+        vocht_bekend = _vocht_bekend(ids)
+        conflict = [bool(eis) and vocht_bekend and ids.get("vocht") not in eis
+                    for eis in self.vocht_eis]
+
+        gescoord: List[Tuple[int, int, int, List[str]]] = []
+        for i, past in enumerate(self.past):
+            if conflict[i]:
+                continue  # vraagt om ander vocht dan deze plek heeft
+            score, treffers = 0, []
+            for cat in SCORE_CATEGORIEEN:
+                eid = ids.get(cat)
+                if eid and eid != "onbekend" and eid in past[cat]:
+                    treffers.append(cat)
+                    score += _WEGING[cat]
+            if score > 0:
+                rangorde = 0 if vocht_bekend else (1 if self.vocht_eis[i] else 0)
+                gescoord.append((score, rangorde, i, treffers))
+        # score desc, dan vormen zonder onbewezen vochtclaim, dan bestandsvolgorde
+        gescoord.sort(key=lambda t: (-t[0], t[1], t[2]))
+
+        gekozen = [(i, tr) for _s, _r, i, tr in gescoord[:MAX_VORMEN]]
+
+        if len(gekozen) < MIN_VORMEN:
+            gekozen_ids = {self.vormen[i].get("id") for i, _ in gekozen}
+            # Eerst de generieke vormen die niet met het vocht botsen; alleen als er
+            # dan nog te weinig zijn, mogen de conflicterende alsnog aanvullen.
+            for negeer_conflict in (False, True):
+                for i in self.generiek:
+                    if len(gekozen) >= MIN_VORMEN:
+                        break
+                    vid = self.vormen[i].get("id")
+                    if vid in gekozen_ids:
+                        continue
+                    if conflict[i] and not negeer_conflict:
+                        continue
+                    gekozen.append((i, []))
+                    gekozen_ids.add(vid)
+
+        return [_vorm_naar_advies(self.vormen[i], tr, ids) for i, tr in gekozen]
+
+
+def _catalogus() -> Optional[_Catalogus]:
+    """De voorbereide catalogus voor de huidige vormen en contentversie."""
     vormen = _vormen()
     if not vormen:
-        return []
+        return None
+    versie = content.versie()
+    if _CATALOGUS["vormen"] is vormen and _CATALOGUS["versie"] == versie:
+        return _CATALOGUS["catalogus"]
+    with _LOCK:
+        if _CATALOGUS["vormen"] is not vormen or _CATALOGUS["versie"] != versie:
+            _CATALOGUS.update({"vormen": vormen, "versie": versie,
+                               "catalogus": _Catalogus(vormen)})
+        return _CATALOGUS["catalogus"]
 
-    conflict = {i: _vocht_conflict(v, ids) for i, v in enumerate(vormen)}
-
-    gescoord: List[Tuple[int, int, int, dict, List[str]]] = []
-    for i, v in enumerate(vormen):
-        if conflict[i]:
-            continue  # vraagt om ander vocht dan deze plek heeft
-        score, treffers = _score(v, ids)
-        if score > 0:
-            gescoord.append((score, _vocht_rangorde(v, ids), i, v, treffers))
-    # score desc, dan vormen zonder onbewezen vochtclaim, dan bestandsvolgorde
-    gescoord.sort(key=lambda t: (-t[0], t[1], t[2]))
-
-    gekozen = [(v, tr) for _s, _r, _i, v, tr in gescoord[:MAX_VORMEN]]
-
-    if len(gekozen) < MIN_VORMEN:
-        gekozen_ids = {v.get("id") for v, _ in gekozen}
-        generiek = sorted(
-            enumerate(vormen),
-            key=lambda t: (-_genericiteit(t[1])[0], -_genericiteit(t[1])[1], t[0]),
-        )
-        # Eerst de generieke vormen die niet met het vocht botsen; alleen als er
-        # dan nog te weinig zijn, mogen de conflicterende alsnog aanvullen.
-        for negeer_conflict in (False, True):
-            for i, v in generiek:
-                if len(gekozen) >= MIN_VORMEN:
-                    break
-                if v.get("id") in gekozen_ids:
-                    continue
-                if conflict[i] and not negeer_conflict:
-                    continue
-                gekozen.append((v, []))
-                gekozen_ids.add(v.get("id"))
-
-    return [_vorm_naar_advies(v, tr, ids) for v, tr in gekozen]
+
+def aanbevolen_beplanting_voor_ids(ids: Dict[str, Optional[str]]) -> List[dict]:
+    """Passende vormen voor een set entry-id's (gememoiseerd per id-tuple)."""
+    catalogus = _catalogus()
+    if catalogus is None:
+        return []
+    sleutel = tuple(ids.get(cat) for cat in SCORE_CATEGORIEEN)
+    uit = catalogus.memo.get(sleutel)
+    metrics.cache("beplanting_memo", uit is not None)
+    if uit is None:
+        uit = catalogus.aanbevolen(ids)
+        if len(catalogus.memo) >= catalogus.MEMO_MAX:
+            catalogus.memo.clear()
+        catalogus.memo[sleutel] = uit
+    return [dict(a, voorbeeldsoorten=list(a["voorbeeldsoorten"])) for a in uit]
 
 
 def landschap(
@@ -309,7 +326,14 @@ def verrijk_advies(
     Returns:
         `{"landschap": {...}, "wortelbare_diepte": {...}|None,
           "aanbevolen_beplanting": [...]}`
+
+    Staat de combinatie in het voorberekende artefact (services/kennislaag.py),
+    dan komt de uitkomst daaruit; anders wordt alles hier uitgerekend.
     """
+    laag = kennislaag.verrijk(fgr=fgr, nsn=nsn, gmm=gmm, bodem=bodem,
+                              vocht=vocht, gt_code=gt_code)
+    if laag is not None:
+        return laag
     ids = {
         "fgr": ctx.entry_id("fgr", fgr),
         "nsn": ctx.entry_id("nsn", nsn),
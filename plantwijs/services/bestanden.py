@@ -0,0 +1,37 @@
+"""Bestanden atomair wegschrijven.
+
+Caches en artefacten op schijf (tiles, WMS-laagnamen, kennislaag) worden door
+meerdere threads en workers tegelijk gelezen en geschreven. Via een tijdelijk
+bestand naast het doel en een `os.replace` ziet een lezer altijd het oude of
+het nieuwe bestand, nooit een half geschreven.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Union
+
+
+def schrijf_atomair(pad: str, inhoud: Union[bytes, str]) -> None:
+    """`inhoud` naar `pad` (tekst als UTF-8); de map wordt zo nodig aangemaakt.
+
+    Het tijdelijke bestand is uniek per proces en thread. Een `OSError` gaat
+    door: de aanroeper bepaalt of een mislukte schrijfactie erg is.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(pad)), exist_ok=True)
+    tmp = f"{pad}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if isinstance(inhoud, str):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(inhoud)
+        else:
+            with open(tmp, "wb") as f:
+                f.write(inhoud)
+        os.replace(tmp, pad)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,154 @@
+"""Contentbundel: alle YAML uit `content/` als één geversioneerde snapshot.
+
+`context`, `advies`, `wortel` en `report` lazen elk hun eigen YAML-bestand en
+controleerden bij elke aanroep de mtime; één advies kostte zo tientallen
+stat-calls, en `context_descriptions.yaml` werd twee keer geparst. Deze module
+is nu de enige lezer:
+
+- `snapshot()` geeft de huidige `Snapshot`: per bestand de geparste YAML, plus
+  een `versie` (sha1 over de bestandsinhoud). Een snapshot wordt nooit
+  gewijzigd; bij een wijziging op schijf komt er een nieuwe voor in de plaats.
+  De geparste YAML is gedeeld: consumenten lezen alleen en bouwen hun eigen
+  afgeleide structuren (bij voorkeur per `versie` of per object-identiteit).
+- Wijzigingen worden hooguit eens per `CONTENT_CONTROLE_S` seconden
+  gedetecteerd (één listdir plus één stat per bestand), niet bij elke aanroep.
+  Alleen gewijzigde bestanden worden opnieuw geparst.
+- `yaml_inhoud(pad)` geeft één bestand uit de snapshot; tests die een eigen
+  kopie willen, wijzen `CONTENT_DIR` naar een tijdelijke map.
+
+Een ontbrekend of kapot bestand levert `None` op en nooit een exception: de
+consumenten vallen dan terug op hun lege standaard, zoals voorheen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import yaml
+
+from ..config import CONTENT_CONTROLE_S, CONTENT_DIR
+
+
+class Snapshot:
+    """Onveranderlijke momentopname van de contentbestanden."""
+
+    __slots__ = ("versie", "bestanden", "mtimes", "geladen_op")
+
+    def __init__(self, bestanden: Dict[str, Any], mtimes: Dict[str, Optional[float]],
+                 hashes: Dict[str, str]):
+        totaal = hashlib.sha1()
+        for pad in sorted(hashes):
+            totaal.update(f"{pad}\0{hashes[pad]}\0".encode("utf-8"))
+        self.versie: str = totaal.hexdigest()[:16]
+        self.bestanden: Mapping[str, Any] = MappingProxyType(dict(bestanden))
+        self.mtimes: Mapping[str, Optional[float]] = MappingProxyType(dict(mtimes))
+        self.geladen_op: float = time.time()
+
+    def __repr__(self) -> str:
+        return f"<Snapshot {self.versie} ({len(self.bestanden)} bestanden)>"
+
+
+_LOCK = threading.Lock()
+_STAAT: Dict[str, Any] = {
+    "snapshot": None,         # huidige Snapshot
+    "hashes": {},             # pad → sha1 van de bytes (voor de versie)
+    "gecontroleerd_op": 0.0,  # time.monotonic() van de laatste controle
+}
+
+
+def _sleutel(pad: str) -> str:
+    return os.path.abspath(pad)
+
+
+def _paden() -> set:
+    """Alle te bewaken paden: de YAML in content/."""
+    try:
+        namen = os.listdir(CONTENT_DIR)
+    except OSError:
+        namen = []
+    return {_sleutel(os.path.join(CONTENT_DIR, n))
+            for n in namen if n.endswith((".yaml", ".yml"))}
+
+
+def _mtime(pad: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(pad)
+    except OSError:
+        return None
+
+
+def _lees(pad: str) -> Tuple[Any, str]:
+    """(geparste YAML of None, sha1) van één bestand."""
+    try:
+        with open(pad, "rb") as f:
+            ruw = f.read()
+    except OSError:
+        print(f"[CONTENT] ontbreekt: {pad}")
+        return None, "ontbreekt"
+    sha = hashlib.sha1(ruw).hexdigest()
+    try:
+        return yaml.safe_load(ruw.decode("utf-8")) or {}, sha
+    except Exception as e:  # kapotte YAML mag de API nooit slopen
+        print(f"[CONTENT] fout bij laden van {os.path.basename(pad)}:", e)
+        return None, sha
+
+
+def _ververs(forceer: bool = False) -> Snapshot:
+    """Nieuwe snapshot als er iets veranderd is (onder _LOCK)."""
+    oud: Optional[Snapshot] = _STAAT["snapshot"]
+    paden = _paden()
+    mtimes = {p: _mtime(p) for p in paden}
+    if oud is not None and not forceer and dict(oud.mtimes) == mtimes:
+        return oud
+
+    bestanden: Dict[str, Any] = {}
+    hashes: Dict[str, str] = {}
+    for pad, mtime in mtimes.items():
+        if (oud is not None and not forceer and pad in oud.mtimes
+                and oud.mtimes[pad] == mtime and pad in _STAAT["hashes"]):
+            bestanden[pad] = oud.bestanden[pad]
+            hashes[pad] = _STAAT["hashes"][pad]
+        else:
+            bestanden[pad], hashes[pad] = _lees(pad)
+    nieuw = Snapshot(bestanden, mtimes, hashes)
+    _STAAT.update({"snapshot": nieuw, "hashes": hashes})
+    if oud is not None and oud.versie != nieuw.versie:
+        print(f"[CONTENT] nieuwe versie {nieuw.versie} (was {oud.versie})")
+    return nieuw
+
+
+def snapshot() -> Snapshot:
+    """De huidige snapshot; controleert hooguit eens per `CONTENT_CONTROLE_S` op wijzigingen."""
+    huidig: Optional[Snapshot] = _STAAT["snapshot"]
+    nu = time.monotonic()
+    if huidig is not None and nu - _STAAT["gecontroleerd_op"] < CONTENT_CONTROLE_S:
+        return huidig
+    with _LOCK:
+        if _STAAT["snapshot"] is not None and nu - _STAAT["gecontroleerd_op"] < CONTENT_CONTROLE_S:
+            return _STAAT["snapshot"]
+        huidig = _ververs()
+        _STAAT["gecontroleerd_op"] = time.monotonic()
+    return huidig
+
+
+def versie() -> str:
+    """Versiehash van de huidige content (verandert bij elke inhoudelijke wijziging)."""
+    return snapshot().versie
+
+
+def yaml_inhoud(pad: str) -> Any:
+    """Geparste YAML van één bestand uit de snapshot, of None (ontbreekt/kapot)."""
+    return snapshot().bestanden.get(_sleutel(pad))
+
+
+def herlaad() -> Snapshot:
+    """Alles opnieuw inlezen, ongeacht mtime en controle-interval (admin/tests)."""
+    with _LOCK:
+        snap = _ververs(forceer=True)
+        _STAAT["gecontroleerd_op"] = time.monotonic()
+    return snap
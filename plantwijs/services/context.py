@@ -14,19 +14,25 @@ letterlijk gevolgd:
    De volgorde in het YAML-bestand is dus betekenisvol.
 5. Nog geen treffer ⇒ de fallback-entry (lege `match` én lege `match_exact`).
 
-De YAML wordt in het geheugen gecachet; de mtime wordt bij elke aanroep
-gecontroleerd, zodat een gewijzigd bestand zonder herstart wordt opgepakt.
+De YAML komt uit de contentbundel (`services/content.py`), die hooguit eens
+per paar seconden op wijzigingen controleert; een gewijzigd bestand wordt dus
+zonder herstart opgepakt.
+
+Per geladen versie wordt de YAML ook gecompileerd (`_Categorie`): een dict
+voor `match_exact`, een Aho–Corasick-automaat voor `match` die per positie de
+laagste entry-index (= bestandsvolgorde) onthoudt, en een id-index. Resultaten
+worden per (categorie, genormaliseerde waarde) gememoiseerd. De tests houden
+de uitkomst gelijk aan de lineaire referentie uit content/README.md.
 """
 
 from __future__ import annotations
 
 import os
 import threading
-from typing import Any, Dict, List, Optional
-
-import yaml
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..config import CONTENT_DIR
+from . import content
 
 CONTEXT_YAML_PATH = os.path.join(CONTENT_DIR, "context_descriptions.yaml")
 
@@ -34,7 +40,7 @@ CONTEXT_YAML_PATH = os.path.join(CONTENT_DIR, "context_descriptions.yaml")
 # waarin het blok `landschap` wordt opgebouwd.
 CATEGORIEEN = ("fgr", "nsn", "gmm", "bodem", "vocht")
 
-_CACHE: Dict[str, Any] = {"data": None, "mtime": None, "path": None}
+_CACHE: Dict[str, Any] = {"data": None, "raw": None, "compiled": None}
 _LOCK = threading.Lock()
 
 
@@ -54,10 +60,8 @@ def _as_list(v: Any) -> List[str]:
 
 
 # ───────────────────── laden + cachen
-def _read_yaml(path: str) -> Dict[str, List[dict]]:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f) or {}
-    cats = raw.get("categorieen") or {}
+def _lees(raw: Any) -> Dict[str, List[dict]]:
+    cats = (raw or {}).get("categorieen") or {}
     out: Dict[str, List[dict]] = {}
     for cat, entries in cats.items():
         lijst: List[dict] = []
@@ -78,37 +82,36 @@ def _read_yaml(path: str) -> Dict[str, List[dict]]:
 
 
 def _data() -> Dict[str, List[dict]]:
-    """Geef de (gecachete) categorieën terug; herlaadt bij gewijzigde mtime."""
-    path = CONTEXT_YAML_PATH
-    try:
-        mtime = os.path.getmtime(path)
-    except OSError:
-        mtime = None
-
-    if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+    """Geef de categorieën terug; opnieuw opgebouwd zodra de bundel een nieuwe YAML heeft."""
+    raw = content.yaml_inhoud(CONTEXT_YAML_PATH)
+    if _CACHE["data"] is not None and _CACHE["raw"] is raw:
         return _CACHE["data"]
 
     with _LOCK:
         # dubbelcheck binnen het slot
-        if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+        if _CACHE["data"] is not None and _CACHE["raw"] is raw:
             return _CACHE["data"]
-        if mtime is None:
-            print(f"[CONTEXT] ontbreekt: {path}")
-            data: Dict[str, List[dict]] = {}
-        else:
-            try:
-                data = _read_yaml(path)
-            except Exception as e:  # kapotte YAML mag de API nooit slopen
-                print("[CONTEXT] fout bij laden:", e)
-                data = {}
-        _CACHE.update({"data": data, "mtime": mtime, "path": path})
+        try:
+            data = _lees(raw) if isinstance(raw, dict) else {}
+        except Exception as e:  # kapotte YAML mag de API nooit slopen
+            print("[CONTEXT] fout bij laden:", e)
+            data = {}
+        compiled = {cat: _Categorie(lijst) for cat, lijst in data.items()}
+        _CACHE.update({"data": data, "raw": raw, "compiled": compiled})
     return _CACHE["data"]
 
 
+def _compiled() -> Dict[str, "_Categorie"]:
+    """De gecompileerde categorieën van de huidige versie (zie `_data`)."""
+    _data()
+    return _CACHE["compiled"] or {}
+
+
 def reload_cache() -> None:
-    """Forceer een herlaad bij de eerstvolgende aanroep (voor tests/admin)."""
+    """Forceer een herlaad (voor tests/admin): de bundel leest alles opnieuw in."""
     with _LOCK:
-        _CACHE.update({"data": None, "mtime": None, "path": None})
+        _CACHE.update({"data": None, "raw": None, "compiled": None})
+    content.herlaad()
 
 
 def categorieen() -> List[str]:
@@ -121,7 +124,105 @@ def entries(categorie: str) -> List[dict]:
     return _data().get(str(categorie or "").strip().lower(), [])
 
 
-# ───────────────────── matcher (referentie-implementatie uit content/README.md)
+# ───────────────────── gecompileerde matcher
+class _Automaat:
+    """Aho–Corasick over de `match`-teksten van één categorie.
+
+    Elke knoop onthoudt de laagste entry-index van alle patronen die op die
+    positie eindigen (inclusief de patronen via de faallinks). Eén pass over
+    de waarde geeft zo de eerste entry in bestandsvolgorde met een deeltekst-
+    treffer — precies wat de lineaire lus uit content/README.md oplevert.
+    """
+
+    __slots__ = ("_goto", "_fail", "_beste")
+
+    def __init__(self, patronen: List[Tuple[str, int]]):
+        goto: List[Dict[str, int]] = [{}]
+        beste: List[Optional[int]] = [None]
+        for patroon, index in patronen:
+            knoop = 0
+            for teken in patroon:
+                volgende = goto[knoop].get(teken)
+                if volgende is None:
+                    goto.append({})
+                    beste.append(None)
+                    volgende = len(goto) - 1
+                    goto[knoop][teken] = volgende
+                knoop = volgende
+            if beste[knoop] is None or index < beste[knoop]:
+                beste[knoop] = index
+
+        # faallinks breedte-eerst; `beste` erft het minimum van de faalknoop
+        fail = [0] * len(goto)
+        rij = list(goto[0].values())
+        for knoop in rij:
+            for teken, kind in goto[knoop].items():
+                f = fail[knoop]
+                while f and teken not in goto[f]:
+                    f = fail[f]
+                fail[kind] = goto[f].get(teken, 0)
+                erf = beste[fail[kind]]
+                if erf is not None and (beste[kind] is None or erf < beste[kind]):
+                    beste[kind] = erf
+                rij.append(kind)
+        self._goto, self._fail, self._beste = goto, fail, beste
+
+    def eerste(self, tekst: str) -> Optional[int]:
+        """Laagste entry-index met een patroon dat in `tekst` voorkomt."""
+        goto, fail, beste = self._goto, self._fail, self._beste
+        knoop = 0
+        gevonden: Optional[int] = None
+        for teken in tekst:
+            while knoop and teken not in goto[knoop]:
+                knoop = fail[knoop]
+            knoop = goto[knoop].get(teken, 0)
+            b = beste[knoop]
+            if b is not None and (gevonden is None or b < gevonden):
+                gevonden = b
+                if gevonden == 0:
+                    break
+        return gevonden
+
+
+class _Categorie:
+    """Eén categorie, gecompileerd: exact-dict, automaat, id-index en memo."""
+
+    MEMO_MAX = 4096   # kaartwaarden zijn eindig; dit is ruim voldoende
+
+    def __init__(self, lijst: List[dict]):
+        self.lijst = lijst
+        self.fallback = _fallback(lijst)
+        self.exact: Dict[str, dict] = {}
+        patronen: List[Tuple[str, int]] = []
+        self.per_id: Dict[str, dict] = {}
+        for i, e in enumerate(lijst):
+            for m in e["match_exact"]:
+                self.exact.setdefault(norm(m), e)
+            for m in e["match"]:
+                mn = norm(m)
+                if mn:
+                    patronen.append((mn, i))
+            self.per_id.setdefault(e["id"].lower(), e)
+        self.automaat = _Automaat(patronen)
+        self.memo: Dict[str, Optional[dict]] = {}
+
+    def zoek(self, v: str) -> Optional[dict]:
+        """Entry voor een al genormaliseerde, niet-lege waarde."""
+        try:
+            return self.memo[v]
+        except KeyError:
+            pass
+        e = self.exact.get(v)
+        if e is None:
+            i = self.automaat.eerste(v)
+            e = self.lijst[i] if i is not None else self.fallback
+        if len(self.memo) >= self.MEMO_MAX:
+            self.memo.clear()
+        self.memo[v] = e
+        return e
+
+
+# ───────────────────── matcher
 def _fallback(lijst: List[dict]) -> Optional[dict]:
     return next((e for e in lijst if not e["match"] and not e["match_exact"]), None)
 
@@ -132,24 +233,13 @@ def zoek(categorie: str, waarde: Any) -> Optional[dict]:
     Onbekende categorie ⇒ None. Lege waarde ⇒ fallback-entry (of None als de
     categorie geen fallback heeft).
     """
-    lijst = entries(categorie)
-    if not lijst:
+    cat = _compiled().get(str(categorie or "").strip().lower())
+    if cat is None or not cat.lijst:
         return None
-
-    fallback = _fallback(lijst)
     v = norm(waarde)
     if not v:
-        return fallback
-
-    for e in lijst:
-        if any(norm(m) == v for m in e["match_exact"]):
-            return e
-    for e in lijst:
-        for m in e["match"]:
-            mn = norm(m)
-            if mn and mn in v:
-                return e
-    return fallback
+        return cat.fallback
+    return cat.zoek(v)
 
 
 def entry_id(categorie: str, waarde: Any) -> Optional[str]:
@@ -163,7 +253,8 @@ def entry_by_id(categorie: str, eid: str) -> Optional[dict]:
     key = str(eid or "").strip().lower()
     if not key:
         return None
-    return next((e for e in entries(categorie) if e["id"].lower() == key), None)
+    cat = _compiled().get(str(categorie or "").strip().lower())
+    return cat.per_id.get(key) if cat is not None else None
 
 
 def beschrijf(categorie: str, waarde: Any) -> Optional[dict]:
@@ -172,7 +263,11 @@ def beschrijf(categorie: str, waarde: Any) -> Optional[dict]:
     Retourneert `{titel, ontstaan, versterken, bron}` of None als de categorie
     onbekend is (of de categorie geen enkele passende entry kent).
     """
-    e = zoek(categorie, waarde)
+    return beschrijf_entry(zoek(categorie, waarde))
+
+
+def beschrijf_entry(e: Optional[dict]) -> Optional[dict]:
+    """Het landschapsverhaal van een al gevonden entry (zie `beschrijf`)."""
     if not e:
         return None
     return {
@@ -2,20 +2,58 @@
 
 from __future__ import annotations
 
+import hashlib
 import io
 import math
 import os
 import re
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
 
-from ..config import DATA_DIR, DATA_PATHS, HEADERS, MIN_DATASET_ROWS, ONLINE_CSV_URLS
+from ..config import (
+    DATA_DIR,
+    DATA_PATHS,
+    DATASET_CONTROLE_S,
+    HEADERS,
+    MIN_DATASET_ROWS,
+    ONLINE_CSV_URLS,
+)
+from . import metrics
+from .zoekindex import clear_cache as clear_zoekindex, index_voor
 
 # ───────────────────── cache
-_CACHE: Dict[str, Any] = {"df": None, "mtime": None, "path": None, "source": None}
+# De actieve snapshot. `df` wordt bij een herlaadactie als laatste vervangen:
+# de nieuwe dataset en zijn afgeleide indexen zijn dan al klaar, en een request
+# die nog met de oude dataframe bezig is, maakt die gewoon af.
+# `gecontroleerd_op` (time.monotonic) is de laatste keer dat de bronbestanden
+# bekeken zijn; zie DATASET_CONTROLE_S.
+_CACHE: Dict[str, Any] = {"df": None, "mtime": None, "path": None, "source": None, "hash": None,
+                          "rows": None, "gecontroleerd_op": float("-inf")}
+# Eén lader tegelijk. Wie de lock niet krijgt en al een (oudere) dataset heeft,
+# gebruikt die; alleen bij een koude start wacht een request op de lader.
+_LAAD_LOCK = threading.Lock()
+# Lokale bestanden die te klein bleken, met hun mtime: niet elke request opnieuw parsen.
+_OVERGESLAGEN: Dict[str, float] = {}
+# Voortgang van de achtergrond-herlaadactie (/api/admin/reload, /api/health).
+_HERLAAD: Dict[str, Any] = {"status": "idle", "gestart_op": None, "klaar_op": None,
+                            "fout": None, "thread": None}
+_HERLAAD_LOCK = threading.Lock()
+# Sleutel in `df.attrs` met de datasetversie ((pad, mtime), zie `dataset_versie`).
+# attrs reizen mee door filteren, kopiëren en sorteren; services/jsonuitvoer.py
+# gebruikt de versie om rijfragmenten veilig te hergebruiken.
+VERSIE_ATTR = "plantwijs_dataset_versie"
+
+# Sorteervolgorde van de volledige dataset per (versie, kolom, aflopend): de
+# rang van elk rijlabel. Een gefilterde selectie sorteert daarmee zonder
+# stringvergelijkingen, en altijd stabiel (gelijke waarden houden de
+# bestandsvolgorde). Dat laatste is nodig voor paginering met offset/cursor.
+_VOLGORDE: Dict[Tuple[Any, str, bool], pd.Series] = {}
+_VOLGORDE_MAX = 32
 
 # ───────────────────── Nederlandse namen (SL2020)
 # Standaardlijst van de Nederlandse Flora 2020: wetenschappelijke naam →
@@ -304,7 +342,29 @@ def _fetch_csv_online(url: str) -> Optional[pd.DataFrame]:
         return None
 
 
-def get_df() -> pd.DataFrame:
+def _snapshot_actueel() -> Optional[pd.DataFrame]:
+    """De geladen dataframe als die nog bij de bronbestanden past, anders None.
+
+    Zelfde voorrang als `_laad_snapshot`: het eerste bestaande lokale pad wint,
+    te kleine bestanden (ongewijzigd sinds de vorige poging) tellen niet mee, en
+    de online CSV alleen als er lokaal niets bruikbaars is.
+    """
+    df = _CACHE["df"]
+    if df is None:
+        return None
+    for path in DATA_PATHS:
+        if not os.path.exists(path):
+            continue
+        m = os.path.getmtime(path)
+        if path == _CACHE["path"]:
+            return df if m == _CACHE["mtime"] else None
+        if _OVERGESLAGEN.get(path) != m:
+            return None
+    return df if _CACHE["source"] == "online" else None
+
+
+def _laad_snapshot() -> Dict[str, Any]:
+    """Dataset inlezen (lokaal, anders online), zonder de cache te raadplegen."""
     env_path = os.environ.get("PLANTWIJS_CSV", "").strip()
 
     # 1) Probeer lokaal (development)
@@ -312,20 +372,18 @@ def get_df() -> pd.DataFrame:
         if not os.path.exists(path):
             continue
         m = os.path.getmtime(path)
-        if _CACHE["df"] is not None and _CACHE["mtime"] == m and _CACHE["path"] == path:
-            return _CACHE["df"].copy()
+        if _OVERGESLAGEN.get(path) == m:
+            continue
         df = _load_df(path)
         if len(df) < MIN_DATASET_ROWS and path != env_path:
             print(f"[DATA] overgeslagen (slechts {len(df)} rijen, minimum {MIN_DATASET_ROWS}): {path}")
+            _OVERGESLAGEN[path] = m
             continue
-        _CACHE.update({"df": df, "mtime": m, "path": path, "source": "local"})
+        df.attrs[VERSIE_ATTR] = (path, m)
         print(f"[DATA] geladen (lokaal): {path} — {len(df)} rijen, {df.shape[1]} kolommen")
-        return _CACHE["df"].copy()
+        return {"df": df, "mtime": m, "path": path, "source": "local"}
 
     # 2) Fallback: online CSV (GitHub raw)
-    if _CACHE["df"] is not None and _CACHE.get("source") == "online":
-        return _CACHE["df"].copy()
-
     env_url = os.environ.get("PLANTWIJS_ONLINE_CSV_URL", "").strip()
     for url in ONLINE_CSV_URLS:
         df = _fetch_csv_online(url)
@@ -334,9 +392,10 @@ def get_df() -> pd.DataFrame:
         if len(df) < MIN_DATASET_ROWS and url != env_url:
             print(f"[DATA] online overgeslagen (slechts {len(df)} rijen): {url}")
             continue
-        _CACHE.update({"df": df, "mtime": time.time(), "path": url, "source": "online"})
+        m = time.time()
+        df.attrs[VERSIE_ATTR] = (url, m)
         print(f"[DATA] geladen (online): {url} — {len(df)} rijen, {df.shape[1]} kolommen")
-        return _CACHE["df"].copy()
+        return {"df": df, "mtime": m, "path": url, "source": "online"}
 
     # 3) Niets gevonden → duidelijke foutmelding
     raise FileNotFoundError(
@@ -345,14 +404,131 @@ def get_df() -> pd.DataFrame:
     )
 
 
+def _inhoud_hash(df: pd.DataFrame) -> str:
+    """Korte hash over de inhoud; gelijk zolang de data gelijk is, ongeacht pad of mtime."""
+    rijen = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    kolommen = "\x1f".join(map(str, df.columns)).encode("utf-8")
+    return hashlib.sha1(kolommen + rijen.tobytes()).hexdigest()[:12]
+
+
+_GELADEN = metrics.teller("plantwijs_dataset_loads_total",
+                          "Keren dat een dataset-snapshot actief werd (start, gewijzigde bron, herladen).")
+_HERLADEN = metrics.teller("plantwijs_dataset_reloads_total",
+                           "Afgeronde /api/admin/reload-acties, naar uitslag (klaar of fout).",
+                           ("uitslag",))
+
+
+@metrics.verzamelaar
+def _metrics() -> List[metrics.Familie]:
+    return [("plantwijs_dataset_rows", "gauge", "Aantal rijen in de actieve dataset.",
+             [({}, float(_CACHE.get("rows") or 0))])]
+
+
+def _installeer(snap: Dict[str, Any]) -> pd.DataFrame:
+    """Afgeleide indexen bouwen en daarna de snapshot actief maken (onder _LAAD_LOCK)."""
+    df = snap["df"]
+    versie = df.attrs[VERSIE_ATTR]
+    snap["hash"] = _inhoud_hash(df)
+    index_voor(df, versie)
+    if "naam" in df.columns:
+        _rang(df, versie, "naam", False)
+    _CACHE.update({k: snap[k] for k in ("mtime", "path", "source", "hash")})
+    _CACHE.update({"rows": int(len(df)), "gecontroleerd_op": time.monotonic()})
+    _CACHE["df"] = df
+    _GELADEN.inc()
+    return df
+
+
+def get_df(kopie: bool = True) -> pd.DataFrame:
+    """De actieve dataset.
+
+    Of de bron is gewijzigd, wordt hooguit eens per `DATASET_CONTROLE_S`
+    seconden bekeken; daartussen kost een aanroep geen bestandstoegang. Met
+    `kopie=False` komt de gedeelde dataframe zelf terug, zonder kopie: alleen
+    om te lezen (filteren, `.loc` en sorteren geven al een nieuw frame).
+    """
+    df = _CACHE["df"]
+    if df is not None and time.monotonic() - _CACHE["gecontroleerd_op"] < DATASET_CONTROLE_S:
+        return df.copy() if kopie else df
+    df = _snapshot_actueel()
+    if df is not None:
+        _CACHE["gecontroleerd_op"] = time.monotonic()
+    else:
+        oud = _CACHE["df"]
+        if oud is None:
+            _LAAD_LOCK.acquire()
+        elif not _LAAD_LOCK.acquire(blocking=False):
+            # een andere request of de herlaadthread is al aan het laden
+            return oud.copy() if kopie else oud
+        try:
+            df = _snapshot_actueel()
+            if df is None:
+                df = _installeer(_laad_snapshot())
+        finally:
+            _LAAD_LOCK.release()
+    return df.copy() if kopie else df
+
+
+def _herlaad_werk() -> None:
+    try:
+        with _LAAD_LOCK:
+            _installeer(_laad_snapshot())
+        with _HERLAAD_LOCK:
+            _HERLAAD.update({"status": "klaar", "klaar_op": time.time(), "fout": None})
+        _HERLADEN.inc(uitslag="klaar")
+    except Exception as e:
+        print("[DATA] herladen mislukt; de vorige dataset blijft actief:", e)
+        with _HERLAAD_LOCK:
+            _HERLAAD.update({"status": "fout", "klaar_op": time.time(), "fout": str(e)})
+        _HERLADEN.inc(uitslag="fout")
+
+
+def herlaad(wacht: bool = False) -> Dict[str, Any]:
+    """Dataset op de achtergrond opnieuw inlezen en daarna atomair omwisselen.
+
+    Tot de nieuwe snapshot (met indexen) klaar is, krijgen requests de oude.
+    Loopt er al een herlaadactie, dan wordt die niet dubbel gestart. Met
+    `wacht` keert de functie pas terug als het herladen klaar is.
+    """
+    with _HERLAAD_LOCK:
+        t = _HERLAAD["thread"]
+        if t is None or not t.is_alive():
+            t = threading.Thread(target=_herlaad_werk, name="dataset-herlaad", daemon=True)
+            _HERLAAD.update({"status": "bezig", "gestart_op": time.time(), "klaar_op": None,
+                             "fout": None, "thread": t})
+            t.start()
+    if wacht:
+        t.join()
+    return herlaad_status()
+
+
+def herlaad_status() -> Dict[str, Any]:
+    """Voortgang van de laatste herlaadactie plus de hash van de actieve dataset."""
+    with _HERLAAD_LOCK:
+        status = {k: v for k, v in _HERLAAD.items() if k != "thread"}
+    status["actieve_versie"] = _CACHE.get("hash")
+    return status
+
+
 def clear_cache() -> None:
     """Leeg de dataset-cache; de eerstvolgende get_df() laadt opnieuw."""
-    _CACHE.update({"df": None, "mtime": None, "path": None, "source": None})
+    with _LAAD_LOCK:
+        _CACHE.update({"df": None, "mtime": None, "path": None, "source": None, "hash": None,
+                       "rows": None, "gecontroleerd_op": float("-inf")})
+        _OVERGESLAGEN.clear()
+        _VOLGORDE.clear()
+        clear_zoekindex()
 
 
 def dataset_info() -> Dict[str, Any]:
     """Metadata over de geladen dataset (zonder de dataframe zelf)."""
-    return {"path": _CACHE.get("path"), "source": _CACHE.get("source")}
+    return {"path": _CACHE.get("path"), "source": _CACHE.get("source"),
+            "versie": _CACHE.get("hash"), "rows": _CACHE.get("rows")}
+
+
+def dataset_versie() -> Tuple[Any, Any]:
+    """(pad, mtime) van de geladen dataset; verandert bij elke herlaadactie."""
+    return (_CACHE.get("path"), _CACHE.get("mtime"))
 
 
 # ───────────────────── JSON-cleaner
@@ -372,10 +548,6 @@ def _clean(o: Any) -> Any:
 
 
 # ───────────────────── filtering helpers
-def _contains_ci(s: Any, needle: str) -> bool:
-    return needle.lower() in str(s or "").lower()
-
-
 def _split_tokens(cell: Any) -> List[str]:
     return [t.strip().lower()
             for t in re.split(r"[/|;,]+", str(cell or ""))
@@ -615,6 +787,39 @@ def ensure_beplantingstype(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# ───────────────────── getypeerde kolommen (Parquet/Arrow-export)
+# De CSV wordt bewust als tekst ingelezen (dtype=str); voor de kolomformaten
+# krijgen de kolommen hier hun echte type, zodat een afnemer niet opnieuw hoeft
+# te parsen. Alles wat hier niet genoemd wordt blijft tekst.
+_RE_ELLENBERG = re.compile(r"^ellenberg_[a-z](?:_min|_max)?$")
+_BOOL_KOLOMMEN = ("invasief", "inheems")
+_JA_NEE = {"ja": True, "nee": False, "true": True, "false": False, "1": True, "0": False}
+
+
+def getypeerd(df: pd.DataFrame) -> pd.DataFrame:
+    """Kopie van `df` met echte dtypes voor de kolomformaten.
+
+    - `ellenberg_*` (ook `_min`/`_max`): float, lege of onleesbare waarde → NaN;
+    - `status_nl`: categorisch met vaste categorieën `STATUS_LABELS`;
+    - `invasief`, `inheems`: nullable boolean (ja/nee; leeg → <NA>);
+    - overige kolommen: nullable string.
+    """
+    uit: Dict[str, pd.Series] = {}
+    for kolom in df.columns:
+        s = df[kolom]
+        if _RE_ELLENBERG.match(kolom):
+            uit[kolom] = pd.to_numeric(s, errors="coerce").astype("float64")
+        elif kolom == "status_nl":
+            uit[kolom] = pd.Categorical(
+                s.astype("string").str.strip().str.lower(), categories=list(STATUS_LABELS))
+        elif kolom in _BOOL_KOLOMMEN:
+            uit[kolom] = s.astype("string").str.strip().str.lower().map(
+                _JA_NEE, na_action="ignore").astype("boolean")
+        else:
+            uit[kolom] = s.astype("string")
+    return pd.DataFrame(uit, index=df.index)
+
+
 def _filter_plants_df(
     q: str,
     inheems_only: bool,
@@ -629,13 +834,13 @@ def _filter_plants_df(
     sort: str,
     desc: bool,
 ) -> pd.DataFrame:
-    df = get_df()
+    df = get_df(kopie=False)
 
     if q:
-        df = df[df.apply(
-            lambda r: _contains_ci(r.get("naam"), q) or _contains_ci(r.get("wetenschappelijke_naam"), q),
-            axis=1
-        )]
+        # Zoekindex (services/zoekindex.py): volgorde = relevantie, zodat
+        # sort=relevantie (geen kolom) die volgorde gewoon laat staan.
+        treffers = index_voor(df, df.attrs.get(VERSIE_ATTR)).treffers(q)
+        df = df.loc[[label for label, _score in treffers]]
 
     # Afgeleid beplantingstype (boom/heester) + filter
     if beplantingstype:
@@ -653,6 +858,34 @@ def _filter_plants_df(
     df = filter_standplaats(df, vocht, bodem)
 
     if sort in df.columns:
-        df = df.sort_values(sort, ascending=not desc)
+        df = sorteer(df, sort, desc)
 
     return df
+
+
+def sorteer(df: pd.DataFrame, kolom: str, desc: bool = False) -> pd.DataFrame:
+    """Stabiel gesorteerde `df` op `kolom`; gelijke waarden houden de bestandsvolgorde.
+
+    Hoort `df` bij de geladen dataset (zelfde versie in `df.attrs`), dan komt
+    de volgorde uit de voorberekende rang van de volledige dataset.
+    """
+    versie = df.attrs.get(VERSIE_ATTR)
+    bron = _CACHE["df"]
+    if (versie is None or bron is None or bron.attrs.get(VERSIE_ATTR) != versie
+            or kolom not in bron.columns):
+        return df.sort_values(kolom, ascending=not desc, kind="mergesort")
+    rang = _rang(bron, versie, kolom, desc)
+    return df.iloc[np.argsort(rang.reindex(df.index).to_numpy(), kind="stable")]
+
+
+def _rang(bron: pd.DataFrame, versie: Any, kolom: str, desc: bool) -> pd.Series:
+    """Rang van elk rijlabel van `bron` gesorteerd op `kolom` (gecachet per versie)."""
+    sleutel = (versie, kolom, bool(desc))
+    rang = _VOLGORDE.get(sleutel)
+    if rang is None:
+        volgorde = bron.sort_values(kolom, ascending=not desc, kind="mergesort").index
+        rang = pd.Series(np.arange(len(volgorde)), index=volgorde)
+        if len(_VOLGORDE) >= _VOLGORDE_MAX:
+            _VOLGORDE.clear()
+        _VOLGORDE[sleutel] = rang
+    return rang
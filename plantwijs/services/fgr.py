@@ -0,0 +1,134 @@
+"""FGR (Fysisch-Geografische Regio's) lokaal: de vlakken in SQLite.
+
+`fgr_from_point` deed per advies één WFS-bbox-query en bij een misser nog een
+CQL INTERSECTS: één of twee netwerkrondes voor een kaart met een handvol grote
+regio's die vrijwel nooit verandert. Hier staan de vlakken in `FGR_PAD`, in
+hetzelfde formaat als de bodem- en GMM-vlakken van services/lokaal.py (SQLite
+met een R-tree op de bbox, `lokaal.Polygonen`):
+
+- het bestand mag met de repo mee, of wordt met `lokaal.schrijf_polygonen`
+  gebouwd;
+- ontbreekt het, dan haalt `warm_fgr()` (lifespan) de vlakken op de
+  achtergrond één keer via WFS GetFeature op (gepagineerd, in RD) en schrijft
+  ze naar `FGR_PAD`.
+
+Of het bestand er is wordt één keer per proces bekeken, net als in
+services/lokaal.py. Zolang er geen index is geeft `zoek` `BUITEN` en gaat
+services/pdok.py via de WFS.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from ..config import FGR_PAD, FMT_JSON, HEADERS, PDOK_FGR_WFS, TX_WGS84_RD
+from . import upstream
+from .lokaal import BUITEN, Polygonen, schrijf_polygonen
+
+FGR_LAAG = "fysischgeografischeregios:fysischgeografischeregios"
+_PAGINA = 1000
+
+
+# ───────────────────── laden / ophalen
+_INDEX: Optional[Polygonen] = None
+_GEOPEND = False   # FGR_PAD al bekeken; ook een ontbrekend bestand wordt onthouden
+_LADER: Optional[threading.Thread] = None
+_LOCK = threading.Lock()
+
+
+def _index() -> Optional[Polygonen]:
+    """De index uit `FGR_PAD`, één keer per proces geopend; None zonder bestand."""
+    global _INDEX, _GEOPEND
+    if _GEOPEND:
+        return _INDEX
+    with _LOCK:
+        if not _GEOPEND:
+            _INDEX = Polygonen.open("fgr", FGR_PAD)
+            _GEOPEND = True
+            if _INDEX is not None:
+                print("[FGR] lokale index in gebruik:", FGR_PAD)
+        return _INDEX
+
+
+def _download() -> List[Dict[str, Any]]:
+    """Alle FGR-vlakken via WFS GetFeature (in RD), pagina voor pagina."""
+    features: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        url = (f"{PDOK_FGR_WFS}&request=GetFeature&typenames={FGR_LAAG}"
+               f"&outputFormat={FMT_JSON}&srsName=EPSG:28992"
+               f"&count={_PAGINA}&startIndex={start}")
+        upstream.wacht(url)
+        r = requests.get(url, headers=HEADERS, timeout=60)
+        r.raise_for_status()
+        pagina = (r.json() or {}).get("features") or []
+        features.extend(pagina)
+        if len(pagina) < _PAGINA:
+            return features
+        start += _PAGINA
+
+
+def laad(ophalen: bool = False) -> Optional[Polygonen]:
+    """De index openen; met `ophalen` zo nodig eerst via de WFS bouwen."""
+    global _INDEX, _GEOPEND
+    index = _index()
+    if index is not None or not ophalen:
+        return index
+    t0 = time.time()
+    try:
+        _, n = schrijf_polygonen("fgr", _download(), bron=PDOK_FGR_WFS, pad=FGR_PAD)
+    except Exception as e:   # dan blijft de live WFS de bron
+        print("[FGR] lokale index niet gebouwd:", e)
+        return None
+    print(f"[FGR] index: {n} vlakken via de WFS in {time.time() - t0:.1f}s")
+    with _LOCK:
+        _INDEX, _GEOPEND = None, False
+    return _index()
+
+
+def warm_fgr() -> None:
+    """Bij de start: ontbreekt de index, dan op de achtergrond via de WFS bouwen."""
+    global _LADER
+    if _index() is not None:
+        return
+    with _LOCK:
+        if _LADER is not None and _LADER.is_alive():
+            return
+        _LADER = threading.Thread(target=laad, kwargs={"ophalen": True},
+                                  name="fgr-index", daemon=True)
+        _LADER.start()
+
+
+def zoek(lat: float, lon: float) -> Any:
+    """FGR-regio op een punt, None buiten alle vlakken, of BUITEN zonder index."""
+    index = _index()
+    if index is None:
+        return BUITEN
+    try:
+        props = index.props(*TX_WGS84_RD.transform(lon, lat))
+    except sqlite3.Error as e:
+        print("[FGR] lookup fout:", e)
+        return BUITEN
+    if props is None or props is BUITEN:
+        return props
+    return props.get("fgr") or None
+
+
+def status() -> str:
+    """'lokaal' | 'laden' | 'wms' (voor /api/health)."""
+    if _index() is not None:
+        return "lokaal"
+    if _LADER is not None and _LADER.is_alive():
+        return "laden"
+    return "wms"
+
+
+def clear_cache() -> None:
+    global _INDEX, _GEOPEND
+    with _LOCK:
+        _INDEX, _GEOPEND = None, False
@@ -13,6 +13,14 @@ De service is bewust "stil": elke fout (time-out, HTTP-fout, onbruikbare
 JSON, geen match) levert `None` op. De aanroeper vertaalt dat naar een nette
 404, precies zoals docs/API.md voorschrijft. Eén kapotte bron mag nooit een
 500 opleveren.
+
+Het ophalen loopt via de gedeelde asynchrone client (services/httpklient.py);
+/advies/geo gebruikt `zoek_adres_async`, `zoek_adres` is de synchrone ingang.
+
+Uitzondering op het "stil" zijn: is de Locatieserver zelf onbereikbaar
+(time-out, geen verbinding, 5xx, of de stroomonderbreker in
+services/upstream.py staat open), dan gaat `upstream.BronFout` door. Dat is
+geen "adres niet gevonden"; de route maakt er een 503 van.
 """
 
 from __future__ import annotations
@@ -20,13 +28,12 @@ from __future__ import annotations
 import math
 import re
 import urllib.parse
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from ..config import upstream_url
+from . import httpklient, upstream
 
-from ..config import HEADERS
-
-LOCATIESERVER_FREE = "https://api.pdok.nl/bzk/locatieserver/search/v3_1/free"
+LOCATIESERVER_FREE = upstream_url("https://api.pdok.nl/bzk/locatieserver/search/v3_1/free")
 TIMEOUT_S = 8
 
 # "POINT(5.98157932 52.14612744)" — ook met extra spaties of wetenschappelijke notatie.
@@ -53,7 +60,15 @@ def parse_point_ll(waarde: Any) -> Optional[Tuple[float, float]]:
     return lat, lon
 
 
-def zoek_adres(adres: str) -> Optional[Dict[str, Any]]:
+def _zoekterm(adres: str) -> str:
+    return " ".join(str(adres or "").split())
+
+
+def _url(q: str) -> str:
+    return f"{LOCATIESERVER_FREE}?rows=1&q={urllib.parse.quote(q)}"
+
+
+async def zoek_adres_async(adres: str) -> Optional[Dict[str, Any]]:
     """Zoek een Nederlands adres/plaats op.
 
     Args:
@@ -61,21 +76,45 @@ def zoek_adres(adres: str) -> Optional[Dict[str, Any]]:
 
     Returns:
         `{"adres_gevonden": str, "lat": float, "lon": float}` bij een treffer,
-        anders `None` (geen match, lege invoer of een bronfout).
+        anders `None` (geen match, lege invoer of een onbruikbaar antwoord).
+
+    Raises:
+        upstream.BronFout: de Locatieserver is onbereikbaar of de onderbreker staat open.
     """
-    q = " ".join(str(adres or "").split())
+    q = _zoekterm(adres)
     if not q:
         return None
 
-    url = f"{LOCATIESERVER_FREE}?rows=1&q={urllib.parse.quote(q)}"
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT_S)
+    async def _haal() -> List[Any]:
+        with upstream.bewaakt("geocode"):
+            await upstream.wacht_async(url)
+            try:
+                r = await httpklient.get(url, timeout=TIMEOUT_S)
+            except Exception as e:
+                raise (upstream.BronStoring(str(e)) if upstream.is_storing(e) else e) from e
+            if r.status_code >= 500:
+                raise upstream.BronStoring(f"HTTP {r.status_code}")
         r.raise_for_status()
-        docs = ((r.json() or {}).get("response") or {}).get("docs") or []
+        return ((r.json() or {}).get("response") or {}).get("docs") or []
+
+    url = _url(q)
+    try:
+        docs = await upstream.eenmalig_async((url,), _haal)
+    except upstream.BronFout:
+        raise
     except Exception as e:  # netwerk, HTTP-status, JSON — allemaal gewoon "geen match"
         print("[GEOCODE] lookup faalde voor", q, "→", e)
         return None
+    return _treffer(q, docs)
+
+
+def zoek_adres(adres: str) -> Optional[Dict[str, Any]]:
+    """Als `zoek_adres_async`, voor synchrone aanroepers (scripts)."""
+    return httpklient.voer_uit(zoek_adres_async(adres))
+
 
+def _treffer(q: str, docs: List[Any]) -> Optional[Dict[str, Any]]:
+    """De beste match uit de Locatieserver-`docs`, of None."""
     if not docs:
         return None
 
@@ -0,0 +1,70 @@
+"""Gedeelde asynchrone HTTP-client voor de kaartbronnen (PDOK, Locatieserver).
+
+Met `requests.get` hield elke lookup een thread uit de threadpool bezet zolang
+PDOK nadacht, en opende hij zijn eigen verbinding. Hier deelt alles wat op
+dezelfde event loop draait één `httpx.AsyncClient` met een verbindingspool
+(`HTTP_MAX_VERBINDINGEN`): honderden lopende lookups kosten dan geen threads
+meer, alleen wachtende coroutines.
+
+- `klient()`: de client van de lopende event loop (lui aangemaakt);
+- `get(...)`: GET via die client;
+- `sluit()`: de client van de lopende loop sluiten (lifespan-shutdown);
+- `voer_uit(coro)`: een coroutine vanuit synchrone code draaien (PDF-jobthread,
+  scripts); de client van die tijdelijke loop wordt daarna gesloten.
+
+Een client hoort bij één event loop, daarom één per loop (de TestClient en
+`voer_uit` starten elk hun eigen loop).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+import httpx
+
+from ..config import HEADERS, HTTP_MAX_VERBINDINGEN
+
+T = TypeVar("T")
+
+_KLIENTEN: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def klient() -> httpx.AsyncClient:
+    """De client van de lopende event loop."""
+    loop = asyncio.get_running_loop()
+    k = _KLIENTEN.get(loop)
+    if k is None or k.is_closed:
+        k = httpx.AsyncClient(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=httpx.Timeout(12.0),
+            limits=httpx.Limits(max_connections=HTTP_MAX_VERBINDINGEN,
+                                max_keepalive_connections=HTTP_MAX_VERBINDINGEN),
+        )
+        _KLIENTEN[loop] = k
+    return k
+
+
+async def get(url: str, params: Optional[Dict[str, Any]] = None,
+              timeout: float = 10.0) -> httpx.Response:
+    return await klient().get(url, params=params, timeout=timeout)
+
+
+async def sluit() -> None:
+    """De client van de lopende loop sluiten (als die er is)."""
+    k = _KLIENTEN.pop(asyncio.get_running_loop(), None)
+    if k is not None:
+        await k.aclose()
+
+
+def voer_uit(coro: Awaitable[T]) -> T:
+    """`coro` synchroon uitvoeren op een eigen event loop en daarna opruimen."""
+    async def _met_opruimen() -> T:
+        try:
+            return await coro
+        finally:
+            await sluit()
+    return asyncio.run(_met_opruimen())
@@ -0,0 +1,115 @@
+"""JSON-uitvoer voor de grote lijsten (/api/plants, /advies/geo).
+
+Voorheen ging een lijst drie keer volledig door Python: `to_dict(orient=
+"records")`, de recursieve `dataset._clean` (NaN/inf → null) en de
+standaard-encoder van `JSONResponse`. Hier gebeurt het in één gang:
+
+- NaN/inf/NA worden per kolom vervangen door None, niet per cel;
+- rijen gaan met orjson (valt terug op `json` als dat ontbreekt) rechtstreeks
+  uit de kolomlijsten naar bytes;
+- per rij wordt het JSON-fragment bewaard, per datasetversie en kolomselectie.
+  Een volgende response met (deels) dezelfde rijen plakt alleen bytes aan
+  elkaar. De datasetversie komt uit `df.attrs` (gezet door `dataset.get_df`);
+  een dataframe zonder die versie wordt gewoon zonder cache geserialiseerd.
+
+`json_antwoord` bouwt daar de response omheen: de kleine velden gaan via
+`_clean` en de encoder, de lijsten worden als kant-en-klare bytes ingevoegd.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+import pandas as pd
+from fastapi.responses import Response
+
+from . import metrics
+from .dataset import VERSIE_ATTR, _clean
+
+try:  # optioneel: ± 5x sneller dan json.dumps
+    import orjson
+except ImportError:  # pragma: no cover - afhankelijk van de installatie
+    orjson = None
+
+FRAGMENT_SELECTIES_MAX = 8   # (datasetversie, kolommen)-combinaties in de cache
+
+_FRAGMENTEN: "OrderedDict[Tuple[Any, Tuple[str, ...]], Dict[Hashable, bytes]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def dumps(o: Any) -> bytes:
+    """Compacte UTF-8 JSON, gelijk aan wat `JSONResponse` zou schrijven."""
+    if orjson is not None:
+        return orjson.dumps(o, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(o, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def _kolom(s: pd.Series) -> List[Any]:
+    """Waarden van één kolom als Python-objecten, met None voor NaN/inf/NA."""
+    waarden = s.astype(object).where(s.notna(), None).tolist()
+    if s.dtype.kind == "f":
+        waarden = [v if v is None or math.isfinite(v) else None for v in waarden]
+    return waarden
+
+
+def _fragmenten(df: pd.DataFrame, cols: Sequence[str]) -> List[bytes]:
+    """Eén JSON-object (bytes) per rij, zonder cache."""
+    kolommen = [_kolom(df[c]) for c in cols]
+    return [dumps(dict(zip(cols, rij))) for rij in zip(*kolommen)]
+
+
+def records_json(df: pd.DataFrame, cols: Sequence[str]) -> bytes:
+    """`df[cols]` als JSON-array van objecten, zoals `to_dict(orient="records")`."""
+    cols = tuple(cols)
+    versie = df.attrs.get(VERSIE_ATTR)
+    if versie is None or not df.index.is_unique:
+        return b"[" + b",".join(_fragmenten(df, cols)) + b"]"
+
+    sleutel = (versie, cols)
+    with _LOCK:
+        cache = _FRAGMENTEN.get(sleutel)
+        if cache is None:
+            cache = _FRAGMENTEN[sleutel] = {}
+            while len(_FRAGMENTEN) > FRAGMENT_SELECTIES_MAX:
+                _FRAGMENTEN.popitem(last=False)
+        else:
+            _FRAGMENTEN.move_to_end(sleutel)
+
+    labels = df.index.tolist()
+    ontbrekend = [lbl for lbl in labels if lbl not in cache]
+    metrics.cache("json_rij", True, len(labels) - len(ontbrekend))
+    metrics.cache("json_rij", False, len(ontbrekend))
+    if ontbrekend:
+        nieuw = _fragmenten(df.loc[ontbrekend], cols)
+        with _LOCK:
+            cache.update(zip(ontbrekend, nieuw))
+    return b"[" + b",".join([cache[lbl] for lbl in labels]) + b"]"
+
+
+def json_antwoord(payload: Dict[str, Any], status_code: int = 200,
+                  **rauw: bytes) -> Response:
+    """JSON-response voor `payload`; de velden in `rauw` zijn al geserialiseerd.
+
+    De volgorde van de sleutels blijft die van `payload`; een sleutel uit
+    `rauw` die niet in `payload` staat komt achteraan.
+    """
+    delen = []
+    for k, v in payload.items():
+        waarde = rauw[k] if k in rauw else dumps(_clean(v))
+        delen.append(dumps(k) + b":" + waarde)
+    for k, waarde in rauw.items():
+        if k not in payload:
+            delen.append(dumps(k) + b":" + waarde)
+    return Response(content=b"{" + b",".join(delen) + b"}", status_code=status_code,
+                    media_type="application/json")
+
+
+def clear_cache() -> None:
+    """Alle rijfragmenten vergeten (tests, dataset-reload)."""
+    with _LOCK:
+        _FRAGMENTEN.clear()
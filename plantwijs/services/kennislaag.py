@@ -0,0 +1,234 @@
+"""Voorberekende kennislaag: `verrijk_advies` als één opzoekactie.
+
+Alle invoer van de kennislaag komt uit een eindige verzameling kaartklassen:
+de FGR-regio's, de NSN-klassen, de bodemcategorieën, de Gt-codes en de
+GMM-omschrijvingen. Na het matchen tegen content/ blijft daar per blok een
+kleine sleutel van over:
+
+- `landschap`: per categorie het entry-id (context.py);
+- `wortelbare_diepte`: (bodem-token, Gt-label, modifier-index) uit
+  `wortel.invoer`;
+- `aanbevolen_beplanting`: het id-tuple (fgr, nsn, vocht, bodem).
+
+`scripts/bouw_kennislaag.py` loopt alle bereikbare sleutels af en schrijft de
+uitkomsten naar `KENNISLAAG_PAD` (JSON). Elke unieke uitkomst staat daarin
+één keer in een tabel (`dieptes`, `vormen`, `teksten`); per sleutel staan
+alleen indices.
+
+Het bestand hoort bij één contentversie (services/content.py). Wijkt die af,
+ontbreekt het bestand, of staat een sleutel er niet in (bijvoorbeeld een
+Gt-code die de kaart nooit levert), dan geeft `verrijk()` None en rekent
+advies.py alles live uit. De uitkomst is in beide gevallen gelijk; zie
+tests/test_kennislaag.py.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import CONTENT_CONTROLE_S, KENNISLAAG_PAD
+from . import content
+from . import context as ctx
+from . import wortel
+from .bestanden import schrijf_atomair
+
+FORMAAT = 1
+
+# Gt-codes zoals de grondwatertrappenkaart ze levert (zie pdok._gt_pretty): de
+# codes uit de legenda en dezelfde codes in hoofdletters.
+_GT_LEGENDA = ("Ia", "Ib", "IIa", "IIb", "IIc", "IIIa", "IIIb", "IVu", "IVc",
+               "Vao", "Vad", "Vbo", "Vbd", "VIo", "VId", "VIIo", "VIId", "VIIIo", "VIIId")
+
+_CACHE: Dict[str, Any] = {"pad": None, "mtime": None, "data": None,
+                          "gecontroleerd_op": 0.0, "gemeld": None}
+_LOCK = threading.Lock()
+
+
+def _sleutel(*delen: Any) -> str:
+    return "|".join("" if d is None else str(d) for d in delen)
+
+
+class _Uniek:
+    """Tabel van unieke waarden; `index(w)` geeft de plek van w in `lijst`."""
+
+    def __init__(self) -> None:
+        self.lijst: List[Any] = []
+        self._index: Dict[str, int] = {}
+
+    def index(self, waarde: Any) -> int:
+        tekst = json.dumps(waarde, ensure_ascii=False, sort_keys=True)
+        if tekst not in self._index:
+            self._index[tekst] = len(self.lijst)
+            self.lijst.append(waarde)
+        return self._index[tekst]
+
+
+# ───────────────────── bouwen (scripts/bouw_kennislaag.py)
+def bouw() -> Dict[str, Any]:
+    """Alle bereikbare kennislaag-uitkomsten voor de huidige contentversie."""
+    # Pas hier importeren: advies.py leest dit module zelf bij elk advies.
+    from .advies import SCORE_CATEGORIEEN, aanbevolen_beplanting_voor_ids
+
+    data = ctx._data()
+    ids = {cat: [e["id"] for e in data.get(cat) or []] for cat in ctx.CATEGORIEEN}
+    for cat, lijst in ids.items():
+        if ctx.zoek(cat, None) is None:
+            lijst.append(None)   # zonder fallback-entry kan een waarde ook niets matchen
+
+    landschap = {cat: {_sleutel(eid): ctx.beschrijf_entry(ctx.entry_by_id(cat, eid))
+                       for eid in lijst} for cat, lijst in ids.items()}
+
+    tabel = wortel._tabel()
+    gt_labels = [""] + list(dict.fromkeys(
+        [g for g in _GT_LEGENDA] + [g.upper() for g in _GT_LEGENDA]))
+    dieptes = _Uniek()
+    wortels: Dict[str, Optional[int]] = {}
+    for bodem_t in tabel.tokens["bodem"] + [None]:
+        for gt_label in gt_labels:
+            gt_t = wortel.gt_token(gt_label)
+            for mod_i in [None] + list(range(len(tabel.modifiers))):
+                diepte = wortel.uit_invoer(bodem_t, gt_t, gt_label, mod_i)
+                wortels[_sleutel(bodem_t, gt_label, mod_i)] = \
+                    dieptes.index(diepte) if diepte else None
+
+    # Een advies is een vaste vorm plus een plekafhankelijke `waarom_hier`.
+    vormen, teksten, adviezen = _Uniek(), _Uniek(), _Uniek()
+    beplanting: Dict[str, List[int]] = {}
+
+    def _combinaties(i: int, gekozen: Dict[str, Optional[str]]):
+        if i == len(SCORE_CATEGORIEEN):
+            yield dict(gekozen)
+            return
+        cat = SCORE_CATEGORIEEN[i]
+        for eid in ids.get(cat) or [None]:
+            gekozen[cat] = eid
+            yield from _combinaties(i + 1, gekozen)
+
+    for combinatie in _combinaties(0, {}):
+        lijst = []
+        for a in aanbevolen_beplanting_voor_ids(combinatie):
+            vast = {k: v for k, v in a.items() if k != "waarom_hier"}
+            lijst.append(adviezen.index(
+                [vormen.index(vast), teksten.index(a["waarom_hier"])]))
+        beplanting[_sleutel(*(combinatie[c] for c in SCORE_CATEGORIEEN))] = lijst
+
+    return {
+        "formaat": FORMAAT,
+        "versie": content.versie(),
+        "gebouwd_op": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "landschap": landschap,
+        "dieptes": dieptes.lijst,
+        "wortel": wortels,
+        "vormen": vormen.lijst,
+        "teksten": teksten.lijst,
+        "adviezen": adviezen.lijst,
+        "beplanting": beplanting,
+    }
+
+
+def schrijf(pad: Optional[str] = None) -> Dict[str, Any]:
+    """`bouw()` naar schijf (atomair); geeft het geschreven artefact terug."""
+    pad = pad or KENNISLAAG_PAD
+    laag = bouw()
+    schrijf_atomair(pad, json.dumps(laag, ensure_ascii=False, separators=(",", ":")))
+    return laag
+
+
+# ───────────────────── lezen (runtime)
+def _laad(pad: str) -> Optional[Dict[str, Any]]:
+    try:
+        mtime: Optional[float] = os.path.getmtime(pad)
+    except OSError:
+        mtime = None
+    if _CACHE["pad"] == pad and _CACHE["mtime"] == mtime:
+        return _CACHE["data"]
+    if mtime is None:
+        data = None
+    else:
+        try:
+            with open(pad, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:  # kapot artefact: dan maar live
+            print(f"[KENNISLAAG] {pad} onleesbaar:", e)
+            data = None
+    _CACHE.update({"pad": pad, "mtime": mtime, "data": data})
+    return data
+
+
+def _artefact() -> Optional[Dict[str, Any]]:
+    """Het artefact als het bij de huidige contentversie hoort, anders None."""
+    pad = KENNISLAAG_PAD
+    nu = time.monotonic()
+    if _CACHE["pad"] != pad or nu - _CACHE["gecontroleerd_op"] >= CONTENT_CONTROLE_S:
+        with _LOCK:
+            _laad(pad)
+            _CACHE["gecontroleerd_op"] = nu
+    laag = _CACHE["data"] if _CACHE["pad"] == pad else None
+    if not laag:
+        return None
+    versie = content.versie()
+    if laag.get("formaat") != FORMAAT or laag.get("versie") != versie:
+        if _CACHE["gemeld"] != (pad, versie):
+            _CACHE["gemeld"] = (pad, versie)
+            print(f"[KENNISLAAG] {os.path.basename(pad)} hoort bij contentversie "
+                  f"{laag.get('versie')}, niet bij {versie}; live uitrekenen")
+        return None
+    return laag
+
+
+def verrijk(fgr: Any = None, nsn: Any = None, gmm: Any = None, bodem: Any = None,
+            vocht: Any = None, gt_code: Any = None) -> Optional[Dict[str, Any]]:
+    """Zelfde uitvoer als `advies.verrijk_advies`, uit het artefact; None als dat niet kan."""
+    laag = _artefact()
+    if laag is None:
+        return None
+    waarden = {"fgr": fgr, "nsn": nsn, "gmm": gmm, "bodem": bodem, "vocht": vocht}
+    ids = {cat: ctx.entry_id(cat, waarden.get(cat)) for cat in ctx.CATEGORIEEN}
+
+    landschap: Dict[str, Optional[dict]] = {}
+    for cat in ctx.CATEGORIEEN:
+        per_cat = laag["landschap"].get(cat) or {}
+        sleutel = _sleutel(ids[cat])
+        if sleutel not in per_cat:
+            return None
+        verhaal = per_cat[sleutel]
+        landschap[cat] = dict(verhaal, versterken=list(verhaal["versterken"])) if verhaal else None
+
+    bodem_t, _gt_t, gt_label, mod_i = wortel.invoer(bodem=bodem, gt_code=gt_code, nsn=nsn)
+    sleutel = _sleutel(bodem_t, gt_label, mod_i)
+    if sleutel not in laag["wortel"]:
+        return None
+    diepte_i = laag["wortel"][sleutel]
+
+    sleutel = _sleutel(ids["fgr"], ids["nsn"], ids["bodem"], ids["vocht"])
+    lijst = laag["beplanting"].get(sleutel)
+    if lijst is None:
+        return None
+    vormen, teksten = laag["vormen"], laag["teksten"]
+    adviezen = []
+    for i in lijst:
+        vorm_i, tekst_i = laag["adviezen"][i]
+        vast = vormen[vorm_i]
+        adviezen.append({
+            "vorm": vast["vorm"],
+            "omschrijving": vast["omschrijving"],
+            "waarom_hier": teksten[tekst_i],
+            "voorbeeldsoorten": list(vast["voorbeeldsoorten"]),
+        })
+
+    return {
+        "landschap": landschap,
+        "wortelbare_diepte": dict(laag["dieptes"][diepte_i]) if diepte_i is not None else None,
+        "aanbevolen_beplanting": adviezen,
+    }
+
+
+def clear_cache() -> None:
+    """Het geladen artefact vergeten (tests)."""
+    with _LOCK:
+        _CACHE.update({"pad": None, "mtime": None, "data": None,
+                       "gecontroleerd_op": 0.0, "gemeld": None})
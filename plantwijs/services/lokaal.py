@@ -0,0 +1,266 @@
+"""Lokale kaartdata: Gt/GHG/GLG en AHN als raster, bodem en GMM als polygonen.
+
+Zonder deze bestanden kost elke klik per bron één of meer WMS GetFeatureInfo-
+rondes naar PDOK; bulk- en batchwerk wordt daardoor begrensd door het netwerk.
+Met `scripts/bouw_lokale_data.py` worden de kaarten één keer (offline) omgezet
+naar bestanden in `LOKAAL_DIR`:
+
+- rasters (`gt`, `ghg`, `glg`, `ahn`): `<naam>.npy` + `<naam>.json`. Een
+  NumPy-array in RD (EPSG:28992) met `x0`/`y0` (linkerbovenhoek), `cel`
+  (meter) en `nodata`. De array wordt geopend met `mmap_mode="r"`: het
+  besturingssysteem leest alleen de pagina's die echt worden opgevraagd, dus
+  ook een landelijk 25 m-raster kost bijna geen geheugen;
+- polygonen (`bodem`, `gmm`): `<naam>.sqlite` met een R-tree op de bbox, net
+  als de NSN-index (services/nsn.py), plus de oorspronkelijke properties per
+  vlak. De uitleesregels in services/pdok.py werken daardoor ongewijzigd.
+
+Een lookup geeft de waarde, `None` (binnen de kaart maar geen waarde: water,
+bebouwing) of `BUITEN` (buiten het bereik van het bestand, of geen bestand).
+Alleen bij `BUITEN` vraagt services/pdok.py het nog via WMS op.
+
+De bestanden worden één keer per proces geopend; na het opnieuw bouwen is een
+herstart (of `clear_cache()`) nodig.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from ..config import LOKAAL_DIR, TX_WGS84_RD
+from .nsn import _point_in_polygon
+
+RASTERS = ("gt", "ghg", "glg", "ahn")
+POLYGONEN = ("bodem", "gmm")
+
+
+class _Buiten:
+    def __repr__(self) -> str:
+        return "BUITEN"
+
+
+BUITEN: Any = _Buiten()   # punt valt buiten de lokale data: via WMS opvragen
+
+_CACHE: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+def _pad(naam: str, ext: str) -> str:
+    return os.path.join(LOKAAL_DIR, f"{naam}{ext}")
+
+
+def _rd(lat: float, lon: float) -> Tuple[float, float]:
+    return TX_WGS84_RD.transform(lon, lat)
+
+
+# ───────────────────── rasters
+class Raster:
+    """Een memory-mapped raster in RD met de linkerbovenhoek op (x0, y0)."""
+
+    def __init__(self, data: np.ndarray, meta: Dict[str, Any]):
+        self.data = data
+        self.x0 = float(meta["x0"])
+        self.y0 = float(meta["y0"])
+        self.cel = float(meta["cel"])
+        self.nodata = meta.get("nodata")
+        self.meta = meta
+
+    @classmethod
+    def open(cls, naam: str) -> Optional["Raster"]:
+        try:
+            with open(_pad(naam, ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return cls(np.load(_pad(naam, ".npy"), mmap_mode="r"), meta)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"[LOKAAL] raster {naam} onbruikbaar:", e)
+            return None
+
+    def waarde(self, x: float, y: float) -> Union[float, None, _Buiten]:
+        kolom = int((x - self.x0) // self.cel)
+        rij = int((self.y0 - y) // self.cel)
+        if not (0 <= rij < self.data.shape[0] and 0 <= kolom < self.data.shape[1]):
+            return BUITEN
+        v = self.data[rij, kolom]
+        if (self.nodata is not None and v == self.nodata) or v != v:   # v != v: NaN
+            return None
+        return float(v)
+
+
+# ───────────────────── polygonen
+class Polygonen:
+    """Vlakken met properties in SQLite, gevonden via een R-tree op de bbox."""
+
+    def __init__(self, pad: str):
+        self.pad = pad
+        self._lokaal = threading.local()
+        con = self._con()
+        rij = con.execute("SELECT value FROM meta WHERE key='bbox'").fetchone()
+        self.bbox: Tuple[float, float, float, float] = tuple(json.loads(rij[0])) if rij else \
+            (float("-inf"), float("-inf"), float("inf"), float("inf"))
+
+    @classmethod
+    def open(cls, naam: str, pad: Optional[str] = None) -> Optional["Polygonen"]:
+        """`<naam>.sqlite` in `LOKAAL_DIR` (of `pad`); None als het er niet (goed) is."""
+        pad = pad or _pad(naam, ".sqlite")
+        if not os.path.exists(pad):
+            return None
+        try:
+            return cls(pad)
+        except sqlite3.Error as e:
+            print(f"[LOKAAL] polygonen {naam} onbruikbaar:", e)
+            return None
+
+    def _con(self) -> sqlite3.Connection:
+        """Eén alleen-lezen verbinding per thread."""
+        con = getattr(self._lokaal, "con", None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.pad}?mode=ro", uri=True, check_same_thread=False)
+            self._lokaal.con = con
+        return con
+
+    def props(self, x: float, y: float) -> Union[dict, None, _Buiten]:
+        minx, miny, maxx, maxy = self.bbox
+        if not (minx <= x <= maxx and miny <= y <= maxy):
+            return BUITEN
+        rijen = self._con().execute(
+            "SELECT f.props, f.geom FROM rtree r JOIN feats f ON f.id=r.id "
+            "WHERE r.minx<=? AND r.maxx>=? AND r.miny<=? AND r.maxy>=? "
+            "ORDER BY f.bbox_area ASC LIMIT 80",
+            (x, x, y, y),
+        ).fetchall()
+        for props, geom in rijen:
+            if _in_geometrie(x, y, json.loads(zlib.decompress(geom))):
+                return json.loads(props)
+        return None
+
+
+def _in_geometrie(x: float, y: float, geom: Dict[str, Any]) -> bool:
+    def _in_vlak(ringen) -> bool:
+        if not ringen or not _point_in_polygon(x, y, ringen[0]):
+            return False
+        return not any(gat and _point_in_polygon(x, y, gat) for gat in ringen[1:])
+
+    if geom.get("type") == "Polygon":
+        return _in_vlak(geom.get("coordinates"))
+    if geom.get("type") == "MultiPolygon":
+        return any(_in_vlak(vlak) for vlak in geom.get("coordinates") or [])
+    return False
+
+
+# ───────────────────── publiek
+def _bron(naam: str) -> Optional[Union[Raster, Polygonen]]:
+    if naam in _CACHE:
+        return _CACHE[naam]
+    with _LOCK:
+        if naam not in _CACHE:
+            bron = Raster.open(naam) if naam in RASTERS else Polygonen.open(naam)
+            if bron is not None:
+                print(f"[LOKAAL] {naam}: lokale data in gebruik")
+            _CACHE[naam] = bron
+        return _CACHE[naam]
+
+
+def waarde(naam: str, lat: float, lon: float) -> Union[float, None, _Buiten]:
+    """Rasterwaarde op een punt; `BUITEN` als er geen lokale data voor is."""
+    raster = _bron(naam)
+    if raster is None:
+        return BUITEN
+    return raster.waarde(*_rd(lat, lon))
+
+
+def props(naam: str, lat: float, lon: float) -> Union[dict, None, _Buiten]:
+    """Properties van het vlak op een punt; `BUITEN` als er geen lokale data voor is."""
+    vlakken = _bron(naam)
+    if vlakken is None:
+        return BUITEN
+    try:
+        return vlakken.props(*_rd(lat, lon))
+    except sqlite3.Error as e:
+        print(f"[LOKAAL] {naam} lookup fout:", e)
+        return BUITEN
+
+
+def status() -> Dict[str, str]:
+    """Per bron 'lokaal' of 'wms' (voor /api/health)."""
+    return {naam: ("lokaal" if _bron(naam) is not None else "wms") for naam in RASTERS + POLYGONEN}
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
+
+
+# ───────────────────── bouwen (scripts/bouw_lokale_data.py)
+def schrijf_raster(naam: str, data: np.ndarray, x0: float, y0: float, cel: float,
+                   nodata: Optional[float] = None, bron: str = "") -> str:
+    """Raster `naam` in RD wegschrijven; (x0, y0) is de linkerbovenhoek."""
+    os.makedirs(LOKAAL_DIR, exist_ok=True)
+    tmp = _pad(naam, f".{os.getpid()}.tmp.npy")
+    np.save(tmp, np.ascontiguousarray(data))
+    os.replace(tmp, _pad(naam, ".npy"))
+    meta = {"x0": x0, "y0": y0, "cel": cel, "nodata": nodata, "crs": "EPSG:28992",
+            "shape": list(data.shape), "dtype": str(data.dtype), "bron": bron,
+            "gebouwd_op": int(time.time())}
+    with open(_pad(naam, ".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    return _pad(naam, ".npy")
+
+
+def _bbox(geom: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    vlakken = [geom.get("coordinates") or []] if geom.get("type") == "Polygon" else \
+        geom.get("coordinates") or [] if geom.get("type") == "MultiPolygon" else []
+    xs = [p[0] for vlak in vlakken for ring in vlak for p in ring]
+    ys = [p[1] for vlak in vlakken for ring in vlak for p in ring]
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def schrijf_polygonen(naam: str, features: Iterable[Dict[str, Any]], bron: str = "",
+                      pad: Optional[str] = None) -> Tuple[str, int]:
+    """GeoJSON-features (coördinaten in RD) naar `<naam>.sqlite` (of `pad`) met R-tree."""
+    pad = pad or _pad(naam, ".sqlite")
+    os.makedirs(os.path.dirname(os.path.abspath(pad)), exist_ok=True)
+    tmp = f"{pad}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = sqlite3.connect(tmp)
+    n = 0
+    totaal = [float("inf"), float("inf"), float("-inf"), float("-inf")]
+    try:
+        con.execute("CREATE TABLE meta(key TEXT PRIMARY KEY, value TEXT);")
+        con.execute("CREATE TABLE feats(id INTEGER PRIMARY KEY, props TEXT, geom BLOB, bbox_area REAL);")
+        con.execute("CREATE VIRTUAL TABLE rtree USING rtree(id, minx, maxx, miny, maxy);")
+        for ft in features:
+            geom = (ft or {}).get("geometry") or {}
+            bb = _bbox(geom)
+            if bb is None:
+                continue
+            minx, miny, maxx, maxy = bb
+            blob = zlib.compress(json.dumps(
+                {"type": geom["type"], "coordinates": geom["coordinates"]},
+                separators=(",", ":")).encode("utf-8"))
+            cur = con.execute("INSERT INTO feats(props, geom, bbox_area) VALUES (?,?,?)",
+                              (json.dumps(ft.get("properties") or {}, ensure_ascii=False),
+                               sqlite3.Binary(blob), (maxx - minx) * (maxy - miny)))
+            con.execute("INSERT INTO rtree(id, minx, maxx, miny, maxy) VALUES (?,?,?,?,?)",
+                        (cur.lastrowid, minx, maxx, miny, maxy))
+            totaal = [min(totaal[0], minx), min(totaal[1], miny),
+                      max(totaal[2], maxx), max(totaal[3], maxy)]
+            n += 1
+        con.execute("INSERT INTO meta(key, value) VALUES ('bbox', ?)", (json.dumps(totaal),))
+        con.execute("INSERT INTO meta(key, value) VALUES ('bron', ?)", (bron,))
+        con.execute("INSERT INTO meta(key, value) VALUES ('gebouwd_op', ?)", (str(int(time.time())),))
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, pad)
+    return pad, n
@@ -0,0 +1,222 @@
+"""Metrics in het Prometheus-tekstformaat (/api/metrics), zonder externe dienst.
+
+Een klein register in het eigen proces, alleen standaardbibliotheek:
+
+- `teller(naam, hulp, labels)` → `Teller.inc(n, **labels)` (counter);
+- `histogram(naam, hulp, labels, grenzen)` → `Histogram.observe(s, **labels)`
+  met vaste vakgrenzen in seconden;
+- `verzamelaar(fn)` voor waarden die elders al worden bijgehouden (upstream-
+  tellers, stroomonderbrekers, datasetgrootte): `fn()` levert bij elke scrape
+  families als `(naam, soort, hulp, [(labels, waarde), ...])`.
+
+De modules die meten maken hun metrieken zelf aan bij het importeren; een
+tweede aanroep met dezelfde naam geeft dezelfde metriek terug. Labelwaarden
+moeten begrensd blijven (routesjablonen, bronnamen, geen vrije invoer).
+
+Elke worker heeft zijn eigen register: met meer uvicorn-workers ziet een scrape
+alleen de worker die de request afhandelt.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# vakgrenzen in seconden: van een lokale lookup (ms) tot een trage WMS (10 s)
+DUUR_GRENZEN_S: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                                     1.0, 2.5, 5.0, 10.0)
+
+Familie = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+_REGISTER: Dict[str, "_Metriek"] = {}
+_VERZAMELAARS: List[Callable[[], Iterable[Familie]]] = []
+_LOCK = threading.Lock()
+
+
+class _Metriek:
+    soort = ""
+
+    def __init__(self, naam: str, hulp: str, labels: Sequence[str] = ()):
+        self.naam = naam
+        self.hulp = hulp
+        self.labels = tuple(labels)
+        self._waarden: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _sleutel(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(naam, "")) for naam in self.labels)
+
+    def _labels(self, sleutel: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labels, sleutel))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waarden.clear()
+
+
+class Teller(_Metriek):
+    soort = "counter"
+
+    def inc(self, n: float = 1.0, **labels: Any) -> None:
+        sleutel = self._sleutel(labels)
+        with self._lock:
+            self._waarden[sleutel] = self._waarden.get(sleutel, 0.0) + n
+
+    def waarde(self, **labels: Any) -> float:
+        with self._lock:
+            return self._waarden.get(self._sleutel(labels), 0.0)
+
+    def regels(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._waarden.items())
+        return [f"{self.naam}{_labeltekst(self._labels(s))} {_getal(v)}" for s, v in items]
+
+
+class Histogram(_Metriek):
+    soort = "histogram"
+
+    def __init__(self, naam: str, hulp: str, labels: Sequence[str] = (),
+                 grenzen: Sequence[float] = DUUR_GRENZEN_S):
+        super().__init__(naam, hulp, labels)
+        self.grenzen = tuple(grenzen)
+
+    def observe(self, waarde: float, **labels: Any) -> None:
+        sleutel = self._sleutel(labels)
+        with self._lock:
+            rij = self._waarden.get(sleutel)
+            if rij is None:
+                rij = self._waarden[sleutel] = [[0] * len(self.grenzen), 0, 0.0]
+            rij[1] += 1
+            rij[2] += waarde
+            for i, grens in enumerate(self.grenzen):
+                if waarde <= grens:
+                    rij[0][i] += 1
+                    break
+
+    @contextmanager
+    def tijd(self, **labels: Any) -> Iterator[None]:
+        """Meet de duur van het blok (ook als het een exception gooit)."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t, **labels)
+
+    def monsters(self) -> List[Tuple[Dict[str, str], List[int], int, float]]:
+        """Per labelcombinatie: (labels, cumulatieve vakken, aantal, som)."""
+        with self._lock:
+            items = sorted((s, list(r[0]), r[1], r[2]) for s, r in self._waarden.items())
+        uit = []
+        for sleutel, vakken, aantal, som in items:
+            cumulatief, tot = [], 0
+            for n in vakken:
+                tot += n
+                cumulatief.append(tot)
+            uit.append((self._labels(sleutel), cumulatief, aantal, som))
+        return uit
+
+    def kwantiel(self, cumulatief: List[int], aantal: int, q: float) -> Optional[float]:
+        """Bovengrens van het vak waarin kwantiel `q` valt (None: boven de hoogste grens)."""
+        for grens, tot in zip(self.grenzen, cumulatief):
+            if tot >= q * aantal:
+                return grens
+        return None
+
+    def regels(self) -> List[str]:
+        uit = []
+        for labels, cumulatief, aantal, som in self.monsters():
+            for grens, tot in zip(self.grenzen, cumulatief):
+                uit.append(f"{self.naam}_bucket{_labeltekst(dict(labels, le=_getal(grens)))} {tot}")
+            uit.append(f"{self.naam}_bucket{_labeltekst(dict(labels, le='+Inf'))} {aantal}")
+            uit.append(f"{self.naam}_sum{_labeltekst(labels)} {_getal(som)}")
+            uit.append(f"{self.naam}_count{_labeltekst(labels)} {aantal}")
+        return uit
+
+
+def _registreer(cls: type, naam: str, *args: Any, **kwargs: Any) -> Any:
+    with _LOCK:
+        metriek = _REGISTER.get(naam)
+        if metriek is None:
+            metriek = _REGISTER[naam] = cls(naam, *args, **kwargs)
+        return metriek
+
+
+def teller(naam: str, hulp: str, labels: Sequence[str] = ()) -> Teller:
+    return _registreer(Teller, naam, hulp, labels)
+
+
+def histogram(naam: str, hulp: str, labels: Sequence[str] = (),
+              grenzen: Sequence[float] = DUUR_GRENZEN_S) -> Histogram:
+    return _registreer(Histogram, naam, hulp, labels, grenzen)
+
+
+def verzamelaar(fn: Callable[[], Iterable[Familie]]) -> Callable[[], Iterable[Familie]]:
+    """`fn` bij elke scrape aanroepen (ook bruikbaar als decorator)."""
+    with _LOCK:
+        if fn not in _VERZAMELAARS:
+            _VERZAMELAARS.append(fn)
+    return fn
+
+
+def cache(naam: str, hit: bool, n: int = 1) -> None:
+    """Eén (of `n`) opvraging(en) van cache `naam` tellen als hit of miss."""
+    if n:
+        CACHE.inc(n, cache=naam, uitslag="hit" if hit else "miss")
+
+
+# ───────────────────── tekstformaat
+def _getal(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if v != v:
+        return "NaN"
+    return repr(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _labeltekst(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    delen = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        delen.append(f'{k}="{v}"')
+    return "{" + ",".join(delen) + "}"
+
+
+def _kop(naam: str, soort: str, hulp: str) -> List[str]:
+    return [f"# HELP {naam} {hulp}", f"# TYPE {naam} {soort}"]
+
+
+def tekst() -> str:
+    """Alle metrieken in het Prometheus-tekstformaat (versie 0.0.4)."""
+    with _LOCK:
+        metrieken = list(_REGISTER.values())
+        verzamelaars = list(_VERZAMELAARS)
+    regels: List[str] = []
+    for m in metrieken:
+        regels += _kop(m.naam, m.soort, m.hulp) + m.regels()
+    for fn in verzamelaars:
+        try:
+            families = list(fn())
+        except Exception as e:   # één kapotte verzamelaar mag de scrape niet slopen
+            print("[METRICS] verzamelaar faalde:", e)
+            continue
+        for naam, soort, hulp, monsters in families:
+            regels += _kop(naam, soort, hulp)
+            regels += [f"{naam}{_labeltekst(labels)} {_getal(float(v))}" for labels, v in monsters]
+    return "\n".join(regels) + "\n"
+
+
+def reset() -> None:
+    """Alle waarden op nul (tests); de metrieken zelf blijven geregistreerd."""
+    with _LOCK:
+        metrieken = list(_REGISTER.values())
+    for m in metrieken:
+        m.reset()
+
+
+CACHE = teller("plantwijs_cache_requests_total",
+               "Opvragingen per cache, als hit of miss.", ("cache", "uitslag"))
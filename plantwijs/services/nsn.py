@@ -28,6 +28,7 @@ from ..config import (
     NSN_ZIP_PATH,
     TX_WGS84_RD,
 )
+from . import metrics
 
 # NSN bron-resolutie (geen full in-memory cache; Render 512MB)
 _NSN_SOURCE: Optional[Tuple[str, str, Optional[str]]] = None  # ("geojson"|"zip"|"missing", path, membername)
@@ -442,13 +443,25 @@ def _nsn_lookup_index(px: float, py: float) -> Optional[str]:
     return None
 
 
+_LOOKUP_DUUR = metrics.histogram("plantwijs_nsn_lookup_duration_seconds",
+                                 "Duur van een NSN-lookup (index, of zonder index een scan).")
+
+
 def nsn_from_point(lat: float, lon: float) -> Optional[str]:
     """Bepaal NSN (Natuurlijk Systeem Nederland) op basis van een klikpunt.
 
     Snelheid:
       - primair via on-disk RTree index (SQLite in /tmp) → snelle lookups
       - fallback: stream-scan (alleen als index niet kan worden gebouwd)
+
+    De duur van elke lookup komt in /api/metrics.
     """
+    with _LOOKUP_DUUR.tijd():
+        return _nsn_from_point(lat, lon)
+
+
+def _nsn_from_point(lat: float, lon: float) -> Optional[str]:
+    """De lookup zelf, zonder tijdmeting (zie `nsn_from_point`)."""
     kind, _, _ = _resolve_nsn_source()
     if kind == "missing":
         return None
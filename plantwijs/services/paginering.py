@@ -0,0 +1,105 @@
+"""Veldselectie en paginering voor de soortenlijsten (/api/plants, /advies/geo).
+
+- `fields`: alleen deze kolommen per rij (komma-gescheiden of herhaald);
+  onbekende velden ⇒ `OngeldigVerzoek` (400).
+- `limit` / `offset`: een pagina uit de (stabiel gesorteerde) selectie.
+- `cursor`: het vervolg van een eerdere pagina. De cursor is een opaak token
+  met de offset, de datasetversie en een hash van de filters; hoort hij bij
+  een andere query of een andere dataset, dan volgt ook een 400 in plaats van
+  een stilletjes verschoven lijst.
+
+Zonder `limit`, `offset` en `cursor` blijft alles zoals het was: de hele
+selectie, met `next_cursor: null`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .dataset import VERSIE_ATTR
+
+# Parameters die de pagina bepalen en dus niet in de query-hash horen.
+PAGINA_PARAMS = ("limit", "offset", "cursor", "fields")
+
+
+class OngeldigVerzoek(ValueError):
+    """Onbekend veld of ongeldige cursor; `code` is de foutcode voor de API."""
+
+    def __init__(self, code: str, detail: str):
+        super().__init__(detail)
+        self.code = code
+        self.detail = detail
+
+    def als_json(self) -> dict:
+        return {"error": self.code, "detail": self.detail}
+
+
+def velden(gevraagd: Iterable[str], beschikbaar: Sequence[str]) -> List[str]:
+    """De gevraagde velden in opgegeven volgorde, of alle beschikbare als er niets gevraagd is."""
+    namen: List[str] = []
+    for waarde in gevraagd or []:
+        for naam in str(waarde or "").split(","):
+            naam = naam.strip()
+            if naam and naam not in namen:
+                namen.append(naam)
+    if not namen:
+        return list(beschikbaar)
+    onbekend = [n for n in namen if n not in beschikbaar]
+    if onbekend:
+        raise OngeldigVerzoek(
+            "onbekend_veld",
+            f"onbekende velden: {', '.join(onbekend)}; kies uit {', '.join(beschikbaar)}")
+    return namen
+
+
+def query_hash(items: Iterable[Tuple[str, str]]) -> str:
+    """Korte hash van de query-parameters die de selectie en volgorde bepalen."""
+    relevant = sorted((k, v) for k, v in items if k not in PAGINA_PARAMS)
+    return hashlib.sha1(json.dumps(relevant).encode("utf-8")).hexdigest()[:12]
+
+
+def _versie(df: pd.DataFrame) -> str:
+    return hashlib.sha1(repr(df.attrs.get(VERSIE_ATTR)).encode("utf-8")).hexdigest()[:12]
+
+
+def _maak_cursor(offset: int, versie: str, qhash: str) -> str:
+    ruw = json.dumps({"o": offset, "v": versie, "q": qhash}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(ruw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _lees_cursor(cursor: str, versie: str, qhash: str) -> int:
+    try:
+        ruw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(ruw.decode("utf-8"))
+        offset = int(data["o"])
+    except Exception:
+        raise OngeldigVerzoek("ongeldige_cursor", "cursor is onleesbaar") from None
+    if offset < 0:
+        raise OngeldigVerzoek("ongeldige_cursor", "cursor is onleesbaar")
+    if data.get("q") != qhash:
+        raise OngeldigVerzoek("ongeldige_cursor", "cursor hoort bij een andere zoekopdracht")
+    if data.get("v") != versie:
+        raise OngeldigVerzoek("ongeldige_cursor",
+                              "de dataset is sindsdien bijgewerkt; begin opnieuw zonder cursor")
+    return offset
+
+
+def pagina(df: pd.DataFrame, limit: Optional[int], offset: int = 0,
+           cursor: Optional[str] = None, qhash: str = "") -> Tuple[pd.DataFrame, Optional[str]]:
+    """(rijen van deze pagina, cursor voor de volgende of None).
+
+    Een cursor wint van `offset`. Zonder `limit` loopt de pagina tot het eind.
+    """
+    versie = _versie(df)
+    if cursor:
+        offset = _lees_cursor(cursor, versie, qhash)
+    offset = max(0, int(offset or 0))
+    einde = len(df) if limit is None else min(len(df), offset + max(0, int(limit)))
+    deel = df.iloc[offset:einde]
+    volgende = _maak_cursor(einde, versie, qhash) if einde < len(df) else None
+    return deel, volgende
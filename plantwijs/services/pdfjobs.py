@@ -0,0 +1,193 @@
+"""Asynchrone PDF-jobs: aanvragen, status opvragen, downloaden.
+
+Een koud rapport duurt seconden (alle PDOK-lookups, de kaart, de opmaak). Via
+`POST /advies/pdf/jobs` hoeft de browser daar geen verbinding voor open te
+houden: de aanvraag krijgt meteen een job-id, en de PDF staat na afloop klaar
+op een download-URL.
+
+- Jobs gaan in een begrensde wachtrij in het eigen proces; `JOB_THREADS`
+  threads werken die af via `report.maak_rapport`, met het opmaken in de
+  procespool (services/pdfpool.py).
+- Dezelfde aanvraag (plek op 5 decimalen + filters) levert zolang de job leeft
+  hetzelfde job-id op: tien klikken op de knop geven één rapport.
+- Resultaten worden `JOB_TTL_S` seconden bewaard, met maximaal `JOB_MAX`
+  jobs tegelijk; de oudste afgeronde jobs vallen er als eerste uit.
+"""
+
+from __future__ import annotations
+
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from . import pdfpool
+from .report import KAART_DECIMALEN, maak_rapport
+
+JOB_THREADS = 1
+JOB_WACHTRIJ = 16       # wachtende jobs; daarboven weigert de API (429)
+JOB_MAX = 64            # jobs in het geheugen (± 8 MB aan PDF's)
+JOB_TTL_S = 15 * 60     # zo lang blijft een job (en zijn PDF) opvraagbaar
+JOB_POOL_GEDULD_S = 120  # zo lang wacht een job op een plek in de procespool
+
+WACHTEND, BEZIG, KLAAR, FOUT = "wachtend", "bezig", "klaar", "fout"
+
+
+class JobWachtrijVol(Exception):
+    """Er staan al `JOB_WACHTRIJ` jobs te wachten."""
+
+
+_JOBS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_PER_SLEUTEL: Dict[Tuple[Any, ...], str] = {}
+_WACHTRIJ: "queue.Queue[Optional[str]]" = queue.Queue()
+_LOCK = threading.Lock()
+_THREADS: list = []
+
+
+def _sleutel(lat: float, lon: float, filters: Dict[str, Any]) -> Tuple[Any, ...]:
+    genormaliseerd = tuple(sorted(
+        (k, tuple(v) if isinstance(v, (list, tuple)) else v) for k, v in filters.items()))
+    return (round(float(lat), KAART_DECIMALEN), round(float(lon), KAART_DECIMALEN),
+            genormaliseerd)
+
+
+def _opruimen(nu: float) -> None:
+    """Verlopen jobs weg, en afgeronde jobs zolang er te veel zijn (onder _LOCK)."""
+    for job_id in [j for j, job in _JOBS.items()
+                   if job["status"] in (KLAAR, FOUT) and nu - job["klaar_op"] > JOB_TTL_S]:
+        _vergeet(job_id)
+    while len(_JOBS) > JOB_MAX:
+        oudste = next((j for j, job in _JOBS.items() if job["status"] in (KLAAR, FOUT)), None)
+        if oudste is None:
+            break
+        _vergeet(oudste)
+
+
+def _vergeet(job_id: str) -> None:
+    job = _JOBS.pop(job_id, None)
+    if job is not None and _PER_SLEUTEL.get(job["sleutel"]) == job_id:
+        del _PER_SLEUTEL[job["sleutel"]]
+
+
+def _start_threads() -> None:
+    """Job-threads lui starten (onder _LOCK)."""
+    _THREADS[:] = [t for t in _THREADS if t.is_alive()]
+    while len(_THREADS) < JOB_THREADS:
+        t = threading.Thread(target=_werk, name=f"pdf-job-{len(_THREADS)}", daemon=True)
+        t.start()
+        _THREADS.append(t)
+
+
+def nieuw(lat: float, lon: float, **filters: Any) -> Dict[str, Any]:
+    """Job aanmaken (of de lopende/afgeronde job voor dezelfde aanvraag teruggeven).
+
+    Raises:
+        JobWachtrijVol: er staan al te veel jobs te wachten.
+    """
+    sleutel = _sleutel(lat, lon, filters)
+    nu = time.time()
+    with _LOCK:
+        _opruimen(nu)
+        bestaand = _PER_SLEUTEL.get(sleutel)
+        if bestaand is not None and _JOBS[bestaand]["status"] != FOUT:
+            return _status(_JOBS[bestaand])
+        if _WACHTRIJ.qsize() >= JOB_WACHTRIJ:
+            raise JobWachtrijVol(f"{JOB_WACHTRIJ} jobs in de wachtrij")
+
+        job_id = secrets.token_urlsafe(12)
+        _JOBS[job_id] = {
+            "id": job_id, "status": WACHTEND, "sleutel": sleutel,
+            "lat": lat, "lon": lon, "filters": dict(filters),
+            "aangemaakt": nu, "klaar_op": None, "pdf": None, "fout": None,
+        }
+        _PER_SLEUTEL[sleutel] = job_id
+        _WACHTRIJ.put(job_id)
+        _start_threads()
+        return _status(_JOBS[job_id])
+
+
+def status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Publieke status van een job, of None als die onbekend of verlopen is."""
+    with _LOCK:
+        _opruimen(time.time())
+        job = _JOBS.get(job_id)
+        return _status(job) if job is not None else None
+
+
+def _status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Statusdict zonder de PDF zelf (onder _LOCK)."""
+    uit: Dict[str, Any] = {
+        "id": job["id"],
+        "status": job["status"],
+        "aangemaakt": round(job["aangemaakt"], 3),
+    }
+    if job["status"] == WACHTEND:
+        uit["positie"] = sum(1 for j in _JOBS.values() if j["status"] == WACHTEND
+                             and j["aangemaakt"] <= job["aangemaakt"])
+    if job["klaar_op"] is not None:
+        uit["klaar_op"] = round(job["klaar_op"], 3)
+        uit["verloopt_op"] = round(job["klaar_op"] + JOB_TTL_S, 3)
+    if job["status"] == KLAAR:
+        uit["bytes"] = len(job["pdf"])
+    if job["status"] == FOUT:
+        uit["fout"] = job["fout"]
+    return uit
+
+
+def pdf(job_id: str) -> Optional[bytes]:
+    """De PDF van een afgeronde job, of None (onbekend, verlopen of nog niet klaar)."""
+    with _LOCK:
+        _opruimen(time.time())
+        job = _JOBS.get(job_id)
+        return job["pdf"] if job is not None and job["status"] == KLAAR else None
+
+
+def _maak(job: Dict[str, Any]) -> bytes:
+    """Rapport maken; bij een volle procespool even wachten in plaats van falen."""
+    einde = time.time() + JOB_POOL_GEDULD_S
+    while True:
+        try:
+            return maak_rapport(job["lat"], job["lon"], wachtrij=pdfpool.gereserveerd,
+                                **job["filters"])
+        except pdfpool.WachtrijVol:
+            if time.time() > einde:
+                raise
+            time.sleep(0.5)
+
+
+def _werk() -> None:
+    while True:
+        job_id = _WACHTRIJ.get()
+        if job_id is None:   # stopsignaal van shutdown()
+            return
+        with _LOCK:
+            job = _JOBS.get(job_id)
+            if job is None:
+                continue
+            job["status"] = BEZIG
+        try:
+            resultaat, fout = _maak(job), None
+        except Exception as e:
+            print(f"[PDF-JOB] {job_id} mislukt:", e)
+            resultaat, fout = None, type(e).__name__
+        with _LOCK:
+            job.update({"status": KLAAR if fout is None else FOUT, "pdf": resultaat,
+                        "fout": fout, "klaar_op": time.time()})
+
+
+def shutdown() -> None:
+    """Job-threads stoppen (lifespan); wachtende jobs vervallen."""
+    with _LOCK:
+        levend = [t for t in _THREADS if t.is_alive()]
+        _THREADS.clear()
+    for _ in levend:
+        _WACHTRIJ.put(None)
+
+
+def clear() -> None:
+    """Alle jobs vergeten (tests)."""
+    with _LOCK:
+        _JOBS.clear()
+        _PER_SLEUTEL.clear()
@@ -0,0 +1,185 @@
+"""Procespool voor het opmaken van PDF-rapporten.
+
+Het opmaken (reportlab-layout, PNG-decodering) is puur CPU-werk. In de
+threadpool van uvicorn houdt dat de GIL vast en stokken gelijktijdige
+`/api/plants`- en `/advies/geo`-requests. Daarom draait `render_rapport` hier in
+een aparte, begrensde procespool:
+
+- `PDF_WORKERS` processen (config; 0 = in het eigen proces, handig voor tests
+  en voor machines met weinig geheugen);
+- maximaal `PDF_WACHTRIJ` rapporten tegelijk in behandeling (lopend +
+  wachtend). Is de rij vol, dan volgt meteen `WachtrijVol` (de router maakt
+  daar een 429 met Retry-After van) in plaats van een steeds langere wachttijd.
+  De plek wordt met `gereserveerd()` al vóór het verzamelen vastgelegd: een
+  overbelaste server weigert dan zonder eerst PDOK, tiles en dataset te doen;
+- per rapport een timeout van `PDF_TIMEOUT_S` seconden (`RenderTimeout`, 504).
+
+Het ophalen van de brondata (PDOK, tiles, dataset) blijft in de API: dat is
+I/O en profiteert van de caches daar. Alleen de picklebare data uit
+`report.verzamel_rapport_async` gaat naar de worker.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..config import PDF_TIMEOUT_S, PDF_WACHTRIJ, PDF_WORKERS
+from . import metrics
+from .report import render_rapport
+
+
+class WachtrijVol(Exception):
+    """Er zijn al `PDF_WACHTRIJ` rapporten in behandeling."""
+
+
+class RenderTimeout(Exception):
+    """Het opmaken duurde langer dan `PDF_TIMEOUT_S` seconden."""
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_LOCK = threading.Lock()
+_STAND: Dict[str, int] = {"in_behandeling": 0, "klaar": 0, "geweigerd": 0, "timeouts": 0}
+
+_RENDER_DUUR = metrics.histogram(
+    "plantwijs_pdf_render_duration_seconds",
+    "Duur van het opmaken van een PDF-rapport (incl. wachten op een worker), "
+    "naar uitslag: ok, timeout of fout.", ("uitslag",),
+    grenzen=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+
+
+@metrics.verzamelaar
+def _metrics() -> List[metrics.Familie]:
+    with _LOCK:
+        stand = dict(_STAND)
+    return [
+        ("plantwijs_pdf_in_progress", "gauge", "PDF-rapporten in behandeling (lopend + wachtend).",
+         [({}, stand["in_behandeling"])]),
+        ("plantwijs_pdf_rejected_total", "counter", "PDF-rapporten geweigerd omdat de wachtrij vol was.",
+         [({}, stand["geweigerd"])]),
+    ]
+
+
+def _pool() -> ProcessPoolExecutor:
+    """De pool, lui aangemaakt bij het eerste rapport.
+
+    "spawn" in plaats van fork: de API heeft op dat moment threads lopen
+    (uvicorn, tile-pool), en een fork met threads kan vastlopen op locks.
+    """
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            print(f"[PDF] procespool gestart ({PDF_WORKERS} worker(s), wachtrij {PDF_WACHTRIJ})")
+        return _POOL
+
+
+class _Plek:
+    """Eén plek in de wachtrij; komt precies één keer vrij."""
+
+    def __init__(self) -> None:
+        self.bij_worker = False
+        self._vrij = False
+
+    def vrijgeven(self, _future: Any = None) -> None:
+        with _LOCK:
+            if not self._vrij:
+                self._vrij = True
+                _STAND["in_behandeling"] -= 1
+
+
+@contextmanager
+def gereserveerd() -> Iterator[Callable[[Dict[str, Any]], bytes]]:
+    """Een plek in de wachtrij voor het hele rapport: verzamelen én opmaken.
+
+    Levert de renderfunctie voor die plek. De plek komt vrij bij het verlaten
+    van het blok, of — als het rapport al bij een worker ligt — pas als die
+    worker klaar is (ook na een `RenderTimeout`).
+
+    Raises:
+        WachtrijVol: er is geen plek meer in de wachtrij (meteen, vóór het werk).
+    """
+    with _LOCK:
+        if _STAND["in_behandeling"] >= PDF_WACHTRIJ:
+            _STAND["geweigerd"] += 1
+            raise WachtrijVol(f"{PDF_WACHTRIJ} rapporten in behandeling")
+        _STAND["in_behandeling"] += 1
+    plek = _Plek()
+    try:
+        yield lambda data: _gemeten(plek, data)
+    finally:
+        if not plek.bij_worker:
+            plek.vrijgeven()
+
+
+def render(data: Dict[str, Any]) -> bytes:
+    """PDF-bytes uit de data van `report.verzamel_rapport_async`, via de pool.
+
+    Reserveert zelf een plek; wie ook het verzamelen wil afschermen gebruikt
+    `gereserveerd()`.
+
+    Raises:
+        WachtrijVol: er is geen plek meer in de wachtrij.
+        RenderTimeout: de worker was niet op tijd klaar. Het rapport loopt in
+            de worker nog af en houdt tot die tijd zijn plek in de rij bezet.
+    """
+    with gereserveerd() as renderer:
+        return renderer(data)
+
+
+def _gemeten(plek: _Plek, data: Dict[str, Any]) -> bytes:
+    t0 = time.perf_counter()
+    uitslag = "fout"
+    try:
+        pdf = _render(plek, data)
+        uitslag = "ok"
+    except RenderTimeout:
+        uitslag = "timeout"
+        raise
+    finally:
+        _RENDER_DUUR.observe(time.perf_counter() - t0, uitslag=uitslag)
+    with _LOCK:
+        _STAND["klaar"] += 1
+    return pdf
+
+
+def _render(plek: _Plek, data: Dict[str, Any]) -> bytes:
+    """Het eigenlijke opmaken, in dit proces of in de pool."""
+    if PDF_WORKERS <= 0:
+        pdf = render_rapport(data)
+    else:
+        future = _pool().submit(render_rapport, data)
+        # De plek komt pas vrij als de worker echt klaar is, ook na een timeout.
+        plek.bij_worker = True
+        future.add_done_callback(plek.vrijgeven)
+        try:
+            pdf = future.result(timeout=PDF_TIMEOUT_S)
+        except FutureTimeout:
+            with _LOCK:
+                _STAND["timeouts"] += 1
+            raise RenderTimeout(f"rapport niet klaar binnen {PDF_TIMEOUT_S:g} s") from None
+    return pdf
+
+
+def status() -> Dict[str, Any]:
+    """Tellers voor /api/health."""
+    with _LOCK:
+        return {"workers": PDF_WORKERS, "wachtrij": PDF_WACHTRIJ,
+                "actief": _POOL is not None, **_STAND}
+
+
+def shutdown() -> None:
+    """Pool afsluiten (lifespan); een volgend rapport start hem opnieuw."""
+    global _POOL
+    with _LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
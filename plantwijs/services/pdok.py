@@ -1,17 +1,39 @@
 """PDOK-service: FGR (WFS), bodem, Gt/GHG/GLG, AHN en GMM (WMS GetFeatureInfo).
 
-Belangrijk: laagnamen worden LAZY opgehaald (bij eerste gebruik), nooit bij import.
-Als PDOK onbereikbaar is, vallen we terug op de hardcoded defaults per laag.
+Belangrijk: laagnamen worden nooit bij import opgehaald. Ze komen van schijf
+(`WMSMETA_PAD`, geladen bij de start) of worden bij eerste gebruik opgelost en
+daarna bewaard; oude namen worden op de achtergrond ververst. Als PDOK
+onbereikbaar is, vallen we terug op de hardcoded defaults per laag.
+
+De lookups zijn asynchroon (`*_async`, via de gedeelde client van
+services/httpklient.py) voor /advies/geo en het PDF-rapport. De synchrone namen
+zonder `_async` (scripts, diagnoseroute) draaien diezelfde coroutine via
+`httpklient.voer_uit`.
+
+Staat er lokale kaartdata klaar (services/lokaal.py, gebouwd met
+scripts/bouw_lokale_data.py), dan lezen bodem, AHN, GMM en Gt die eerst uit;
+de WMS is dan alleen nog de terugval buiten het bereik van die bestanden.
+
+Alle aanvragen lopen via services/upstream.py: gelijktijdige identieke
+lookups worden samengevoegd en per host gedoseerd, en elke bron heeft een
+stroomonderbreker. Een storing (time-out, geen verbinding, overbelast) komt
+als `upstream.BronFout` naar boven, zodat /advies/geo de bron als `fout` meldt
+in plaats van `leeg`.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import os
 import re
 import threading
+import time
 import urllib.parse
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
@@ -26,7 +48,11 @@ from ..config import (
     PDOK_FGR_WFS,
     TX_WGS84_RD,
     TX_WGS84_WEB,
+    WMSMETA_PAD,
+    WMSMETA_TTL_S,
 )
+from . import fgr, httpklient, lokaal, metrics, upstream
+from .bestanden import schrijf_atomair
 from .dataset import SOIL_SYNONYMS
 
 
@@ -47,42 +73,65 @@ def _capabilities(url: str) -> Optional[ET.Element]:
         return None
 
 
-def _find_layer_name(url: str, want: List[str]) -> Optional[Tuple[str, str]]:
+@lru_cache(maxsize=16)
+def _laagindex(url: str) -> Optional[List[Tuple[str, str, str, str]]]:
+    """Alle lagen van een service, één keer uit de GetCapabilities gelezen:
+    (naam, titel, naam in kleine letters, titel in kleine letters)."""
     root = _capabilities(url)
     if root is None:
         return None
-    layers = root.findall(".//{*}Layer")
-    cand: List[Tuple[str, str]] = []
-    for layer in layers:
+    index: List[Tuple[str, str, str, str]] = []
+    for layer in root.findall(".//{*}Layer"):
         name_el = layer.find("{*}Name")
         title_el = layer.find("{*}Title")
-        name = (name_el.text if name_el is not None else "")
-        title = (title_el.text if title_el is not None else "")
-        if not name and not title:
-            continue
-        cand.append((name, title))
+        name = (name_el.text if name_el is not None else "") or ""
+        title = (title_el.text if title_el is not None else "") or ""
+        if name or title:
+            index.append((name, title, name.lower(), title.lower()))
+    return index
+
+
+def _find_layer_name(url: str, want: List[str]) -> Optional[Tuple[str, str]]:
+    """Eerste laag met een gezochte term in de titel, anders in de naam, anders
+    de eerste laag met een naam — in één doorloop over de laagindex."""
+    index = _laagindex(url)
+    if index is None:
+        return None
     lwant = [w.lower() for w in want]
-    for name, title in cand:
-        t = (title or "").lower()
-        if any(w in t for w in lwant) and name:
-            return name, title
-    for name, title in cand:
-        n = (name or "").lower()
-        if any(w in n for w in lwant) and name:
-            return name, title
-    for name, title in cand:
-        if name:
+    beste: Optional[Tuple[str, str]] = None
+    beste_rang = 3
+    for name, title, n, t in index:
+        if not name:
+            continue
+        if any(w in t for w in lwant):
             return name, title
-    return None
+        rang = 1 if any(w in n for w in lwant) else 2
+        if rang < beste_rang:
+            beste, beste_rang = (name, title), rang
+    return beste
 
 
-# ───────────────────── WMS-laagnamen (lazy + gecachet)
+# ───────────────────── WMS-laagnamen (schijf + geheugen, ververst op de achtergrond)
+# Volgorde bij `get_wms_meta()`: geheugen → bestand (`WMSMETA_PAD`) → live
+# oplossen. Is de opgeslagen versie ouder dan `WMSMETA_TTL_S`, dan wordt die
+# gewoon gebruikt en ververst een achtergrondthread hem. `warm_wms_meta()`
+# (lifespan) laadt het bestand bij de start, zonder op PDOK te wachten.
 _WMSMETA: Dict[str, Dict[str, str]] = {}
+_WMSMETA_OP = 0.0              # time.time() van het oplossen (0 = onbekend)
 _WMSMETA_LOCK = threading.Lock()
+_WMSMETA_VERVERS: Optional[threading.Thread] = None
+_WMSMETA_OPNIEUW_S = 600       # na een mislukte poging: dan pas opnieuw proberen
+_CAP_URLS = (FGR_WMS, BODEM_WMS, GWD_WMS, AHN_WMS, GMM_WMS)
+
 
+def _resolve_layers() -> Tuple[Dict[str, Dict[str, str]], bool]:
+    """Zoek de WMS-laagnamen op via GetCapabilities; val per laag terug op defaults.
 
-def _resolve_layers() -> Dict[str, Dict[str, str]]:
-    """Zoek de WMS-laagnamen op via GetCapabilities; val terug op defaults."""
+    De vijf services worden tegelijk opgehaald. Geeft ook terug of er minstens
+    één GetCapabilities gelukt is (anders is het resultaat alleen defaults).
+    """
+    with ThreadPoolExecutor(max_workers=len(_CAP_URLS), thread_name_prefix="wms-cap") as pool:
+        gelukt = any(idx is not None for idx in pool.map(_laagindex, _CAP_URLS))
     meta: Dict[str, Dict[str, str]] = {}
     fgr = _find_layer_name(FGR_WMS, ["fysisch", "fgr"]) or ("fysischgeografischeregios", "FGR")
     bodem = _find_layer_name(BODEM_WMS, ["bodemvlakken", "bodem"]) or ("Bodemvlakken", "Bodemvlakken")
@@ -98,27 +147,110 @@ def _resolve_layers() -> Dict[str, Dict[str, str]]:
     meta["glg"] = {"url": GWD_WMS, "layer": glg[0], "title": glg[1]}
     meta["ahn"] = {"url": AHN_WMS, "layer": ahn[0], "title": ahn[1]}
     meta["gmm"] = {"url": GMM_WMS, "layer": gmm[0], "title": gmm[1]}
-    return meta
+    return meta, gelukt
 
 
-def get_wms_meta() -> Dict[str, Dict[str, str]]:
-    """Laagnamen ophalen (één keer per proces). Netwerk pas bij eerste gebruik."""
-    global _WMSMETA
-    if _WMSMETA:
-        return _WMSMETA
+def _lees_wms_meta() -> Optional[Tuple[Dict[str, Dict[str, str]], float]]:
+    """(meta, opgelost_op) uit `WMSMETA_PAD`, of None als het er niet (goed) staat."""
+    try:
+        with open(WMSMETA_PAD, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        meta = data["meta"]
+        if not all(isinstance(meta.get(k), dict) and meta[k].get("layer") for k in _fallback_layers()):
+            return None
+        return meta, float(data["opgelost_op"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _schrijf_wms_meta(meta: Dict[str, Dict[str, str]], op: float) -> None:
+    """Laagnamen bewaren voor de volgende start; fouten zijn niet erg."""
+    try:
+        schrijf_atomair(WMSMETA_PAD, json.dumps({"opgelost_op": op, "meta": meta},
+                                                ensure_ascii=False, indent=1))
+    except OSError as e:
+        print("[WMS] laagnamen niet naar schijf geschreven:", e)
+
+
+def _installeer_wms_meta(meta: Dict[str, Dict[str, str]], op: float) -> None:
+    global _WMSMETA, _WMSMETA_OP
+    _WMSMETA, _WMSMETA_OP = meta, op
+
+
+def _los_op_en_bewaar() -> Dict[str, Dict[str, str]]:
+    """Live oplossen; bij succes naar geheugen en schijf. Mislukt alles, dan de
+    defaults, met een kortere termijn tot de volgende poging."""
+    _capabilities.cache_clear()
+    _laagindex.cache_clear()
+    _get.cache_clear()
+    try:
+        meta, gelukt = _resolve_layers()
+    except Exception as e:  # nooit een 500 door een kapotte bron
+        print("[WMS] resolve fout, val terug op defaults:", e)
+        meta, gelukt = _fallback_layers(), False
+    nu = time.time()
+    if gelukt:
+        _schrijf_wms_meta(meta, nu)
+        _installeer_wms_meta(meta, nu)
+        print("[WMS] resolved:", meta)
+    elif not _WMSMETA:
+        _installeer_wms_meta(meta, nu - max(0.0, WMSMETA_TTL_S - _WMSMETA_OPNIEUW_S))
+        print("[WMS] GetCapabilities onbereikbaar, standaard-laagnamen")
+    return _WMSMETA
+
+
+def _ververs_op_achtergrond() -> None:
+    """Eén verversingsthread tegelijk; de lopende aanvragen houden de oude namen."""
+    global _WMSMETA_VERVERS
     with _WMSMETA_LOCK:
-        if _WMSMETA:
+        if _WMSMETA_VERVERS is not None and _WMSMETA_VERVERS.is_alive():
+            return
+        _WMSMETA_VERVERS = threading.Thread(target=_los_op_en_bewaar, name="wms-meta", daemon=True)
+        _WMSMETA_VERVERS.start()
+
+
+def _is_oud(op: float) -> bool:
+    return WMSMETA_TTL_S > 0 and time.time() - op > WMSMETA_TTL_S
+
+
+def warm_wms_meta() -> None:
+    """Bij de start: laagnamen van schijf laden; ontbreken ze of zijn ze oud,
+    dan op de achtergrond oplossen. Blokkeert nooit op PDOK."""
+    if not _WMSMETA:
+        opgeslagen = _lees_wms_meta()
+        if opgeslagen is not None:
+            _installeer_wms_meta(*opgeslagen)
+            print("[WMS] laagnamen van schijf:", WMSMETA_PAD)
+    if not _WMSMETA or _is_oud(_WMSMETA_OP):
+        _ververs_op_achtergrond()
+
+
+def get_wms_meta() -> Dict[str, Dict[str, str]]:
+    """Laagnamen: uit het geheugen, anders van schijf, anders live opgelost."""
+    if not _WMSMETA:
+        with _WMSMETA_LOCK:
+            if not _WMSMETA:
+                opgeslagen = _lees_wms_meta()
+                if opgeslagen is not None:
+                    _installeer_wms_meta(*opgeslagen)
+            ververs = _WMSMETA_VERVERS
+        if not _WMSMETA:
+            if ververs is not None and ververs.is_alive():
+                return _fallback_layers()   # warm_wms_meta lost al op; niet nog eens wachten
+            with _WMSMETA_LOCK:
+                if not _WMSMETA:
+                    _los_op_en_bewaar()
             return _WMSMETA
-        try:
-            meta = _resolve_layers()
-        except Exception as e:  # nooit een 500 door een kapotte bron
-            print("[WMS] resolve fout, val terug op defaults:", e)
-            meta = _fallback_layers()
-        _WMSMETA = meta
-        print("[WMS] resolved:", meta)
+    if _WMSMETA_OP and _is_oud(_WMSMETA_OP):
+        _ververs_op_achtergrond()
     return _WMSMETA
 
 
+async def _wms_meta_async() -> Dict[str, Dict[str, str]]:
+    """`get_wms_meta` zonder de event loop te blokkeren (GetCapabilities in een thread)."""
+    return get_wms_meta() if _WMSMETA else await asyncio.to_thread(get_wms_meta)
+
+
 def _fallback_layers() -> Dict[str, Dict[str, str]]:
     """Hardcoded defaults als PDOK volledig onbereikbaar is."""
     return {
@@ -133,14 +265,76 @@ def _fallback_layers() -> Dict[str, Dict[str, str]]:
 
 
 # ───────────────────── WFS/WMS helpers
-def _wfs(url: str) -> List[dict]:
+def _wfs_features(r: Any) -> List[dict]:
+    """Features uit een WFS-antwoord (`requests` of `httpx`); [] als het geen JSON is."""
+    if r.status_code != 200:
+        return []
+    if "json" not in r.headers.get("Content-Type", "").lower():
+        return []
+    return (r.json() or {}).get("features", [])
+
+
+# Bronnaam per service (voor de stroomonderbrekers in services/upstream.py).
+_BRONNEN = {
+    PDOK_FGR_WFS: "fgr", FGR_WMS: "fgr", BODEM_WMS: "bodem",
+    GWD_WMS: "gwt", AHN_WMS: "ahn", GMM_WMS: "gmm",
+}
+
+
+def _bron(url: str) -> str:
+    for basis, naam in _BRONNEN.items():
+        if url.startswith(basis):
+            return naam
+    return upstream.host(url)
+
+
+# ───────────────────── metrics per bron en infoformaat (/api/metrics)
+_AANROEPEN = metrics.teller(
+    "plantwijs_upstream_requests_total",
+    "Aanvragen aan PDOK per bron en infoformaat (wfs voor de WFS), naar uitkomst: "
+    "ok, leeg, http_4xx, http_5xx, storing (time-out/verbinding) of fout.",
+    ("bron", "formaat", "uitkomst"))
+_AANROEP_DUUR = metrics.histogram(
+    "plantwijs_upstream_request_duration_seconds",
+    "Duur van één aanvraag aan PDOK, zonder het wachten op de limiet.", ("bron", "formaat"))
+
+
+def _meet(bron: str, formaat: str, t0: float, uitkomst: str) -> None:
+    _AANROEPEN.inc(bron=bron, formaat=formaat, uitkomst=uitkomst)
+    _AANROEP_DUUR.observe(time.perf_counter() - t0, bron=bron, formaat=formaat)
+
+
+def _uitkomst(r: Any, gevonden: Any) -> str:
+    if r.status_code >= 500:
+        return "http_5xx"
+    if r.status_code >= 400:
+        return "http_4xx"
+    return "ok" if gevonden else "leeg"
+
+
+async def _wfs_async(url: str) -> List[dict]:
+    bron = _bron(url)
+
+    async def _haal() -> List[dict]:
+        with upstream.bewaakt(bron):
+            await upstream.wacht_async(url)
+            t0 = time.perf_counter()
+            try:
+                r = await httpklient.get(url, timeout=10)
+                feats = _wfs_features(r)
+            except Exception as e:
+                _meet(bron, "wfs", t0, "storing" if upstream.is_storing(e) else "fout")
+                if upstream.is_storing(e):
+                    raise upstream.BronStoring(f"{bron}: {e}") from e
+                raise
+            _meet(bron, "wfs", t0, _uitkomst(r, feats))
+            if r.status_code >= 500:
+                raise upstream.BronStoring(f"{bron}: HTTP {r.status_code}")
+            return feats
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        if r.status_code != 200:
-            return []
-        if "json" not in r.headers.get("Content-Type", "").lower():
-            return []
-        return (r.json() or {}).get("features", [])
+        return await upstream.eenmalig_async((url,), _haal)
+    except upstream.BronFout:
+        raise
     except Exception:
         return []
 
@@ -173,66 +367,122 @@ _DEF_INFO_FORMATS = [
 ]
 
 
-def _wms_getfeatureinfo(base_url: str, layer: str, lat: float, lon: float) -> dict | None:
+def _featureinfo_params(layer: str, lat: float, lon: float) -> Dict[str, Any]:
     cx, cy = TX_WGS84_WEB.transform(lon, lat)
     m = 200.0
     bbox = f"{cx-m},{cy-m},{cx+m},{cy+m}"
-    params_base = {
+    params_base: Dict[str, Any] = {
         "service": "WMS", "version": "1.3.0", "request": "GetFeatureInfo",
         "layers": layer, "query_layers": layer, "styles": "",
         "crs": "EPSG:3857", "width": 101, "height": 101, "i": 50, "j": 50,
         "bbox": bbox,
     }
     params_base["feature_count"] = 10
-    for fmt in _DEF_INFO_FORMATS:
-        params = dict(params_base)
-        params["info_format"] = fmt
-        try:
-            r = requests.get(base_url, params=params, headers=HEADERS, timeout=10)
-            if not r.ok:
-                continue
-            ctype = r.headers.get("Content-Type", "").lower()
-            if "json" in ctype:
-                data = r.json() or {}
-                feats = data.get("features") or []
-                if feats:
-                    props = feats[0].get("properties") or {}
-                    if props:
-                        return props
-            text = r.text
-            if text and fmt in ("text/plain", "text/xml", "application/vnd.ogc.gml"):
-                return {"_text": text}
-        except Exception:
-            continue
+    return params_base
+
+
+def _featureinfo_props(fmt: str, r: Any) -> dict | None:
+    """Props uit één GetFeatureInfo-antwoord, of None."""
+    if r.status_code >= 400:
+        return None
+    ctype = r.headers.get("Content-Type", "").lower()
+    if "json" in ctype:
+        data = r.json() or {}
+        feats = data.get("features") or []
+        if feats:
+            props = feats[0].get("properties") or {}
+            if props:
+                return props
+    text = r.text
+    if text and fmt in ("text/plain", "text/xml", "application/vnd.ogc.gml"):
+        return {"_text": text}
     return None
 
 
+def _featureinfo_sleutel(base_url: str, layer: str, lat: float, lon: float) -> Tuple[Any, ...]:
+    """Sleutel voor het samenvoegen; ± 1 mm afronding op hetzelfde punt."""
+    return (base_url, layer, round(lat, 8), round(lon, 8))
+
+
+async def _wms_getfeatureinfo_async(base_url: str, layer: str, lat: float, lon: float) -> dict | None:
+    """Props op een punt; probeert de infoformaten om de beurt.
+
+    Een time-out of verbindingsfout stopt de reeks meteen (`BronStoring`): de
+    andere formaten zouden even lang wachten. Alleen 5xx-antwoorden telt ook
+    als storing. Beide tellen voor de stroomonderbreker van de bron.
+    """
+    bron = _bron(base_url)
+
+    async def _haal() -> dict | None:
+        with upstream.bewaakt(bron):
+            params_base = _featureinfo_params(layer, lat, lon)
+            serverfouten = 0
+            for fmt in _DEF_INFO_FORMATS:
+                params = dict(params_base)
+                params["info_format"] = fmt
+                await upstream.wacht_async(base_url)   # overbelast (UpstreamBezet): een fout, geen lege plek
+                t0 = time.perf_counter()
+                try:
+                    r = await httpklient.get(base_url, params=params, timeout=10)
+                    props = _featureinfo_props(fmt, r)
+                except Exception as e:
+                    _meet(bron, fmt, t0, "storing" if upstream.is_storing(e) else "fout")
+                    if upstream.is_storing(e):
+                        raise upstream.BronStoring(f"{bron}: {e}") from e
+                    continue
+                _meet(bron, fmt, t0, _uitkomst(r, props))
+                if props:
+                    return props
+                serverfouten += r.status_code >= 500
+            if serverfouten == len(_DEF_INFO_FORMATS):
+                raise upstream.BronStoring(f"{bron}: alleen serverfouten")
+            return None
+    props = await upstream.eenmalig_async(_featureinfo_sleutel(base_url, layer, lat, lon), _haal)
+    return dict(props) if props else props   # samengevoegde aanroepers krijgen elk een eigen dict
+
+
+def _wms_getfeatureinfo(base_url: str, layer: str, lat: float, lon: float) -> dict | None:
+    return httpklient.voer_uit(_wms_getfeatureinfo_async(base_url, layer, lat, lon))
+
+
 # ───────────────────── PDOK value extractors
-def fgr_from_point(lat: float, lon: float) -> str | None:
+_FGR_LAAG = fgr.FGR_LAAG
+
+
+def _fgr_urls(lat: float, lon: float) -> List[str]:
+    """WFS-verzoeken voor een punt: eerst een kleine RD-bbox, dan INTERSECTS. [] buiten NL."""
     x, y = TX_WGS84_RD.transform(lon, lat)
     if not (0 < x < 300_000 and 300_000 < y < 620_000):
-        return None
+        return []
     b = 100
     x1, y1, x2, y2 = round(x-b, 3), round(y-b, 3), round(x+b, 3), round(y+b, 3)
-    layer_name = "fysischgeografischeregios:fysischgeografischeregios"
     url_rd = (
-        f"{PDOK_FGR_WFS}&request=GetFeature&typenames={layer_name}"
+        f"{PDOK_FGR_WFS}&request=GetFeature&typenames={_FGR_LAAG}"
         f"&outputFormat={FMT_JSON}&srsName=EPSG:28992&bbox={x1},{y1},{x2},{y2}&count=1"
     )
-    feats = _wfs(url_rd)
-    if feats:
-        return feats[0].get("properties", {}).get("fgr")
     cql = urllib.parse.quote_plus(f"INTERSECTS(geometry,POINT({lon} {lat}))")
     url_pt = (
-        f"{PDOK_FGR_WFS}&request=GetFeature&typenames={layer_name}"
+        f"{PDOK_FGR_WFS}&request=GetFeature&typenames={_FGR_LAAG}"
         f"&outputFormat={FMT_JSON}&srsName=EPSG:4326&cql_filter={cql}&count=1"
     )
-    feats = _wfs(url_pt)
-    if feats:
-        return feats[0].get("properties", {}).get("fgr")
+    return [url_rd, url_pt]
+
+
+async def fgr_from_point_async(lat: float, lon: float) -> str | None:
+    lokale = fgr.zoek(lat, lon)   # lokale index (services/fgr.py); WFS alleen als terugval
+    if lokale is not lokaal.BUITEN:
+        return lokale
+    for url in _fgr_urls(lat, lon):
+        feats = await _wfs_async(url)
+        if feats:
+            return feats[0].get("properties", {}).get("fgr")
     return None
 
 
+def fgr_from_point(lat: float, lon: float) -> str | None:
+    return httpklient.voer_uit(fgr_from_point_async(lat, lon))
+
+
 # Termen uit de BRO Bodemkaart → de vier PlantWijs-bodemcategorieën, via de
 # gedeelde synoniementabel in `services.dataset` (kaartzijde en soortenfilter
 # hanteren zo dezelfde indeling; zavel telt bij klei). Substring-matching is
@@ -269,15 +519,24 @@ def _bodem_resultaat(ruw: str, props: dict) -> Tuple[Optional[str], dict]:
     return (_soil_from_text(ruw) or ruw or None), props
 
 
-def bodem_from_bodemkaart(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+async def bodem_from_bodemkaart_async(lat: float, lon: float) -> Tuple[Optional[str], dict]:
     """Bodemcategorie voor een punt: (zand|klei|leem|veen of ruwe naam, props).
 
     De props bevatten onder `RUWE_BODEM_KEY` de kaartterm zoals de BRO
     Bodemkaart hem noemt, ook als die naar een categorie is herleid.
     """
-    layer = get_wms_meta().get("bodem", {}).get("layer") or "Bodemvlakken"
-    props = _wms_getfeatureinfo(BODEM_WMS, layer, lat, lon) or {}
+    lokale = lokaal.props("bodem", lat, lon)
+    if lokale is not lokaal.BUITEN:
+        return _bodem_uit_props(lokale or {})
+    layer = (await _wms_meta_async()).get("bodem", {}).get("layer") or "Bodemvlakken"
+    return _bodem_uit_props(await _wms_getfeatureinfo_async(BODEM_WMS, layer, lat, lon) or {})
 
+
+def bodem_from_bodemkaart(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+    return httpklient.voer_uit(bodem_from_bodemkaart_async(lat, lon))
+
+
+def _bodem_uit_props(props: dict) -> Tuple[Optional[str], dict]:
     for k in (
         "grondsoort", "bodem", "BODEM", "BODEMTYPE", "soil", "bodemtype", "SOILAREA_NAME", "NAAM",
         "first_soilname", "normal_soilprofile_name",
@@ -297,14 +556,31 @@ def bodem_from_bodemkaart(lat: float, lon: float) -> Tuple[Optional[str], dict]:
     return None, props
 
 
-def ahn_from_wms(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+async def ahn_from_wms_async(lat: float, lon: float) -> Tuple[Optional[str], dict]:
     """
     Haal een AHN-hoogte (DTM) op via de PDOK AHN WMS.
     Retourneert (hoogte_meter, raw_props) waarbij hoogte_meter als string is geformatteerd.
     """
-    layer = get_wms_meta().get("ahn", {}).get("layer") or "dtm_05m"
-    props = _wms_getfeatureinfo(AHN_WMS, layer, lat, lon) or {}
+    lokale = _ahn_lokaal(lat, lon)
+    if lokale is not lokaal.BUITEN:
+        return _ahn_uit_props(lokale)
+    layer = (await _wms_meta_async()).get("ahn", {}).get("layer") or "dtm_05m"
+    return _ahn_uit_props(await _wms_getfeatureinfo_async(AHN_WMS, layer, lat, lon) or {})
+
+
+def ahn_from_wms(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+    return httpklient.voer_uit(ahn_from_wms_async(lat, lon))
 
+
+def _ahn_lokaal(lat: float, lon: float) -> Any:
+    """Props in de vorm van de WMS (`value_list`) uit het lokale AHN-raster, of BUITEN."""
+    v = lokaal.waarde("ahn", lat, lon)
+    if v is lokaal.BUITEN:
+        return v
+    return {} if v is None else {"value_list": f"{v:.3f}"}
+
+
+def _ahn_uit_props(props: dict) -> Tuple[Optional[str], dict]:
     def _first_numeric_value(d: dict) -> Optional[float]:
         for v in d.values():
             s = str(v).strip()
@@ -335,15 +611,24 @@ def ahn_from_wms(lat: float, lon: float) -> Tuple[Optional[str], dict]:
     return f"{val:.2f}", props
 
 
-def gmm_from_wms(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+async def gmm_from_wms_async(lat: float, lon: float) -> Tuple[Optional[str], dict]:
     """
     Haal een geomorfologische eenheid op via de BRO Geomorfologische kaart (GMM) WMS.
     Retourneert (omschrijving, raw_props), waarbij de omschrijving afkomstig is uit de
     landvormsubgroep-beschrijving (indien beschikbaar).
     """
-    layer = get_wms_meta().get("gmm", {}).get("layer") or "geomorphological_area"
-    props = _wms_getfeatureinfo(GMM_WMS, layer, lat, lon) or {}
+    lokale = lokaal.props("gmm", lat, lon)
+    if lokale is not lokaal.BUITEN:
+        return _gmm_uit_props(lokale or {})
+    layer = (await _wms_meta_async()).get("gmm", {}).get("layer") or "geomorphological_area"
+    return _gmm_uit_props(await _wms_getfeatureinfo_async(GMM_WMS, layer, lat, lon) or {})
+
+
+def gmm_from_wms(lat: float, lon: float) -> Tuple[Optional[str], dict]:
+    return httpklient.voer_uit(gmm_from_wms_async(lat, lon))
 
+
+def _gmm_uit_props(props: dict) -> Tuple[Optional[str], dict]:
     def _norm_key(k: str) -> str:
         return k.lower().replace("_", "").replace("-", "")
 
@@ -454,11 +739,57 @@ def _vochtklasse_from_gt_code(gt: Optional[str]) -> Optional[str]:
     return None
 
 
+_GT_LAAG = "BRO Grondwaterspiegeldiepte Grondwatertrappen Gt"
+
+
+def _vocht_lokaal(lat: float, lon: float) -> Any:
+    """Als `vocht_from_gwt` uit de lokale Gt-, GLG- en GHG-rasters; BUITEN zonder Gt-raster.
+
+    Het Gt-raster bevat de ordinale code van de WMS (1 = Ia … 19 = VIIId), de
+    GLG/GHG-rasters de diepte in cm onder maaiveld.
+    """
+    v = lokaal.waarde("gt", lat, lon)
+    if v is lokaal.BUITEN:
+        return lokaal.BUITEN
+    props = {} if v is None else {"value_list": str(int(v))}
+    klass, gt_raw = _gt_uit_props(props)
+    if not klass:
+        for key in ("glg", "ghg"):
+            diepte = lokaal.waarde(key, lat, lon)
+            if diepte is lokaal.BUITEN or diepte is None:
+                continue
+            return _klasse_uit_cm(int(diepte)), {key.upper(): str(int(diepte))}, _gt_pretty(gt_raw)
+    return klass, props, _gt_pretty(gt_raw)
+
+
+async def vocht_from_gwt_async(lat: float, lon: float) -> Tuple[Optional[str], dict, Optional[str]]:
+    lokale = _vocht_lokaal(lat, lon)
+    if lokale is not lokaal.BUITEN:
+        return lokale
+    meta = await _wms_meta_async()
+    gt_layer = meta.get("gt", {}).get("layer") or _GT_LAAG
+    props = await _wms_getfeatureinfo_async(GWD_WMS, gt_layer, lat, lon) or {}
+    klass, gt_raw = _gt_uit_props(props)
+
+    if not klass:
+        for key in ("glg", "ghg"):
+            lyr = meta.get(key, {}).get("layer")
+            if not lyr:
+                continue
+            p2 = await _wms_getfeatureinfo_async(GWD_WMS, lyr, lat, lon) or {}
+            diepte_klasse = _klasse_uit_diepte(p2)
+            if diepte_klasse:
+                return diepte_klasse, p2, _gt_pretty(gt_raw)
+
+    return klass, props, _gt_pretty(gt_raw)
+
+
 def vocht_from_gwt(lat: float, lon: float) -> Tuple[Optional[str], dict, Optional[str]]:
-    meta = get_wms_meta()
-    gt_layer = meta.get("gt", {}).get("layer") or "BRO Grondwaterspiegeldiepte Grondwatertrappen Gt"
-    props = _wms_getfeatureinfo(GWD_WMS, gt_layer, lat, lon) or {}
+    return httpklient.voer_uit(vocht_from_gwt_async(lat, lon))
+
 
+def _gt_uit_props(props: dict) -> Tuple[Optional[str], Optional[str]]:
+    """(vochtklasse, ruwe Gt-waarde) uit de props van de Gt-laag."""
     def _first_numeric(d: dict) -> Optional[str]:
         for k, v in d.items():
             ks = str(k).lower()
@@ -494,23 +825,22 @@ def vocht_from_gwt(lat: float, lon: float) -> Tuple[Optional[str], dict, Optiona
             if hint:
                 gt_raw = hint
 
-    klass = _vochtklasse_from_gt_code(gt_raw)
+    return _vochtklasse_from_gt_code(gt_raw), gt_raw
 
-    if not klass:
-        for key in ("glg", "ghg"):
-            lyr = meta.get(key, {}).get("layer")
-            if not lyr:
-                continue
-            p2 = _wms_getfeatureinfo(GWD_WMS, lyr, lat, lon) or {}
-            txt = " ".join(str(v) for v in p2.values())
-            m = re.search(r"(GLG|GHG)\s*[:=]?\s*(\d{1,3})", txt, re.I)
-            depth = int(m.group(2)) if m else None
-            if depth is not None:
-                if depth < 25:   klass = "zeer nat"
-                elif depth < 40: klass = "nat"
-                elif depth < 80: klass = "vochtig"
-                elif depth < 120: klass = "droog"
-                else:            klass = "zeer droog"
-                return klass, p2, _gt_pretty(gt_raw)
 
-    return klass, props, _gt_pretty(gt_raw)
+def _klasse_uit_diepte(p2: dict) -> Optional[str]:
+    """Vochtklasse uit een GLG/GHG-diepte (cm) in de props, of None."""
+    txt = " ".join(str(v) for v in p2.values())
+    m = re.search(r"(GLG|GHG)\s*[:=]?\s*(\d{1,3})", txt, re.I)
+    if not m:
+        return None
+    return _klasse_uit_cm(int(m.group(2)))
+
+
+def _klasse_uit_cm(depth: int) -> str:
+    """Vochtklasse bij een grondwaterdiepte (GLG/GHG) in cm onder maaiveld."""
+    if depth < 25:   return "zeer nat"
+    if depth < 40:   return "nat"
+    if depth < 80:   return "vochtig"
+    if depth < 120:  return "droog"
+    return "zeer droog"
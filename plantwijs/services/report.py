@@ -23,6 +23,27 @@ afgevangen: één kapotte of trage bron levert "niet gevonden" in het rapport op
 nooit een exception naar de router. Ook de kaartuitsnede is optioneel; is de
 tile-server niet bereikbaar, dan komt er een tekstregel in plaats van de kaart.
 
+Verzamelen (`verzamel_rapport_async`) gebeurt gelijktijdig: de zes bronnen via
+de asynchrone PDOK-client en de kaartuitsnede in een thread, zodat een rapport
+zo lang duurt als de traagste bron in plaats van de som ervan.
+
+Kaart-tiles
+-----------
+De negen tiles van de mozaïek worden parallel opgehaald en twee keer gecachet:
+in het geheugen (LRU) en op schijf (`config.TILE_CACHE_DIR`, met een TTL).
+Daarnaast wordt de afgewerkte kaart-PNG per (afgeronde lat/lon, zoom)
+bewaard, zodat een tweede rapport voor dezelfde plek geen tile meer ophaalt.
+
+Hergebruik
+----------
+De stijlen worden één keer gebouwd. De vaste tekstblokken (sectiekoppen,
+disclaimer en bronnenlijst) en de blokken uit de kennislaag (landschap,
+beplantingsvormen) worden per inhoud gecompileerd en als ondiepe kopie
+hergebruikt: het parsen van de Paragraph-opmaak gebeurt dan maar één keer.
+Een compleet rapport wordt als bytes bewaard per (afgeronde plek, filters,
+contentversie, datasetversie, datum) — maar alleen als alle bronnen en de
+kaart het deden, zodat een tijdelijke storing niet in de cache belandt.
+
 Filterlogica
 ------------
 De soortentabel gebruikt dezelfde filterfuncties als `/api/plants` en
@@ -33,18 +54,24 @@ Licht, beplantingstype, status en invasief werken precies als elders.
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import json
 import math
 import os
 import re
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, ContextManager, Dict, List, Optional, Tuple
 from xml.sax.saxutils import escape
 
 import pandas as pd
 import requests
-import yaml
 from PIL import Image, ImageDraw
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -63,16 +90,23 @@ from reportlab.platypus import (
     TableStyle,
 )
 
-from ..config import CONTENT_DIR, VERSION
+from ..config import CONTENT_DIR, TILE_CACHE_DIR, VERSION, upstream_url
+from . import content, httpklient, metrics, timing, upstream
 from .advies import verrijk_advies
-from .dataset import _filter_plants_df, ensure_beplantingstype, status_filter_labels
+from .bestanden import schrijf_atomair
+from .dataset import (
+    _filter_plants_df,
+    dataset_versie,
+    ensure_beplantingstype,
+    status_filter_labels,
+)
 from .nsn import nsn_from_point
 from .pdok import (
-    ahn_from_wms,
-    bodem_from_bodemkaart,
-    fgr_from_point,
-    gmm_from_wms,
-    vocht_from_gwt,
+    ahn_from_wms_async,
+    bodem_from_bodemkaart_async,
+    fgr_from_point_async,
+    gmm_from_wms_async,
+    vocht_from_gwt_async,
 )
 
 # ───────────────────── constanten
@@ -131,7 +165,7 @@ DISCLAIMER_AANVULLING = (
 )
 
 # ───────────────────── kaart (OpenStreetMap-tiles)
-TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_URL = upstream_url("https://tile.openstreetmap.org/{z}/{x}/{y}.png")
 TILE_HEADERS = {"User-Agent": f"Beplantingswijzer/{VERSION} (locatierapport)"}
 TILE_TIMEOUT = 8
 KAART_ZOOM = 16
@@ -154,18 +188,140 @@ def _webmercator_tile_xy(lat: float, lon: float, z: int) -> Tuple[float, float]:
 
 
 def _tile_png(z: int, x: int, y: int) -> Optional[bytes]:
-    """Eén OSM-tile ophalen; None bij een niet-200 antwoord."""
-    r = requests.get(TILE_URL.format(z=z, x=x, y=y),
-                     timeout=TILE_TIMEOUT, headers=TILE_HEADERS)
-    if r.status_code != 200:
+    """Eén OSM-tile ophalen; None bij een niet-200 antwoord.
+
+    Gelijktijdige rapporten voor dezelfde buurt delen de download (upstream).
+    """
+    url = TILE_URL.format(z=z, x=x, y=y)
+
+    def _haal() -> Optional[bytes]:
+        upstream.wacht(url)
+        r = requests.get(url, timeout=TILE_TIMEOUT, headers=TILE_HEADERS)
+        if r.status_code != 200:
+            return None
+        return r.content
+    return upstream.eenmalig((url,), _haal)
+
+
+# ───────────────────── tile-cache (geheugen + schijf)
+# Het tilebeleid van OpenStreetMap (operations.osmfoundation.org/policies/tiles)
+# vraagt om een herkenbare User-Agent, lokaal cachen (minimaal zeven dagen) en
+# geen bulkdownloads. Een rapport haalt alleen de 3×3 tiles rond één punt op,
+# met hooguit `TILE_WORKERS` tegelijk — minder dan een browser met de kaart open.
+TILE_TTL_S = 7 * 24 * 3600
+TILE_GEHEUGEN_MAX = 256      # ± 5 MB aan PNG's
+TILE_WORKERS = 4
+TILE_POGINGEN = 2            # één herkansing per tile
+KAART_CACHE_MAX = 64
+KAART_DECIMALEN = 5          # ± 1 m: de marker verschuift minder dan een pixel
+
+_TILE_LRU: "OrderedDict[Tuple[int, int, int], bytes]" = OrderedDict()
+_KAART_LRU: "OrderedDict[Tuple[float, float, int, int], bytes]" = OrderedDict()
+_TILE_LOCK = threading.Lock()
+_TILE_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _lru_get(lru: OrderedDict, sleutel: Any) -> Optional[bytes]:
+    with _TILE_LOCK:
+        waarde = lru.get(sleutel)
+        if waarde is not None:
+            lru.move_to_end(sleutel)
+        return waarde
+
+
+def _lru_zet(lru: OrderedDict, sleutel: Any, waarde: bytes, maximum: int) -> None:
+    with _TILE_LOCK:
+        lru[sleutel] = waarde
+        lru.move_to_end(sleutel)
+        while len(lru) > maximum:
+            lru.popitem(last=False)
+
+
+def _tile_pad(z: int, x: int, y: int) -> str:
+    return os.path.join(TILE_CACHE_DIR, str(z), str(x), f"{y}.png")
+
+
+def _tile_van_schijf(z: int, x: int, y: int) -> Optional[bytes]:
+    """Tile uit de schijfcache, of None als hij ontbreekt of ouder is dan de TTL."""
+    pad = _tile_pad(z, x, y)
+    try:
+        if time.time() - os.path.getmtime(pad) > TILE_TTL_S:
+            return None
+        with open(pad, "rb") as f:
+            return f.read() or None
+    except OSError:
         return None
-    return r.content
+
+
+def _tile_naar_schijf(z: int, x: int, y: int, ruw: bytes) -> None:
+    """Tile in de schijfcache zetten; fouten zijn niet erg."""
+    try:
+        schrijf_atomair(_tile_pad(z, x, y), ruw)
+    except OSError as e:
+        print("[REPORT] tile niet naar schijfcache geschreven:", e)
+
+
+def _tile(z: int, x: int, y: int) -> Optional[bytes]:
+    """Tile via geheugen → schijf → OSM, met één herkansing bij een fout."""
+    sleutel = (z, x, y)
+    ruw = _lru_get(_TILE_LRU, sleutel)
+    metrics.cache("tile_geheugen", ruw is not None)
+    if ruw is not None:
+        return ruw
+    ruw = _tile_van_schijf(z, x, y)
+    metrics.cache("tile_schijf", ruw is not None)
+    if ruw is None:
+        for poging in range(TILE_POGINGEN):
+            try:
+                ruw = _tile_png(z, x, y)
+            except Exception as e:
+                print(f"[REPORT] tile {z}/{x}/{y} poging {poging + 1} faalde:", e)
+                ruw = None
+            if ruw:
+                break
+        if not ruw:
+            return None
+        _tile_naar_schijf(z, x, y, ruw)
+    _lru_zet(_TILE_LRU, sleutel, ruw, TILE_GEHEUGEN_MAX)
+    return ruw
+
+
+def _tile_pool() -> ThreadPoolExecutor:
+    global _TILE_POOL
+    with _TILE_LOCK:
+        if _TILE_POOL is None:
+            _TILE_POOL = ThreadPoolExecutor(max_workers=TILE_WORKERS,
+                                            thread_name_prefix="osm-tile")
+        return _TILE_POOL
+
+
+def clear_kaart_cache() -> None:
+    """Leeg de tile- en kaartcache in het geheugen (de schijfcache blijft staan)."""
+    with _TILE_LOCK:
+        _TILE_LRU.clear()
+        _KAART_LRU.clear()
 
 
 def _static_map_image(lat: float, lon: float, z: int = KAART_ZOOM,
                       px: int = KAART_PX) -> Optional[BytesIO]:
     """Kaartuitsnede met marker als PNG in een BytesIO, of None bij een fout.
 
+    De afgewerkte PNG wordt per (lat/lon op `KAART_DECIMALEN`, zoom, px)
+    gecachet; zie `_bouw_kaart` voor het opbouwen zelf.
+    """
+    sleutel = (round(lat, KAART_DECIMALEN), round(lon, KAART_DECIMALEN), z, px)
+    png = _lru_get(_KAART_LRU, sleutel)
+    if png is None:
+        png = _bouw_kaart(sleutel[0], sleutel[1], z, px)
+        if png is None:
+            return None
+        _lru_zet(_KAART_LRU, sleutel, png, KAART_CACHE_MAX)
+    return BytesIO(png)
+
+
+def _bouw_kaart(lat: float, lon: float, z: int, px: int) -> Optional[bytes]:
+    """Bouw de kaartuitsnede als PNG-bytes, of None bij een fout.
+
     Er wordt een 3×3-mozaïek van tiles opgebouwd en daaruit een venster van
     `px` bij `px` geknipt dat exact op het punt is gecentreerd. Elke fout
     (netwerk, statuscode, kapotte afbeelding) levert None op; het rapport wordt
@@ -175,16 +331,18 @@ def _static_map_image(lat: float, lon: float, z: int = KAART_ZOOM,
         fx, fy = _webmercator_tile_xy(lat, lon, z)
         cx, cy = int(math.floor(fx)), int(math.floor(fy))
 
+        posities = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        tiles = list(_tile_pool().map(
+            lambda d: _tile(z, cx + d[0], cy + d[1]), posities))
+
         mozaiek = Image.new("RGB", (768, 768), (238, 238, 232))
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                ruw = _tile_png(z, cx + dx, cy + dy)
-                if not ruw:
-                    return None
-                tile = Image.open(BytesIO(ruw)).convert("RGB")
-                if tile.size != (256, 256):
-                    tile = tile.resize((256, 256))
-                mozaiek.paste(tile, ((dx + 1) * 256, (dy + 1) * 256))
+        for (dx, dy), ruw in zip(posities, tiles):
+            if not ruw:
+                return None
+            tile = Image.open(BytesIO(ruw)).convert("RGB")
+            if tile.size != (256, 256):
+                tile = tile.resize((256, 256))
+            mozaiek.paste(tile, ((dx + 1) * 256, (dy + 1) * 256))
 
         # positie van het punt binnen het mozaïek
         punt_x = (fx - (cx - 1)) * 256.0
@@ -207,39 +365,21 @@ def _static_map_image(lat: float, lon: float, z: int = KAART_ZOOM,
 
         uit = BytesIO()
         img.save(uit, format="PNG", optimize=True)
-        uit.seek(0)
-        return uit
+        return uit.getvalue()
     except Exception as e:
         print("[REPORT] kaartuitsnede niet beschikbaar:", e)
         return None
 
 
 # ───────────────────── disclaimer uit de kennislaag
-_META_CACHE: Dict[str, Any] = {"meta": None, "mtime": None}
-_META_LOCK = threading.Lock()
 _CONTEXT_YAML = os.path.join(CONTENT_DIR, "context_descriptions.yaml")
 
 
 def _context_meta() -> Dict[str, Any]:
-    """`meta` uit content/context_descriptions.yaml (gecachet op mtime)."""
-    try:
-        mtime = os.path.getmtime(_CONTEXT_YAML)
-    except OSError:
-        mtime = None
-    if _META_CACHE["meta"] is not None and _META_CACHE["mtime"] == mtime:
-        return _META_CACHE["meta"]
-
-    with _META_LOCK:
-        meta: Dict[str, Any] = {}
-        if mtime is not None:
-            try:
-                with open(_CONTEXT_YAML, "r", encoding="utf-8") as f:
-                    meta = (yaml.safe_load(f) or {}).get("meta") or {}
-            except Exception as e:
-                print("[REPORT] meta uit context_descriptions.yaml niet leesbaar:", e)
-                meta = {}
-        _META_CACHE.update({"meta": meta, "mtime": mtime})
-    return _META_CACHE["meta"]
+    """`meta` uit content/context_descriptions.yaml (via de contentbundel)."""
+    raw = content.yaml_inhoud(_CONTEXT_YAML)
+    meta = raw.get("meta") if isinstance(raw, dict) else None
+    return meta if isinstance(meta, dict) else {}
 
 
 def _disclaimer() -> str:
@@ -247,6 +387,11 @@ def _disclaimer() -> str:
     return tekst or STANDAARD_DISCLAIMER
 
 
+def _inhoudsversie() -> str:
+    """Versiehash van content/ (zie services/content.py)."""
+    return content.versie()
+
+
 # ───────────────────── tekst-helpers
 def _tekst(waarde: Any) -> str:
     """Ruwe waarde naar één nette regel tekst (leeg blijft leeg)."""
@@ -282,7 +427,20 @@ def _datum_nl(nu: Optional[datetime] = None) -> str:
 
 
 # ───────────────────── stijlen
+_STIJLEN: Dict[str, ParagraphStyle] = {}
+_STIJL_LOCK = threading.Lock()
+
+
 def _stijlen() -> Dict[str, ParagraphStyle]:
+    """De rapportstijlen; één keer gebouwd en daarna alleen gelezen."""
+    if not _STIJLEN:
+        with _STIJL_LOCK:
+            if not _STIJLEN:
+                _STIJLEN.update(_bouw_stijlen())
+    return _STIJLEN
+
+
+def _bouw_stijlen() -> Dict[str, ParagraphStyle]:
     basis = getSampleStyleSheet()
     s: Dict[str, ParagraphStyle] = {}
     s["titel"] = ParagraphStyle(
@@ -323,28 +481,76 @@ def _stijlen() -> Dict[str, ParagraphStyle]:
     return s
 
 
+# ───────────────────── gecompileerde fragmenten
+# Platypus-flowables houden na `wrap()` hun eigen maten bij en mogen dus niet
+# tussen twee builds gedeeld worden. Een ondiepe kopie deelt wél de geparste
+# opmaak (`frags`) — dat is het dure deel — en krijgt eigen maten.
+FRAGMENT_CACHE_MAX = 512
+
+_FRAGMENTEN: "OrderedDict[Any, List[Any]]" = OrderedDict()
+_FRAGMENT_LOCK = threading.Lock()
+
+
+def _kopie(flowables: List[Any]) -> List[Any]:
+    uit: List[Any] = []
+    for f in flowables:
+        if isinstance(f, KeepTogether):
+            uit.append(KeepTogether(_kopie(f._content), maxHeight=f._maxHeight))
+        else:
+            uit.append(copy.copy(f))
+    return uit
+
+
+def _fragment(sleutel: Any, bouw: Callable[[], List[Any]]) -> List[Any]:
+    """Flowables uit de fragmentcache (als kopie), of bouwen en bewaren."""
+    with _FRAGMENT_LOCK:
+        sjabloon = _FRAGMENTEN.get(sleutel)
+        if sjabloon is not None:
+            _FRAGMENTEN.move_to_end(sleutel)
+    metrics.cache("pdf_fragment", sjabloon is not None)
+    if sjabloon is None:
+        sjabloon = bouw()
+        with _FRAGMENT_LOCK:
+            _FRAGMENTEN[sleutel] = sjabloon
+            while len(_FRAGMENTEN) > FRAGMENT_CACHE_MAX:
+                _FRAGMENTEN.popitem(last=False)
+    return _kopie(sjabloon)
+
+
+def _inhoudssleutel(waarde: Any) -> str:
+    """Stabiele sleutel voor een blok uit de kennislaag (de inhoud zelf)."""
+    return json.dumps(waarde, sort_keys=True, ensure_ascii=False, default=str)
+
+
 # ───────────────────── locatieprofiel ophalen
-def _veilig(naam: str, fn: Callable[[], Any], leeg: Any) -> Any:
-    """Bronlookup uitvoeren; een exception levert de lege waarde op.
+async def _veilig(naam: str, lookup: Awaitable[Any], leeg: Any,
+                  fouten: Optional[List[str]] = None) -> Any:
+    """Op een bronlookup wachten; een exception levert de lege waarde op.
 
     Zelfde afspraak als `/advies/geo`: één kapotte bron mag het rapport
-    nooit slopen (docs/API.md).
+    nooit slopen (docs/API.md). De naam van een falende bron komt in
+    `fouten`, zodat zo'n rapport niet in de cache belandt.
     """
     try:
-        return fn()
+        return await timing.gemeten(naam, lookup)
     except Exception as e:
         print(f"[REPORT] bron '{naam}' faalde:", e)
+        if fouten is not None:
+            fouten.append(naam)
         return leeg
 
 
-def _locatieprofiel(lat: float, lon: float) -> Dict[str, Optional[str]]:
-    """FGR, NSN, bodem, Gt/vocht, AHN en GMM voor een punt (elk apart afgevangen)."""
-    fgr = _veilig("fgr", lambda: fgr_from_point(lat, lon), None)
-    nsn = _veilig("nsn", lambda: nsn_from_point(lat, lon), None)
-    bodem, _ = _veilig("bodem", lambda: bodem_from_bodemkaart(lat, lon), (None, {}))
-    vocht, _, gt_code = _veilig("gwt", lambda: vocht_from_gwt(lat, lon), (None, {}, None))
-    ahn, _ = _veilig("ahn", lambda: ahn_from_wms(lat, lon), (None, {}))
-    gmm, _ = _veilig("gmm", lambda: gmm_from_wms(lat, lon), (None, {}))
+async def _locatieprofiel(lat: float, lon: float,
+                          fouten: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """FGR, NSN, bodem, Gt/vocht, AHN en GMM voor een punt (gelijktijdig, elk apart afgevangen)."""
+    fgr, nsn, (bodem, _), (vocht, _, gt_code), (ahn, _), (gmm, _) = await asyncio.gather(
+        _veilig("fgr", fgr_from_point_async(lat, lon), None, fouten),
+        _veilig("nsn", asyncio.to_thread(nsn_from_point, lat, lon), None, fouten),
+        _veilig("bodem", bodem_from_bodemkaart_async(lat, lon), (None, {}), fouten),
+        _veilig("gwt", vocht_from_gwt_async(lat, lon), (None, {}, None), fouten),
+        _veilig("ahn", ahn_from_wms_async(lat, lon), (None, {}), fouten),
+        _veilig("gmm", gmm_from_wms_async(lat, lon), (None, {}), fouten),
+    )
     return {
         "fgr": _tekst(fgr) or None,
         "nsn": _tekst(nsn) or None,
@@ -356,7 +562,8 @@ def _locatieprofiel(lat: float, lon: float) -> Dict[str, Optional[str]]:
     }
 
 
-def _kennislaag(profiel: Dict[str, Optional[str]]) -> Dict[str, Any]:
+def _kennislaag(profiel: Dict[str, Optional[str]],
+               fouten: Optional[List[str]] = None) -> Dict[str, Any]:
     """De kennislaag-velden; faalt die, dan blijft het rapport gewoon staan."""
     try:
         return verrijk_advies(
@@ -369,6 +576,8 @@ def _kennislaag(profiel: Dict[str, Optional[str]]) -> Dict[str, Any]:
         )
     except Exception as e:
         print("[REPORT] kennislaag faalde:", e)
+        if fouten is not None:
+            fouten.append("kennislaag")
         return {"landschap": {}, "wortelbare_diepte": None, "aanbevolen_beplanting": []}
 
 
@@ -436,10 +645,10 @@ SECTIE_RUIMTE = 40 * mm
 
 def _sectie(kop: str, intro: str, s: Dict[str, ParagraphStyle]) -> List[Any]:
     """Sectiekop met introzin, die nooit alleen onder aan een pagina belandt."""
-    return [
+    return _fragment(("sectie", kop, intro), lambda: [
         CondPageBreak(SECTIE_RUIMTE),
         KeepTogether([Paragraph(_esc(kop), s["kop"]), Paragraph(_esc(intro), s["tekst"])]),
-    ]
+    ])
 
 
 BULLET = "●"  # ZapfDingbats a71 — een gevulde ronde bullet
@@ -499,6 +708,12 @@ def _profieltabel(profiel: Dict[str, Optional[str]], s: Dict[str, ParagraphStyle
 
 def _landschapsblok(landschap: Dict[str, Any], s: Dict[str, ParagraphStyle]) -> List[Any]:
     """Sectie "Jouw landschap": nsn eerst, dan fgr; gmm/bodem/vocht compact."""
+    return _fragment(("landschap", _inhoudssleutel(landschap)),
+                     lambda: _bouw_landschapsblok(landschap, s))
+
+
+def _bouw_landschapsblok(landschap: Dict[str, Any],
+                         s: Dict[str, ParagraphStyle]) -> List[Any]:
     uit: List[Any] = []
     if not landschap:
         uit.append(Paragraph(
@@ -580,19 +795,26 @@ def _vormenblok(vormen: List[Dict[str, Any]], s: Dict[str, ParagraphStyle]) -> L
             s["klein_muted"])]
     uit: List[Any] = []
     for vorm in vormen:
-        # Alleen de naam en de eerste alinea worden bij elkaar gehouden; de rest
-        # mag doorlopen, anders schuift een heel blok naar de volgende pagina.
-        alineas = [Paragraph(_esc(_tekst(vorm.get(veld))), s["tekst"])
-                   for veld in ("omschrijving", "waarom_hier") if _tekst(vorm.get(veld))]
-        kop = Paragraph(_esc(vorm.get("vorm")), s["subkop"])
-        uit.append(KeepTogether([kop, alineas[0]] if alineas else [kop]))
-        uit.extend(alineas[1:])
-        soorten = [_tekst(x) for x in (vorm.get("voorbeeldsoorten") or []) if _tekst(x)]
-        if soorten:
-            uit.append(Paragraph(
-                f'<font color="#6b7280"><b>Voorbeeldsoorten:</b></font> '
-                f'{_esc(", ".join(soorten))}', s["klein"]))
-        uit.append(Spacer(1, 3))
+        uit.extend(_fragment(("vorm", _inhoudssleutel(vorm)), lambda v=vorm: _vorm(v, s)))
+    return uit
+
+
+def _vorm(vorm: Dict[str, Any], s: Dict[str, ParagraphStyle]) -> List[Any]:
+    """Eén beplantingsvorm: naam, toelichting en voorbeeldsoorten."""
+    uit: List[Any] = []
+    # Alleen de naam en de eerste alinea worden bij elkaar gehouden; de rest
+    # mag doorlopen, anders schuift een heel blok naar de volgende pagina.
+    alineas = [Paragraph(_esc(_tekst(vorm.get(veld))), s["tekst"])
+               for veld in ("omschrijving", "waarom_hier") if _tekst(vorm.get(veld))]
+    kop = Paragraph(_esc(vorm.get("vorm")), s["subkop"])
+    uit.append(KeepTogether([kop, alineas[0]] if alineas else [kop]))
+    uit.extend(alineas[1:])
+    soorten = [_tekst(x) for x in (vorm.get("voorbeeldsoorten") or []) if _tekst(x)]
+    if soorten:
+        uit.append(Paragraph(
+            f'<font color="#6b7280"><b>Voorbeeldsoorten:</b></font> '
+            f'{_esc(", ".join(soorten))}', s["klein"]))
+    uit.append(Spacer(1, 3))
     return uit
 
 
@@ -650,6 +872,21 @@ def _filterzin(gebruikt: Dict[str, List[str]]) -> str:
     return "; ".join(delen) if delen else "geen"
 
 
+def _voetwerk(s: Dict[str, ParagraphStyle]) -> List[Any]:
+    """"Over dit rapport" met disclaimer en bronnenlijst (per contentversie)."""
+    def _bouw() -> List[Any]:
+        uit: List[Any] = [CondPageBreak(SECTIE_RUIMTE), KeepTogether([
+            Paragraph(_esc("Over dit rapport"), s["kop"]),
+            Paragraph(f"<b>Let op.</b> {_esc(_disclaimer())} {_esc(DISCLAIMER_AANVULLING)}",
+                      s["tekst"]),
+        ])]
+        uit.append(Paragraph("Gebruikte bronnen", s["subkop"]))
+        uit.extend(_bullets(list(BRONNENLIJST), s))
+        return uit
+
+    return _fragment(("voetwerk", _inhoudsversie()), _bouw)
+
+
 # ───────────────────── paginanummering
 class _GenummerdCanvas(rl_canvas.Canvas):
     """Canvas die "pagina X van Y" kan zetten (tweede pass bij het opslaan)."""
@@ -701,8 +938,48 @@ def _paginadecoratie(canv: rl_canvas.Canvas, doc, subtitel: str) -> None:
     canv.restoreState()
 
 
+# ───────────────────── rapportcache
+# Een compleet rapport hangt af van de plek, de filters, de content, de
+# dataset en de datum (die staat op elke pagina). De brondata van PDOK
+# verandert zelden, maar een TTL houdt een rapport niet eindeloos vast.
+RAPPORT_CACHE_MAX = 32        # ± 4 MB bij een typisch rapport van 120 kB
+RAPPORT_TTL_S = 6 * 3600
+
+_RAPPORTEN: "OrderedDict[Any, Tuple[float, bytes]]" = OrderedDict()
+_RAPPORT_LOCK = threading.Lock()
+
+
+def _rapport_uit_cache(sleutel: Any) -> Optional[bytes]:
+    with _RAPPORT_LOCK:
+        item = _RAPPORTEN.get(sleutel)
+        if item is None:
+            return None
+        if time.time() - item[0] > RAPPORT_TTL_S:
+            del _RAPPORTEN[sleutel]
+            return None
+        _RAPPORTEN.move_to_end(sleutel)
+        return item[1]
+
+
+def _rapport_naar_cache(sleutel: Any, pdf: bytes) -> None:
+    with _RAPPORT_LOCK:
+        _RAPPORTEN[sleutel] = (time.time(), pdf)
+        _RAPPORTEN.move_to_end(sleutel)
+        while len(_RAPPORTEN) > RAPPORT_CACHE_MAX:
+            _RAPPORTEN.popitem(last=False)
+
+
+def clear_cache() -> None:
+    """Leeg alle rapportcaches in het geheugen: rapporten, fragmenten en kaarten."""
+    with _RAPPORT_LOCK:
+        _RAPPORTEN.clear()
+    with _FRAGMENT_LOCK:
+        _FRAGMENTEN.clear()
+    clear_kaart_cache()
+
+
 # ───────────────────── publieke API
-def maak_rapport(
+async def verzamel_rapport_async(
     lat: float,
     lon: float,
     *,
@@ -715,34 +992,141 @@ def maak_rapport(
     vocht: Optional[List[str]] = None,
     bodem: Optional[List[str]] = None,
     beplantingstype: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Alles wat het rapport nodig heeft ophalen (het I/O-deel).
+
+    De bronnen en de kaart komen tegelijk. Het resultaat is een picklebare
+    dict met het locatieprofiel, de kennislaag, de soortentabel, de kaart als
+    PNG-bytes en de datum, zodat `render_rapport` in een apart proces kan
+    draaien (services/pdfpool.py). Parameters als bij `maak_rapport`.
+    """
+    licht = list(licht or [])
+    vocht = list(vocht or [])
+    bodem = list(bodem or [])
+    beplantingstype = list(beplantingstype or [])
+
+    fouten: List[str] = []
+    # de kaart hangt alleen van de plek af en komt dus parallel met de bronnen
+    kaart_taak = asyncio.ensure_future(
+        timing.gemeten("kaart", asyncio.to_thread(_static_map_image, lat, lon)))
+    profiel = await _locatieprofiel(lat, lon, fouten)
+    with timing.stap("kennislaag"):
+        kennis = _kennislaag(profiel, fouten)
+    df, gebruikt = await timing.gemeten("filter", asyncio.to_thread(
+        _soorten,
+        profiel,
+        inheems_only=inheems_only, toon_inheems=toon_inheems,
+        toon_ingeburgerd=toon_ingeburgerd, toon_exoot=toon_exoot,
+        exclude_invasief=exclude_invasief, licht=licht, vocht=vocht,
+        bodem=bodem, beplantingstype=beplantingstype,
+    ))
+    kaart = await kaart_taak
+    return {
+        "lat": lat,
+        "lon": lon,
+        "datum": _datum_nl(),
+        "profiel": profiel,
+        "kennis": kennis,
+        "soorten": df.head(MAX_SOORTEN).reset_index(drop=True),
+        "totaal": int(len(df)),
+        "gebruikt": gebruikt,
+        "kaart": kaart.getvalue() if kaart is not None else None,
+        "fouten": fouten,
+    }
+
+
+async def maak_rapport_async(
+    lat: float,
+    lon: float,
+    *,
+    inheems_only: bool = False,
+    toon_inheems: Optional[bool] = None,
+    toon_ingeburgerd: Optional[bool] = None,
+    toon_exoot: Optional[bool] = None,
+    exclude_invasief: bool = True,
+    licht: Optional[List[str]] = None,
+    vocht: Optional[List[str]] = None,
+    bodem: Optional[List[str]] = None,
+    beplantingstype: Optional[List[str]] = None,
+    wachtrij: Optional[Callable[[], ContextManager[Callable[[Dict[str, Any]], bytes]]]] = None,
 ) -> bytes:
     """Bouw het PDF-locatierapport en geef de bytes terug.
 
+    Draait op de event loop van de aanroeper, met diens gedeelde HTTP-client;
+    alleen het opmaken gaat naar een thread (en van daaruit naar de pool).
+
     Args:
         lat, lon: WGS84-coördinaten van de plek.
         inheems_only, toon_*, exclude_invasief: statusfilters, zoals /api/plants.
         licht, vocht, bodem, beplantingstype: extra filters op de soortentabel.
             Vocht en bodem overschrijven de kaartwaarde van deze locatie.
+        wachtrij: levert per rapport een contextmanager die een plek reserveert
+            en de renderfunctie voor die plek geeft (`pdfpool.gereserveerd`).
+            De plek wordt vóór het verzamelen genomen, zodat een volle rij
+            meteen weigert. Standaard `render_rapport` in dit proces, zonder rij.
 
     Returns:
         De PDF als bytes. Faalt een bron, dan staat er "niet gevonden" in het
         rapport; er wordt nooit een exception doorgegeven vanwege een bron.
+        Exceptions van de wachtrij zelf (vol, timeout) gaan wél door.
     """
     licht = list(licht or [])
     vocht = list(vocht or [])
     bodem = list(bodem or [])
     beplantingstype = list(beplantingstype or [])
 
-    s = _stijlen()
-    profiel = _locatieprofiel(lat, lon)
-    kennis = _kennislaag(profiel)
-    df, gebruikt = _soorten(
-        profiel,
-        inheems_only=inheems_only, toon_inheems=toon_inheems,
-        toon_ingeburgerd=toon_ingeburgerd, toon_exoot=toon_exoot,
-        exclude_invasief=exclude_invasief, licht=licht, vocht=vocht,
-        bodem=bodem, beplantingstype=beplantingstype,
+    # Het rapport toont de coördinaten op 5 decimalen (± 1 m); op die precisie
+    # wordt ook opgezocht, zodat het rapport één op één bij de cachesleutel hoort.
+    lat, lon = round(float(lat), KAART_DECIMALEN), round(float(lon), KAART_DECIMALEN)
+    sleutel = (
+        lat, lon, inheems_only, toon_inheems, toon_ingeburgerd, toon_exoot,
+        exclude_invasief, tuple(licht), tuple(vocht), tuple(bodem),
+        tuple(beplantingstype), _inhoudsversie(), dataset_versie(), _datum_nl(),
     )
+    pdf = _rapport_uit_cache(sleutel)
+    metrics.cache("rapport", pdf is not None)
+    if pdf is not None:
+        return pdf
+
+    with (wachtrij or _zonder_wachtrij)() as renderer:
+        data = await verzamel_rapport_async(
+            lat, lon,
+            inheems_only=inheems_only, toon_inheems=toon_inheems,
+            toon_ingeburgerd=toon_ingeburgerd, toon_exoot=toon_exoot,
+            exclude_invasief=exclude_invasief, licht=licht, vocht=vocht,
+            bodem=bodem, beplantingstype=beplantingstype,
+        )
+        pdf = await timing.gemeten("pdf", asyncio.to_thread(renderer, data))
+    if data["kaart"] is not None and not data["fouten"]:
+        _rapport_naar_cache(sleutel, pdf)
+    return pdf
+
+
+def maak_rapport(lat: float, lon: float, **opties: Any) -> bytes:
+    """Synchrone ingang van `maak_rapport_async` (PDF-jobthread, scripts).
+
+    Draait op een eigen, kortlevende event loop; de route gebruikt de
+    asynchrone variant op de loop van de app.
+    """
+    return httpklient.voer_uit(maak_rapport_async(lat, lon, **opties))
+
+
+def _zonder_wachtrij() -> ContextManager[Callable[[Dict[str, Any]], bytes]]:
+    return nullcontext(render_rapport)
+
+
+def render_rapport(data: Dict[str, Any]) -> bytes:
+    """De PDF opmaken uit de data van `verzamel_rapport_async` (het CPU-deel).
+
+    Doet geen netwerkverkeer; draait in de procespool van de API of, zonder
+    pool, gewoon in het aanroepende proces.
+    """
+    s = _stijlen()
+    lat, lon, datum = data["lat"], data["lon"], data["datum"]
+    profiel = data["profiel"]
+    kennis = data["kennis"]
+    df = data["soorten"]
+    gebruikt = data["gebruikt"]
     coordinaten = f"{lat:.5f}, {lon:.5f}"
 
     story: List[Any] = []
@@ -750,12 +1134,12 @@ def maak_rapport(
     # 1 ── kop
     story.append(Paragraph(_esc(TITEL), s["titel"]))
     story.append(Paragraph(
-        f"Opgesteld op {_esc(_datum_nl())} &nbsp;·&nbsp; "
+        f"Opgesteld op {_esc(datum)} &nbsp;·&nbsp; "
         f"Coördinaten (WGS84): <b>{_esc(coordinaten)}</b>", s["subtitel"]))
     story.append(Spacer(1, 7))
 
     # 2 ── kaartuitsnede
-    kaart = _static_map_image(lat, lon)
+    kaart = BytesIO(data["kaart"]) if data.get("kaart") else None
     if kaart is not None:
         try:
             story.append(RLImage(kaart, width=KAART_MM * mm, height=KAART_MM * mm,
@@ -803,7 +1187,7 @@ def maak_rapport(
     story.extend(_vormenblok(kennis.get("aanbevolen_beplanting") or [], s))
 
     # 7 ── passende soorten
-    totaal = int(len(df))
+    totaal = int(data["totaal"])
     getoond = min(totaal, MAX_SOORTEN)
     story.extend(_sectie(
         "Passende soorten",
@@ -817,14 +1201,7 @@ def maak_rapport(
         s["klein_muted"]))
 
     # 8 ── voetwerk
-    story.append(CondPageBreak(SECTIE_RUIMTE))
-    story.append(KeepTogether([
-        Paragraph(_esc("Over dit rapport"), s["kop"]),
-        Paragraph(f"<b>Let op.</b> {_esc(_disclaimer())} {_esc(DISCLAIMER_AANVULLING)}",
-                  s["tekst"]),
-    ]))
-    story.append(Paragraph("Gebruikte bronnen", s["subkop"]))
-    story.extend(_bullets(list(BRONNENLIJST), s))
+    story.extend(_voetwerk(s))
 
     # ── bouwen
     buf = BytesIO()
@@ -835,7 +1212,7 @@ def maak_rapport(
         title=TITEL, author="Beplantingswijzer",
         subject=f"Locatierapport voor {coordinaten}",
     )
-    voettekst = f"Beplantingswijzer — locatierapport {coordinaten} — {_datum_nl()}"
+    voettekst = f"Beplantingswijzer — locatierapport {coordinaten} — {datum}"
 
     def _op_pagina(canv, doc_):
         _paginadecoratie(canv, doc_, voettekst)
@@ -0,0 +1,215 @@
+"""Tijdmeting per request: stappen, Server-Timing-header en histogrammen.
+
+`/advies/geo` gaf alleen één `elapsed_ms`; bij een trage request was niet te
+zien of FGR, NSN, Gt, het filteren, de kennislaag of het serialiseren de
+boosdoener was. Daarom:
+
+- `TimingMiddleware` start per HTTP-request een `Meting` (in een contextvar,
+  dus ook zichtbaar in de threadpool en in `asyncio.gather`-taken);
+- code markeert een stap met `with stap("kennislaag"):`; buiten een request
+  (scripts, tests die een functie direct aanroepen) doet dat niets;
+- bij de start van het antwoord komen alle stappen plus `totaal` in de header
+  `Server-Timing` (zichtbaar in het Network-paneel van de browser);
+- na afloop telt elke stap mee in een histogram per (route, stap) in het
+  register van services/metrics.py (/api/metrics); `samenvatting()` vat ze
+  samen voor /api/health;
+- `volg_threadpool()` (lifespan) laat /api/metrics ook zien hoe vol de
+  threadpool van de sync endpoints is en hoeveel aanroepen erop wachten.
+
+Stappen die tegelijk lopen (de bronnen) overlappen: hun duur telt niet op tot
+het totaal. Een stap die vaker voorkomt in één request wordt opgeteld.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, TypeVar
+
+import anyio.to_thread
+from starlette.datastructures import MutableHeaders
+
+from . import metrics
+
+T = TypeVar("T")
+
+
+class Meting:
+    """De stappen van één request, in volgorde van eerste voorkomen."""
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.stappen: Dict[str, float] = {}
+        self.totaal_ms: Optional[float] = None
+        self._lock = threading.Lock()   # _advies_antwoord draait in een andere thread
+
+    def noteer(self, naam: str, ms: float) -> None:
+        with self._lock:
+            self.stappen[naam] = self.stappen.get(naam, 0.0) + ms
+
+    def verstreken_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def als_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {naam: round(ms, 1) for naam, ms in self.stappen.items()}
+
+    def header(self) -> str:
+        delen = [f"{naam};dur={ms:.1f}" for naam, ms in self.als_dict().items()]
+        if self.totaal_ms is not None:
+            delen.append(f"totaal;dur={self.totaal_ms:.1f}")
+        return ", ".join(delen)
+
+
+_HUIDIG: ContextVar[Optional[Meting]] = ContextVar("plantwijs_meting", default=None)
+
+
+@contextmanager
+def stap(naam: str) -> Iterator[None]:
+    """Meet de duur van het blok als stap `naam` van de lopende request."""
+    meting = _HUIDIG.get()
+    if meting is None:
+        yield
+        return
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        meting.noteer(naam, (time.perf_counter() - t) * 1000)
+
+
+async def gemeten(naam: str, aw: Awaitable[T]) -> T:
+    """`await aw` als stap `naam`."""
+    with stap(naam):
+        return await aw
+
+
+def timings() -> Dict[str, float]:
+    """De stappen tot nu toe van de lopende request (ms); {} buiten een request."""
+    meting = _HUIDIG.get()
+    return meting.als_dict() if meting is not None else {}
+
+
+# ───────────────────── histogrammen (services/metrics.py)
+REQUESTS = metrics.teller("plantwijs_http_requests_total",
+                          "Afgehandelde HTTP-requests per route en statuscode.", ("route", "status"))
+REQUEST_DUUR = metrics.histogram("plantwijs_http_request_duration_seconds",
+                                 "Duur van een request tot de start van het antwoord.", ("route",))
+STAP_DUUR = metrics.histogram("plantwijs_request_stage_duration_seconds",
+                              "Duur per stap binnen een request (bronnen lopen tegelijk).",
+                              ("route", "stap"))
+
+
+def registreer(route: str, meting: Meting, status: Optional[int] = None) -> None:
+    """De stappen en het totaal van een afgeronde request in de histogrammen."""
+    for naam, ms in meting.als_dict().items():
+        STAP_DUUR.observe(ms / 1000, route=route, stap=naam)
+    if meting.totaal_ms is not None:
+        REQUEST_DUUR.observe(meting.totaal_ms / 1000, route=route)
+    REQUESTS.inc(route=route, status=status if status is not None else "")
+
+
+def samenvatting() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Per route en stap (plus `totaal`): aantal, gemiddelde en p50/p95 in ms.
+
+    De percentielen zijn de bovengrens van het histogramvak; None betekent
+    boven de hoogste grens.
+    """
+    def _ms(v: Optional[float]) -> Optional[float]:
+        return None if v is None else round(v * 1000, 1)
+
+    rijen = [(labels["route"], labels["stap"], STAP_DUUR, cum, n, som)
+             for labels, cum, n, som in STAP_DUUR.monsters()]
+    rijen += [(labels["route"], "totaal", REQUEST_DUUR, cum, n, som)
+              for labels, cum, n, som in REQUEST_DUUR.monsters()]
+    uit: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for route, naam, histo, cum, n, som in sorted(rijen, key=lambda r: (r[0], r[1])):
+        uit.setdefault(route, {})[naam] = {
+            "aantal": n,
+            "gem_ms": round(som * 1000 / n, 1) if n else None,
+            "p50_ms": _ms(histo.kwantiel(cum, n, 0.5)),
+            "p95_ms": _ms(histo.kwantiel(cum, n, 0.95)),
+        }
+    return uit
+
+
+def reset() -> None:
+    for m in (REQUESTS, REQUEST_DUUR, STAP_DUUR):
+        m.reset()
+
+
+# ───────────────────── threadpool (anyio)
+# Sync endpoints en `run_in_threadpool` lenen een plek van de standaard-limiter
+# van anyio (40). Zijn ze allemaal bezet, dan wacht de request vóór hij begint;
+# dat is geen stap van de Meting, maar wel te zien in deze gauges.
+_LIMITER: Optional[Any] = None
+
+
+def volg_threadpool() -> None:
+    """Onthoud de limiter van de event loop; aanroepen vanuit de lifespan."""
+    global _LIMITER
+    _LIMITER = anyio.to_thread.current_default_thread_limiter()
+
+
+@metrics.verzamelaar
+def _threadpool_metrics() -> List[metrics.Familie]:
+    if _LIMITER is None:
+        return []
+    s = _LIMITER.statistics()
+    return [
+        ("plantwijs_threadpool_size", "gauge", "Plekken in de threadpool voor sync endpoints.",
+         [({}, s.total_tokens)]),
+        ("plantwijs_threadpool_busy", "gauge", "Bezette plekken in de threadpool.",
+         [({}, s.borrowed_tokens)]),
+        ("plantwijs_threadpool_waiting", "gauge", "Aanroepen die op een vrije plek in de threadpool wachten.",
+         [({}, s.tasks_waiting)]),
+    ]
+
+
+# ───────────────────── middleware
+def _route(scope: Dict[str, Any]) -> str:
+    """Het routesjabloon (`/plant/{slug}`), zodat het aantal histogrammen begrensd blijft.
+
+    FastAPI zet de gevonden route in de scope; voor andere routes (docs,
+    /static) volgt het echte pad. Paden zonder route tellen samen als "overig".
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        return scope["path"]
+    return "overig"
+
+
+class TimingMiddleware:
+    """Pure ASGI-middleware: Meting per request, Server-Timing, histogrammen."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        meting = Meting()
+        token = _HUIDIG.set(meting)
+        status: Dict[str, int] = {}
+
+        async def _send(bericht: Dict[str, Any]) -> None:
+            if bericht["type"] == "http.response.start":
+                status["code"] = bericht["status"]
+                meting.totaal_ms = meting.verstreken_ms()
+                headers = MutableHeaders(scope=bericht)
+                headers.append("Server-Timing", meting.header())
+                headers.append("Timing-Allow-Origin", "*")
+            await send(bericht)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _HUIDIG.reset(token)
+            if meting.totaal_ms is None:
+                meting.totaal_ms = meting.verstreken_ms()
+            registreer(_route(scope), meting, status.get("code"))
@@ -0,0 +1,360 @@
+"""Bescherming van de externe bronnen: samenvoegen en doseren van aanvragen.
+
+`/llms.txt` vraagt agents om rustig aan te doen, maar de server zelf stuurde
+alles ongeremd door: N gelijktijdige adviezen voor hetzelfde punt werden 6×N
+identieke PDOK-aanvragen. Twee lagen ertussen:
+
+- samenvoegen (single-flight): lopen er al aanvragen met dezelfde sleutel,
+  dan wachten de volgende op hetzelfde antwoord in plaats van zelf te vragen.
+  `eenmalig(sleutel, fn)` voor threads, `eenmalig_async(sleutel, maak)` voor
+  coroutines (per event loop);
+- doseren (token bucket per host): elke host krijgt `UPSTREAM_RPS` aanvragen
+  per seconde met pieken tot `UPSTREAM_BURST`. Wie geen token heeft, reserveert
+  het volgende en wacht (`wacht` / `wacht_async`); de wachtrij loopt zo op
+  volgorde van aankomst. Zou de wachttijd boven `UPSTREAM_WACHT_S` komen, dan
+  volgt meteen `UpstreamBezet` — de aanroepers behandelen dat als elke andere
+  bronfout.
+
+- stroomonderbreker per bron (fgr, bodem, gwt, ahn, gmm, geocode): na
+  `BRON_DREMPEL` storingen op rij (time-out, geen verbinding, alleen 5xx)
+  gaat hij open en faalt elke lookup naar die bron meteen met `BronOpen`,
+  in plaats van telkens de volle time-out af te wachten. Na `BRON_RUST_S`
+  mag er één proef-lookup door (half open): lukt die, dan gaat hij weer
+  dicht, anders blijft hij nog een rustperiode open. Gebruik:
+  `with bewaakt("bodem"): ...`; een `BronStoring` binnen het blok telt als
+  storing, een normaal einde als herstel.
+
+`status()` geeft per host de tellers (aanvragen, samengevoegd, gewacht,
+geweigerd, totale wachttijd), `onderbrekers()` de stand per bron; beide staan
+in `/api/health`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from ..config import BRON_DREMPEL, BRON_RUST_S, UPSTREAM_BURST, UPSTREAM_RPS, UPSTREAM_WACHT_S
+from . import metrics
+
+T = TypeVar("T")
+
+
+class BronFout(Exception):
+    """Een bron is niet (goed) bereikt; de aanroepers melden de bron als `fout`."""
+
+
+class UpstreamBezet(BronFout):
+    """De wachtrij voor een host is te lang; de aanvraag is niet verstuurd."""
+
+
+class BronOpen(BronFout):
+    """De stroomonderbreker van de bron staat open; niets verstuurd."""
+
+
+class BronStoring(BronFout):
+    """Time-out, geen verbinding of alleen serverfouten: telt voor de onderbreker."""
+
+
+def is_storing(e: BaseException) -> bool:
+    """Zegt deze fout iets over de bron zelf (en niet over één antwoordformaat)?"""
+    return isinstance(e, (requests.Timeout, requests.ConnectionError,
+                          httpx.TimeoutException, httpx.TransportError))
+
+
+# ───────────────────── token bucket per host
+class _Emmer:
+    """Token bucket met reserveringen: `reserveer()` geeft de wachttijd terug."""
+
+    def __init__(self, rps: float, burst: int):
+        self.rps = rps
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.bijgewerkt = time.monotonic()
+
+    def reserveer(self, max_wacht: float) -> Optional[float]:
+        """Neem een token (eventueel een toekomstig); None als dat te lang duurt."""
+        if self.rps <= 0:
+            return 0.0
+        nu = time.monotonic()
+        self.tokens = min(float(self.burst), self.tokens + (nu - self.bijgewerkt) * self.rps)
+        self.bijgewerkt = nu
+        # negatieve tokens = reserveringen van wachtenden vóór ons
+        wacht = max(0.0, (1.0 - self.tokens) / self.rps)
+        if wacht > max_wacht:
+            return None
+        self.tokens -= 1.0
+        return wacht
+
+
+_EMMERS: Dict[str, _Emmer] = {}
+_TELLERS: Dict[str, Dict[str, float]] = {}
+_LOCK = threading.Lock()
+
+
+def host(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+def _teller(h: str) -> Dict[str, float]:
+    t = _TELLERS.get(h)
+    if t is None:
+        t = _TELLERS[h] = {"aanvragen": 0, "samengevoegd": 0, "gewacht": 0,
+                           "geweigerd": 0, "wachttijd_s": 0.0}
+    return t
+
+
+def _reserveer(url: str) -> float:
+    h = host(url)
+    with _LOCK:
+        emmer = _EMMERS.get(h)
+        if emmer is None:
+            emmer = _EMMERS[h] = _Emmer(UPSTREAM_RPS, UPSTREAM_BURST)
+        wacht = emmer.reserveer(UPSTREAM_WACHT_S)
+        teller = _teller(h)
+        if wacht is None:
+            teller["geweigerd"] += 1
+            raise UpstreamBezet(f"{h}: wachtrij vol")
+        teller["aanvragen"] += 1
+        if wacht > 0:
+            teller["gewacht"] += 1
+            teller["wachttijd_s"] += wacht
+    return wacht
+
+
+def wacht(url: str) -> None:
+    """Blokkerend wachten tot er een aanvraag naar de host van `url` mag."""
+    w = _reserveer(url)
+    if w > 0:
+        time.sleep(w)
+
+
+async def wacht_async(url: str) -> None:
+    """Als `wacht`, zonder de event loop te blokkeren."""
+    w = _reserveer(url)
+    if w > 0:
+        await asyncio.sleep(w)
+
+
+# ───────────────────── samenvoegen (single-flight)
+class _Vlucht:
+    __slots__ = ("klaar", "waarde", "fout")
+
+    def __init__(self):
+        self.klaar = threading.Event()
+        self.waarde: Any = None
+        self.fout: Optional[BaseException] = None
+
+
+_LOPEND: Dict[Hashable, _Vlucht] = {}
+_LOPEND_ASYNC: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _sleutel_host(sleutel: Hashable) -> str:
+    """Sleutels zijn tuples met de URL voorop (of de URL zelf)."""
+    return host(str(sleutel[0]) if isinstance(sleutel, tuple) and sleutel else str(sleutel))
+
+
+def _samengevoegd(sleutel: Hashable) -> None:
+    with _LOCK:
+        _teller(_sleutel_host(sleutel))["samengevoegd"] += 1
+
+
+def eenmalig(sleutel: Hashable, fn: Callable[[], T]) -> T:
+    """`fn()` uitvoeren, tenzij een andere thread dat al doet voor `sleutel`."""
+    with _LOCK:
+        vlucht = _LOPEND.get(sleutel)
+        eigenaar = vlucht is None
+        if eigenaar:
+            vlucht = _LOPEND[sleutel] = _Vlucht()
+    if not eigenaar:
+        _samengevoegd(sleutel)
+        vlucht.klaar.wait()
+        if vlucht.fout is not None:
+            raise vlucht.fout
+        return vlucht.waarde
+    try:
+        vlucht.waarde = fn()
+        return vlucht.waarde
+    except BaseException as e:
+        vlucht.fout = e
+        raise
+    finally:
+        with _LOCK:
+            _LOPEND.pop(sleutel, None)
+        vlucht.klaar.set()
+
+
+async def eenmalig_async(sleutel: Hashable, maak: Callable[[], Awaitable[T]]) -> T:
+    """Als `eenmalig` voor coroutines: `maak()` levert de coroutine.
+
+    Het antwoord wordt gedeeld binnen de lopende event loop; een afgebroken
+    wachtende annuleert de gedeelde aanvraag niet (`shield`).
+    """
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        lopend = _LOPEND_ASYNC.setdefault(loop, {})
+        taak = lopend.get(sleutel)
+        eigenaar = taak is None
+        if eigenaar:
+            taak = lopend[sleutel] = asyncio.ensure_future(maak())
+    if eigenaar:
+        def _weg(_t: asyncio.Future, lopend=lopend) -> None:
+            with _LOCK:
+                if lopend.get(sleutel) is _t:
+                    del lopend[sleutel]
+        taak.add_done_callback(_weg)
+    else:
+        _samengevoegd(sleutel)
+    return await asyncio.shield(taak)
+
+
+# ───────────────────── stroomonderbreker per bron
+class _Onderbreker:
+    __slots__ = ("staat", "fouten", "open_sinds", "proef", "keer_geopend", "afgewezen")
+
+    def __init__(self):
+        self.staat = "dicht"          # dicht | open | half_open
+        self.fouten = 0               # storingen op rij
+        self.open_sinds = 0.0         # time.monotonic()
+        self.proef = False            # loopt er een proef-lookup (half open)?
+        self.keer_geopend = 0
+        self.afgewezen = 0
+
+
+_ONDERBREKERS: Dict[str, _Onderbreker] = {}
+
+
+def _toegang(bron: str) -> bool:
+    """Mag er een lookup door? True = dit is de proef; BronOpen als het niet mag."""
+    with _LOCK:
+        o = _ONDERBREKERS.setdefault(bron, _Onderbreker())
+        if o.staat == "open":
+            if time.monotonic() - o.open_sinds < BRON_RUST_S:
+                o.afgewezen += 1
+                raise BronOpen(f"{bron}: stroomonderbreker open")
+            o.staat = "half_open"
+        if o.staat == "half_open":
+            if o.proef:
+                o.afgewezen += 1
+                raise BronOpen(f"{bron}: proef loopt")
+            o.proef = True
+            return True
+        return False
+
+
+def _uitslag(bron: str, proef: bool, gelukt: Optional[bool]) -> None:
+    """gelukt: True = bron antwoordde, False = storing, None = telt niet mee."""
+    with _LOCK:
+        o = _ONDERBREKERS[bron]
+        if proef:
+            o.proef = False
+        if gelukt is None:
+            return
+        if gelukt:
+            if o.staat != "dicht":
+                print(f"[BRON] {bron}: hersteld, stroomonderbreker dicht")
+            o.staat, o.fouten = "dicht", 0
+            return
+        o.fouten += 1
+        if proef or (o.staat == "dicht" and o.fouten >= BRON_DREMPEL):
+            if o.staat == "dicht":
+                o.keer_geopend += 1
+                print(f"[BRON] {bron}: {o.fouten} storingen op rij, stroomonderbreker open")
+            o.staat, o.open_sinds = "open", time.monotonic()
+
+
+@contextmanager
+def bewaakt(bron: str) -> Iterator[None]:
+    """Blok rond één lookup naar `bron`; zie de moduledocstring."""
+    if BRON_DREMPEL <= 0:
+        yield
+        return
+    proef = _toegang(bron)
+    try:
+        yield
+    except BronStoring:
+        _uitslag(bron, proef, False)
+        raise
+    except BaseException:
+        _uitslag(bron, proef, None)
+        raise
+    _uitslag(bron, proef, True)
+
+
+def onderbrekers() -> Dict[str, Dict[str, Any]]:
+    """Stand per bron (voor /api/health)."""
+    nu = time.monotonic()
+    with _LOCK:
+        uit: Dict[str, Dict[str, Any]] = {}
+        for bron, o in sorted(_ONDERBREKERS.items()):
+            rij: Dict[str, Any] = {"staat": o.staat, "fouten_op_rij": o.fouten,
+                                   "keer_geopend": o.keer_geopend, "afgewezen": o.afgewezen}
+            if o.staat == "open":
+                rij["proef_over_s"] = round(max(0.0, BRON_RUST_S - (nu - o.open_sinds)), 1)
+            uit[bron] = rij
+        return uit
+
+
+# ───────────────────── status
+def status() -> Dict[str, Dict[str, Any]]:
+    """Tellers per host (voor /api/health)."""
+    with _LOCK:
+        uit: Dict[str, Dict[str, Any]] = {}
+        for h, t in sorted(_TELLERS.items()):
+            rij: Dict[str, Any] = {k: int(v) for k, v in t.items() if k != "wachttijd_s"}
+            rij["wachttijd_s"] = round(t["wachttijd_s"], 3)
+            lopend = list(_LOPEND) + [s for per_loop in _LOPEND_ASYNC.values() for s in per_loop]
+            rij["lopend"] = sum(1 for s in lopend if _sleutel_host(s) == h)
+            uit[h] = rij
+        return uit
+
+
+@metrics.verzamelaar
+def _metrics() -> List[metrics.Familie]:
+    """Tellers per host en de onderbrekers per bron in de vorm van /api/metrics."""
+    hosts = status()
+    bronnen = onderbrekers()
+
+    def _per_host(veld: str) -> List[Tuple[Dict[str, str], float]]:
+        return [({"host": h}, rij[veld]) for h, rij in hosts.items()]
+    return [
+        ("plantwijs_upstream_host_requests_total", "counter",
+         "Verstuurde aanvragen per externe host.", _per_host("aanvragen")),
+        ("plantwijs_upstream_coalesced_total", "counter",
+         "Lookups die meeliftten op een identieke lopende aanvraag.", _per_host("samengevoegd")),
+        ("plantwijs_upstream_throttled_total", "counter",
+         "Aanvragen die op de limiet per host moesten wachten.", _per_host("gewacht")),
+        ("plantwijs_upstream_rejected_total", "counter",
+         "Aanvragen geweigerd omdat de wachttijd te lang werd.", _per_host("geweigerd")),
+        ("plantwijs_upstream_wait_seconds_total", "counter",
+         "Totale wachttijd op de limiet per host.", _per_host("wachttijd_s")),
+        ("plantwijs_upstream_in_flight", "gauge",
+         "Lopende aanvragen per host.", _per_host("lopend")),
+        ("plantwijs_breaker_open", "gauge",
+         "Stroomonderbreker per bron: 1 als hij open of half open staat.",
+         [({"bron": b}, int(rij["staat"] != "dicht")) for b, rij in bronnen.items()]),
+        ("plantwijs_breaker_opened_total", "counter",
+         "Keren dat de onderbreker van een bron openging.",
+         [({"bron": b}, rij["keer_geopend"]) for b, rij in bronnen.items()]),
+        ("plantwijs_breaker_rejected_total", "counter",
+         "Lookups overgeslagen omdat de onderbreker open stond.",
+         [({"bron": b}, rij["afgewezen"]) for b, rij in bronnen.items()]),
+    ]
+
+
+def reset() -> None:
+    """Emmers, tellers en onderbrekers leegmaken (tests)."""
+    with _LOCK:
+        _EMMERS.clear()
+        _TELLERS.clear()
+        _ONDERBREKERS.clear()
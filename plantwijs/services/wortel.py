@@ -15,7 +15,12 @@ vertaling van ruwe kaartwaarden naar de tokens die het bestand gebruikt
 (bijvoorbeeld "Zware klei" → `zware_klei`, "VIo" → `vio`), en dat gebeurt
 generiek op basis van de tokens die in het bestand voorkomen.
 
-Het bestand wordt gecachet met een mtime-controle, net als context.py.
+Het bestand komt uit de contentbundel (services/content.py), net als bij context.py.
+Per versie wordt het één keer gecompileerd tot een beslistabel (`_Tabel`):
+bodem x Gt → regel als dict, de mediane terugvalregel per losse bodem of Gt,
+en een index van de trefwoorden en codes van de NSN-modifiers. `bepaal()` is
+daarna een handvol dict-lookups; de uitkomst is gelijk aan het stapsgewijs
+doorlopen van de regels (zie tests/test_wortel.py).
 """
 
 from __future__ import annotations
@@ -25,13 +30,12 @@ import re
 import threading
 from typing import Any, Dict, List, Optional, Tuple
 
-import yaml
-
 from ..config import CONTENT_DIR
+from . import content
 
 WORTEL_YAML_PATH = os.path.join(CONTENT_DIR, "wortelbare_diepte.yaml")
 
-_CACHE: Dict[str, Any] = {"data": None, "mtime": None, "path": None}
+_CACHE: Dict[str, Any] = {"data": None, "raw": None, "tabel": None}
 _LOCK = threading.Lock()
 
 # Romeinse Gt-basis, langste eerst zodat "viii" vóór "vi" en "v" wordt herkend.
@@ -58,65 +62,151 @@ def _opsomming(tokens: List[Any]) -> str:
 
 # ───────────────────── laden + cachen
 def _data() -> Dict[str, Any]:
-    path = WORTEL_YAML_PATH
-    try:
-        mtime = os.path.getmtime(path)
-    except OSError:
-        mtime = None
-
-    if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+    raw = content.yaml_inhoud(WORTEL_YAML_PATH)
+    if _CACHE["data"] is not None and _CACHE["raw"] is raw:
         return _CACHE["data"]
 
     with _LOCK:
-        if _CACHE["data"] is not None and _CACHE["mtime"] == mtime and _CACHE["path"] == path:
+        if _CACHE["data"] is not None and _CACHE["raw"] is raw:
             return _CACHE["data"]
-        data: Dict[str, Any] = {}
-        if mtime is None:
-            print(f"[WORTEL] ontbreekt: {path}")
-        else:
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    raw = yaml.safe_load(f) or {}
-                data = raw.get("wortelbare_diepte") or {}
-            except Exception as e:
-                print("[WORTEL] fout bij laden:", e)
-                data = {}
-        _CACHE.update({"data": data, "mtime": mtime, "path": path})
+        try:
+            data = (raw or {}).get("wortelbare_diepte") or {}
+        except Exception as e:
+            print("[WORTEL] fout bij laden:", e)
+            data = {}
+        try:
+            tabel = _Tabel(data)
+        except Exception as e:
+            print("[WORTEL] regels niet te compileren:", e)
+            data, tabel = {}, _Tabel({})
+        _CACHE.update({"data": data, "raw": raw, "tabel": tabel})
     return _CACHE["data"]
 
 
+def _tabel() -> "_Tabel":
+    _data()
+    return _CACHE["tabel"] or _Tabel({})
+
+
 def reload_cache() -> None:
     with _LOCK:
-        _CACHE.update({"data": None, "mtime": None, "path": None})
+        _CACHE.update({"data": None, "raw": None, "tabel": None})
+    content.herlaad()
 
 
 def _regels() -> List[dict]:
-    return list(((_data().get("basisregels_bodem_gt") or {}).get("regels")) or [])
+    return list(_tabel().regels)
 
 
 def _klassen() -> Dict[str, dict]:
-    return dict(_data().get("klassen") or {})
+    return dict(_tabel().klassen)
 
 
 def _klasse_orde() -> List[str]:
-    orde = ((_data().get("nsn_modifiers") or {}).get("klasse_orde")) or []
-    return [str(k) for k in orde] or list(_klassen().keys())
+    return list(_tabel().klasse_orde)
 
 
 def _modifiers() -> List[dict]:
-    return list(((_data().get("nsn_modifiers") or {}).get("regels")) or [])
+    return [rule for _t, _c, rule in _tabel().modifiers]
+
+
+# ───────────────────── gecompileerde beslistabel
+class _Tabel:
+    """Het YAML-bestand, één keer vertaald naar lookups.
+
+    - `per_paar`: (bodem-token, gt-token) → de eerste regel in bestandsvolgorde;
+    - `mediaan_bodem` / `mediaan_gt`: de mediane regel per losse invoer;
+    - `modifiers`: per regel de voorberekende trefwoorden en codes;
+    - memo's voor ruwe invoer → token en NSN-label → modifier.
+    """
+
+    MEMO_MAX = 4096
+
+    def __init__(self, data: Dict[str, Any]):
+        mods = data.get("nsn_modifiers") or {}
+        self.regels: List[dict] = [
+            r for r in (((data.get("basisregels_bodem_gt") or {}).get("regels")) or [])
+            if isinstance(r, dict)]
+        self.klassen: Dict[str, dict] = dict(data.get("klassen") or {})
+        self.klasse_orde: List[str] = [str(k) for k in (mods.get("klasse_orde") or [])] \
+            or list(self.klassen.keys())
+        self.orde_index: Dict[str, int] = {}
+        for i, k in enumerate(self.klasse_orde):
+            self.orde_index.setdefault(k, i)
+        self.opmerking = str((data.get("meta") or {}).get("opmerking") or "").strip()
+
+        # tokens per regel (één keer), en de unieke tokens in bestandsvolgorde
+        per_regel = [([_token(b) for b in (r.get("bodem") or [])],
+                      [_token(g) for g in (r.get("gt") or [])]) for r in self.regels]
+        self.tokens: Dict[str, List[str]] = {"bodem": [], "gt": []}
+        for bodems, gts in per_regel:
+            for veld, lijst in (("bodem", bodems), ("gt", gts)):
+                for t in lijst:
+                    if t and t not in self.tokens[veld]:
+                        self.tokens[veld].append(t)
+        self.token_set = {veld: set(lijst) for veld, lijst in self.tokens.items()}
+
+        self.per_paar: Dict[Tuple[str, str], dict] = {}
+        met: Dict[str, Dict[str, List[dict]]] = {"bodem": {}, "gt": {}}
+        for r, (bodems, gts) in zip(self.regels, per_regel):
+            for b in bodems:
+                if not b:
+                    continue
+                for g in gts:
+                    if g:
+                        self.per_paar.setdefault((b, g), r)
+            for veld, lijst in (("bodem", bodems), ("gt", gts)):
+                for t in dict.fromkeys(lijst):
+                    met[veld].setdefault(t, []).append(r)
+        self.met = met
+        self.mediaan = {veld: {t: self._mediaan(rs) for t, rs in per.items()}
+                        for veld, per in met.items()}
+
+        # Gt zonder (bekende) lettersuffix: eerste token met dezelfde romeinse basis
+        self.gt_basis: Dict[str, str] = {}
+        for k in self.tokens["gt"]:
+            mk = _ROMAN_RE.match(k)
+            if mk:
+                self.gt_basis.setdefault(mk.group(1), k)
+        self.bodem_teksten = [(_leesbaar(k), k) for k in self.tokens["bodem"] if _leesbaar(k)]
+
+        self.modifiers: List[Tuple[List[str], set, dict]] = []
+        for rule in (mods.get("regels") or []):
+            if isinstance(rule, dict):
+                trefwoorden, codes = _modifier_sleutels(rule)
+                self.modifiers.append((trefwoorden, set(codes), rule))
+
+        self.memo: Dict[Tuple[str, str], Any] = {}
+
+    def _mediaan(self, regels: List[dict]) -> Optional[dict]:
+        """Kies uit meerdere kandidaat-regels de middelste klasse.
+
+        Wordt gebruikt als maar één van beide invoerwaarden bekend is (of als de
+        combinatie bodem x Gt niet in het bestand staat): niet de gunstigste en
+        niet de ongunstigste uitkomst, maar het midden.
+        """
+        if not regels:
+            return None
+        n = len(self.klasse_orde)
+        gesorteerd = sorted(regels, key=lambda r: self.orde_index.get(str(r.get("klasse") or ""), n))
+        return gesorteerd[len(gesorteerd) // 2]
+
+    def onthoud(self, soort: str, sleutel: str, bereken) -> Any:
+        try:
+            return self.memo[(soort, sleutel)]
+        except KeyError:
+            pass
+        waarde = bereken()
+        if len(self.memo) >= self.MEMO_MAX:
+            self.memo.clear()
+        self.memo[(soort, sleutel)] = waarde
+        return waarde
 
 
 # ───────────────────── invoer → tokens uit het bestand
 def _alle_tokens(veld: str) -> List[str]:
     """Alle unieke waarden die in de basisregels onder `veld` voorkomen."""
-    uit: List[str] = []
-    for r in _regels():
-        for t in r.get(veld) or []:
-            t = _token(t)
-            if t and t not in uit:
-                uit.append(t)
-    return uit
+    return list(_tabel().tokens.get(veld) or [])
 
 
 def bodem_token(bodem: Any) -> Optional[str]:
@@ -127,16 +217,20 @@ def bodem_token(bodem: Any) -> Optional[str]:
     token dat als tekst in de omschrijving voorkomt (zodat "zware klei" wint
     van "klei").
     """
-    tokens = _alle_tokens("bodem")
-    if not tokens:
+    tabel = _tabel()
+    if not tabel.tokens["bodem"]:
         return None
-    t = _token(bodem)
-    if not t:
+    tekst = _norm(bodem)
+    if not tekst:
         return None
-    if t in tokens:
+    return tabel.onthoud("bodem", tekst, lambda: _bodem_token(tabel, tekst))
+
+
+def _bodem_token(tabel: _Tabel, tekst: str) -> Optional[str]:
+    t = _token(tekst)
+    if t in tabel.token_set["bodem"]:
         return t
-    tekst = _norm(bodem)
-    kandidaten = [k for k in tokens if _leesbaar(k) and _leesbaar(k) in tekst]
+    kandidaten = [k for leesbaar, k in tabel.bodem_teksten if leesbaar in tekst]
     if kandidaten:
         return max(kandidaten, key=lambda k: len(k))
     return None
@@ -144,59 +238,27 @@ def bodem_token(bodem: Any) -> Optional[str]:
 
 def gt_token(gt_code: Any) -> Optional[str]:
     """Zet een Gt-code (bijv. "VIo", "IIIb", "VI") om naar een token uit het bestand."""
-    tokens = _alle_tokens("gt")
-    if not tokens:
+    tabel = _tabel()
+    if not tabel.tokens["gt"]:
         return None
     t = _token(gt_code)
     if not t:
         return None
-    if t in tokens:
+    if t in tabel.token_set["gt"]:
         return t
     m = _ROMAN_RE.match(t)
     if not m:
         return None
-    basis = m.group(1)
-    # Zonder (of met onbekende) letter-suffix: pak het eerste token met dezelfde
+    # Zonder (of met onbekende) letter-suffix: het eerste token met dezelfde
     # romeinse basis in bestandsvolgorde.
-    for k in tokens:
-        mk = _ROMAN_RE.match(k)
-        if mk and mk.group(1) == basis:
-            return k
-    return None
+    return tabel.gt_basis.get(m.group(1))
 
 
 # ───────────────────── basisregel kiezen
 def _regel_voor(bodem_t: Optional[str], gt_t: Optional[str]) -> Optional[dict]:
-    for r in _regels():
-        bodems = [_token(b) for b in (r.get("bodem") or [])]
-        gts = [_token(g) for g in (r.get("gt") or [])]
-        if bodem_t and gt_t:
-            if bodem_t in bodems and gt_t in gts:
-                return r
-    return None
-
-
-def _mediane_regel(regels: List[dict]) -> Optional[dict]:
-    """Kies uit meerdere kandidaat-regels de middelste klasse.
-
-    Wordt gebruikt als maar één van beide invoerwaarden bekend is (of als de
-    combinatie bodem x Gt niet in het bestand staat): niet de gunstigste en
-    niet de ongunstigste uitkomst, maar het midden.
-    """
-    if not regels:
+    if not (bodem_t and gt_t):
         return None
-    orde = _klasse_orde()
-
-    def idx(r: dict) -> int:
-        k = str(r.get("klasse") or "")
-        return orde.index(k) if k in orde else len(orde)
-
-    gesorteerd = sorted(regels, key=idx)
-    return gesorteerd[len(gesorteerd) // 2]
-
-
-def _regels_met(veld: str, token: str) -> List[dict]:
-    return [r for r in _regels() if token in [_token(v) for v in (r.get(veld) or [])]]
+    return _tabel().per_paar.get((bodem_t, gt_t))
 
 
 # ───────────────────── NSN-modifiers
@@ -239,12 +301,16 @@ def _modifier_voor(nsn: Any) -> Optional[dict]:
     n = _norm(nsn)
     if not n:
         return None
+    tabel = _tabel()
+    return tabel.onthoud("nsn", n, lambda: _zoek_modifier(tabel, n))
+
+
+def _zoek_modifier(tabel: _Tabel, n: str) -> Optional[dict]:
     woorden = set(re.split(r"[^a-z0-9]+", n))
-    for rule in _modifiers():
-        trefwoorden, codes = _modifier_sleutels(rule)
+    for trefwoorden, codes, rule in tabel.modifiers:
         if any(w and w in n for w in trefwoorden):
             return rule
-        if any(c and c in woorden for c in codes):
+        if codes & woorden:
             return rule
     return None
 
@@ -258,12 +324,12 @@ def _split_band(band: Any) -> Optional[Tuple[int, int]]:
 
 
 def _verschuif(klasse: str, stappen: int) -> str:
-    orde = _klasse_orde()
-    if klasse not in orde:
+    tabel = _tabel()
+    if klasse not in tabel.orde_index:
         return klasse
-    i = orde.index(klasse) + int(stappen)
-    i = max(0, min(len(orde) - 1, i))
-    return orde[i]
+    i = tabel.orde_index[klasse] + int(stappen)
+    i = max(0, min(len(tabel.klasse_orde) - 1, i))
+    return tabel.klasse_orde[i]
 
 
 # ───────────────────── publieke API
@@ -279,16 +345,35 @@ def bepaal(bodem: Any = None, gt_code: Any = None, nsn: Any = None) -> Optional[
         `{klasse, band_cm, indicatie, toelichting}` of None wanneer er te
         weinig invoer is (géén bodem én géén Gt) of het bestand ontbreekt.
     """
-    if not _regels() or not _klassen():
-        return None
+    return uit_invoer(*invoer(bodem=bodem, gt_code=gt_code, nsn=nsn))
+
+
+def invoer(bodem: Any = None, gt_code: Any = None,
+           nsn: Any = None) -> Tuple[Optional[str], Optional[str], str, Optional[int]]:
+    """Alles waar `bepaal` van afhangt: (bodem-token, gt-token, Gt-label, modifier-index).
 
-    bodem_t = bodem_token(bodem)
-    gt_t = gt_token(gt_code)
+    Ruwe invoer met dezelfde uitkomst hier geeft dezelfde wortelbare diepte;
+    services/kennislaag.py gebruikt dit tuple als sleutel.
+    """
+    mod = _modifier_voor(nsn)
+    mod_i = None
+    if mod is not None:
+        mod_i = next((i for i, (_t, _c, rule) in enumerate(_tabel().modifiers)
+                      if rule is mod), None)
+    return bodem_token(bodem), gt_token(gt_code), str(gt_code or "").strip(), mod_i
+
+
+def uit_invoer(bodem_t: Optional[str], gt_t: Optional[str], gt_label: str,
+               mod_i: Optional[int]) -> Optional[dict]:
+    """`bepaal` voor een al vertaalde invoer (zie `invoer`)."""
+    tabel = _tabel()
+    if not tabel.regels or not tabel.klassen:
+        return None
     if not bodem_t and not gt_t:
         return None
 
     # Voor de toelichting: toon de Gt zoals de kaart hem levert ("VIo"), niet het token.
-    gt_label = str(gt_code or "").strip() or _leesbaar(gt_t).upper()
+    gt_label = gt_label or _leesbaar(gt_t).upper()
 
     regel = _regel_voor(bodem_t, gt_t)
     grondslag: str
@@ -296,12 +381,12 @@ def bepaal(bodem: Any = None, gt_code: Any = None, nsn: Any = None) -> Optional[
         grondslag = f"bodem ({_leesbaar(bodem_t)}) en grondwatertrap ({gt_label})"
     elif gt_t:
         # Gt is de primaire factor in het bestand; die krijgt voorrang.
-        regel = _mediane_regel(_regels_met("gt", gt_t))
+        regel = tabel.mediaan["gt"].get(gt_t)
         grondslag = f"grondwatertrap ({gt_label})"
         if bodem_t:
             grondslag += f"; de combinatie met bodem ({_leesbaar(bodem_t)}) staat niet in de regels"
     else:
-        regel = _mediane_regel(_regels_met("bodem", bodem_t))
+        regel = tabel.mediaan["bodem"].get(bodem_t)
         grondslag = f"bodem ({_leesbaar(bodem_t)}); grondwatertrap onbekend"
 
     if regel is None:
@@ -309,26 +394,26 @@ def bepaal(bodem: Any = None, gt_code: Any = None, nsn: Any = None) -> Optional[
 
     klasse = str(regel.get("klasse") or "")
     band = _split_band(regel.get("wortelbare_diepte_cm")) or \
-        _split_band((_klassen().get(klasse) or {}).get("band_cm"))
+        _split_band((tabel.klassen.get(klasse) or {}).get("band_cm"))
     if band is None:
         return None
     lo, hi = band
 
     # ── stap 3: NSN/BKNSN-modifier
-    mod = _modifier_voor(nsn)
+    mod = tabel.modifiers[mod_i][2] if mod_i is not None else None
     mod_tekst = ""
     if mod:
         effect = mod.get("effect") or {}
         if effect.get("verschuif_klasse"):
             klasse = _verschuif(klasse, effect["verschuif_klasse"])
-            nieuwe_band = _split_band((_klassen().get(klasse) or {}).get("band_cm"))
+            nieuwe_band = _split_band((tabel.klassen.get(klasse) or {}).get("band_cm"))
             if nieuwe_band:
                 lo, hi = nieuwe_band
         lo += int(effect.get("min_cm_plus") or 0)
         hi += int(effect.get("max_cm_plus") or 0)
         mod_tekst = str(mod.get("toelichting") or "").strip()
 
-    klasse_info = _klassen().get(klasse) or {}
+    klasse_info = tabel.klassen.get(klasse) or {}
     indicatie = str(klasse_info.get("indicatie") or "").strip()
 
     # ── stap 4: toelichting samenstellen
@@ -341,9 +426,8 @@ def bepaal(bodem: Any = None, gt_code: Any = None, nsn: Any = None) -> Optional[
         delen.append(f"Aandachtspunten: {maatregelen}.")
     if mod_tekst:
         delen.append(f"Bijstelling vanuit het natuurlijk systeem: {mod_tekst}")
-    opmerking = str((_data().get("meta") or {}).get("opmerking") or "").strip()
-    if opmerking:
-        delen.append(opmerking)
+    if tabel.opmerking:
+        delen.append(tabel.opmerking)
 
     return {
         "klasse": klasse,
@@ -0,0 +1,252 @@
+"""Zoekindex over de soortnamen: `q` op /api/plants en /api/plants/suggest.
+
+Voorheen liep `q` met een `df.apply` per rij door `naam` en
+`wetenschappelijke_naam` (`needle.lower() in tekst.lower()`): geen rangorde,
+geen tikfouten, en "loss" vond geen "löss". Per datasetversie wordt nu één
+keer een index gebouwd:
+
+- velden: `naam`, `nederlandse_naam`, `wetenschappelijke_naam` en de cultivar
+  (de naam tussen aanhalingstekens, "'Greenspire'" → greenspire);
+- vouwen (`vouw`): kleine letters, accenten weg (ö → o), × → x, leestekens en
+  aanhalingstekens worden spaties;
+- een trigram-index (trigram → rijen) voor substring-zoeken: alleen rijen die
+  alle trigrams van de zoekterm bevatten worden nog echt vergeleken;
+- een gesorteerde woordenlijst voor prefix-zoeken met `bisect` (autocomplete);
+- een tikfout-terugval: vindt de substring niets, dan tellen rijen met een
+  woord dat sterk op de zoekterm lijkt ("zomerijk" → Zomereik). De trigrams
+  beperken de kandidaten, `difflib` beslist (`FUZZY_MIN`).
+
+`treffers(q)` geeft de rijen met een score, beste eerst: exacte naam >
+naam begint met q > een woord begint met q > q ergens in de naam > tikfout.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+# (kolom, gewicht): bij gelijke soort treffer wint de Nederlandse naam.
+VELDEN: Tuple[Tuple[str, float], ...] = (
+    ("naam", 1.0),
+    ("nederlandse_naam", 1.0),
+    ("wetenschappelijke_naam", 0.95),
+    ("cultivar", 0.9),
+)
+FUZZY_KANDIDAAT = 0.3    # aandeel gedeelde trigrams om als tikfout-kandidaat mee te tellen
+FUZZY_MIN = 0.75         # minimale gelijkenis (difflib-ratio) voor een tikfout-treffer
+FUZZY_MIN_LENGTE = 4     # kortere zoektermen krijgen geen tikfout-terugval
+SUGGEST_MEMO_MAX = 512
+_WEERGAVE = ("naam", "wetenschappelijke_naam", "nederlandse_naam")
+
+_SCORE_EXACT, _SCORE_BEGIN, _SCORE_WOORD, _SCORE_DEEL, _SCORE_FUZZY = 100, 80, 60, 40, 20
+
+_RE_CULTIVAR = re.compile(r"['‘’\"]([^'‘’\"]+)['‘’\"]")
+_RE_NIET_ALNUM = re.compile(r"[^a-z0-9]+")
+
+_INDEXEN: "OrderedDict[Any, Zoekindex]" = OrderedDict()
+_INDEXEN_MAX = 2
+_LOCK = threading.Lock()
+
+
+def vouw(s: Any) -> str:
+    """Zoekvorm van een tekst: kleine letters, zonder accenten, × → x, alleen [a-z0-9 ]."""
+    t = unicodedata.normalize("NFKD", str(s or "").replace("×", "x"))
+    t = "".join(c for c in t if not unicodedata.combining(c)).lower()
+    return " ".join(_RE_NIET_ALNUM.sub(" ", t).split())
+
+
+def _trigrams(tekst: str) -> Set[str]:
+    return {tekst[i:i + 3] for i in range(len(tekst) - 2)}
+
+
+def _cultivar(naam: Any) -> str:
+    m = _RE_CULTIVAR.search(str(naam or ""))
+    return m.group(1) if m else ""
+
+
+class Zoekindex:
+    """Index over de namen van één dataframe (één datasetversie)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.labels: List[Hashable] = df.index.tolist()
+        kolommen: Dict[str, List[Any]] = {}
+        for kolom, _gewicht in VELDEN:
+            if kolom == "cultivar":
+                bron = df["wetenschappelijke_naam"] if "wetenschappelijke_naam" in df.columns else None
+                kolommen[kolom] = [_cultivar(v) for v in bron] if bron is not None else []
+            elif kolom in df.columns:
+                kolommen[kolom] = df[kolom].tolist()
+        self.velden: List[Tuple[float, List[str]]] = [
+            (gewicht, [vouw(v) for v in kolommen[kolom]])
+            for kolom, gewicht in VELDEN if kolommen.get(kolom)]
+        # wat /api/plants/suggest per treffer teruggeeft
+        weergave = {k: [("" if pd.isna(v) else str(v)) for v in kolommen.get(k) or
+                        [""] * len(self.labels)] for k in _WEERGAVE}
+        self.weergave: List[Dict[str, str]] = [
+            {k: weergave[k][i] for k in _WEERGAVE} for i in range(len(self.labels))]
+
+        self.trigrams: Dict[str, Set[int]] = {}
+        woorden: Set[Tuple[str, int]] = set()
+        for _gewicht, teksten in self.velden:
+            for doc, tekst in enumerate(teksten):
+                if not tekst:
+                    continue
+                for tri in _trigrams(f" {tekst} "):
+                    self.trigrams.setdefault(tri, set()).add(doc)
+                for woord in tekst.split():
+                    woorden.add((woord, doc))
+        self.woorden: List[Tuple[str, int]] = sorted(woorden)
+        self._memo: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    # ───────────────────── kandidaten
+    def _met_prefix(self, woord: str) -> Set[int]:
+        """Rijen met een woord dat met `woord` begint (bisect op de woordenlijst)."""
+        i = bisect.bisect_left(self.woorden, (woord, -1))
+        docs: Set[int] = set()
+        while i < len(self.woorden) and self.woorden[i][0].startswith(woord):
+            docs.add(self.woorden[i][1])
+            i += 1
+        return docs
+
+    def _kandidaten(self, q: str) -> Optional[Set[int]]:
+        """Rijen die alle trigrams van q bevatten; None = te kort, alles bekijken."""
+        if len(q) < 3:
+            return None
+        kandidaten: Optional[Set[int]] = None
+        for tri in sorted(_trigrams(q), key=lambda t: len(self.trigrams.get(t, ()))):
+            docs = self.trigrams.get(tri)
+            if not docs:
+                return set()
+            kandidaten = set(docs) if kandidaten is None else kandidaten & docs
+            if not kandidaten:
+                return kandidaten
+        return kandidaten
+
+    def _score(self, doc: int, q: str) -> float:
+        beste = 0.0
+        for gewicht, teksten in self.velden:
+            tekst = teksten[doc]
+            if not tekst or q not in tekst:
+                continue
+            if tekst == q:
+                s = _SCORE_EXACT
+            elif tekst.startswith(q):
+                s = _SCORE_BEGIN
+            elif f" {q}" in f" {tekst}":
+                s = _SCORE_WOORD
+            else:
+                s = _SCORE_DEEL
+            beste = max(beste, s * gewicht)
+        return beste
+
+    def _fuzzy(self, q: str) -> Dict[int, float]:
+        """Tikfouten: rijen met een woord (of naam) dat sterk op q lijkt.
+
+        De trigrams beperken de kandidaten (minstens `FUZZY_KANDIDAAT` gedeeld);
+        daarna telt de gelijkenis met `difflib` (≥ `FUZZY_MIN`).
+        """
+        tris = _trigrams(f" {q} ")
+        telling: Dict[int, int] = {}
+        for tri in tris:
+            for doc in self.trigrams.get(tri, ()):
+                telling[doc] = telling.get(doc, 0) + 1
+        scores: Dict[int, float] = {}
+        for doc, n in telling.items():
+            if n / len(tris) < FUZZY_KANDIDAAT:
+                continue
+            beste = 0.0
+            for gewicht, teksten in self.velden:
+                tekst = teksten[doc]
+                if not tekst:
+                    continue
+                vergelijk = [tekst] if " " in q else tekst.split()
+                for woord in vergelijk:
+                    beste = max(beste, gewicht * SequenceMatcher(None, q, woord).ratio())
+            if beste >= FUZZY_MIN:
+                scores[doc] = _SCORE_FUZZY * beste
+        return scores
+
+    # ───────────────────── publiek
+    def treffers(self, q: Any, fuzzy: bool = True) -> List[Tuple[Hashable, float]]:
+        """(rijlabel, score) van alle treffers, beste eerst.
+
+        Elke rij waarin de (gevouwen) zoekterm ergens in een naam staat telt mee,
+        net als bij het oude substring-filter. Alleen als dat niets oplevert en
+        `fuzzy` aan staat, volgen de rijen die op een tikfout na overeenkomen.
+        """
+        qv = vouw(q)
+        if not qv:
+            return [(lbl, 0.0) for lbl in self.labels]
+        scores = self._substring(qv)
+        if not scores and fuzzy and len(qv) >= FUZZY_MIN_LENGTE:
+            scores = self._fuzzy(qv)
+        return [(self.labels[d], scores[d]) for d in self._rangorde(scores)]
+
+    def suggesties(self, q: Any, limit: int = 10) -> List[Dict[str, Any]]:
+        """Autocomplete: de beste `limit` namen voor een (begin van een) zoekterm."""
+        qv = vouw(q)
+        if not qv:
+            return []
+        sleutel = (qv, limit)
+        with self._memo_lock:
+            if sleutel in self._memo:
+                self._memo.move_to_end(sleutel)
+                return [dict(s) for s in self._memo[sleutel]]
+
+        if " " not in qv:
+            # één woord: prefix via bisect, aangevuld met substring-treffers
+            docs = self._met_prefix(qv)
+            scores = {doc: self._score(doc, qv) for doc in docs}
+            if len(scores) < limit:
+                scores = {**self._substring(qv), **scores}
+        else:
+            scores = self._substring(qv)
+        if not scores and len(qv) >= FUZZY_MIN_LENGTE:
+            scores = self._fuzzy(qv)
+        uit = [dict(self.weergave[d], score=round(scores[d], 1))
+               for d in self._rangorde(scores)[:limit]]
+        with self._memo_lock:
+            self._memo[sleutel] = uit
+            while len(self._memo) > SUGGEST_MEMO_MAX:
+                self._memo.popitem(last=False)
+        return [dict(s) for s in uit]
+
+    def _substring(self, qv: str) -> Dict[int, float]:
+        kandidaten = self._kandidaten(qv)
+        docs = range(len(self.labels)) if kandidaten is None else kandidaten
+        return {doc: s for doc in docs if (s := self._score(doc, qv)) > 0}
+
+    def _rangorde(self, scores: Dict[int, float]) -> List[int]:
+        """Hoogste score eerst; daarna de kortste naam, dan alfabetisch."""
+        return sorted(scores, key=lambda d: (-scores[d], len(self.weergave[d]["naam"]),
+                                             self.weergave[d]["naam"], d))
+
+
+def index_voor(df: pd.DataFrame, versie: Any = None) -> Zoekindex:
+    """De index voor `df`; met een `versie` wordt hij per versie bewaard."""
+    if versie is None:
+        return Zoekindex(df)
+    with _LOCK:
+        index = _INDEXEN.get(versie)
+        if index is not None:
+            _INDEXEN.move_to_end(versie)
+            return index
+    index = Zoekindex(df)
+    with _LOCK:
+        _INDEXEN[versie] = index
+        while len(_INDEXEN) > _INDEXEN_MAX:
+            _INDEXEN.popitem(last=False)
+    return index
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _INDEXEN.clear()
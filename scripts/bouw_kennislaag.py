@@ -0,0 +1,39 @@
+# bouw_kennislaag.py
+# Doel: de kennislaag van /advies/geo (landschap, wortelbare diepte,
+# aanbevolen beplanting) vooraf uitrekenen voor alle bereikbare kaartklassen,
+# zodat de API per advies één opzoekactie doet in plaats van tientallen
+# functieaanroepen. Zie plantwijs/services/kennislaag.py.
+#
+# Gebruik (vanuit de projectroot, na elke wijziging in content/):
+#   python scripts/bouw_kennislaag.py            # schrijft out/kennislaag.json
+#   python scripts/bouw_kennislaag.py pad.json   # of naar een eigen pad
+# Het pad dat de API leest is in te stellen met PLANTWIJS_KENNISLAAG_PAD.
+#
+# Vergeten te draaien is niet erg: hoort het bestand bij een andere
+# contentversie, dan rekent de API alles gewoon live uit.
+#
+# Locatie: <projectroot>/scripts/. Het script bepaalt de projectroot zelf, dus
+# het werkt vanuit elke map.
+
+import os
+import sys
+import time
+
+# Dit bestand staat in <projectroot>/scripts/ ⇒ één niveau omhoog is de projectroot.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.config import KENNISLAAG_PAD  # noqa: E402
+from plantwijs.services import kennislaag  # noqa: E402
+
+
+def main() -> None:
+    pad = sys.argv[1] if len(sys.argv) > 1 else KENNISLAAG_PAD
+    t0 = time.time()
+    laag = kennislaag.schrijf(pad)
+    print(f"[KENNISLAAG] {pad} geschreven in {time.time() - t0:.1f} s "
+          f"(contentversie {laag['versie']}, {len(laag['beplanting'])} combinaties, "
+          f"{len(laag['adviezen'])} unieke adviezen, {os.path.getsize(pad) // 1024} kB)")
+
+
+if __name__ == "__main__":
+    main()
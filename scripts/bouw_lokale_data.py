@@ -0,0 +1,139 @@
+# bouw_lokale_data.py
+# Doel: kaarten van PDOK/BRO één keer omzetten naar lokale bestanden, zodat
+# /advies/geo bodem, AHN, GMM en Gt zonder WMS-rondes kan opzoeken (zie
+# plantwijs/services/lokaal.py). Handig voor bulk- en batchwerk.
+#
+# Gebruik (vanuit de projectroot):
+#   python scripts/bouw_lokale_data.py raster gt   gt.asc             # Gt (ordinale codes 1..19)
+#   python scripts/bouw_lokale_data.py raster glg  glg.tif            # GLG in cm
+#   python scripts/bouw_lokale_data.py raster ahn  ahn_dtm_5m.asc --factor 5   # → 25 m
+#   python scripts/bouw_lokale_data.py polygonen bodem bodemvlakken.geojson
+#   python scripts/bouw_lokale_data.py polygonen gmm   gmm.geojson --wgs84
+#
+# Invoer:
+#   - rasters als ESRI ASCII grid (.asc) of, als `rasterio` is geïnstalleerd,
+#     als GeoTIFF; altijd in RD (EPSG:28992). `--factor N` verkleint N×N cellen
+#     tot één (gemiddelde; voor gt de middelste cel, want dat zijn klassen);
+#   - polygonen als GeoJSON, in RD of met `--wgs84` in graden. Zet een
+#     GeoPackage van PDOK eerst om, bijv.:
+#       ogr2ogr -f GeoJSON -t_srs EPSG:28992 bodemvlakken.geojson bodemkaart.gpkg soilarea
+#     De properties blijven bewaard; de API leest ze met dezelfde regels als
+#     de WMS-antwoorden (bijv. `first_soilname` voor de bodem).
+#
+# De bestanden komen in PLANTWIJS_LOKAAL_DIR (standaard data/lokaal). Na het
+# bouwen de API herstarten; /api/health toont onder `lokale_data` per bron of
+# hij lokaal of via de WMS gaat.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Dit bestand staat in <projectroot>/scripts/ ⇒ één niveau omhoog is de projectroot.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.config import LOKAAL_DIR, TX_WGS84_RD  # noqa: E402
+from plantwijs.services import lokaal  # noqa: E402
+
+
+def lees_asc(pad: str):
+    """ESRI ASCII grid → (array, x0, y0, cel, nodata); (x0, y0) = linkerbovenhoek."""
+    kop = {}
+    with open(pad, "r", encoding="ascii") as f:
+        for _ in range(6):
+            sleutel, waarde = f.readline().split()[:2]
+            kop[sleutel.lower()] = float(waarde)
+        data = np.loadtxt(f, dtype=np.float32)
+    cel = kop["cellsize"]
+    x0 = kop.get("xllcorner", kop.get("xllcenter", 0.0) - cel / 2)
+    yll = kop.get("yllcorner", kop.get("yllcenter", 0.0) - cel / 2)
+    return data, x0, yll + data.shape[0] * cel, cel, kop.get("nodata_value")
+
+
+def lees_geotiff(pad: str):
+    try:
+        import rasterio  # optioneel: alleen nodig voor GeoTIFF-invoer
+    except ImportError:
+        sys.exit("GeoTIFF-invoer vraagt om `pip install rasterio`; of zet het raster om naar .asc")
+    with rasterio.open(pad) as bron:
+        t = bron.transform
+        return bron.read(1), t.c, t.f, t.a, bron.nodata
+
+
+def verklein(data: np.ndarray, factor: int, nodata, klassen: bool) -> np.ndarray:
+    """N×N cellen → één: het gemiddelde, of voor klassen de middelste cel."""
+    if factor <= 1:
+        return data
+    h, b = (data.shape[0] // factor) * factor, (data.shape[1] // factor) * factor
+    data = data[:h, :b]
+    if klassen:
+        return np.ascontiguousarray(data[factor // 2::factor, factor // 2::factor])
+    blokken = data.astype(np.float32).reshape(h // factor, factor, b // factor, factor)
+    if nodata is not None:
+        blokken = np.where(blokken == nodata, np.nan, blokken)
+    with np.errstate(invalid="ignore"):
+        uit = np.nanmean(blokken, axis=(1, 3))
+    return uit.astype(np.float32)
+
+
+def bouw_raster(naam: str, pad: str, factor: int) -> None:
+    data, x0, y0, cel, nodata = (lees_geotiff if pad.lower().endswith((".tif", ".tiff"))
+                                 else lees_asc)(pad)
+    klassen = naam == "gt"
+    data = verklein(data, factor, nodata, klassen)
+    if klassen:
+        data = np.where(data == nodata, 0, data).astype(np.uint8) if nodata is not None \
+            else data.astype(np.uint8)
+        nodata = 0
+    elif factor > 1:
+        nodata = None   # na het middelen staat "geen waarde" als NaN in het raster
+    uit = lokaal.schrijf_raster(naam, data, x0, y0, cel * max(1, factor), nodata,
+                                bron=os.path.basename(pad))
+    print(f"[LOKAAL] {naam}: {data.shape[1]}×{data.shape[0]} cellen van "
+          f"{cel * max(1, factor):g} m → {uit} ({os.path.getsize(uit) // 1024 // 1024} MB)")
+
+
+def _naar_rd(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        return list(TX_WGS84_RD.transform(coords[0], coords[1]))
+    return [_naar_rd(c) for c in coords]
+
+
+def bouw_polygonen(naam: str, pad: str, wgs84: bool) -> None:
+    with open(pad, "r", encoding="utf-8") as f:
+        features = json.load(f).get("features") or []
+    if wgs84:
+        for ft in features:
+            geom = ft.get("geometry") or {}
+            if geom.get("coordinates"):
+                geom["coordinates"] = _naar_rd(geom["coordinates"])
+    uit, n = lokaal.schrijf_polygonen(naam, features, bron=os.path.basename(pad))
+    print(f"[LOKAAL] {naam}: {n} vlakken → {uit} ({os.path.getsize(uit) // 1024} kB)")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Lokale kaartdata bouwen (zie de kop van dit script).")
+    sub = p.add_subparsers(dest="soort", required=True)
+    r = sub.add_parser("raster")
+    r.add_argument("naam", choices=lokaal.RASTERS)
+    r.add_argument("pad")
+    r.add_argument("--factor", type=int, default=1, help="N×N cellen samenvoegen tot één")
+    v = sub.add_parser("polygonen")
+    v.add_argument("naam", choices=lokaal.POLYGONEN)
+    v.add_argument("pad")
+    v.add_argument("--wgs84", action="store_true", help="coördinaten zijn lon/lat (EPSG:4326)")
+    args = p.parse_args()
+
+    t0 = time.time()
+    if args.soort == "raster":
+        bouw_raster(args.naam, args.pad, args.factor)
+    else:
+        bouw_polygonen(args.naam, args.pad, args.wgs84)
+    print(f"[LOKAAL] klaar in {time.time() - t0:.1f} s; map: {LOKAAL_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import os
 import sys
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import pytest
@@ -166,11 +167,110 @@ def test_score_sorteert_aflopend():
     }
     gekozen = advies_service.aanbevolen_beplanting_voor_ids(ids)
     per_naam = {v.get("naam"): v for v in advies_service._vormen()}
-    scores = [advies_service._score(per_naam[v["vorm"]], ids)[0] for v in gekozen]
+    scores = [_score(per_naam[v["vorm"]], ids)[0] for v in gekozen]
     assert scores == sorted(scores, reverse=True)
     assert scores[0] >= 3
 
 
+def _score(vorm: dict, ids: Dict[str, Optional[str]]) -> Tuple[int, List[str]]:
+    """Referentie: gewogen score + de categorieën die de treffer opleverden."""
+    past = vorm.get("past_bij") or {}
+    treffers: List[str] = []
+    score = 0
+    for cat in advies_service.SCORE_CATEGORIEEN:
+        eid = ids.get(cat)
+        if not eid or eid == "onbekend":
+            continue
+        if eid in advies_service._lijst(past.get(cat)):
+            treffers.append(cat)
+            score += advies_service._WEGING[cat]
+    return score, treffers
+
+
+def _vocht_conflict(vorm: dict, ids: Dict[str, Optional[str]]) -> bool:
+    """Referentie: vochtvoorkeur, bekende vochtklasse en die klasse staat er niet bij."""
+    eis = advies_service._vocht_eis(vorm)
+    return bool(eis) and advies_service._vocht_bekend(ids) and ids.get("vocht") not in eis
+
+
+def _vocht_rangorde(vorm: dict, ids: Dict[str, Optional[str]]) -> int:
+    """Referentie: tie-break bij onbekend vocht, 1 voor vormen mét een vochtvoorkeur."""
+    if advies_service._vocht_bekend(ids):
+        return 0
+    return 1 if advies_service._vocht_eis(vorm) else 0
+
+
+def _aanbevolen_lineair(ids: Dict[str, Optional[str]]) -> List[dict]:
+    """Referentie: de ranking per aanroep opnieuw, direct uit de regels van de service."""
+    vormen = advies_service._vormen()
+    if not vormen:
+        return []
+
+    conflict = {i: _vocht_conflict(v, ids) for i, v in enumerate(vormen)}
+
+    gescoord: List[Tuple[int, int, int, dict, List[str]]] = []
+    for i, v in enumerate(vormen):
+        if conflict[i]:
+            continue  # vraagt om ander vocht dan deze plek heeft
+        score, treffers = _score(v, ids)
+        if score > 0:
+            gescoord.append((score, _vocht_rangorde(v, ids), i, v, treffers))
+    # score desc, dan vormen zonder onbewezen vochtclaim, dan bestandsvolgorde
+    gescoord.sort(key=lambda t: (-t[0], t[1], t[2]))
+
+    gekozen = [(v, tr) for _s, _r, _i, v, tr in gescoord[:advies_service.MAX_VORMEN]]
+
+    if len(gekozen) < advies_service.MIN_VORMEN:
+        gekozen_ids = {v.get("id") for v, _ in gekozen}
+        generiek = sorted(
+            enumerate(vormen),
+            key=lambda t: (-advies_service._genericiteit(t[1])[0],
+                           -advies_service._genericiteit(t[1])[1], t[0]),
+        )
+        # Eerst de generieke vormen die niet met het vocht botsen; alleen als er
+        # dan nog te weinig zijn, mogen de conflicterende alsnog aanvullen.
+        for negeer_conflict in (False, True):
+            for i, v in generiek:
+                if len(gekozen) >= advies_service.MIN_VORMEN:
+                    break
+                if v.get("id") in gekozen_ids:
+                    continue
+                if conflict[i] and not negeer_conflict:
+                    continue
+                gekozen.append((v, []))
+                gekozen_ids.add(v.get("id"))
+
+    return [advies_service._vorm_naar_advies(v, tr, ids) for v, tr in gekozen]
+
+
+def test_voorberekende_ranking_gelijk_aan_lineair():
+    """De catalogus levert voor elke id-combinatie hetzelfde als de referentie."""
+    data = ctx._data()
+    keuzes = {cat: [None, "onbekend"] + [e["id"] for e in data.get(cat, [])][:12]
+              for cat in ("fgr", "nsn", "bodem", "vocht")}
+    for fgr in keuzes["fgr"]:
+        for nsn in keuzes["nsn"]:
+            for bodem in keuzes["bodem"][:4]:
+                for vocht in keuzes["vocht"]:
+                    ids = {"fgr": fgr, "nsn": nsn, "bodem": bodem, "vocht": vocht}
+                    assert (advies_service.aanbevolen_beplanting_voor_ids(ids)
+                            == _aanbevolen_lineair(ids)), ids
+
+
+def test_memo_geeft_een_eigen_kopie():
+    """Wijzigen van een uitkomst mag de gememoiseerde versie niet raken."""
+    ids = {"fgr": ctx.entry_id("fgr", "Laagveengebied"), "nsn": None,
+           "bodem": ctx.entry_id("bodem", "veen"), "vocht": ctx.entry_id("vocht", "nat")}
+    eerste = advies_service.aanbevolen_beplanting_voor_ids(ids)
+    eerste[0]["vorm"] = "gewijzigd"
+    eerste[0]["voorbeeldsoorten"].append("gewijzigd")
+    eerste.append({})
+
+    tweede = advies_service.aanbevolen_beplanting_voor_ids(ids)
+    assert tweede == _aanbevolen_lineair(ids)
+    assert advies_service._catalogus().memo  # de tweede aanroep kwam uit het memo
+
+
 # ───────────────────── /advies/geo met gemockte bronnen
 def _mock_bronnen(monkeypatch, *, fgr="Hogere zandgronden", nsn="Dekzandrug",
                   bodem=("zand", {}), gwt=("droog", {}, "VIo"),
@@ -182,12 +282,19 @@ def _mock_bronnen(monkeypatch, *, fgr="Hogere zandgronden", nsn="Dekzandrug",
             return waarde
         return _fn
 
-    monkeypatch.setattr(advies_router, "fgr_from_point", _of_raise(fgr))
+    def _of_raise_async(waarde):
+        fn = _of_raise(waarde)
+
+        async def _afn(*a, **k):
+            return fn(*a, **k)
+        return _afn
+
+    monkeypatch.setattr(advies_router, "fgr_from_point_async", _of_raise_async(fgr))
     monkeypatch.setattr(advies_router, "nsn_from_point", _of_raise(nsn))
-    monkeypatch.setattr(advies_router, "bodem_from_bodemkaart", _of_raise(bodem))
-    monkeypatch.setattr(advies_router, "vocht_from_gwt", _of_raise(gwt))
-    monkeypatch.setattr(advies_router, "ahn_from_wms", _of_raise(ahn))
-    monkeypatch.setattr(advies_router, "gmm_from_wms", _of_raise(gmm))
+    monkeypatch.setattr(advies_router, "bodem_from_bodemkaart_async", _of_raise_async(bodem))
+    monkeypatch.setattr(advies_router, "vocht_from_gwt_async", _of_raise_async(gwt))
+    monkeypatch.setattr(advies_router, "ahn_from_wms_async", _of_raise_async(ahn))
+    monkeypatch.setattr(advies_router, "gmm_from_wms_async", _of_raise_async(gmm))
 
 
 def test_advies_geo_bevat_alle_contractvelden(client: TestClient, monkeypatch):
@@ -226,6 +333,23 @@ def test_advies_geo_bestaande_velden_ongewijzigd(client: TestClient, monkeypatch
     assert "nederlandse_naam" in d["advies"][0]
 
 
+def test_advies_geo_pagineert_de_soortenlijst(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    params = {"lat": 52.078, "lon": 5.89}
+    alles = client.get("/advies/geo", params=params).json()
+    assert alles["next_cursor"] is None
+    assert alles["advies_count"] == len(alles["advies"])
+
+    eerste = client.get("/advies/geo", params=dict(params, limit=10, fields="naam")).json()
+    assert eerste["advies_count"] == alles["advies_count"]
+    assert eerste["advies"] == [{"naam": it["naam"]} for it in alles["advies"][:10]]
+    assert eerste["landschap"] == alles["landschap"]
+
+    tweede = client.get("/advies/geo", params=dict(
+        params, limit=10, fields="naam", cursor=eerste["next_cursor"])).json()
+    assert tweede["advies"] == [{"naam": it["naam"]} for it in alles["advies"][10:20]]
+
+
 def test_advies_geo_lege_bron_geeft_status_leeg(client: TestClient, monkeypatch):
     _mock_bronnen(monkeypatch, gmm=(None, {}), ahn=(None, {}))
     r = client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89})
@@ -370,13 +494,52 @@ def test_soil_from_text(ruw: str, verwacht: str):
 
 def test_bodem_from_bodemkaart_bewaart_de_ruwe_term(monkeypatch):
     monkeypatch.setattr(pdok, "get_wms_meta", lambda: {"bodem": {"layer": "X"}})
-    monkeypatch.setattr(pdok, "_wms_getfeatureinfo",
-                        lambda *_a, **_k: {"first_soilname": "Petgaten"})
+
+    async def _wms(*_a, **_k):
+        return {"first_soilname": "Petgaten"}
+    monkeypatch.setattr(pdok, "_wms_getfeatureinfo_async", _wms)
+    waarde, props = pdok.bodem_from_bodemkaart(52.15, 4.85)
+    assert waarde == "veen"
+    assert props[pdok.RUWE_BODEM_KEY] == "Petgaten"
+
+
+def test_bodem_sync_loopt_via_de_async_lookup(monkeypatch):
+    import httpx
+    from plantwijs.services import httpklient
+
+    antwoord = {"features": [{"properties": {"first_soilname": "Petgaten"}}]}
+    monkeypatch.setattr(pdok, "_WMSMETA", {"bodem": {"layer": "X"}})
+
+    async def _get(*_a, **_k):
+        return httpx.Response(200, json=antwoord)
+    monkeypatch.setattr(httpklient, "get", _get)
+
     waarde, props = pdok.bodem_from_bodemkaart(52.15, 4.85)
     assert waarde == "veen"
     assert props[pdok.RUWE_BODEM_KEY] == "Petgaten"
 
 
+def test_advies_geo_vraagt_bronnen_tegelijk(client: TestClient, monkeypatch):
+    import asyncio
+    import time
+
+    _mock_bronnen(monkeypatch)
+    for naam in ("fgr_from_point_async", "bodem_from_bodemkaart_async", "vocht_from_gwt_async",
+                 "ahn_from_wms_async", "gmm_from_wms_async"):
+        echt = getattr(advies_router, naam)
+
+        async def _traag(*a, _echt=echt, **k):
+            await asyncio.sleep(0.3)
+            return await _echt(*a, **k)
+        monkeypatch.setattr(advies_router, naam, _traag)
+
+    t0 = time.perf_counter()
+    r = client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89})
+    assert r.status_code == 200
+    assert time.perf_counter() - t0 < 1.0   # na elkaar zou 1,5 s zijn
+    assert all(v == "ok" for v in r.json()["bronnen_status"].values())
+
+
 def test_bodem_detail_alleen_bij_afwijkende_kaartterm(client: TestClient, monkeypatch):
     _mock_bronnen(monkeypatch, bodem=("veen", {pdok.RUWE_BODEM_KEY: "Petgaten"}))
     r = client.get("/advies/geo", params={"lat": 52.15, "lon": 4.85})
@@ -20,7 +20,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from plantwijs.main import app  # noqa: E402
 from plantwijs.routers import advies as advies_router  # noqa: E402
-from plantwijs.services import geocode  # noqa: E402
+from plantwijs.services import geocode, upstream  # noqa: E402
 from plantwijs.services.rapport_md import MAX_SOORTEN, rapport_markdown  # noqa: E402
 
 VERWACHTE_KOPPEN = (
@@ -53,23 +53,28 @@ def _mock_bronnen(monkeypatch, *, fgr="Hogere zandgronden", nsn="Dekzandrug",
             return waarde
         return _fn
 
-    monkeypatch.setattr(advies_router, "fgr_from_point", _vast(fgr))
+    def _vast_async(waarde):
+        async def _fn(*_a, **_k):
+            return waarde
+        return _fn
+
+    monkeypatch.setattr(advies_router, "fgr_from_point_async", _vast_async(fgr))
     monkeypatch.setattr(advies_router, "nsn_from_point", _vast(nsn))
-    monkeypatch.setattr(advies_router, "bodem_from_bodemkaart", _vast(bodem))
-    monkeypatch.setattr(advies_router, "vocht_from_gwt", _vast(gwt))
-    monkeypatch.setattr(advies_router, "ahn_from_wms", _vast(ahn))
-    monkeypatch.setattr(advies_router, "gmm_from_wms", _vast(gmm))
+    monkeypatch.setattr(advies_router, "bodem_from_bodemkaart_async", _vast_async(bodem))
+    monkeypatch.setattr(advies_router, "vocht_from_gwt_async", _vast_async(gwt))
+    monkeypatch.setattr(advies_router, "ahn_from_wms_async", _vast_async(ahn))
+    monkeypatch.setattr(advies_router, "gmm_from_wms_async", _vast_async(gmm))
 
 
 def _mock_geocode(monkeypatch, resultaat=GEVONDEN):
     """Vervang de geocoder en houd bij waarmee hij is aangeroepen."""
     aanroepen = []
 
-    def _fn(adres):
+    async def _fn(adres):
         aanroepen.append(adres)
         return dict(resultaat) if resultaat else None
 
-    monkeypatch.setattr(advies_router, "zoek_adres", _fn)
+    monkeypatch.setattr(advies_router, "zoek_adres_async", _fn)
     return aanroepen
 
 
@@ -94,12 +99,12 @@ def test_zoek_adres_parseert_centroide(monkeypatch):
     }]}}
     gebruikt = {}
 
-    def _get(url, **kwargs):
+    async def _get(url, **kwargs):
         gebruikt["url"] = url
         gebruikt["timeout"] = kwargs.get("timeout")
         return _NepResponse(payload)
 
-    monkeypatch.setattr(geocode.requests, "get", _get)
+    monkeypatch.setattr(geocode.httpklient, "get", _get)
     r = geocode.zoek_adres("Loenenseweg 1 Beekbergen")
 
     assert r == {"adres_gevonden": "Loenenseweg 1, 7361 GB Beekbergen",
@@ -113,24 +118,26 @@ def test_zoek_adres_parseert_centroide(monkeypatch):
 
 
 def test_zoek_adres_zonder_treffer_is_none(monkeypatch):
-    monkeypatch.setattr(geocode.requests, "get",
-                        lambda *a, **k: _NepResponse({"response": {"numFound": 0, "docs": []}}))
+    async def _get(*_a, **_k):
+        return _NepResponse({"response": {"numFound": 0, "docs": []}})
+
+    monkeypatch.setattr(geocode.httpklient, "get", _get)
     assert geocode.zoek_adres("xyzonzin123") is None
 
 
 def test_zoek_adres_bij_bronfout_is_none(monkeypatch):
-    def _stuk(*_a, **_k):
+    async def _stuk(*_a, **_k):
         raise RuntimeError("PDOK plat")
 
-    monkeypatch.setattr(geocode.requests, "get", _stuk)
+    monkeypatch.setattr(geocode.httpklient, "get", _stuk)
     assert geocode.zoek_adres("Domplein 1 Utrecht") is None
 
 
 def test_zoek_adres_lege_invoer_doet_geen_request(monkeypatch):
-    def _nooit(*_a, **_k):
+    async def _nooit(*_a, **_k):
         raise AssertionError("er mag geen request gedaan worden")
 
-    monkeypatch.setattr(geocode.requests, "get", _nooit)
+    monkeypatch.setattr(geocode.httpklient, "get", _nooit)
     assert geocode.zoek_adres("   ") is None
 
 
@@ -187,6 +194,28 @@ def test_adres_zonder_match_geeft_404(client: TestClient, monkeypatch):
     assert r.json() == {"error": "adres_niet_gevonden"}
 
 
+def test_geocoder_onbereikbaar_geeft_503(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    monkeypatch.setattr(upstream, "BRON_DREMPEL", 1)
+    monkeypatch.setattr(upstream, "BRON_RUST_S", 3600)
+
+    async def _nooit(*_a, **_k):
+        raise AssertionError("onderbreker open: er mag geen request gedaan worden")
+
+    monkeypatch.setattr(geocode.httpklient, "get", _nooit)
+    upstream.reset()
+    try:
+        with pytest.raises(upstream.BronStoring):
+            with upstream.bewaakt("geocode"):
+                raise upstream.BronStoring("time-out")
+
+        r = client.get("/advies/geo", params={"adres": "Domplein 1 Utrecht"})
+        assert r.status_code == 503
+        assert r.json()["error"] == "bron_onbereikbaar"
+    finally:
+        upstream.reset()
+
+
 @pytest.mark.parametrize("params", [{}, {"lat": 52.078}, {"lon": 5.89}, {"adres": "   "}])
 def test_zonder_bruikbare_locatie_geeft_422(client: TestClient, params: dict):
     r = client.get("/advies/geo", params=params)
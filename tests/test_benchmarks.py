@@ -0,0 +1,75 @@
+"""benchmarks/: de nep-PDOK, het omleiden van externe URL's en de regressiecontrole."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import belasting, bench, nep_upstream  # noqa: E402
+from plantwijs import config  # noqa: E402
+from plantwijs.services import pdok  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def server():
+    s = nep_upstream.start()
+    yield s
+    s.shutdown()
+
+
+def test_upstream_url_omleiden(monkeypatch):
+    url = "https://service.pdok.nl/bzk/bro-bodemkaart/wms/v1_0?service=WMS"
+    assert config.upstream_url(url) == url
+    monkeypatch.setattr(config, "UPSTREAM_OVERRIDE", "http://127.0.0.1:8765")
+    assert config.upstream_url(url) == \
+        "http://127.0.0.1:8765/service.pdok.nl/bzk/bro-bodemkaart/wms/v1_0?service=WMS"
+
+
+def test_nep_upstream_speelt_opnamen_af(server):
+    basis = f"{server.basis}/service.pdok.nl/bzk/bro-bodemkaart/wms/v1_0"
+    params = pdok._featureinfo_params("Bodemvlakken", 52.2, 5.97)
+    r = requests.get(basis, params={**params, "info_format": "application/json"}, timeout=5)
+    props = pdok._featureinfo_props("application/json", r)
+    assert pdok._bodem_uit_props(props)[0] == "Veldpodzolgronden"
+
+    # ander infoformaat of onbekende dienst: geen opname
+    assert requests.get(basis, params={**params, "info_format": "text/plain"}, timeout=5).status_code == 404
+    assert requests.get(f"{server.basis}/elders.nl/x", timeout=5).status_code == 404
+
+    tile = requests.get(f"{server.basis}/tile.openstreetmap.org/16/33860/21580.png", timeout=5)
+    assert tile.headers["Content-Type"] == "image/png" and tile.content[:4] == b"\x89PNG"
+
+
+def test_regressie_boven_drempel():
+    baseline = {"geo": {"p95_ms": 100.0, "rps": 20.0}, "nsn": {"p95_ms": 1.0, "rps": 900.0}}
+    goed = {"aantal": 10, "fouten": 0, "p95_ms": 120.0, "rps": 18.0}
+    assert bench.vergelijk({"geo": goed}, baseline, 0.25) == []
+    assert bench.vergelijk({"geo": {**goed, "p95_ms": 130.0}}, baseline, 0.25)
+    assert bench.vergelijk({"geo": {**goed, "rps": 10.0}}, baseline, 0.25)
+    assert bench.vergelijk({"geo": {**goed, "fouten": 1}}, baseline, 0.25)
+    # ruis van een paar ms valt binnen de marge
+    assert bench.vergelijk({"nsn": {**goed, "p95_ms": 2.0, "rps": 900.0}}, baseline, 0.25, marge_ms=5) == []
+
+
+def _stap(gebruikers, rps, p95=500.0, fouten=0, mb=300.0):
+    return {"gebruikers": gebruikers,
+            "totaal": {"aantal": 100, "fouten": fouten, "rps": rps, "p95_ms": p95},
+            "geheugen": {"hwm_mb": mb, "piek_totaal_mb": mb}}
+
+
+def test_verzadiging():
+    uit = belasting.analyse([_stap(1, 2.0), _stap(4, 7.5), _stap(16, 7.6)], slo_ms=3000, geheugen_mb=512)
+    assert uit["max_gebruikers_binnen_grenzen"] == 4 and uit["doorvoer_rps"] == 7.5
+    assert uit["verzadigd_bij_gebruikers"] == 16 and uit["reden"] == "doorvoer stijgt niet meer"
+
+    uit = belasting.analyse([_stap(1, 2.0), _stap(4, 7.5, mb=600.0)], slo_ms=3000, geheugen_mb=512)
+    assert uit["max_gebruikers_binnen_grenzen"] == 1 and "geheugen" in uit["reden"]
+    assert uit["hwm_mb"] == 600.0
+
+    uit = belasting.analyse([_stap(1, 2.0), _stap(4, 7.5)], slo_ms=3000, geheugen_mb=512)
+    assert uit["verzadigd_bij_gebruikers"] is None
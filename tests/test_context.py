@@ -16,6 +16,7 @@ import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from plantwijs.services import content  # noqa: E402
 from plantwijs.services import context as ctx  # noqa: E402
 
 INVENTARIS = os.path.join(
@@ -132,8 +133,13 @@ def test_entry_by_id():
 
 
 # ───────────────────── cache
+def _naar_kopie(kopie, monkeypatch) -> None:
+    """Contentbundel en matcher naar de map met `kopie` wijzen."""
+    monkeypatch.setattr(content, "CONTENT_DIR", str(kopie.parent))
+    monkeypatch.setattr(ctx, "CONTEXT_YAML_PATH", str(kopie))
+
+
 def test_cache_herlaadt_bij_gewijzigde_mtime(tmp_path, monkeypatch):
-    bron = ctx.CONTEXT_YAML_PATH
     kopie = tmp_path / "context_descriptions.yaml"
     kopie.write_text(
         "categorieen:\n"
@@ -154,7 +160,8 @@ def test_cache_herlaadt_bij_gewijzigde_mtime(tmp_path, monkeypatch):
         "      bron: test\n",
         encoding="utf-8",
     )
-    monkeypatch.setattr(ctx, "CONTEXT_YAML_PATH", str(kopie))
+    _naar_kopie(kopie, monkeypatch)
+    monkeypatch.setattr(content, "CONTENT_CONTROLE_S", 0)   # elke aanroep controleren
     ctx.reload_cache()
     try:
         assert ctx.entry_id("fgr", "alfa") == "alfa"
@@ -177,5 +184,148 @@ def test_cache_herlaadt_bij_gewijzigde_mtime(tmp_path, monkeypatch):
         os.utime(kopie, (1_600_000_000, 1_600_000_000))
         assert ctx.entry_id("fgr", "alfa") == "beta"
     finally:
-        monkeypatch.setattr(ctx, "CONTEXT_YAML_PATH", bron)
+        monkeypatch.undo()
+        ctx.reload_cache()
+
+
+# ───────────────────── gecompileerde matcher = referentie-implementatie
+def _alle_kaartwaarden() -> list[tuple[str, str]]:
+    """Alle match-teksten plus varianten eromheen, voor elke categorie."""
+    waarden: list[tuple[str, str]] = []
+    for cat in ctx.categorieen():
+        for e in ctx.entries(cat):
+            for m in e["match_exact"] + e["match"]:
+                waarden += [(cat, m), (cat, m.upper()), (cat, f"xx {m} yy"),
+                            (cat, m[1:]), (cat, m[:-1]), (cat, f"{m}{m}")]
+        waarden += [(cat, "iets heel anders"), (cat, ""), (cat, "a")]
+    waarden += [("nsn", label) for label in _nsn_labels()]
+    return waarden
+
+
+def _zoek_lineair(categorie: str, waarde: object) -> dict | None:
+    """Referentie-implementatie uit content/README.md (lineair, zonder memo)."""
+    lijst = ctx.entries(categorie)
+    if not lijst:
+        return None
+
+    fallback = ctx._fallback(lijst)
+    v = ctx.norm(waarde)
+    if not v:
+        return fallback
+
+    for e in lijst:
+        if any(ctx.norm(m) == v for m in e["match_exact"]):
+            return e
+    for e in lijst:
+        for m in e["match"]:
+            mn = ctx.norm(m)
+            if mn and mn in v:
+                return e
+    return fallback
+
+
+def test_gecompileerde_matcher_is_gelijk_aan_referentie():
+    for cat, waarde in _alle_kaartwaarden():
+        verwacht = _zoek_lineair(cat, waarde)
+        assert ctx.zoek(cat, waarde) is verwacht, (cat, waarde)
+        assert ctx.zoek(cat, waarde) is verwacht, (cat, waarde)   # via het memo
+
+
+def test_automaat_houdt_bestandsvolgorde_aan():
+    # "b" staat in het bestand vóór "abc"; ook al eindigt "abc" later in de
+    # tekst, de eerste entry in bestandsvolgorde wint.
+    automaat = ctx._Automaat([("abc", 2), ("b", 1), ("zzz", 0), ("bcd", 3)])
+    assert automaat.eerste("xabcdx") == 1
+    assert automaat.eerste("zzabc") == 1
+    assert automaat.eerste("azzz") == 0
+    assert automaat.eerste("cd") is None
+
+    # faallinks: "he"/"she"/"hers" — klassiek Aho–Corasick-voorbeeld
+    automaat = ctx._Automaat([("hers", 0), ("she", 2), ("he", 1)])
+    assert automaat.eerste("ushers") == 0
+    assert automaat.eerste("ushe") == 1
+
+
+def test_memo_verdwijnt_bij_nieuwe_versie(tmp_path, monkeypatch):
+    kopie = tmp_path / "context_descriptions.yaml"
+    kopie.write_text(
+        "categorieen:\n  fgr:\n    - id: alfa\n      match: ['zand']\n      titel: A\n",
+        encoding="utf-8")
+    _naar_kopie(kopie, monkeypatch)
+    monkeypatch.setattr(content, "CONTENT_CONTROLE_S", 0)
+    ctx.reload_cache()
+    try:
+        assert ctx.entry_id("fgr", "Hogere zandgronden") == "alfa"
+        kopie.write_text(
+            "categorieen:\n  fgr:\n    - id: beta\n      match: ['zand']\n      titel: B\n",
+            encoding="utf-8")
+        os.utime(kopie, (1_600_000_000, 1_600_000_000))
+        assert ctx.entry_id("fgr", "Hogere zandgronden") == "beta"
+        assert ctx.entry_by_id("fgr", "BETA")["titel"] == "B"
+    finally:
+        monkeypatch.undo()
+        ctx.reload_cache()
+
+
+# ───────────────────── contentbundel (services/content.py)
+def _bundel_kopie(tmp_path, monkeypatch, inhoud: str):
+    kopie = tmp_path / "context_descriptions.yaml"
+    kopie.write_text(inhoud, encoding="utf-8")
+    _naar_kopie(kopie, monkeypatch)
+    ctx.reload_cache()
+    return kopie
+
+
+_ALFA = "categorieen:\n  fgr:\n    - id: alfa\n      match_exact: ['x']\n"
+_BETA = "categorieen:\n  fgr:\n    - id: beta\n      match_exact: ['x']\n"
+
+
+def test_bundel_controleert_hooguit_eens_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(content, "CONTENT_CONTROLE_S", 3600)
+    kopie = _bundel_kopie(tmp_path, monkeypatch, _ALFA)
+    try:
+        assert ctx.entry_id("fgr", "x") == "alfa"
+
+        stats = []
+        echte_mtime = content._mtime
+        monkeypatch.setattr(content, "_mtime", lambda p: stats.append(p) or echte_mtime(p))
+        kopie.write_text(_BETA, encoding="utf-8")
+        os.utime(kopie, (1_600_000_000, 1_600_000_000))
+        for _ in range(50):
+            assert ctx.entry_id("fgr", "x") == "alfa"   # binnen het interval: oude snapshot
+        assert stats == []                             # en geen enkele stat-call
+
+        content.herlaad()
+        assert ctx.entry_id("fgr", "x") == "beta"
+    finally:
+        monkeypatch.undo()
         ctx.reload_cache()
+
+
+def test_bundel_versie_volgt_de_inhoud(tmp_path, monkeypatch):
+    monkeypatch.setattr(content, "CONTENT_CONTROLE_S", 0)
+    kopie = _bundel_kopie(tmp_path, monkeypatch, _ALFA)
+    try:
+        ctx.entry_id("fgr", "x")
+        v1 = content.versie()
+        assert content.versie() == v1
+
+        kopie.write_text(_BETA, encoding="utf-8")
+        os.utime(kopie, (1_600_000_000, 1_600_000_000))
+        v2 = content.versie()
+        assert v2 != v1
+
+        # alleen een nieuwe mtime, dezelfde inhoud: zelfde versie
+        os.utime(kopie, (1_700_000_000, 1_700_000_000))
+        assert content.versie() == v2
+    finally:
+        monkeypatch.undo()
+        ctx.reload_cache()
+
+
+def test_bundel_snapshot_is_onveranderlijk():
+    snap = content.snapshot()
+    with pytest.raises(TypeError):
+        snap.bestanden["nieuw"] = {}
+    assert any(p.endswith("maatregelen.yaml") for p in snap.bestanden)
+    assert any(p.endswith("wortelbare_diepte.yaml") for p in snap.bestanden)
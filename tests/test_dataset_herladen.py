@@ -0,0 +1,148 @@
+"""Dataset herladen zonder wachtende requests (services/dataset.py)."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import dataset  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _schone_dataset():
+    dataset.get_df()
+    yield
+    dataset.clear_cache()
+
+
+def _tellende_lader(monkeypatch, vrijgeven: threading.Event = None):
+    """Vervangt `_laad_snapshot`; telt de aanroepen en kan wachten op `vrijgeven`."""
+    echt = dataset._laad_snapshot
+    aanroepen = []
+
+    def _laad():
+        aanroepen.append(1)
+        if vrijgeven is not None:
+            assert vrijgeven.wait(10)
+        return echt()
+    monkeypatch.setattr(dataset, "_laad_snapshot", _laad)
+    return aanroepen
+
+
+def test_koude_start_laadt_een_keer(monkeypatch):
+    dataset.clear_cache()
+    aanroepen = _tellende_lader(monkeypatch)
+    uit = []
+    threads = [threading.Thread(target=lambda: uit.append(len(dataset.get_df()))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(aanroepen) == 1
+    assert len(set(uit)) == 1 and uit[0] > 0
+
+
+def test_tijdens_herladen_de_oude_dataset(monkeypatch):
+    oud = dataset._CACHE["df"]
+    vrijgeven = threading.Event()
+    _tellende_lader(monkeypatch, vrijgeven)
+    # doe alsof het bestand veranderd is: de cache is niet meer actueel
+    monkeypatch.setattr(dataset, "_snapshot_actueel", lambda: None)
+
+    status = dataset.herlaad()
+    assert status["status"] == "bezig"
+    assert dataset.herlaad()["gestart_op"] == status["gestart_op"]  # niet dubbel gestart
+    t0 = time.perf_counter()
+    df = dataset.get_df()
+    assert time.perf_counter() - t0 < 1.0
+    assert df.attrs[dataset.VERSIE_ATTR] == oud.attrs[dataset.VERSIE_ATTR]
+    assert dataset._CACHE["df"] is oud
+
+    vrijgeven.set()
+    dataset._HERLAAD["thread"].join(10)
+    assert dataset.herlaad_status()["status"] == "klaar"
+    assert dataset._CACHE["df"] is not oud
+    assert dataset.herlaad_status()["actieve_versie"] == dataset._CACHE["hash"]
+
+
+def test_mislukt_herladen_houdt_de_vorige_dataset(monkeypatch):
+    oud = dataset._CACHE["df"]
+
+    def _stuk():
+        raise FileNotFoundError("weg")
+    monkeypatch.setattr(dataset, "_laad_snapshot", _stuk)
+    status = dataset.herlaad(wacht=True)
+    assert status["status"] == "fout" and "weg" in status["fout"]
+    assert dataset._CACHE["df"] is oud
+    assert len(dataset.get_df()) == len(oud)
+
+
+def test_inhoud_hash_volgt_de_data():
+    df = dataset.get_df()
+    assert dataset._inhoud_hash(df) == dataset._inhoud_hash(df.copy())
+    anders = df.copy()
+    anders.iloc[0, 0] = "gewijzigd"
+    assert dataset._inhoud_hash(anders) != dataset._inhoud_hash(df)
+
+
+def test_admin_reload_en_health(client: TestClient, monkeypatch):
+    monkeypatch.setenv("PLANTWIJS_ADMIN_KEY", "geheim")
+    r = client.get("/api/admin/reload", params={"key": "geheim", "wacht": True})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["ok"] is True
+    assert data["herladen"]["status"] == "klaar"
+
+    health = client.get("/api/health").json()
+    assert health["dataset"]["versie"] == data["herladen"]["actieve_versie"]
+    assert health["dataset"]["herladen"]["status"] == "klaar"
+
+    r = client.get("/api/admin/reload", params={"key": "geheim"})
+    assert r.status_code == 202
+    dataset._HERLAAD["thread"].join(10)
+
+
+def test_versheidscontrole_is_gedrosseld(monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_CONTROLE_S", 3600)
+    dataset.get_df()
+
+    def _geen_stat(*_a, **_k):
+        raise AssertionError("bestandssysteem geraadpleegd")
+    monkeypatch.setattr(dataset.os.path, "getmtime", _geen_stat)
+    monkeypatch.setattr(dataset.os.path, "exists", _geen_stat)
+    assert len(dataset.get_df()) > 0
+    assert dataset.get_df(kopie=False) is dataset._CACHE["df"]
+
+
+def test_zonder_drossel_elke_aanroep_controleren(monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_CONTROLE_S", 0)
+    dataset.get_df()
+    gezien = []
+    echt = dataset.os.path.getmtime
+    monkeypatch.setattr(dataset.os.path, "getmtime", lambda p: gezien.append(p) or echt(p))
+    dataset.get_df()
+    assert gezien
+
+
+def test_health_kopieert_de_dataset_niet(client: TestClient, monkeypatch):
+    from plantwijs.routers import plants as plants_router
+
+    def _niet(*_a, **_k):
+        raise AssertionError("get_df aangeroepen")
+    monkeypatch.setattr(plants_router, "get_df", _niet)
+    data = client.get("/api/health").json()
+    assert data["ok"] is True
+    assert data["dataset"]["rows"] == len(dataset._CACHE["df"])
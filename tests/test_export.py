@@ -0,0 +1,89 @@
+"""Tests voor de kolomformaten /export/parquet en /export/arrow.
+
+Draait op de lokale CSV; geen netwerk nodig. Zonder pyarrow (optioneel in
+gebruik, wel in requirements.txt) worden de formaattests overgeslagen.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.routers import export as export_router  # noqa: E402
+from plantwijs.services import dataset  # noqa: E402
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def test_getypeerd_zet_de_kolomtypes():
+    df = dataset.get_df().head(50)
+    t = dataset.getypeerd(df)
+    assert list(t.columns) == list(df.columns)
+    assert str(t["ellenberg_f"].dtype) == "float64"
+    assert str(t["status_nl"].dtype) == "category"
+    assert list(t["status_nl"].cat.categories) == list(dataset.STATUS_LABELS)
+    assert str(t["invasief"].dtype) == "boolean"
+    assert str(t["naam"].dtype) == "string"
+
+
+def test_getypeerd_ja_nee_en_onleesbare_getallen():
+    import pandas as pd
+
+    df = pd.DataFrame({"invasief": ["ja", "nee", "", None],
+                       "ellenberg_l_min": ["6.1", "x", "", None],
+                       "status_nl": ["Inheems", "exoot", "onzin", None]})
+    t = dataset.getypeerd(df)
+    assert t["invasief"].tolist()[:2] == [True, False]
+    assert t["invasief"].isna().tolist()[2:] == [True, True]
+    assert t["ellenberg_l_min"].iloc[0] == pytest.approx(6.1)
+    assert t["ellenberg_l_min"].isna().sum() == 3
+    assert t["status_nl"].tolist()[:2] == ["inheems", "exoot"]
+    assert t["status_nl"].isna().sum() == 2
+
+
+def test_parquet_zelfde_rijen_als_csv(client: TestClient):
+    params = {"vocht": "nat", "bodem": "veen"}
+    r = client.get("/export/parquet", params=params)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.parquet"
+    assert "beplantingswijzer_export.parquet" in r.headers["content-disposition"]
+
+    tabel = pq.read_table(io.BytesIO(r.content))
+    csv = client.get("/export/csv", params=params).text
+    assert tabel.num_rows == len(csv.strip().splitlines()) - 1
+    assert pa.types.is_floating(tabel.schema.field("ellenberg_f").type)
+    assert pa.types.is_dictionary(tabel.schema.field("status_nl").type)
+    assert pa.types.is_boolean(tabel.schema.field("invasief").type)
+
+
+def test_arrow_stream_is_leesbaar(client: TestClient):
+    r = client.get("/export/arrow", params={"q": "quercus"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    tabel = pyarrow.ipc.open_stream(io.BytesIO(r.content)).read_all()
+    assert tabel.num_rows > 0
+    namen = [str(n).lower() for n in tabel.column("wetenschappelijke_naam").to_pylist()]
+    assert all("quercus" in n for n in namen)
+
+
+def test_zonder_pyarrow_netjes_501(client: TestClient, monkeypatch):
+    monkeypatch.setattr(export_router, "_pyarrow", lambda: None)
+    for pad, formaat in (("/export/parquet", "parquet"), ("/export/arrow", "arrow")):
+        r = client.get(pad)
+        assert r.status_code == 501
+        assert r.json()["error"] == f"{formaat}_niet_beschikbaar"
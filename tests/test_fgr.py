@@ -0,0 +1,116 @@
+"""Lokale FGR-index (services/fgr.py) en de WFS-terugval in services/pdok.py."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.config import TX_WGS84_RD  # noqa: E402
+from plantwijs.services import fgr, lokaal, pdok  # noqa: E402
+
+LAT, LON = 52.078, 5.89
+X, Y = TX_WGS84_RD.transform(LON, LAT)
+
+
+def _vlak(label: str, x: float, y: float, r: float, gat: float = 0.0) -> dict:
+    ringen = [[[x - r, y - r], [x + r, y - r], [x + r, y + r], [x - r, y + r], [x - r, y - r]]]
+    if gat:
+        ringen.append([[x - gat, y - gat], [x + gat, y - gat], [x + gat, y + gat], [x - gat, y + gat]])
+    return {"type": "Feature", "properties": {"fgr": label},
+            "geometry": {"type": "Polygon", "coordinates": ringen}}
+
+
+def _punt(x: float, y: float):
+    lon, lat = TX_WGS84_RD.transform(x, y, direction="INVERSE")
+    return lat, lon
+
+
+@pytest.fixture(autouse=True)
+def _fgr_bestand(monkeypatch, tmp_path):
+    monkeypatch.setattr(fgr, "FGR_PAD", str(tmp_path / "fgr.sqlite"))
+    fgr.clear_cache()
+    wfs = []
+
+    async def _wfs_async(url):
+        wfs.append(url)
+        return [{"properties": {"fgr": "Via WFS"}}]
+    monkeypatch.setattr(pdok, "_wfs_async", _wfs_async)
+    yield wfs
+    fgr.clear_cache()
+
+
+def _schrijf(features) -> None:
+    lokaal.schrijf_polygonen("fgr", features, pad=fgr.FGR_PAD)
+
+
+def test_lookup_zonder_wfs(_fgr_bestand):
+    _schrijf([_vlak("Hogere zandgronden", X, Y, 5000, gat=500),
+              _vlak("Rivierengebied", X + 20000, Y, 5000)])
+    assert fgr.laad() is not None
+    assert pdok.fgr_from_point(LAT, LON) is None   # in het gat
+    assert pdok.fgr_from_point(*_punt(X + 1000, Y)) == "Hogere zandgronden"
+    assert asyncio.run(pdok.fgr_from_point_async(*_punt(X + 20000, Y + 10))) == "Rivierengebied"
+    assert pdok.fgr_from_point(*_punt(X + 10000, Y)) is None   # tussen de vlakken
+    assert _fgr_bestand == []
+
+
+def test_multipolygon_kleinste_eerst():
+    klein = _vlak("Duinen", X, Y, 100)
+    klein["geometry"] = {"type": "MultiPolygon", "coordinates": [
+        klein["geometry"]["coordinates"],
+        _vlak("", X + 1000, Y, 50)["geometry"]["coordinates"],
+    ]}
+    _schrijf([_vlak("Zeekleigebied", X, Y, 3000), klein])
+    assert fgr.zoek(*_punt(X, Y)) == "Duinen"
+    assert fgr.zoek(*_punt(X + 1000, Y)) == "Duinen"
+    assert fgr.zoek(*_punt(X + 500, Y)) == "Zeekleigebied"
+
+
+def test_ontbrekend_bestand_wordt_onthouden(_fgr_bestand, monkeypatch):
+    gekeken = []
+    echt = fgr.Polygonen.open
+
+    def _open(naam, pad=None):
+        gekeken.append(pad)
+        return echt(naam, pad)
+    monkeypatch.setattr(fgr.Polygonen, "open", _open)
+
+    for _ in range(3):
+        assert pdok.fgr_from_point(LAT, LON) == "Via WFS"
+    assert fgr.status() == "wms"
+    assert gekeken == [fgr.FGR_PAD]
+
+    _schrijf([_vlak("Heuvelland", X, Y, 1000)])
+    assert pdok.fgr_from_point(LAT, LON) == "Via WFS"   # pas na clear_cache, zoals services/lokaal.py
+    fgr.clear_cache()
+    n = len(_fgr_bestand)
+    assert pdok.fgr_from_point(LAT, LON) == "Heuvelland"
+    assert fgr.status() == "lokaal"
+    assert len(_fgr_bestand) == n
+
+
+def test_download_een_keer_en_bewaard(monkeypatch):
+    pagina = [_vlak("Laagveengebied", X, Y, 1000)]
+    opgehaald = []
+
+    def _download():
+        opgehaald.append(1)
+        return pagina
+    monkeypatch.setattr(fgr, "_download", _download)
+    assert fgr.status() == "wms"
+    fgr.warm_fgr()
+    fgr._LADER.join(5)
+    assert fgr.status() == "lokaal"
+    assert fgr.zoek(LAT, LON) == "Laagveengebied"
+
+    fgr.clear_cache()
+    assert fgr.laad(ophalen=True) is not None   # nu uit het bestand
+    assert opgehaald == [1]
+    with sqlite3.connect(fgr.FGR_PAD) as con:
+        assert con.execute("SELECT value FROM meta WHERE key='bron'").fetchone()[0] == fgr.PDOK_FGR_WFS
@@ -0,0 +1,102 @@
+"""Tests voor de JSON-uitvoer van de grote lijsten (services/jsonuitvoer.py)."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import dataset, jsonuitvoer  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _lege_cache():
+    jsonuitvoer.clear_cache()
+    yield
+    jsonuitvoer.clear_cache()
+
+
+def _oud(df: pd.DataFrame, cols) -> list:
+    """De oude route: to_dict + de recursieve _clean."""
+    return dataset._clean(df[list(cols)].to_dict(orient="records"))
+
+
+def test_records_gelijk_aan_to_dict_met_clean():
+    df = dataset.ensure_beplantingstype(dataset.get_df())
+    cols = ["naam", "wetenschappelijke_naam", "beplantingstype", "ellenberg_f", "hoogte"]
+    assert json.loads(jsonuitvoer.records_json(df, cols)) == _oud(df, cols)
+
+
+def test_nan_en_inf_worden_null():
+    df = pd.DataFrame({"a": [1.5, float("nan"), float("inf")], "b": ["x", None, pd.NA]})
+    assert json.loads(jsonuitvoer.records_json(df, ["a", "b"])) == [
+        {"a": 1.5, "b": "x"}, {"a": None, "b": None}, {"a": None, "b": None}]
+
+
+def test_zonder_orjson_zelfde_bytes(monkeypatch):
+    df = dataset.get_df().head(40)
+    cols = ["naam", "standplaats_licht", "ellenberg_l"]
+    met = jsonuitvoer.records_json(df, cols)
+    jsonuitvoer.clear_cache()
+    monkeypatch.setattr(jsonuitvoer, "orjson", None)
+    assert jsonuitvoer.records_json(df, cols) == met
+
+
+def test_rijfragmenten_worden_hergebruikt(monkeypatch):
+    df = dataset.get_df()
+    cols = ["naam", "vocht"]
+    alles = jsonuitvoer.records_json(df, cols)
+
+    def _niet(*_a, **_k):
+        raise AssertionError("rij opnieuw geserialiseerd")
+    monkeypatch.setattr(jsonuitvoer, "_fragmenten", _niet)
+    # een gefilterde, anders gesorteerde selectie komt volledig uit de cache
+    deel = df[df["vocht"].astype(str).str.contains("nat", na=False)].sort_values("naam", ascending=False)
+    assert json.loads(jsonuitvoer.records_json(deel, cols)) == _oud(deel, cols)
+    assert jsonuitvoer.records_json(df, cols) == alles
+
+
+def test_zonder_datasetversie_geen_cache():
+    df = pd.DataFrame({"naam": ["a", "b"]})
+    jsonuitvoer.records_json(df, ["naam"])
+    assert not jsonuitvoer._FRAGMENTEN
+
+
+def test_nieuwe_datasetversie_gebruikt_geen_oude_fragmenten():
+    df = pd.DataFrame({"naam": ["oud"]})
+    df.attrs[dataset.VERSIE_ATTR] = ("x.csv", 1.0)
+    assert json.loads(jsonuitvoer.records_json(df, ["naam"])) == [{"naam": "oud"}]
+    df2 = pd.DataFrame({"naam": ["nieuw"]})
+    df2.attrs[dataset.VERSIE_ATTR] = ("x.csv", 2.0)
+    assert json.loads(jsonuitvoer.records_json(df2, ["naam"])) == [{"naam": "nieuw"}]
+
+
+def test_json_antwoord_houdt_de_volgorde():
+    r = jsonuitvoer.json_antwoord({"count": 2, "items": None, "x": math.nan},
+                                  items=b'[{"a":1},{"a":2}]')
+    assert r.body == b'{"count":2,"items":[{"a":1},{"a":2}],"x":null}'
+    assert r.media_type == "application/json"
+
+
+def test_api_plants_zelfde_inhoud(client: TestClient):
+    r = client.get("/api/plants", params={"vocht": "nat", "sort": "naam"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    data = r.json()
+    assert data["count"] == len(data["items"]) > 0
+    assert list(data) == ["count", "items", "next_cursor"]
+    assert data["next_cursor"] is None
+    assert all(set(("naam", "vocht", "beplantingstype")) <= set(i) for i in data["items"])
@@ -0,0 +1,111 @@
+"""Voorberekende kennislaag (services/kennislaag.py) tegen de live functies."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.services import advies as advies_service  # noqa: E402
+from plantwijs.services import kennislaag  # noqa: E402
+from plantwijs.services import wortel  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def artefact(tmp_path_factory) -> str:
+    pad = str(tmp_path_factory.mktemp("kennislaag") / "kennislaag.json")
+    kennislaag.schrijf(pad)
+    return pad
+
+
+@pytest.fixture
+def met_artefact(monkeypatch, artefact):
+    monkeypatch.setattr(kennislaag, "KENNISLAAG_PAD", artefact)
+    kennislaag.clear_cache()
+    yield artefact
+    kennislaag.clear_cache()
+
+
+def _live(fgr=None, nsn=None, gmm=None, bodem=None, vocht=None, gt_code=None) -> dict:
+    return {
+        "landschap": advies_service.landschap(fgr=fgr, nsn=nsn, gmm=gmm, bodem=bodem, vocht=vocht),
+        "wortelbare_diepte": wortel.bepaal(bodem=bodem, gt_code=gt_code, nsn=nsn),
+        "aanbevolen_beplanting": advies_service.aanbevolen_beplanting(
+            fgr=fgr, nsn=nsn, vocht=vocht, bodem=bodem),
+    }
+
+
+def test_artefact_gelijk_aan_live(met_artefact):
+    """Over een raster van echte kaartwaarden is de opzoekactie gelijk aan live."""
+    plekken = [
+        ("zand", "droog", "VIo"),
+        ("veen", "zeer nat", "Ia"),
+        ("klei", "vochtig", "VBD"),
+        ("Leemarm fijn zand", "zeer droog", "VIId"),
+        ("leem", None, None),
+        (None, "nat", "IIIb"),
+        (None, None, None),
+    ]
+    for fgr in ("Hogere zandgronden", "Laagveengebied", "Heuvelland", None):
+        for nsn in ("Dekzandrug", "Petgaten", "Stuwwal", "Losshelling", None):
+            for bodem, vocht, gt_code in plekken:
+                kw = dict(fgr=fgr, nsn=nsn, gmm="Dekzandrug", bodem=bodem,
+                          vocht=vocht, gt_code=gt_code)
+                uit = kennislaag.verrijk(**kw)
+                assert uit is not None, kw
+                assert uit == _live(**kw), kw
+
+
+def test_verrijk_advies_leest_het_artefact(met_artefact, monkeypatch):
+    """Met een geldig artefact worden de live functies niet meer aangeroepen."""
+    def _niet(*_a, **_k):
+        raise AssertionError("live uitgerekend")
+    verwacht = _live(fgr="Laagveengebied", nsn="Petgaten", bodem="veen",
+                     vocht="zeer nat", gt_code="Ia")
+    monkeypatch.setattr(wortel, "bepaal", _niet)
+    monkeypatch.setattr(advies_service, "aanbevolen_beplanting_voor_ids", _niet)
+
+    uit = advies_service.verrijk_advies(fgr="Laagveengebied", nsn="Petgaten", bodem="veen",
+                                        vocht="zeer nat", gt_code="Ia")
+    assert uit == verwacht
+
+
+def test_onbekende_gt_code_valt_terug_op_live(met_artefact):
+    """Een sleutel die niet in het artefact staat: None, en verrijk_advies rekent live."""
+    kw = dict(fgr="Hogere zandgronden", bodem="zand", vocht="droog", gt_code="VIx")
+    assert kennislaag.verrijk(**kw) is None
+    assert advies_service.verrijk_advies(**kw) == _live(**kw)
+
+
+def test_andere_contentversie_wordt_genegeerd(tmp_path, monkeypatch, artefact):
+    with open(artefact, encoding="utf-8") as f:
+        laag = json.load(f)
+    laag["versie"] = "verouderd"
+    pad = tmp_path / "oud.json"
+    pad.write_text(json.dumps(laag), encoding="utf-8")
+    monkeypatch.setattr(kennislaag, "KENNISLAAG_PAD", str(pad))
+    kennislaag.clear_cache()
+
+    assert kennislaag.verrijk(fgr="Hogere zandgronden") is None
+    assert advies_service.verrijk_advies(fgr="Hogere zandgronden") == _live(fgr="Hogere zandgronden")
+    kennislaag.clear_cache()
+
+
+def test_ontbrekend_artefact(tmp_path, monkeypatch):
+    monkeypatch.setattr(kennislaag, "KENNISLAAG_PAD", str(tmp_path / "bestaat_niet.json"))
+    kennislaag.clear_cache()
+    assert kennislaag.verrijk(fgr="Hogere zandgronden") is None
+    kennislaag.clear_cache()
+
+
+def test_uitkomst_is_een_eigen_kopie(met_artefact):
+    kw = dict(fgr="Laagveengebied", nsn="Petgaten", bodem="veen", vocht="nat", gt_code="IIIa")
+    eerste = kennislaag.verrijk(**kw)
+    eerste["aanbevolen_beplanting"][0]["voorbeeldsoorten"].append("x")
+    eerste["landschap"]["fgr"]["versterken"].append("x")
+    eerste["wortelbare_diepte"]["klasse"] = "x"
+    assert kennislaag.verrijk(**kw) == _live(**kw)
@@ -0,0 +1,131 @@
+"""Lokale kaartdata (services/lokaal.py, scripts/bouw_lokale_data.py) en de WMS-terugval."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from plantwijs.config import TX_WGS84_RD  # noqa: E402
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import lokaal, pdok  # noqa: E402
+
+LAT, LON = 52.078, 5.89
+X, Y = TX_WGS84_RD.transform(LON, LAT)
+VER_WEG = (53.2, 6.5)   # binnen NL, buiten de testbestanden
+
+
+@pytest.fixture(autouse=True)
+def _lokale_map(monkeypatch, tmp_path):
+    monkeypatch.setattr(lokaal, "LOKAAL_DIR", str(tmp_path))
+    lokaal.clear_cache()
+    wms = []
+
+    async def _wms(base_url, layer, lat, lon):
+        wms.append(base_url)
+        return {"value_list": "7.5", "first_soilname": "Zeekleigronden"}
+    monkeypatch.setattr(pdok, "_wms_getfeatureinfo_async", _wms)
+    monkeypatch.setattr(pdok, "_WMSMETA", pdok._fallback_layers())
+    yield wms
+    lokaal.clear_cache()
+
+
+def _raster(naam: str, waarde, nodata=None, dtype=np.float32) -> None:
+    """10×10 cellen van 25 m met het testpunt in cel (5, 5)."""
+    data = np.full((10, 10), nodata if nodata is not None else 0, dtype=dtype)
+    if waarde is not None:
+        data[5, 5] = waarde
+    lokaal.schrijf_raster(naam, data, X - 137.5, Y + 137.5, 25.0, nodata)
+
+
+def _vierkant(props: dict, r: float = 50.0) -> dict:
+    ring = [[X - r, Y - r], [X + r, Y - r], [X + r, Y + r], [X - r, Y + r], [X - r, Y - r]]
+    return {"type": "Feature", "properties": props,
+            "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+def test_ahn_uit_raster_zonder_wms(_lokale_map):
+    _raster("ahn", 12.345)
+    assert pdok.ahn_from_wms(LAT, LON)[0] == "12.35"
+    assert _lokale_map == []
+    lokaal.clear_cache()
+    assert asyncio.run(pdok.ahn_from_wms_async(LAT, LON))[0] == "12.35"
+
+
+def test_nodata_binnen_het_raster_is_leeg(_lokale_map):
+    _raster("ahn", None, nodata=-9999.0)
+    assert pdok.ahn_from_wms(LAT, LON) == (None, {})
+    assert _lokale_map == []
+
+
+def test_buiten_het_raster_terug_naar_wms(_lokale_map):
+    _raster("ahn", 12.0)
+    assert pdok.ahn_from_wms(*VER_WEG)[0] == "7.50"
+    assert _lokale_map == [pdok.AHN_WMS]
+
+
+def test_gt_ordinaal_en_glg_terugval(_lokale_map):
+    _raster("gt", 14, nodata=0, dtype=np.uint8)
+    assert pdok.vocht_from_gwt(LAT, LON) == ("droog", {"value_list": "14"}, "VIo")
+
+    lokaal.clear_cache()
+    _raster("gt", None, nodata=0, dtype=np.uint8)
+    _raster("glg", 30)
+    klasse, props, gt = pdok.vocht_from_gwt(LAT, LON)
+    assert (klasse, props, gt) == ("nat", {"GLG": "30"}, None)
+    assert _lokale_map == []
+
+
+def test_bodem_en_gmm_uit_polygonen(_lokale_map):
+    lokaal.schrijf_polygonen("bodem", [_vierkant({"first_soilname": "Petgaten"}),
+                                       _vierkant({"first_soilname": "Duinzand"}, r=500)])
+    waarde, props = pdok.bodem_from_bodemkaart(LAT, LON)
+    assert waarde == "veen" and props[pdok.RUWE_BODEM_KEY] == "Petgaten"   # kleinste vlak eerst
+
+    ver = _vierkant({"landformsubgroup_description": "Rivierduin"})
+    ver["geometry"]["coordinates"] = [[[x + 2000, y] for x, y in
+                                       ver["geometry"]["coordinates"][0]]]
+    lokaal.schrijf_polygonen("gmm", [_vierkant({"landformsubgroup_description": "Dekzandrug"}), ver])
+    assert asyncio.run(pdok.gmm_from_wms_async(LAT, LON))[0] == "Dekzandrug"
+    assert _lokale_map == []
+
+    # binnen het bereik van de data maar in geen enkel vlak: leeg, geen WMS
+    tussen_lon, tussen_lat = pdok.TX_WGS84_RD.transform(X + 1000, Y, direction="INVERSE")
+    assert pdok.gmm_from_wms(tussen_lat, tussen_lon) == (None, {})
+    assert _lokale_map == []
+    assert pdok.bodem_from_bodemkaart(*VER_WEG)[0] == "klei"   # buiten de data: WMS
+    assert _lokale_map == [pdok.BODEM_WMS]
+
+
+def test_health_toont_lokale_data():
+    _raster("ahn", 1.0)
+    data = TestClient(app).get("/api/health").json()
+    assert data["lokale_data"]["ahn"] == "lokaal"
+    assert data["lokale_data"]["bodem"] == "wms"
+
+
+def test_script_bouwt_raster_uit_asc(tmp_path):
+    pad = os.path.join(ROOT, "scripts", "bouw_lokale_data.py")
+    spec = importlib.util.spec_from_file_location("bouw_lokale_data", pad)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    asc = tmp_path / "ahn.asc"
+    rijen = [" ".join(str(float(r * 4 + k)) for k in range(4)) for r in range(4)]
+    asc.write_text(
+        f"ncols 4\nnrows 4\nxllcorner {X - 10}\nyllcorner {Y - 10}\ncellsize 5\n"
+        "NODATA_value -9999\n" + "\n".join(rijen) + "\n", encoding="ascii")
+    script.bouw_raster("ahn", str(asc), factor=2)
+
+    raster = lokaal.Raster.open("ahn")
+    assert raster.data.shape == (2, 2) and raster.cel == 10.0
+    # linksonder: cellen 8, 9, 12, 13 → gemiddeld 10.5
+    assert raster.waarde(X - 5, Y - 5) == pytest.approx(10.5)
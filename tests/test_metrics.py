@@ -0,0 +1,108 @@
+"""/api/metrics en het register in services/metrics.py."""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import metrics, pdok, upstream  # noqa: E402
+
+REGEL = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? (-?[0-9.e+]+|\+Inf|NaN)$')
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _schoon():
+    metrics.reset()
+    upstream.reset()
+    yield
+    metrics.reset()
+    upstream.reset()
+
+
+def _waarden(tekst: str) -> dict:
+    uit = {}
+    for regel in tekst.splitlines():
+        if regel and not regel.startswith("#"):
+            naam, waarde = regel.rsplit(" ", 1)
+            uit[naam] = float(waarde)
+    return uit
+
+
+def test_formaat_en_request_latentie(client: TestClient):
+    client.get("/api/health")
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for regel in r.text.splitlines():
+        assert regel.startswith("# ") or REGEL.match(regel), regel
+
+    w = _waarden(r.text)
+    assert w['plantwijs_http_requests_total{route="/api/health",status="200"}'] == 1
+    assert w['plantwijs_http_request_duration_seconds_count{route="/api/health"}'] == 1
+    assert w['plantwijs_http_request_duration_seconds_bucket{route="/api/health",le="+Inf"}'] == 1
+    assert "plantwijs_dataset_rows" in w
+    assert "# TYPE plantwijs_http_request_duration_seconds histogram" in r.text
+
+
+def test_pdok_aanroepen_per_bron_en_formaat(client: TestClient, monkeypatch):
+    class _Antwoord:
+        def __init__(self, status, ctype, body):
+            self.status_code, self.headers, self.text = status, {"Content-Type": ctype}, body
+
+        def json(self):
+            return {"features": [{"properties": {"bodem": "zand"}}]}
+
+    antwoorden = iter([_Antwoord(500, "text/html", "stuk"),
+                       _Antwoord(200, "application/json", "{}")])
+
+    async def _get(*_a, **_k):
+        return next(antwoorden)
+    monkeypatch.setattr(pdok.httpklient, "get", _get)
+    assert pdok._wms_getfeatureinfo(pdok.BODEM_WMS, "laag", 52.0, 5.0) == {"bodem": "zand"}
+
+    w = _waarden(client.get("/api/metrics").text)
+    json1, json2 = pdok._DEF_INFO_FORMATS[:2]
+    assert w[f'plantwijs_upstream_requests_total{{bron="bodem",formaat="{json1}",uitkomst="http_5xx"}}'] == 1
+    assert w[f'plantwijs_upstream_requests_total{{bron="bodem",formaat="{json2}",uitkomst="ok"}}'] == 1
+    assert w[f'plantwijs_upstream_request_duration_seconds_count{{bron="bodem",formaat="{json2}"}}'] == 1
+    assert w['plantwijs_upstream_host_requests_total{host="service.pdok.nl"}'] == 2
+    assert w['plantwijs_breaker_open{bron="bodem"}'] == 0
+
+
+def test_cache_hits_en_verzamelaar_die_faalt(client: TestClient):
+    metrics.cache("proef", True, 3)
+    metrics.cache("proef", False)
+
+    def _kapot():
+        raise RuntimeError("stuk")
+    metrics.verzamelaar(_kapot)
+    try:
+        w = _waarden(client.get("/api/metrics").text)
+    finally:
+        metrics._VERZAMELAARS.remove(_kapot)
+    assert w['plantwijs_cache_requests_total{cache="proef",uitslag="hit"}'] == 3
+    assert w['plantwijs_cache_requests_total{cache="proef",uitslag="miss"}'] == 1
+
+
+def test_histogram_vakken_en_kwantiel():
+    h = metrics.Histogram("proef_seconds", "proef", ("x",), grenzen=(0.1, 1.0))
+    for s in (0.05, 0.5, 0.5, 5.0):
+        h.observe(s, x="a")
+    (labels, cumulatief, aantal, som), = h.monsters()
+    assert labels == {"x": "a"} and cumulatief == [1, 3] and aantal == 4
+    assert som == pytest.approx(6.05)
+    assert h.kwantiel(cumulatief, aantal, 0.5) == 1.0
+    assert h.kwantiel(cumulatief, aantal, 1.0) is None   # boven de hoogste grens
+    assert 'proef_seconds_bucket{x="a",le="+Inf"} 4' in h.regels()
@@ -25,7 +25,7 @@ from PIL import Image
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from plantwijs.main import app  # noqa: E402
-from plantwijs.services import report  # noqa: E402
+from plantwijs.services import httpklient, pdfjobs, pdfpool, report  # noqa: E402
 
 PDF_MAGIC = b"%PDF"
 
@@ -35,6 +35,18 @@ def client() -> TestClient:
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def _lege_caches(monkeypatch, tmp_path):
+    """Elke test begint met lege rapport-/kaartcaches en een eigen schijfmap."""
+    monkeypatch.setattr(report, "TILE_CACHE_DIR", str(tmp_path / "tiles"))
+    monkeypatch.setattr(pdfpool, "PDF_WORKERS", 0)   # opmaken in dit proces
+    report.clear_cache()
+    pdfjobs.clear()
+    yield
+    report.clear_cache()
+    pdfjobs.clear()
+
+
 # ───────────────────── mocks (geen netwerk)
 def _mock_bronnen(monkeypatch, *, fgr="Hogere zandgronden", nsn="Dekzandrug",
                   bodem=("zand", {}), gwt=("droog", {}, "VIo"),
@@ -46,12 +58,19 @@ def _mock_bronnen(monkeypatch, *, fgr="Hogere zandgronden", nsn="Dekzandrug",
             return waarde
         return _fn
 
-    monkeypatch.setattr(report, "fgr_from_point", _of_raise(fgr))
+    def _of_raise_async(waarde):
+        fn = _of_raise(waarde)
+
+        async def _afn(*a, **k):
+            return fn(*a, **k)
+        return _afn
+
+    monkeypatch.setattr(report, "fgr_from_point_async", _of_raise_async(fgr))
     monkeypatch.setattr(report, "nsn_from_point", _of_raise(nsn))
-    monkeypatch.setattr(report, "bodem_from_bodemkaart", _of_raise(bodem))
-    monkeypatch.setattr(report, "vocht_from_gwt", _of_raise(gwt))
-    monkeypatch.setattr(report, "ahn_from_wms", _of_raise(ahn))
-    monkeypatch.setattr(report, "gmm_from_wms", _of_raise(gmm))
+    monkeypatch.setattr(report, "bodem_from_bodemkaart_async", _of_raise_async(bodem))
+    monkeypatch.setattr(report, "vocht_from_gwt_async", _of_raise_async(gwt))
+    monkeypatch.setattr(report, "ahn_from_wms_async", _of_raise_async(ahn))
+    monkeypatch.setattr(report, "gmm_from_wms_async", _of_raise_async(gmm))
 
 
 def _tegel_png() -> bytes:
@@ -336,6 +355,8 @@ def test_kaart_wordt_ingesloten_als_de_tiles_werken(monkeypatch):
     _mock_tiles(monkeypatch)
     met_kaart = report.maak_rapport(52.078, 5.89)
 
+    report.clear_cache()
+    monkeypatch.setattr(report, "TILE_TTL_S", -1)  # ook de schijfcache negeren
     _mock_tiles(monkeypatch, gedrag="fout")
     zonder_kaart = report.maak_rapport(52.078, 5.89)
 
@@ -355,6 +376,272 @@ def test_marker_staat_op_het_punt(monkeypatch):
     assert midden == (29, 92, 63)  # huisstijlgroen van de marker
 
 
+# ───────────────────── (e) tile-cache en parallel ophalen
+def _tellende_tiles(monkeypatch, *, vertraging=0.0, eerst_fout=False):
+    import threading
+    import time
+
+    stand = {"calls": 0, "tegelijk": 0, "max_tegelijk": 0}
+    gezien = set()
+    lock = threading.Lock()
+
+    def _fn(z, x, y):
+        with lock:
+            stand["calls"] += 1
+            stand["tegelijk"] += 1
+            stand["max_tegelijk"] = max(stand["max_tegelijk"], stand["tegelijk"])
+            eerste = (z, x, y) not in gezien
+            gezien.add((z, x, y))
+        try:
+            time.sleep(vertraging)
+            if eerst_fout and eerste:
+                raise ConnectionError("eenmalige hapering")
+            return _tegel_png()
+        finally:
+            with lock:
+                stand["tegelijk"] -= 1
+
+    monkeypatch.setattr(report, "_tile_png", _fn)
+    return stand
+
+
+def test_tiles_worden_parallel_opgehaald(monkeypatch):
+    stand = _tellende_tiles(monkeypatch, vertraging=0.05)
+    assert report._static_map_image(52.078, 5.89) is not None
+    assert stand["calls"] == 9
+    assert stand["max_tegelijk"] > 1
+
+
+def test_tweede_kaart_haalt_geen_tiles_meer_op(monkeypatch):
+    stand = _tellende_tiles(monkeypatch)
+    eerste = report._static_map_image(52.078, 5.89).getvalue()
+    tweede = report._static_map_image(52.078, 5.89).getvalue()
+    assert stand["calls"] == 9
+    assert eerste == tweede
+
+    # een naburig punt deelt de tiles via de tile-cache
+    report._static_map_image(52.07801, 5.89001)
+    assert stand["calls"] == 9
+
+
+def test_schijfcache_overleeft_het_legen_van_het_geheugen(monkeypatch):
+    stand = _tellende_tiles(monkeypatch)
+    report._static_map_image(52.078, 5.89)
+    report.clear_kaart_cache()
+    assert report._static_map_image(52.078, 5.89) is not None
+    assert stand["calls"] == 9
+
+
+def test_verlopen_tile_op_schijf_wordt_opnieuw_opgehaald(monkeypatch):
+    stand = _tellende_tiles(monkeypatch)
+    report._static_map_image(52.078, 5.89)
+    report.clear_kaart_cache()
+    monkeypatch.setattr(report, "TILE_TTL_S", -1)
+    report._static_map_image(52.078, 5.89)
+    assert stand["calls"] == 18
+
+
+def test_haperende_tile_krijgt_een_herkansing(monkeypatch):
+    stand = _tellende_tiles(monkeypatch, eerst_fout=True)
+    assert report._static_map_image(52.078, 5.89) is not None
+    assert stand["calls"] == 18
+
+
+# ───────────────────── (f) hergebruik van stijlen, fragmenten en rapporten
+def _tellende_bronnen(monkeypatch, **kwargs):
+    _mock_bronnen(monkeypatch, **kwargs)
+    stand = {"calls": 0}
+    fgr = report.fgr_from_point_async
+
+    async def _fn(*a, **k):
+        stand["calls"] += 1
+        return await fgr(*a, **k)
+
+    monkeypatch.setattr(report, "fgr_from_point_async", _fn)
+    return stand
+
+
+def test_stijlen_worden_eenmalig_gebouwd():
+    assert report._stijlen() is report._stijlen()
+
+
+def test_identiek_rapport_komt_uit_de_cache(monkeypatch):
+    stand = _tellende_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    eerste = report.maak_rapport(52.078, 5.89)
+    tweede = report.maak_rapport(52.078000001, 5.89)   # zelfde plek op 5 decimalen
+    assert stand["calls"] == 1
+    assert tweede is eerste
+
+    # een ander filter is een ander rapport
+    report.maak_rapport(52.078, 5.89, licht=["zon"])
+    assert stand["calls"] == 2
+
+
+def test_rapport_met_kapotte_bron_wordt_niet_bewaard(monkeypatch):
+    stand = _tellende_bronnen(monkeypatch, bodem=RuntimeError("PDOK plat"))
+    _mock_tiles(monkeypatch)
+    report.maak_rapport(52.078, 5.89)
+    report.maak_rapport(52.078, 5.89)
+    assert stand["calls"] == 2
+
+
+def test_hergebruikte_fragmenten_geven_dezelfde_tekst(monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    koud = _pdf_tekst(report.maak_rapport(52.078, 5.89))
+    assert report._FRAGMENTEN
+
+    report._RAPPORTEN.clear()   # alleen het rapport opnieuw, fragmenten blijven
+    warm = _pdf_tekst(report.maak_rapport(52.078, 5.89))
+    assert warm == koud
+    assert "Zo versterk je dit landschap" in warm
+
+
+# ───────────────────── (g) procespool: backpressure en timeout
+def test_pdf_via_de_procespool(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    monkeypatch.setattr(pdfpool, "PDF_WORKERS", 1)
+    try:
+        r = client.get("/advies/pdf", params={"lat": 52.078, "lon": 5.89})
+    finally:
+        pdfpool.shutdown()
+    assert r.status_code == 200
+    assert _is_geldige_pdf(r.content)
+    assert "Jouw plek" in _pdf_tekst(r.content)
+
+
+def test_pdf_route_draait_op_de_loop_van_de_app(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+
+    def geen_eigen_loop(coro):
+        coro.close()
+        raise AssertionError("de route hoort de gedeelde client te gebruiken")
+
+    monkeypatch.setattr(httpklient, "voer_uit", geen_eigen_loop)
+    r = client.get("/advies/pdf", params={"lat": 52.078, "lon": 5.89})
+    assert r.status_code == 200
+    assert r.content.startswith(b"%PDF")
+
+
+def test_volle_wachtrij_geeft_429(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    monkeypatch.setattr(pdfpool, "PDF_WACHTRIJ", 0)
+
+    async def niet_verzamelen(*a, **k):
+        raise AssertionError("een volle rij mag niets meer ophalen")
+
+    monkeypatch.setattr(report, "verzamel_rapport_async", niet_verzamelen)
+    r = client.get("/advies/pdf", params={"lat": 52.078, "lon": 5.89})
+    assert r.status_code == 429
+    assert r.json()["error"] == "pdf_wachtrij_vol"
+    assert int(r.headers["retry-after"]) > 0
+    assert pdfpool.status()["in_behandeling"] == 0
+
+
+def test_trage_worker_geeft_504_en_geeft_zijn_plek_terug(client: TestClient, monkeypatch):
+    import time
+
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    monkeypatch.setattr(pdfpool, "PDF_WORKERS", 1)
+    monkeypatch.setattr(pdfpool, "PDF_TIMEOUT_S", 0.001)  # korter dan het starten van de worker
+    try:
+        r = client.get("/advies/pdf", params={"lat": 52.078, "lon": 5.89})
+        assert r.status_code == 504
+        assert r.json()["error"] == "pdf_timeout"
+
+        for _ in range(300):   # de worker maakt het rapport alsnog af
+            if pdfpool.status()["in_behandeling"] == 0:
+                break
+            time.sleep(0.05)
+        assert pdfpool.status()["in_behandeling"] == 0
+    finally:
+        pdfpool.shutdown()
+
+
+# ───────────────────── (h) asynchrone PDF-jobs
+def _wacht_op_job(client: TestClient, job_id: str) -> dict:
+    import time
+
+    for _ in range(200):
+        job = client.get(f"/advies/pdf/jobs/{job_id}").json()
+        if job["status"] in ("klaar", "fout"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} niet klaar: {job}")
+
+
+def test_pdf_job_aanvragen_pollen_en_downloaden(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    r = client.post("/advies/pdf/jobs", params={"lat": 52.078, "lon": 5.89})
+    assert r.status_code == 202
+    job = r.json()
+    assert job["status"] in ("wachtend", "bezig", "klaar")
+    assert r.headers["location"] == job["status_url"] == f"/advies/pdf/jobs/{job['id']}"
+
+    klaar = _wacht_op_job(client, job["id"])
+    assert klaar["status"] == "klaar"
+    assert klaar["bytes"] > 0
+
+    pdf = client.get(klaar["download_url"])
+    assert pdf.status_code == 200
+    assert pdf.headers["content-type"].startswith("application/pdf")
+    assert _is_geldige_pdf(pdf.content)
+    assert "Jouw plek" in _pdf_tekst(pdf.content)
+
+
+def test_identieke_aanvraag_geeft_dezelfde_job(client: TestClient, monkeypatch):
+    import threading
+
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    los = threading.Event()
+    fgr = report.fgr_from_point_async
+
+    async def _wacht(*a, **k):
+        los.wait(5)   # blokkeert alleen de event loop van deze job-thread
+        return await fgr(*a, **k)
+    monkeypatch.setattr(report, "fgr_from_point_async", _wacht)
+
+    params = {"lat": 52.078, "lon": 5.89, "licht": ["zon"]}
+    eerste = client.post("/advies/pdf/jobs", params=params).json()
+    tweede = client.post("/advies/pdf/jobs",
+                         params={**params, "lat": 52.0780001}).json()
+    ander = client.post("/advies/pdf/jobs", params={**params, "licht": ["schaduw"]}).json()
+    assert tweede["id"] == eerste["id"]
+    assert ander["id"] != eerste["id"]
+
+    # nog niet klaar ⇒ 409 met de status erbij
+    r = client.get(f"/advies/pdf/jobs/{eerste['id']}/download")
+    assert r.status_code == 409
+    assert r.json()["error"] == "job_niet_klaar"
+
+    los.set()
+    assert _wacht_op_job(client, eerste["id"])["status"] == "klaar"
+    assert _wacht_op_job(client, ander["id"])["status"] == "klaar"
+
+
+def test_onbekende_job_is_404(client: TestClient):
+    assert client.get("/advies/pdf/jobs/bestaat-niet").status_code == 404
+    r = client.get("/advies/pdf/jobs/bestaat-niet/download")
+    assert r.status_code == 404
+    assert r.json()["error"] == "job_niet_gevonden"
+
+
+def test_verlopen_job_is_weg(client: TestClient, monkeypatch):
+    _mock_bronnen(monkeypatch)
+    _mock_tiles(monkeypatch)
+    job = client.post("/advies/pdf/jobs", params={"lat": 52.078, "lon": 5.89}).json()
+    _wacht_op_job(client, job["id"])
+    monkeypatch.setattr(pdfjobs, "JOB_TTL_S", -1)
+    assert client.get(f"/advies/pdf/jobs/{job['id']}").status_code == 404
+
+
 # ───────────────────── overige contractafspraken
 def test_ontbrekende_coordinaten_is_422(client: TestClient):
     assert client.get("/advies/pdf").status_code == 422
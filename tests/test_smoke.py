@@ -76,6 +76,53 @@ def test_plants_zoekterm(client: TestClient):
                for it in data["items"])
 
 
+def test_plants_pagineren_met_cursor(client: TestClient):
+    """Pagina's via next_cursor sluiten precies aan op de volledige lijst."""
+    params = {"vocht": "nat", "sort": "hoogte", "desc": "true"}
+    alles = client.get("/api/plants", params=params).json()["items"]
+
+    namen, cursor = [], None
+    while True:
+        r = client.get("/api/plants", params=dict(params, limit=25, fields="naam",
+                                                  **({"cursor": cursor} if cursor else {})))
+        assert r.status_code == 200
+        data = r.json()
+        assert data["count"] == len(alles)
+        assert all(list(it) == ["naam"] for it in data["items"])
+        namen += [it["naam"] for it in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert namen == [it["naam"] for it in alles]
+
+
+def test_plants_limit_offset_en_fields(client: TestClient):
+    alles = client.get("/api/plants").json()["items"]
+    r = client.get("/api/plants", params={"limit": 3, "offset": 5,
+                                          "fields": ["naam", "vocht,hoogte"]})
+    data = r.json()
+    assert [it["naam"] for it in data["items"]] == [it["naam"] for it in alles[5:8]]
+    assert list(data["items"][0]) == ["naam", "vocht", "hoogte"]
+    assert data["next_cursor"]
+
+
+@pytest.mark.parametrize("params,fout", [
+    ({"fields": "naam,bestaat_niet"}, "onbekend_veld"),
+    ({"cursor": "onzin!"}, "ongeldige_cursor"),
+])
+def test_plants_ongeldige_paginering_is_400(client: TestClient, params: dict, fout: str):
+    r = client.get("/api/plants", params=params)
+    assert r.status_code == 400
+    assert r.json()["error"] == fout
+
+
+def test_plants_cursor_hoort_bij_de_zoekopdracht(client: TestClient):
+    cursor = client.get("/api/plants", params={"vocht": "nat", "limit": 2}).json()["next_cursor"]
+    r = client.get("/api/plants", params={"vocht": "droog", "limit": 2, "cursor": cursor})
+    assert r.status_code == 400
+    assert r.json()["error"] == "ongeldige_cursor"
+
+
 def test_index_geeft_html(client: TestClient):
     r = client.get("/")
     assert r.status_code == 200
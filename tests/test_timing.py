@@ -0,0 +1,100 @@
+"""Tijdmeting per request (services/timing.py): Server-Timing, `timings` en histogrammen."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.routers import advies as advies_router  # noqa: E402
+from plantwijs.services import metrics, timing  # noqa: E402
+
+BRONNEN = ("fgr", "nsn", "bodem", "gwt", "ahn", "gmm")
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _bronnen(monkeypatch):
+    def _async(waarde):
+        async def _fn(*_a, **_k):
+            return waarde
+        return _fn
+
+    monkeypatch.setattr(advies_router, "fgr_from_point_async", _async("Hogere zandgronden"))
+    monkeypatch.setattr(advies_router, "nsn_from_point", lambda *_a: "Dekzandrug")
+    monkeypatch.setattr(advies_router, "bodem_from_bodemkaart_async", _async(("zand", {})))
+    monkeypatch.setattr(advies_router, "vocht_from_gwt_async", _async(("droog", {}, "VIo")))
+    monkeypatch.setattr(advies_router, "ahn_from_wms_async", _async(("12.34", {})))
+    monkeypatch.setattr(advies_router, "gmm_from_wms_async", _async(("Dekzandrug", {})))
+    timing.reset()
+    yield
+    timing.reset()
+
+
+def _server_timing(r) -> dict:
+    uit = {}
+    for deel in r.headers["server-timing"].split(","):
+        naam, dur = deel.strip().split(";dur=")
+        uit[naam] = float(dur)
+    return uit
+
+
+def test_advies_geo_stappen_in_header_en_json(client: TestClient):
+    r = client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89, "limit": 5})
+    assert r.status_code == 200
+    header = _server_timing(r)
+    assert set(BRONNEN) | {"filter", "kennislaag", "serialisatie", "totaal"} <= set(header)
+    assert header["totaal"] >= header["filter"]
+    assert r.headers["timing-allow-origin"] == "*"
+
+    d = r.json()
+    assert set(BRONNEN) | {"filter", "kennislaag"} <= set(d["timings"])
+    assert "serialisatie" not in d["timings"]   # die loopt nog tijdens het serialiseren
+    assert d["elapsed_ms"] >= 0
+
+
+def test_markdown_en_histogrammen_per_route(client: TestClient):
+    r = client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89, "format": "md"})
+    assert "markdown" in _server_timing(r)
+    client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89})
+
+    samenvatting = timing.samenvatting()["/advies/geo"]
+    assert samenvatting["totaal"]["aantal"] == 2
+    assert samenvatting["fgr"]["p95_ms"] is not None
+    health = client.get("/api/health").json()
+    assert health["timings"]["/advies/geo"]["kennislaag"]["aantal"] == 2
+
+    # routesjablonen, geen losse paden; onbekende paden samen onder "overig"
+    client.get("/advies/pdf/jobs/bestaat-niet")
+    client.get("/bestaat/niet")
+    client.get("/openapi.json")
+    assert {"/advies/pdf/jobs/{job_id}", "overig", "/openapi.json"} <= set(timing.samenvatting())
+    assert "/advies/pdf/jobs/bestaat-niet" not in timing.samenvatting()
+
+
+def test_stap_buiten_request():
+    with timing.stap("los"):
+        pass
+    assert timing.timings() == {}
+
+
+def test_threadpool_in_metrics(monkeypatch):
+    monkeypatch.setattr(timing, "_LIMITER", None)
+    assert "plantwijs_threadpool" not in metrics.tekst()
+
+    async def _in_loop():
+        timing.volg_threadpool()
+    anyio.run(_in_loop)
+    tekst = metrics.tekst()
+    assert "plantwijs_threadpool_size 40" in tekst
+    assert "plantwijs_threadpool_waiting 0" in tekst
@@ -0,0 +1,224 @@
+"""Samenvoegen, doseren en stroomonderbrekers voor externe bronnen (services/upstream.py)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import pdok, upstream  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _schone_tellers():
+    upstream.reset()
+    yield
+    upstream.reset()
+
+
+def _tegelijk(n: int, fn) -> list:
+    uit = []
+    threads = [threading.Thread(target=lambda: uit.append(fn())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return uit
+
+
+def test_eenmalig_deelt_een_lopende_aanroep():
+    aanroepen = []
+
+    def _traag():
+        aanroepen.append(1)
+        time.sleep(0.2)
+        return {"ok": True}
+
+    uit = _tegelijk(6, lambda: upstream.eenmalig(("https://voorbeeld.nl/a",), _traag))
+    assert len(aanroepen) == 1
+    assert uit == [{"ok": True}] * 6
+    assert upstream.status()["voorbeeld.nl"]["samengevoegd"] == 5
+    # daarna is er niets meer in de lucht: een nieuwe aanroep vraagt opnieuw
+    upstream.eenmalig(("https://voorbeeld.nl/a",), _traag)
+    assert len(aanroepen) == 2
+
+
+def test_eenmalig_geeft_de_fout_aan_iedereen():
+    def _stuk():
+        time.sleep(0.1)
+        raise ValueError("kapot")
+
+    fouten = []
+
+    def _roep():
+        try:
+            upstream.eenmalig(("https://voorbeeld.nl/b",), _stuk)
+        except ValueError as e:
+            fouten.append(str(e))
+    _tegelijk(4, _roep)
+    assert fouten == ["kapot"] * 4
+
+
+def test_eenmalig_async_deelt_binnen_de_loop():
+    aanroepen = []
+
+    async def _traag():
+        aanroepen.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def _alle():
+        return await asyncio.gather(*[
+            upstream.eenmalig_async(("https://voorbeeld.nl/c",), _traag) for _ in range(5)])
+
+    assert asyncio.run(_alle()) == [42] * 5
+    assert len(aanroepen) == 1
+
+
+def test_emmer_reserveert_op_volgorde():
+    emmer = upstream._Emmer(rps=10, burst=2)
+    wachttijden = [emmer.reserveer(0.25) for _ in range(5)]
+    assert wachttijden[:2] == [0.0, 0.0]
+    assert wachttijden[2] == pytest.approx(0.1, abs=0.02)
+    assert wachttijden[3] == pytest.approx(0.2, abs=0.02)
+    assert wachttijden[4] is None   # zou langer dan 0,25 s wachten
+    assert upstream._Emmer(rps=0, burst=1).reserveer(0) == 0.0
+
+
+def test_featureinfo_voor_hetzelfde_punt_een_aanvraag(monkeypatch):
+    aanroepen = []
+
+    async def _get(*_a, **_k):
+        aanroepen.append(1)
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"features": [{"properties": {"waarde": 1}}]})
+    monkeypatch.setattr(pdok.httpklient, "get", _get)
+
+    async def _alle():
+        return await asyncio.gather(*[
+            pdok._wms_getfeatureinfo_async(pdok.AHN_WMS, "dtm_05m", 52.1, 5.1) for _ in range(5)])
+
+    uit = asyncio.run(_alle())
+    assert len(aanroepen) == 1
+    assert uit == [{"waarde": 1}] * 5
+    assert len({id(p) for p in uit}) == 5   # elk een eigen dict
+
+
+def test_volle_wachtrij_is_een_bronfout(monkeypatch):
+    monkeypatch.setattr(upstream, "UPSTREAM_RPS", 0.01)
+    monkeypatch.setattr(upstream, "UPSTREAM_BURST", 1)
+    monkeypatch.setattr(upstream, "UPSTREAM_WACHT_S", 0.0)
+
+    async def _get(*_a, **_k):
+        return httpx.Response(200, json={"features": [{"properties": {"waarde": 1}}]})
+    monkeypatch.setattr(pdok.httpklient, "get", _get)
+
+    assert pdok._wms_getfeatureinfo(pdok.AHN_WMS, "dtm_05m", 52.1, 5.1) == {"waarde": 1}
+    with pytest.raises(upstream.UpstreamBezet):
+        pdok._wms_getfeatureinfo(pdok.AHN_WMS, "dtm_05m", 52.2, 5.2)
+    teller = upstream.status()[upstream.host(pdok.AHN_WMS)]
+    assert teller["aanvragen"] == 1 and teller["geweigerd"] == 1
+
+
+def test_health_toont_de_tellers(client: TestClient):
+    upstream.eenmalig(("https://voorbeeld.nl/d",), lambda: upstream.wacht("https://voorbeeld.nl/d"))
+    data = client.get("/api/health").json()
+    assert data["upstream"]["voorbeeld.nl"]["aanvragen"] == 1
+    assert data["upstream"]["voorbeeld.nl"]["lopend"] == 0
+
+
+# ───────────────────── stroomonderbreker
+def test_onderbreker_opent_en_herstelt(monkeypatch):
+    monkeypatch.setattr(upstream, "BRON_DREMPEL", 2)
+    monkeypatch.setattr(upstream, "BRON_RUST_S", 3600)
+
+    def _storing():
+        with upstream.bewaakt("bodem"):
+            raise upstream.BronStoring("time-out")
+
+    for _ in range(2):
+        with pytest.raises(upstream.BronStoring):
+            _storing()
+    assert upstream.onderbrekers()["bodem"]["staat"] == "open"
+    with pytest.raises(upstream.BronOpen):
+        with upstream.bewaakt("bodem"):
+            raise AssertionError("mag niet uitgevoerd worden")
+
+    # rustperiode voorbij: één proef; lukt die, dan weer dicht
+    monkeypatch.setattr(upstream, "BRON_RUST_S", 0)
+    with upstream.bewaakt("bodem"):
+        assert upstream.onderbrekers()["bodem"]["staat"] == "half_open"
+        with pytest.raises(upstream.BronOpen):   # tijdens de proef niemand anders
+            with upstream.bewaakt("bodem"):
+                pass
+    stand = upstream.onderbrekers()["bodem"]
+    assert stand["staat"] == "dicht" and stand["fouten_op_rij"] == 0
+    assert stand["keer_geopend"] == 1 and stand["afgewezen"] == 2
+
+
+def test_mislukte_proef_heropent(monkeypatch):
+    monkeypatch.setattr(upstream, "BRON_DREMPEL", 1)
+    monkeypatch.setattr(upstream, "BRON_RUST_S", 0)
+    for _ in range(2):
+        with pytest.raises(upstream.BronStoring):
+            with upstream.bewaakt("ahn"):
+                raise upstream.BronStoring("weg")
+    assert upstream.onderbrekers()["ahn"]["staat"] == "open"
+    # gewone fouten (geen storing) tellen niet mee
+    with pytest.raises(ValueError):
+        with upstream.bewaakt("ahn"):
+            raise ValueError("kapot antwoord")
+    assert upstream.onderbrekers()["ahn"]["staat"] == "half_open"
+
+
+def test_timeout_stopt_de_formatenreeks(monkeypatch):
+    aanroepen = []
+
+    async def _get(*_a, **_k):
+        aanroepen.append(1)
+        raise httpx.ReadTimeout("te traag")
+    monkeypatch.setattr(pdok.httpklient, "get", _get)
+    with pytest.raises(upstream.BronStoring):
+        pdok._wms_getfeatureinfo(pdok.GMM_WMS, "x", 52.1, 5.1)
+    assert len(aanroepen) == 1
+    assert upstream.onderbrekers()["gmm"]["fouten_op_rij"] == 1
+
+
+def test_advies_geo_faalt_snel_bij_open_onderbreker(client: TestClient, monkeypatch):
+    from plantwijs.routers import advies as advies_router
+    from plantwijs.services import httpklient
+
+    monkeypatch.setattr(upstream, "BRON_DREMPEL", 1)
+    monkeypatch.setattr(upstream, "BRON_RUST_S", 3600)
+    monkeypatch.setattr(pdok, "_WMSMETA", pdok._fallback_layers())
+    monkeypatch.setattr(advies_router, "nsn_from_point", lambda *_a, **_k: None)
+    aanroepen = []
+
+    async def _get(url, *_a, **_k):
+        aanroepen.append(url)
+        raise httpx.ConnectTimeout("te traag")
+    monkeypatch.setattr(httpklient, "get", _get)
+
+    eerste = client.get("/advies/geo", params={"lat": 52.078, "lon": 5.89}).json()
+    assert {eerste["bronnen_status"][b] for b in ("fgr", "bodem", "gwt", "ahn", "gmm")} == {"fout"}
+    n = len(aanroepen)
+
+    tweede = client.get("/advies/geo", params={"lat": 52.2, "lon": 5.5}).json()
+    assert len(aanroepen) == n   # niets meer naar PDOK
+    assert tweede["bronnen_status"]["bodem"] == "fout"
+    bronnen = client.get("/api/health").json()["bronnen"]
+    assert bronnen["bodem"]["staat"] == "open" and bronnen["bodem"]["afgewezen"] >= 1
@@ -0,0 +1,100 @@
+"""WMS-laagnamen: laagindex, schijfcache en verversen op de achtergrond (services/pdok.py)."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.services import pdok  # noqa: E402
+
+CAPS = """<WMS_Capabilities xmlns="http://www.opengis.net/wms"><Capability>
+  <Layer><Title>Service</Title>
+    <Layer><Name>eerste</Name><Title>Iets anders</Title></Layer>
+    <Layer><Name>ghg_laag</Name><Title>Hoogste stand</Title></Layer>
+    <Layer><Name>gt_laag</Name><Title>BRO Grondwatertrappen</Title></Layer>
+  </Layer>
+</Capability></WMS_Capabilities>"""
+
+
+@pytest.fixture(autouse=True)
+def _schone_meta(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdok, "_WMSMETA", {})
+    monkeypatch.setattr(pdok, "_WMSMETA_OP", 0.0)
+    monkeypatch.setattr(pdok, "_WMSMETA_VERVERS", None)
+    monkeypatch.setattr(pdok, "WMSMETA_PAD", str(tmp_path / "wmsmeta.json"))
+    pdok._laagindex.cache_clear()
+    yield
+    pdok._laagindex.cache_clear()
+
+
+def _meta(achtervoegsel: str) -> dict:
+    return {k: dict(v, layer=v["layer"] + achtervoegsel) for k, v in pdok._fallback_layers().items()}
+
+
+def _schrijf(meta: dict, op: float) -> None:
+    with open(pdok.WMSMETA_PAD, "w", encoding="utf-8") as f:
+        json.dump({"opgelost_op": op, "meta": meta}, f)
+
+
+def test_find_layer_name_rangorde(monkeypatch):
+    monkeypatch.setattr(pdok, "_capabilities", lambda _url: ET.fromstring(CAPS))
+    assert pdok._find_layer_name("u", ["grondwatertrappen"]) == ("gt_laag", "BRO Grondwatertrappen")
+    assert pdok._find_layer_name("u", ["ghg"]) == ("ghg_laag", "Hoogste stand")   # via de naam
+    assert pdok._find_layer_name("u", ["bestaat niet"]) == ("eerste", "Iets anders")
+
+
+def test_laagnamen_van_schijf_zonder_netwerk(monkeypatch):
+    _schrijf(_meta("_schijf"), time.time())
+
+    def _geen_netwerk():
+        raise AssertionError("GetCapabilities opgevraagd")
+    monkeypatch.setattr(pdok, "_resolve_layers", _geen_netwerk)
+    assert pdok.get_wms_meta()["bodem"]["layer"] == "Bodemvlakken_schijf"
+
+
+def test_oude_laagnamen_eerst_gebruiken_dan_verversen(monkeypatch):
+    _schrijf(_meta("_oud"), time.time() - pdok.WMSMETA_TTL_S - 10)
+    los = threading.Event()
+
+    def _resolve():
+        assert los.wait(5)
+        return _meta("_nieuw"), True
+    monkeypatch.setattr(pdok, "_resolve_layers", _resolve)
+
+    assert pdok.get_wms_meta()["gmm"]["layer"].endswith("_oud")
+    los.set()
+    pdok._WMSMETA_VERVERS.join(5)
+    assert pdok.get_wms_meta()["gmm"]["layer"].endswith("_nieuw")
+    with open(pdok.WMSMETA_PAD, encoding="utf-8") as f:
+        assert json.load(f)["meta"]["gmm"]["layer"].endswith("_nieuw")
+
+
+def test_warm_blokkeert_niet(monkeypatch):
+    los = threading.Event()
+
+    def _resolve():
+        assert los.wait(5)
+        return _meta("_live"), True
+    monkeypatch.setattr(pdok, "_resolve_layers", _resolve)
+
+    t0 = time.perf_counter()
+    pdok.warm_wms_meta()
+    assert time.perf_counter() - t0 < 0.5
+    assert pdok.get_wms_meta() == pdok._fallback_layers()   # tijdens het oplossen: defaults
+    los.set()
+    pdok._WMSMETA_VERVERS.join(5)
+    assert pdok.get_wms_meta()["ahn"]["layer"] == "dtm_05m_live"
+
+
+def test_onbereikbaar_geeft_defaults_zonder_bestand(monkeypatch):
+    monkeypatch.setattr(pdok, "_resolve_layers", lambda: (pdok._fallback_layers(), False))
+    assert pdok.get_wms_meta() == pdok._fallback_layers()
+    assert not os.path.exists(pdok.WMSMETA_PAD)
@@ -138,3 +138,61 @@ def test_verschuiving_wordt_begrensd():
     r = wortel.bepaal(bodem="veen", gt_code="Ia", nsn="Petgaten")
     assert r["klasse"] == "zeer_beperkt"
     assert r["band_cm"] == "0-30"
+
+
+# ───────────────────── gecompileerde beslistabel = stapsgewijze regels
+def _regel_lineair(bodem_t, gt_t):
+    for r in wortel._regels():
+        if bodem_t in [wortel._token(b) for b in r.get("bodem") or []] and \
+                gt_t in [wortel._token(g) for g in r.get("gt") or []]:
+            return r
+    return None
+
+
+def _mediaan_lineair(regels):
+    if not regels:
+        return None
+    orde = wortel._klasse_orde()
+
+    def idx(r):
+        k = str(r.get("klasse") or "")
+        return orde.index(k) if k in orde else len(orde)
+
+    gesorteerd = sorted(regels, key=idx)
+    return gesorteerd[len(gesorteerd) // 2]
+
+
+def _modifier_lineair(nsn):
+    import re
+
+    n = wortel._norm(nsn)
+    woorden = set(re.split(r"[^a-z0-9]+", n))
+    for rule in wortel._modifiers():
+        trefwoorden, codes = wortel._modifier_sleutels(rule)
+        if any(w in n for w in trefwoorden) or any(c in woorden for c in codes):
+            return rule
+    return None
+
+
+def test_tabel_geeft_dezelfde_regels_als_de_lijst():
+    bodems = wortel._alle_tokens("bodem") + ["onbekend"]
+    gts = wortel._alle_tokens("gt") + ["xx"]
+    for b in bodems:
+        for g in gts:
+            assert wortel._regel_voor(b, g) is _regel_lineair(b, g), (b, g)
+        lineair = [r for r in wortel._regels()
+                   if b in [wortel._token(v) for v in r.get("bodem") or []]]
+        assert wortel._tabel().mediaan["bodem"].get(b) is _mediaan_lineair(lineair)
+    for g in gts:
+        lineair = [r for r in wortel._regels()
+                   if g in [wortel._token(v) for v in r.get("gt") or []]]
+        assert wortel._tabel().mediaan["gt"].get(g) is _mediaan_lineair(lineair)
+
+
+def test_modifier_index_gelijk_aan_lijst():
+    labels = ["Dekzandrug", "Kom", "Restgeul", "Hoogveen", "Rg2", "sw4x", "bos", "", "Water"]
+    for rule in wortel._modifiers():
+        labels += [wortel._leesbaar(t) for t in rule.get("nsn") or []]
+    for label in labels:
+        assert wortel._modifier_voor(label) is (_modifier_lineair(label) if label else None), label
+        assert wortel._modifier_voor(label) is wortel._modifier_voor(label)   # via het memo
@@ -0,0 +1,101 @@
+"""Zoekindex over de soortnamen (services/zoekindex.py) en /api/plants/suggest."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plantwijs.main import app  # noqa: E402
+from plantwijs.services import dataset, zoekindex  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def index() -> zoekindex.Zoekindex:
+    df = dataset.get_df()
+    return zoekindex.index_voor(df, df.attrs.get(dataset.VERSIE_ATTR))
+
+
+def _namen(index, treffers):
+    df = dataset.get_df()
+    return [df.at[lbl, "naam"] for lbl, _ in treffers]
+
+
+def test_vouw():
+    assert zoekindex.vouw("Löss") == "loss"
+    assert zoekindex.vouw("Platanus × hispanica") == "platanus x hispanica"
+    assert zoekindex.vouw("Tilia 'Greenspire'") == "tilia greenspire"
+    assert zoekindex.vouw(None) == ""
+
+
+def test_kleine_index_accent_en_cultivar():
+    df = pd.DataFrame({
+        "naam": ["Lösskers", "Winterlinde 'Greenspire'", "Eik"],
+        "wetenschappelijke_naam": ["Prunus avium", "Tilia cordata 'Greenspire'", "Quercus robur"],
+    })
+    idx = zoekindex.Zoekindex(df)
+    assert [lbl for lbl, _ in idx.treffers("loss")] == [0]
+    assert [lbl for lbl, _ in idx.treffers("greenspire")] == [1]
+    assert [lbl for lbl, _ in idx.treffers("quercus robur")] == [2]
+
+
+def test_treffers_omvatten_het_oude_substringfilter(index):
+    df = dataset.get_df()
+    for q in ("eik", "quercus", "acer", "ab", "Tilia cordata", "berlin"):
+        oud = {lbl for lbl, r in df.iterrows()
+               if q.lower() in str(r.get("naam") or "").lower()
+               or q.lower() in str(r.get("wetenschappelijke_naam") or "").lower()}
+        nieuw = {lbl for lbl, _ in index.treffers(q)}
+        assert oud <= nieuw, q
+
+
+def test_rangorde_exact_en_begin_eerst(index):
+    namen = _namen(index, index.treffers("zomereik"))
+    assert namen[0].lower().startswith("zomereik")
+    scores = [s for _, s in index.treffers("eik")]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_tikfout_vindt_de_soort(index):
+    assert any("zomereik" in n.lower() for n in _namen(index, index.treffers("zomerijk"))[:3])
+    assert index.treffers("zomerijk", fuzzy=False) == []
+    assert index.treffers("qqqqqqq") == []
+
+
+def test_suggest_memo_geeft_kopie(index):
+    eerste = index.suggesties("acer", 5)
+    eerste[0]["naam"] = "x"
+    assert index.suggesties("acer", 5)[0]["naam"] != "x"
+
+
+def test_api_plants_q_en_relevantie(client: TestClient):
+    r = client.get("/api/plants", params={"q": "zomerijk", "fields": "naam"})
+    assert r.status_code == 200
+    assert any("zomereik" in i["naam"].lower() for i in r.json()["items"])
+
+    r = client.get("/api/plants", params={"q": "linde", "sort": "relevantie", "fields": "naam"})
+    namen = [i["naam"].lower() for i in r.json()["items"]]
+    assert namen and namen[0].startswith("linde")
+
+
+def test_suggest_endpoint(client: TestClient):
+    r = client.get("/api/plants/suggest", params={"q": "querc", "limit": 5})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["q"] == "querc"
+    assert 0 < len(data["items"]) <= 5
+    assert all(i["wetenschappelijke_naam"].lower().startswith("quercus") for i in data["items"])
+    assert set(data["items"][0]) == {"naam", "wetenschappelijke_naam", "nederlandse_naam", "score"}
+
+    assert client.get("/api/plants/suggest", params={"q": ""}).json()["items"] == []
+    assert client.get("/api/plants/suggest", params={"q": "a", "limit": 0}).status_code == 422